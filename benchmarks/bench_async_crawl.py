@@ -0,0 +1,76 @@
+# seoran/benchmarks/bench_async_crawl.py
+# بنچمارک خزش ناهمگام در برابر سرور محلی: گزارش صفحه بر ثانیه برای 1، 10 و 100 میزبان.
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/bench_async_crawl.py
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "crawler"))
+sys.path.insert(0, BENCH_DIR)
+
+import crawler  # noqa: E402
+from async_crawler import crawl_website_concurrent  # noqa: E402
+from local_site import LocalSiteServer  # noqa: E402
+
+
+def run_async(host_count, max_pages, concurrency, per_host_connections, host_delay, latency):
+    with LocalSiteServer(host_count=host_count, latency=latency) as site:
+        crawler.ALLOWED_DOMAINS = []
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            pages = crawl_website_concurrent(site.start_url(), max_pages=max_pages,
+                                             allowed_domains_list=site.allowed_domains(),
+                                             max_concurrency=concurrency,
+                                             max_connections_per_host=per_host_connections,
+                                             host_delay=host_delay)
+        elapsed = time.perf_counter() - start
+    return pages, elapsed
+
+
+def run_sync(max_pages, host_delay, latency):
+    with LocalSiteServer(host_count=1, latency=latency) as site:
+        crawler.ALLOWED_DOMAINS = []
+        crawler.REQUEST_DELAY = host_delay
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            crawler.crawl_website(site.start_url(), max_pages=max_pages,
+                                  allowed_domains_list=site.allowed_domains())
+        elapsed = time.perf_counter() - start
+    return crawler.pages_crawled_count, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک خزنده ناهمگام")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--per-host-connections", type=int, default=4)
+    parser.add_argument("--host-delay", type=float, default=0.05)
+    parser.add_argument("--latency", type=float, default=0.02, help="تاخیر شبیه‌سازی شده سرور (ثانیه)")
+    parser.add_argument("--hosts", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as download_dir:
+        crawler.DOWNLOAD_DIR = download_dir
+        crawler.LOG_LEVEL = "WARNING"
+
+        sync_pages = min(args.pages, 30)
+        pages, elapsed = run_sync(sync_pages, args.host_delay, args.latency)
+        print(f"{'mode':<8}{'hosts':>6}{'pages':>8}{'seconds':>10}{'pages/sec':>12}")
+        print(f"{'sync':<8}{1:>6}{pages:>8}{elapsed:>10.2f}{pages / elapsed:>12.1f}")
+
+        for host_count in args.hosts:
+            pages, elapsed = run_async(host_count, args.pages, args.concurrency,
+                                       args.per_host_connections, args.host_delay, args.latency)
+            print(f"{'async':<8}{host_count:>6}{pages:>8}{elapsed:>10.2f}{pages / elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# seoran/benchmarks/bench_checkpoint.py
+# بنچمارک هزینه checkpoint خزش: رویدادهای خزشی با سرعت --rate صفحه بر ثانیه (هر صفحه --links لینک جدید)
+# شبیه‌سازی می‌شوند و هزینه ثبت رویدادها، زمان هر checkpoint (هر --interval ثانیه) و زمان بازسازی وضعیت
+# برای ادامه خزش گزارش می‌شود.
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/bench_checkpoint.py --pages 200000 --rate 2000
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "crawler"))
+
+from crawl_checkpoint import CrawlCheckpoint  # noqa: E402
+from frontier import Frontier  # noqa: E402
+from seen_store import create_seen_store  # noqa: E402
+
+
+def simulate(path, pages, links_per_page, pages_per_checkpoint):
+    """
+    رویدادهای pages صفحه را ثبت و هر pages_per_checkpoint صفحه یک checkpoint می‌نویسد.
+    (زمان ثبت رویدادها، لیست زمان checkpoint ها) را برمی‌گرداند.
+    """
+    checkpoint = CrawlCheckpoint(path, "http://example.ir/", interval=float('inf'))
+    start_url = "http://example.ir/"
+    checkpoint.pushed(start_url, 0)
+    next_link = 1
+    record_seconds = 0.0
+    checkpoint_times = []
+    for page in range(pages):
+        links = [f"http://host{i % 50}.example.ir/page/{i}" for i in range(next_link, next_link + links_per_page)]
+        next_link += links_per_page
+        url = start_url if page == 0 else f"http://host{page % 50}.example.ir/page/{page}"
+        start = time.perf_counter()
+        checkpoint.done(url)
+        checkpoint.kept(url, (page * 0x9E3779B97F4A7C15) & ((1 << 64) - 1))
+        checkpoint.pushed_many(links, 1)
+        record_seconds += time.perf_counter() - start
+        if (page + 1) % pages_per_checkpoint == 0:
+            start = time.perf_counter()
+            checkpoint.save({'pages_crawled_count': page + 1})
+            checkpoint_times.append(time.perf_counter() - start)
+    checkpoint.close({'pages_crawled_count': pages})
+    return record_seconds, checkpoint_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک هزینه checkpoint خزش")
+    parser.add_argument("--pages", type=int, default=200_000)
+    parser.add_argument("--links", type=int, default=10, help="تعداد لینک جدید هر صفحه")
+    parser.add_argument("--rate", type=float, default=2000, help="سرعت خزش فرضی (صفحه بر ثانیه)")
+    parser.add_argument("--interval", type=float, default=5.0, help="فاصله checkpoint ها (ثانیه)")
+    args = parser.parse_args()
+
+    pages_per_checkpoint = max(1, int(args.rate * args.interval))
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, "crawl_checkpoint.sqlite")
+        record_seconds, checkpoint_times = simulate(path, args.pages, args.links, pages_per_checkpoint)
+        size = sum(os.path.getsize(os.path.join(work_dir, name)) for name in os.listdir(work_dir))
+
+        crawl_seconds = args.pages / args.rate
+        checkpoint_seconds = sum(checkpoint_times)
+        print(f"pages: {args.pages}  links/page: {args.links}  rate: {args.rate:.0f} pages/sec  "
+              f"interval: {args.interval}s ({pages_per_checkpoint} pages)")
+        print(f"recording events:  {record_seconds * 1e6 / args.pages:8.2f} us/page")
+        if checkpoint_times:
+            print(f"checkpoint:        {checkpoint_seconds / len(checkpoint_times) * 1000:8.2f} ms avg  "
+                  f"{max(checkpoint_times) * 1000:8.2f} ms max  ({len(checkpoint_times)} checkpoints)")
+        print(f"overhead:          {(record_seconds + checkpoint_seconds) / crawl_seconds * 100:8.2f} % "
+              f"of crawl time")
+        print(f"checkpoint size:   {size / 1024 / 1024:8.1f} MB")
+
+        start = time.perf_counter()
+        checkpoint = CrawlCheckpoint(path, "http://example.ir/", resume=True)
+        frontier = Frontier(host_delay=0)
+        seen_store = create_seen_store()
+        counters = checkpoint.restore(frontier, seen_store)
+        checkpoint.close()
+        print(f"restore:           {time.perf_counter() - start:8.2f} s  "
+              f"({len(frontier)} queued, {len(seen_store)} seen, {counters['pages_crawled_count']} crawled)")
+        frontier.close()
+
+
+if __name__ == "__main__":
+    main()
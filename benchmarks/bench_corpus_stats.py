@@ -0,0 +1,92 @@
+# seoran/benchmarks/bench_corpus_stats.py
+# بنچمارک آمار پیکره: حلقه‌های پایتون خالص (Counter برای هر سند، دیکشنری df و بردارهای دیکشنری) در برابر
+# ساخت برداری و دسته‌ای با NumPy (corpus_stats.py)، روی همان پیکره مصنوعی bench_token_store در هر دو قالب
+# خروجی پردازشگر. df و وزن‌های TF-IDF دو روش با هم مقایسه می‌شوند.
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/bench_corpus_stats.py --docs 5000
+
+import argparse
+import contextlib
+import io
+import math
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "indexer"))
+sys.path.insert(0, BENCH_DIR)
+
+import numpy as np  # noqa: E402
+
+from corpus_stats import CorpusStats, build_corpus_stats  # noqa: E402
+from index_builder import find_token_files  # noqa: E402
+from bench_token_store import synthetic_documents, write_text, write_token_ids  # noqa: E402
+
+
+def pure_python_stats(tokens_dir):
+    """df و بردار TF-IDF نرمال شده هر سند (همان فرمول corpus_stats) با دیکشنری‌های پایتون."""
+    term_counts = []
+    df = Counter()
+    for path in find_token_files(tokens_dir):
+        with open(path, 'r', encoding='utf-8') as f:
+            counts = Counter(f.read().split())
+        term_counts.append(counts)
+        df.update(counts.keys())
+    doc_count = len(term_counts)
+    idf = {term: math.log((1 + doc_count) / (1 + frequency)) + 1 for term, frequency in df.items()}
+    vectors = []
+    for counts in term_counts:
+        vector = {term: (1 + math.log(count)) * idf[term] for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vectors.append({term: weight / norm for term, weight in vector.items()})
+    return df, vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک آمار پیکره و TF-IDF")
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--mean-length", type=int, default=400)
+    parser.add_argument("--chunk-tokens", type=int, default=500_000)
+    args = parser.parse_args()
+
+    documents = list(synthetic_documents(args.docs, args.vocabulary, args.mean_length))
+    print(f"docs: {args.docs}  tokens: {sum(len(tokens) for _, tokens in documents)}  "
+          f"chunk: {args.chunk_tokens} tokens")
+    with tempfile.TemporaryDirectory() as work_dir:
+        text_dir = os.path.join(work_dir, "text")
+        ids_dir = os.path.join(work_dir, "ids")
+        write_text(text_dir, documents)
+        os.makedirs(ids_dir)
+        write_token_ids(ids_dir, documents)
+
+        start = time.perf_counter()
+        df, vectors = pure_python_stats(text_dir)
+        python_seconds = time.perf_counter() - start
+        print(f"{'pure python (text)':<24}{python_seconds:>8.2f} s")
+
+        for name, tokens_dir in (("numpy (text)", text_dir), ("numpy (token_ids)", ids_dir)):
+            stats_dir = os.path.join(work_dir, f"stats_{name.split()[1][1:-1]}")
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_corpus_stats(tokens_dir, stats_dir, chunk_tokens=args.chunk_tokens)
+            seconds = time.perf_counter() - start
+            print(f"{name:<24}{seconds:>8.2f} s  ({python_seconds / seconds:.1f}x)")
+
+            stats = CorpusStats(stats_dir)
+            assert all(stats.df[stats.term_id(term)] == frequency for term, frequency in df.items())
+            for doc_id in range(0, stats.doc_count, max(1, stats.doc_count // 50)):
+                indices, weights = stats.document_vector(doc_id)
+                expected = vectors[doc_id]
+                assert len(indices) == len(expected)
+                assert np.allclose([expected[stats.vocabulary[i]] for i in indices], weights, atol=1e-5)
+        candidates = stats.stop_word_candidates(limit=5)
+        print("stop word candidates:", ", ".join(f"{term} ({ratio:.0%})" for term, ratio in candidates))
+
+
+if __name__ == "__main__":
+    main()
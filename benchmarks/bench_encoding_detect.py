@@ -0,0 +1,114 @@
+# seoran/benchmarks/bench_encoding_detect.py
+# بنچمارک تشخیص انکودینگ: پارس کامل DOM فقط برای original_encoding (مسیر قدیمی fetch_page)، UnicodeDammit
+# و تشخیص بایتی encoding_detect. برای هر روش زمان CPU به ازای هر صفحه و تعداد صفحاتی که متنشان درست
+# دیکود شده گزارش می‌شود. صفحات ترکیبی از حالت‌های رایج در سایت‌های فارسی هستند: UTF-8 با و بدون charset
+# در هدر، windows-1256 فقط با تگ meta، windows-1256 بدون هیچ اعلامی، UTF-8 با meta غلط windows-1256 و UTF-8
+# با یک بایت سرگردان در پابرگ (یک بایت تنهای 0xD8 یا «Caf\xe9» لاتین-۱). حالت‌های بایت سرگردان یک بررسی
+# رگرسیون هم هستند: اگر تشخیص بایتی آن‌ها را UTF-8 دیکود نکند، بنچمارک با خطا تمام می‌شود.
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/bench_encoding_detect.py --pages 400
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "crawler"))
+sys.path.insert(0, BENCH_DIR)
+
+from bs4 import BeautifulSoup, UnicodeDammit  # noqa: E402
+
+from encoding_detect import decode_html  # noqa: E402
+from bench_page_analysis import make_page  # noqa: E402
+
+# (نام حالت، انکودینگ واقعی، charset در meta، charset هدر HTTP همان‌طور که requests گزارش می‌کند،
+#  بایت‌های سرگردانی که پیش از </footer> اضافه می‌شوند)
+CASES = [
+    ("utf-8 header", 'utf-8', 'utf-8', 'utf-8', None),
+    ("utf-8 meta only", 'utf-8', 'utf-8', None, None),
+    ("1256 meta only", 'windows-1256', 'windows-1256', None, None),
+    ("1256 latin-1 header", 'windows-1256', 'windows-1256', 'ISO-8859-1', None),
+    ("1256 undeclared", 'windows-1256', None, None, None),
+    ("utf-8 wrong meta", 'utf-8', 'windows-1256', None, None),
+    ("utf-8 stray byte", 'utf-8', None, None, b'\xd8'),
+    ("utf-8 latin-1 footer", 'utf-8', 'utf-8', None, b' Caf\xe9'),
+]
+STRAY_BYTE_CASES = {case[0] for case in CASES if case[4] is not None}
+
+
+def build_page(rng, page_number, encoding, meta, stray):
+    html = make_page(rng, page_number, meta or encoding).decode(meta or encoding)
+    if meta is None:
+        html = html.replace('<meta charset="utf-8">', '')
+    if encoding == 'windows-1256':
+        # «ی» فارسی در windows-1256 نیست؛ سایت‌های قدیمی «ي» عربی می‌نویسند
+        html = html.replace('ی', 'ي')
+    raw = html.encode(encoding, errors='replace')
+    if stray is not None:
+        # متن درست همان UTF-8 با جایگزینی بایت‌های خراب است
+        raw = raw.replace(b'</footer>', stray + b'</footer>')
+        html = raw.decode('utf-8', errors='replace')
+    return html, raw
+
+
+def full_parse(raw, declared):
+    """مسیر قدیمی fetch_page: یک پارس کامل فقط برای original_encoding."""
+    if declared and declared.lower() not in ('iso-8859-1', 'windows-1256'):
+        return raw.decode(declared, errors='replace')
+    encoding = BeautifulSoup(raw, 'lxml').original_encoding or 'utf-8'
+    return raw.decode(encoding, errors='replace')
+
+
+def unicode_dammit(raw, declared):
+    if declared and declared.lower() not in ('iso-8859-1', 'windows-1256'):
+        return raw.decode(declared, errors='replace')
+    dammit = UnicodeDammit(raw, is_html=True)
+    return dammit.unicode_markup if dammit.unicode_markup is not None else raw.decode('utf-8', errors='replace')
+
+
+def byte_sniffing(raw, declared):
+    return decode_html(raw, declared)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک تشخیص انکودینگ")
+    parser.add_argument("--pages", type=int, default=400)
+    args = parser.parse_args()
+
+    # UnicodeDammit برای هر صفحه با بایت سرگردان یک هشدار لاگ می‌کند
+    logging.getLogger('bs4').setLevel(logging.ERROR)
+    rng = random.Random(42)
+    pages = []
+    for i in range(args.pages):
+        name, encoding, meta, declared, stray = CASES[i % len(CASES)]
+        text, raw = build_page(rng, i, encoding, meta, stray)
+        pages.append((name, text, raw, declared))
+
+    print(f"pages: {len(pages)}  avg size: {sum(len(p[2]) for p in pages) / len(pages) / 1024:.1f} KB")
+    print(f"{'method':<16}{'us CPU/page':>13}{'correct':>10}   wrong cases")
+    regressions = {}
+    for method_name, method in (("full parse", full_parse), ("UnicodeDammit", unicode_dammit),
+                                ("byte sniffing", byte_sniffing)):
+        wrong = {}
+        start = time.process_time()
+        decoded = [method(raw, declared) for _, _, raw, declared in pages]
+        elapsed = time.process_time() - start
+        for (name, text, _, _), result in zip(pages, decoded):
+            if result != text:
+                wrong[name] = wrong.get(name, 0) + 1
+        correct = len(pages) - sum(wrong.values())
+        print(f"{method_name:<16}{elapsed / len(pages) * 1e6:>13.1f}{correct:>10}   "
+              f"{', '.join(f'{name}: {count}' for name, count in wrong.items()) or '-'}")
+        if method is byte_sniffing:
+            regressions = {name: count for name, count in wrong.items() if name in STRAY_BYTE_CASES}
+
+    if regressions:
+        sys.exit(f"رگرسیون: صفحات UTF-8 با بایت سرگردان درست دیکود نشدند: {regressions}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# seoran/benchmarks/bench_focused_crawl.py
+# بنچمارک خزش متمرکز: ترتیب عمق (BFS) در برابر اولویت‌بندی محتوایی (focus.py) با بودجه ثابت max_pages، روی
+# یک سایت مصنوعی که مثل سایت‌های واقعی بخش بزرگی از لینک‌هایش به صفحات برچسب، ورود و صفحات انگلیسی
+# می‌رسند. صفحات ذخیره شده هر خزش با همان مراحل پردازشگر (process_html_file_task_v2، آستانه‌های
+# MIN_TEXT_LENGTH و MIN_TOKEN_COUNT) بررسی می‌شوند و بازده به صورت «سند پذیرفته شده در هر 1000 دانلود»
+# گزارش می‌شود.
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/bench_focused_crawl.py --pages 300
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "crawler"))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "processor"))
+sys.path.insert(0, BENCH_DIR)
+
+import crawler  # noqa: E402
+import text_processor  # noqa: E402
+from synthetic_site import SyntheticSite, SYNTHETIC_WORDS  # noqa: E402
+
+# (نوع صفحه، سهم از صفحات سایت)
+PAGE_KINDS = [("article", 0.35), ("tag", 0.3), ("login", 0.1), ("english", 0.25)]
+ENGLISH_WORDS = ["the", "search", "engine", "page", "read", "more", "news", "about", "world", "today",
+                 "language", "people", "city", "market", "price", "health", "music", "film", "game", "team"]
+_PAGE_NUMBER_RE = re.compile(r'(\d+)$')
+
+
+class FocusSite(SyntheticSite):
+    """
+    سایت مصنوعی با چهار نوع صفحه: مقاله فارسی (/p/n)، ابر برچسب (/k/n) با چند لینک و بدون متن،
+    صفحه ورود (/u/n) و صفحه انگلیسی (/e/n) که بیشتر به صفحات انگلیسی دیگر لینک می‌دهد. مسیرها عمدا با
+    هیچ قاعده‌ای از FOCUS_URL_RULES منطبق نیستند تا بازده الگوها در طول خزش یاد گرفته شود.
+    """
+    def page_kind(self, page_number):
+        if page_number == 0:
+            return "article"
+        point = random.Random(self.seed * 7919 + page_number).random()
+        for kind, share in PAGE_KINDS:
+            point -= share
+            if point < 0:
+                return kind
+        return PAGE_KINDS[-1][0]
+
+    def url_for(self, host, page_number):
+        kind = self.page_kind(page_number)
+        path = {"article": f"/p/{page_number}", "tag": f"/k/{page_number}",
+                "login": f"/u/{page_number}", "english": f"/e/{page_number}"}[kind]
+        return f"http://{host}:{self.port}{path}"
+
+    def _page_number(self, path):
+        match = _PAGE_NUMBER_RE.search(path)
+        if match is None:
+            return None
+        page_number = int(match.group(1))
+        return page_number if 0 <= page_number < self.page_count else None
+
+    def page_encoding(self, page_number):
+        return 'utf-8'
+
+    def render_page(self, path):
+        page_number = self._page_number(path) or 0
+        kind = self.page_kind(page_number)
+        rng = random.Random(self.seed * 1_000_003 + page_number)
+
+        def sentence(length, words=SYNTHETIC_WORDS):
+            return " ".join(rng.choice(words) for _ in range(length))
+
+        def anchor(target):
+            # متن لینک‌ها مثل سایت‌های واقعی نشانه کاملی نیست: بخشی از لینک‌های مقاله‌ها «ادامه مطلب» یا تصویری‌اند
+            # و بخشی از لینک‌های برچسب‌ها چند کلمه فارسی دارند. صفحات برچسب ابر برچسب‌اند (لینک‌های تک کلمه‌ای)
+            target_kind = self.page_kind(target)
+            choice = rng.random()
+            if kind == "tag":
+                text = rng.choice(SYNTHETIC_WORDS)
+            elif target_kind == "article":
+                text = sentence(4) if choice < 0.5 else "ادامه مطلب" if choice < 0.75 else '<img src="/i.png">'
+            elif target_kind == "tag":
+                text = "#" + rng.choice(SYNTHETIC_WORDS) if choice < 0.5 else sentence(3)
+            elif target_kind == "login":
+                text = "ورود به حساب" if choice < 0.5 else "حساب کاربری من"
+            else:
+                text = "Read more" if choice < 0.5 else sentence(4, ENGLISH_WORDS)
+            host = self.hosts[target % len(self.hosts)]
+            return f'<li><a href="{self.url_for(host, target)}">{text}</a></li>'
+
+        targets = []
+        for _ in range({"article": self.links_per_page, "tag": 12, "login": 2, "english": self.links_per_page}[kind]):
+            target = rng.randrange(self.page_count)
+            # صفحات انگلیسی بیشتر به صفحات انگلیسی دیگر لینک می‌دهند
+            for _ in range(5 if kind == "english" and rng.random() < 0.7 else 0):
+                if self.page_kind(target) == "english":
+                    break
+                target = rng.randrange(self.page_count)
+            targets.append(target)
+        links = "".join(anchor(target) for target in targets)
+
+        if kind == "article":
+            content = (f'<article class="post"><h1>{sentence(6)}</h1><div class="entry-content">'
+                       + "".join(f"<p>{sentence(60)}.</p>" for _ in range(max(1, self.page_words // 60)))
+                       + f'</div></article><div class="related-posts"><ul>{links}</ul></div>')
+        elif kind == "tag":
+            content = f'<h1>برچسب: {rng.choice(SYNTHETIC_WORDS)}</h1><ul class="tag-list">{links}</ul>'
+        elif kind == "login":
+            content = ('<form><label>نام کاربری</label><input name="user"><label>رمز عبور</label>'
+                       f'<input name="pass" type="password"><button>ورود</button></form><ul>{links}</ul>')
+        else:
+            content = (f'<article><h1>{sentence(6, ENGLISH_WORDS)}</h1>'
+                       + "".join(f"<p>{sentence(60, ENGLISH_WORDS)}.</p>" for _ in range(5))
+                       + f'</article><ul>{links}</ul>')
+        lang = "en" if kind == "english" else "fa"
+        return (f'<!DOCTYPE html><html lang="{lang}"><head><meta charset="utf-8"><title>{kind} {page_number}'
+                f'</title></head><body>{content}</body></html>')
+
+
+def accepted_documents(download_dir, output_dir):
+    """تعداد صفحات ذخیره شده‌ای که پردازشگر می‌پذیرد."""
+    text_processor.HTML_FILES_BASE_DIR = download_dir
+    stats = text_processor.ProcessingStats()
+    for root, _, names in os.walk(download_dir):
+        for name in names:
+            if name.endswith(".html"):
+                text_processor.process_html_file_task_v2(os.path.join(root, name), output_dir, stats)
+    return stats.successfully_processed
+
+
+def run(site, max_pages, focused):
+    crawler.FOCUSED_CRAWL = focused
+    with tempfile.TemporaryDirectory() as work_dir:
+        crawler.DOWNLOAD_DIR = os.path.join(work_dir, "pages")
+        crawler.ALLOWED_DOMAINS = []
+        cpu_start = time.process_time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            crawler.crawl_website(site.start_url(), max_pages=max_pages, allowed_domains_list=site.allowed_domains())
+        cpu_seconds = time.process_time() - cpu_start
+        fetches = crawler.pages_crawled_count
+        estimated = crawler.focus_scorer.accepted if crawler.focus_scorer is not None else None
+        with contextlib.redirect_stdout(io.StringIO()):
+            accepted = accepted_documents(crawler.DOWNLOAD_DIR, os.path.join(work_dir, "out"))
+    return fetches, accepted, estimated, cpu_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک بازده خزش متمرکز در برابر ترتیب عمق")
+    parser.add_argument("--pages", type=int, default=300, help="بودجه صفحات هر خزش (max_pages)")
+    parser.add_argument("--site-pages", type=int, default=20000)
+    parser.add_argument("--hosts", type=int, default=1)
+    parser.add_argument("--links", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    crawler.REQUEST_DELAY = 0
+    crawler.STORAGE_MODE = "files"
+    crawler.CRAWL_CHECKPOINTS = False
+    crawler.LOG_LEVEL = "WARNING"
+    text_processor.INCREMENTAL_PROCESSING = False
+    site = FocusSite(page_count=args.site_pages, links_per_page=args.links, host_count=args.hosts,
+                     seed=args.seed).start_in_subprocess()
+    try:
+        print(f"{'order':<10}{'fetches':>9}{'accepted':>10}{'per 1000':>10}{'crawler estimate':>18}{'CPU ms/page':>13}")
+        for name, focused in (("depth", False), ("focused", True)):
+            fetches, accepted, estimated, cpu_seconds = run(site, args.pages, focused)
+            print(f"{name:<10}{fetches:>9}{accepted:>10}{accepted * 1000 / max(1, fetches):>10.0f}"
+                  f"{'-' if estimated is None else estimated:>18}{cpu_seconds * 1000 / max(1, fetches):>13.2f}")
+    finally:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# seoran/benchmarks/bench_html_cleaner.py
+# بنچمارک استخراج متن اصلی: extract_text_from_soup روی BeautifulSoup (یک پیمایش برای هر تگ و سلکتور)
+# در برابر پاکسازی کامپایل شده در یک گذر (extract_text_from_html). خروجی دو مسیر برای همه صفحات
+# مقایسه می‌شود و زمان CPU هر صفحه و نسبت سرعت گزارش می‌شود.
+#
+# صفحات نمونه فارسی (وردپرس، خبرگزاری، ویکی‌پدیا، ویرگول، فروشگاه) در benchmarks/fixtures هستند؛
+# با --pages-dir می‌توان صفحات دانلود شده توسط خزنده را هم سنجید.
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/bench_html_cleaner.py --repeat 20
+#   python benchmarks/bench_html_cleaner.py --pages-dir crawler/downloaded_pages
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "processor"))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from html_cleaner import compiled_cleaner, extract_text_from_html, extract_text_from_soup  # noqa: E402
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+
+
+def soup_path(html):
+    return extract_text_from_soup(BeautifulSoup(html, 'lxml'))
+
+
+def load_pages(directory):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, "**", "*.html"), recursive=True)):
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            pages.append((os.path.relpath(path, directory), f.read()))
+    return pages
+
+
+def cpu_ms_per_page(function, html, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        function(html)
+    return (time.process_time() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک پاکسازی HTML و استخراج متن اصلی")
+    parser.add_argument("--pages-dir", default=FIXTURES_DIR, help="پوشه صفحات HTML (به صورت بازگشتی)")
+    parser.add_argument("--repeat", type=int, default=10, help="تعداد تکرار هر صفحه")
+    parser.add_argument("--quiet", action="store_true", help="فقط خلاصه (برای تعداد زیاد صفحه)")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages_dir)
+    if not pages:
+        print(f"هیچ فایل HTML در {args.pages_dir} پیدا نشد.")
+        return
+    if not compiled_cleaner().supported:
+        print("هشدار: قواعد پاکسازی سلکتور پیچیده دارند؛ extract_text_from_html از مسیر BeautifulSoup استفاده می‌کند.")
+
+    mismatches = [name for name, html in pages if soup_path(html) != extract_text_from_html(html)]
+    if mismatches:
+        print(f"خطا: خروجی {len(mismatches)} صفحه یکسان نیست: {', '.join(mismatches[:10])}")
+        sys.exit(1)
+
+    total_soup = total_compiled = 0.0
+    if not args.quiet:
+        print(f"{'page':<32}{'KB':>8}{'soup ms':>10}{'single ms':>11}{'speedup':>9}")
+    for name, html in pages:
+        soup_ms = cpu_ms_per_page(soup_path, html, args.repeat)
+        compiled_ms = cpu_ms_per_page(extract_text_from_html, html, args.repeat)
+        total_soup += soup_ms
+        total_compiled += compiled_ms
+        if not args.quiet:
+            print(f"{name[:31]:<32}{len(html.encode('utf-8')) / 1024:>8.1f}{soup_ms:>10.2f}{compiled_ms:>11.2f}"
+                  f"{soup_ms / compiled_ms:>8.2f}x")
+    print(f"pages: {len(pages)} (identical output)")
+    print(f"soup        {total_soup / len(pages):>8.2f} ms CPU/page")
+    print(f"single-pass {total_compiled / len(pages):>8.2f} ms CPU/page")
+    print(f"speedup: {total_soup / total_compiled:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# seoran/benchmarks/bench_http_fetch.py
+# بنچمارک لایه HTTP خزنده: اتصال جدید برای هر صفحه در برابر pool اتصال‌ها (keep-alive)، با و بدون
+# فشرده‌سازی gzip. برای هر حالت سرعت خزش، میانگین زمان مرحله connect (اتصال + انتظار تا هدرهای پاسخ،
+# یعنی TTFB)، تعداد اتصال‌های جدید و حجم منتقل شده روی شبکه به ازای هر صفحه گزارش می‌شود.
+#
+# سرور روی loopback است و دست‌دادن TCP در آن تقریبا هزینه‌ای ندارد؛ --connect-latency هزینه برقراری هر
+# اتصال جدید (رفت و برگشت TCP و TLS در شبکه واقعی) را شبیه‌سازی می‌کند.
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/bench_http_fetch.py --pages 300 --connect-latency 0.01
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "crawler"))
+sys.path.insert(0, BENCH_DIR)
+
+import crawler  # noqa: E402
+from async_crawler import crawl_website_concurrent  # noqa: E402
+from synthetic_site import SyntheticSite  # noqa: E402
+
+# (نام، استفاده از pool اتصال‌ها، فشرده‌سازی پاسخ‌ها توسط سرور)
+CONFIGURATIONS = [
+    ("new connection", False, False),
+    ("pooled", True, False),
+    ("pooled+gzip", True, True),
+]
+
+
+def run(args, pooling, compress):
+    crawler.HTTP_POOLING = pooling
+    site = SyntheticSite(page_count=max(args.pages * 2, 100), links_per_page=args.links, page_words=args.page_words,
+                         host_count=args.hosts, latency=args.latency, compress=compress,
+                         connect_latency=args.connect_latency).start()
+    try:
+        with tempfile.TemporaryDirectory() as download_dir:
+            crawler.DOWNLOAD_DIR = download_dir
+            crawler.ALLOWED_DOMAINS = []
+            crawler.REQUEST_DELAY = 0
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if args.mode == "sync":
+                    crawler.crawl_website(site.start_url(), max_pages=args.pages,
+                                          allowed_domains_list=site.allowed_domains())
+                    pages = crawler.pages_crawled_count
+                else:
+                    pages = crawl_website_concurrent(site.start_url(), max_pages=args.pages,
+                                                     allowed_domains_list=site.allowed_domains(),
+                                                     max_concurrency=args.concurrency, host_delay=0)
+            elapsed = time.perf_counter() - start
+    finally:
+        site.stop()
+    connect_count = crawler.STAGE_SECONDS.count(("connect",))
+    return {
+        "pages": pages,
+        "pages_per_sec": pages / elapsed,
+        "connect_ms": crawler.STAGE_SECONDS.sum(("connect",)) / connect_count * 1000 if connect_count else 0.0,
+        "connections": site.connections_opened,
+        "wire_kb_per_page": site.bytes_sent / 1024 / max(1, site.requests_served),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک pool اتصال‌ها و فشرده‌سازی در خزنده")
+    parser.add_argument("--mode", choices=("sync", "async"), default="sync")
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--hosts", type=int, default=4)
+    parser.add_argument("--links", type=int, default=20)
+    parser.add_argument("--page-words", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.0, help="تاخیر پاسخ سرور به هر درخواست (ثانیه)")
+    parser.add_argument("--connect-latency", type=float, default=0.01,
+                        help="هزینه شبیه‌سازی شده برقراری هر اتصال جدید (ثانیه)")
+    args = parser.parse_args()
+    crawler.LOG_LEVEL = "WARNING"
+
+    print(f"mode: {args.mode}  pages: {args.pages}  hosts: {args.hosts}  connect latency: {args.connect_latency}s")
+    print(f"{'config':<16}{'pages/sec':>11}{'connect ms':>12}{'connections':>13}{'wire KB/page':>14}")
+    rows = {}
+    for name, pooling, compress in CONFIGURATIONS:
+        row = rows[name] = run(args, pooling, compress)
+        print(f"{name:<16}{row['pages_per_sec']:>11.1f}{row['connect_ms']:>12.2f}{row['connections']:>13}"
+              f"{row['wire_kb_per_page']:>14.1f}")
+    saving = rows["new connection"]["connect_ms"] - rows["pooled"]["connect_ms"]
+    wire_ratio = rows["pooled+gzip"]["wire_kb_per_page"] / rows["pooled"]["wire_kb_per_page"]
+    print(f"connect/TTFB saving with pooling: {saving:.2f} ms per page")
+    speedup = rows["pooled"]["pages_per_sec"] / rows["new connection"]["pages_per_sec"]
+    print(f"crawl speed with pooling: {speedup:.2f}x pages/sec of a new connection per page")
+    print(f"transfer size with gzip: {wire_ratio * 100:.0f}% of uncompressed")
+    crawler.HTTP_POOLING = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# seoran/benchmarks/bench_lemma_cache.py
+# بنچمارک کش لم‌ها در process_text_with_nlp روی متن مصنوعی با توزیع زیپفی:
+# بدون کش، کش سرد (اجرای اول) و کش گرم (اجرای دوم با کش بارگذاری شده از فایل).
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/bench_lemma_cache.py --docs 300
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "processor"))
+sys.path.insert(0, BENCH_DIR)
+
+import text_processor  # noqa: E402
+from lemma_cache import LemmaCache  # noqa: E402
+from bench_parallel_processor import EXTRA_WORDS, SUFFIXES  # noqa: E402
+from local_site import PERSIAN_WORDS  # noqa: E402
+
+
+def zipf_documents(doc_count, words_per_doc=800, seed=3):
+    """اسنادی که شکل‌های ظاهری کلمات در آنها با احتمال 1/رتبه (زیپف) انتخاب می‌شوند."""
+    rng = random.Random(seed)
+    forms = [word + suffix for word in PERSIAN_WORDS + EXTRA_WORDS for suffix in SUFFIXES[2:]]
+    forms += list(text_processor.DEFAULT_STOP_WORDS[:60]) + ["۱۲۳", "«", "»", "،"]
+    rng.shuffle(forms)
+    weights = [1 / rank for rank in range(1, len(forms) + 1)]
+    documents = []
+    for _ in range(doc_count):
+        words = rng.choices(forms, weights, k=words_per_doc)
+        documents.append(" ".join(words[i] + ("." if i % 15 == 14 else "") for i in range(len(words))))
+    return documents
+
+
+def run(texts, cache):
+    text_processor.lemma_cache = cache
+    start = time.process_time()
+    outputs = [text_processor.process_text_with_nlp(text) for text in texts]
+    return outputs, time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک کش لم‌ها")
+    parser.add_argument("--docs", type=int, default=300)
+    args = parser.parse_args()
+
+    texts = [text_processor.normalize_persian_text_v2(doc) for doc in zipf_documents(args.docs)]
+    token_count = sum(len(text.split()) for text in texts)
+    signature = text_processor.lemma_cache_signature()
+
+    baseline, baseline_seconds = run(texts, LemmaCache(0))
+    print(f"{'run':<10}{'seconds':>10}{'tokens/s':>12}{'hit rate':>10}{'speedup':>9}")
+    print(f"{'no cache':<10}{baseline_seconds:>10.2f}{token_count / baseline_seconds:>12,.0f}{'-':>10}{1:>9.2f}")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        cache_path = os.path.join(work_dir, "lemma_cache.json")
+        cold_cache = LemmaCache(text_processor.LEMMA_CACHE_SIZE)
+        cold, cold_seconds = run(texts, cold_cache)
+        cold_cache.save(cache_path, signature)
+
+        warm_cache = LemmaCache(text_processor.LEMMA_CACHE_SIZE)
+        warm_cache.load(cache_path, signature)
+        warm, warm_seconds = run(texts, warm_cache)
+
+    assert cold == baseline and warm == baseline, "خروجی با کش با خروجی بدون کش یکسان نیست"
+    for name, seconds, cache in (("cold", cold_seconds, cold_cache), ("warm", warm_seconds, warm_cache)):
+        print(f"{name:<10}{seconds:>10.2f}{token_count / seconds:>12,.0f}{cache.hit_rate():>10.1%}"
+              f"{baseline_seconds / seconds:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
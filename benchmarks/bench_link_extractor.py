@@ -0,0 +1,114 @@
+# seoran/benchmarks/bench_link_extractor.py
+# بنچمارک استخراج لینک در صفحات پر لینک (مثل صفحات دسته‌بندی): حلقه قبلی (urljoin + validators.url +
+# دو بار urlparse + زنجیره endswith برای هر لینک) در برابر LinkExtractor با URL پایه کش شده و یکسان‌سازی.
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/bench_link_extractor.py --pages 100 --links 600
+
+import argparse
+import os
+import random
+import sys
+import time
+from urllib.parse import urlparse, urljoin
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "crawler"))
+
+import validators  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+
+from link_extractor import extract_links_from_soup, extract_links_from_html  # noqa: E402
+
+SITE = "https://blog.example.ir"
+ALLOWED_DOMAINS = ["blog.example.ir", "www.example.ir"]
+
+
+def make_category_page(rng, link_count):
+    """صفحه دسته‌بندی با لینک‌های مطلق، نسبی، تکراری، پارامترهای ردیابی و لینک‌های نامعتبر."""
+    anchors = []
+    for i in range(link_count):
+        post_id = rng.randint(1, link_count * 4)
+        kind = i % 10
+        if kind < 3:
+            href = f"/post/{post_id}/"
+        elif kind < 5:
+            href = f"{SITE}/post/{post_id}?utm_source=telegram&utm_medium=social"
+        elif kind == 5:
+            href = f"post/{post_id}#comments"
+        elif kind == 6:
+            href = f"/tag/{rng.choice(['سیاست', 'ورزش', 'فناوری'])}/?page={rng.randint(1, 5)}"
+        elif kind == 7:
+            href = f"https://other-site.com/{post_id}"
+        elif kind == 8:
+            href = rng.choice(["mailto:info@example.ir", "javascript:void(0)", "/files/report.pdf", "#top"])
+        else:
+            href = f"https://WWW.example.ir:443/archive/{post_id}"
+        anchors.append(f'<li><a href="{href}">لینک {i}</a></li>')
+    return f'<html><body><ul>{"".join(anchors)}</ul></body></html>'
+
+
+def legacy_extract_links(soup, base_url, allowed_domains):
+    """پیاده‌سازی قبلی extract_links برای مقایسه."""
+    links = set()
+    base_domain = urlparse(base_url).netloc
+    for anchor_tag in soup.find_all('a', href=True):
+        href = anchor_tag['href'].strip()
+        href = href.split('#')[0]
+        if not href or href.startswith(('mailto:', 'tel:', 'javascript:', 'ftp:')) or href.endswith(
+                ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.zip', '.rar', '.exe', '.mp3', '.mp4',
+                 '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx')):
+            continue
+        try:
+            absolute_url = urljoin(base_url, href)
+        except ValueError:
+            continue
+        if not validators.url(absolute_url):
+            continue
+        parsed_absolute_url = urlparse(absolute_url)
+        if parsed_absolute_url.scheme not in ['http', 'https']:
+            continue
+        if allowed_domains:
+            if parsed_absolute_url.netloc not in allowed_domains:
+                continue
+        elif parsed_absolute_url.netloc != base_domain:
+            continue
+        links.add(absolute_url)
+    return links
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک استخراج لینک")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--links", type=int, default=600, help="تعداد لینک در هر صفحه")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    pages = [make_category_page(rng, args.links) for _ in range(args.pages)]
+    soups = [BeautifulSoup(page, 'lxml') for page in pages]
+    base_url = f"{SITE}/category/news/"
+
+    legacy_total = sum(len(legacy_extract_links(soup, base_url, ALLOWED_DOMAINS)) for soup in soups[:5])
+    fast_total = sum(len(extract_links_from_soup(soup, base_url, ALLOWED_DOMAINS)) for soup in soups[:5])
+    print(f"links kept (first 5 pages): legacy={legacy_total} canonical={fast_total}")
+
+    # کش یکسان‌سازی URL در اجرای واقعی هم گرم می‌شود (لینک‌های منو در همه صفحات تکرار می‌شوند)
+    runs = (
+        ("legacy (soup)", lambda i: legacy_extract_links(soups[i], base_url, ALLOWED_DOMAINS)),
+        ("fast (soup)", lambda i: extract_links_from_soup(soups[i], base_url, ALLOWED_DOMAINS)),
+        ("fast (lxml html)", lambda i: extract_links_from_html(pages[i], base_url, ALLOWED_DOMAINS)),
+    )
+    results = {}
+    for name, run in runs:
+        start = time.process_time()
+        for i in range(len(pages)):
+            run(i)
+        elapsed = time.process_time() - start
+        results[name] = elapsed
+        per_page_ms = elapsed / len(pages) * 1000
+        print(f"{name:<18}{per_page_ms:>8.2f} ms CPU/page {len(pages) * args.links / elapsed:>12,.0f} links/s")
+    print(f"speedup (soup input): {results['legacy (soup)'] / results['fast (soup)']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# seoran/benchmarks/bench_page_analysis.py
+# بنچمارک زمان CPU به ازای هر صفحه: مسیر قبلی با سه بار پارس (تشخیص انکودینگ در fetch_page،
+# extract_links و extract_text_from_html_v2) در برابر تحلیل یک‌باره صفحه (page_analysis).
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/bench_page_analysis.py --pages 200
+
+import argparse
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "crawler"))
+sys.path.insert(0, BENCH_DIR)
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from link_extractor import extract_links_from_soup  # noqa: E402
+from page_analysis import analyze_page  # noqa: E402
+from encoding_detect import decode_html  # noqa: E402
+from html_cleaner import extract_text_from_soup  # noqa: E402
+from local_site import PERSIAN_WORDS  # noqa: E402
+
+SITE = "https://blog.example.ir"
+
+
+def make_page(rng, page_number, encoding, link_count=80, paragraph_count=12):
+    """یک صفحه وبلاگ فارسی با سربرگ، منو، نوار کناری، تبلیغ و تعداد زیادی لینک."""
+    def sentence(length):
+        return " ".join(rng.choice(PERSIAN_WORDS) for _ in range(length))
+
+    nav = "".join(f'<li><a href="/category/{i}/">{sentence(2)}</a></li>' for i in range(link_count // 2))
+    related = "".join(f'<a href="{SITE}/post/{rng.randint(1, 10**6)}?utm_source=x">{sentence(4)}</a>'
+                      for _ in range(link_count // 2))
+    paragraphs = "".join(f"<p>{sentence(60)}</p>" for _ in range(paragraph_count))
+    html = (
+        f'<!DOCTYPE html><html lang="fa" dir="rtl"><head><meta charset="{encoding}">'
+        f'<title>{sentence(5)}</title><script>var x = 1;</script><style>body{{}}</style></head><body>'
+        f'<header class="site-header"><nav class="main-navigation"><ul>{nav}</ul></nav></header>'
+        f'<div id="sidebar"><div class="widget">{sentence(30)}</div></div>'
+        f'<div class="ads banner">{sentence(10)}</div>'
+        f'<article class="post"><h1>{sentence(6)}</h1><div class="post-meta-data">{sentence(5)}</div>'
+        f'<div class="entry-content">{paragraphs}</div></article>'
+        f'<div class="related-posts">{related}</div><div class="promo-box">{sentence(8)}</div>'
+        f'<footer class="site-footer">{sentence(20)}</footer></body></html>'
+    )
+    return html.encode(encoding, errors='replace')
+
+
+def three_parse_path(raw, declared_encoding, url):
+    """مسیر قبلی: یک پارس برای انکودینگ، یک پارس برای لینک‌ها و یک پارس در پردازشگر."""
+    html_text = raw.decode(declared_encoding or 'iso-8859-1', errors='replace')
+    if declared_encoding is None or declared_encoding.lower() in ('iso-8859-1', 'windows-1256'):
+        soup_for_encoding = BeautifulSoup(raw, 'lxml')
+        encoding = soup_for_encoding.original_encoding or 'utf-8'
+        html_text = raw.decode(encoding, errors='replace')
+    links = extract_links_from_soup(BeautifulSoup(html_text, 'lxml'), url, [])
+    main_text = extract_text_from_soup(BeautifulSoup(html_text, 'lxml'))
+    return links, main_text
+
+
+def single_parse_path(raw, declared_encoding, url):
+    html_text, _ = decode_html(raw, declared_encoding)
+    analysis = analyze_page(html_text, url, [])
+    return analysis.links, analysis.main_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک تحلیل یک‌باره صفحه")
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    pages = []
+    for i in range(args.pages):
+        # نیمی از صفحات windows-1256 بدون charset در هدر HTTP (حالت رایج در سایت‌های فارسی)
+        if i % 2:
+            pages.append((make_page(rng, i, 'windows-1256'), None, f"{SITE}/post/{i}"))
+        else:
+            pages.append((make_page(rng, i, 'utf-8'), 'utf-8', f"{SITE}/post/{i}"))
+
+    for raw, declared, url in pages[:20]:
+        assert three_parse_path(raw, declared, url) == single_parse_path(raw, declared, url), url
+
+    results = {}
+    for name, path in (("three-parse", three_parse_path), ("single-parse", single_parse_path)):
+        start = time.process_time()
+        for raw, declared, url in pages:
+            path(raw, declared, url)
+        results[name] = (time.process_time() - start) / len(pages) * 1000
+        print(f"{name:<14}{results[name]:>8.2f} ms CPU/page")
+    print(f"speedup: {results['three-parse'] / results['single-parse']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
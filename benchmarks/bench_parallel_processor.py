@@ -0,0 +1,101 @@
+# seoran/benchmarks/bench_parallel_processor.py
+# بنچمارک مقیاس‌پذیری پردازش موازی main_processor_v2 روی یک پیکره مصنوعی فارسی.
+# برای هر تعداد پروسس زمان کل و سرعت نسبت به حالت ترتیبی گزارش می‌شود و یکسان بودن خروجی‌ها بررسی می‌شود.
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/bench_parallel_processor.py --docs 400 --workers 1 2 4
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "processor"))
+sys.path.insert(0, BENCH_DIR)
+
+import text_processor  # noqa: E402
+from local_site import PERSIAN_WORDS  # noqa: E402
+
+# واژه‌های بیشتر و پسوندهای رایج تا لماتایزر با تنوع واقعی‌تری از کلمات روبه‌رو شود
+EXTRA_WORDS = [
+    "دانشگاه", "دانشجو", "پژوهش", "مقاله", "نویسنده", "خواننده", "کتابخانه", "روزنامه", "خبرگزاری",
+    "اقتصاد", "سیاست", "ورزش", "فوتبال", "بازیکن", "مربی", "هنرمند", "سینما", "فیلم", "موسیقی",
+    "رفتند", "می‌روند", "نوشتند", "می‌نویسد", "خواندیم", "گفتند", "دیدم", "ساختند", "آموزش", "مدرسه",
+]
+SUFFIXES = ["", "", "", "ها", "های", "ی", "ان"]
+
+
+def make_document(rng, paragraph_count=10, words_per_paragraph=80):
+    vocabulary = PERSIAN_WORDS + EXTRA_WORDS
+    paragraphs = []
+    for _ in range(paragraph_count):
+        words = (rng.choice(vocabulary) + rng.choice(SUFFIXES) for _ in range(words_per_paragraph))
+        paragraphs.append("<p>" + " ".join(words) + ".</p>")
+    return ('<html lang="fa"><head><title>سند</title></head><body><nav><a href="/">خانه</a></nav>'
+            f'<article><div class="entry-content">{"".join(paragraphs)}</div></article>'
+            '<footer>پابرگ</footer></body></html>')
+
+
+def write_corpus(directory, doc_count, seed=1):
+    rng = random.Random(seed)
+    for i in range(doc_count):
+        subdir = os.path.join(directory, f"site_{i % 5}_ir")
+        os.makedirs(subdir, exist_ok=True)
+        with open(os.path.join(subdir, f"page_{i}.html"), 'w', encoding='utf-8') as f:
+            f.write(make_document(rng))
+
+
+def read_outputs(directory):
+    outputs = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith("_tokens.txt"):
+                continue  # کش لم‌ها و manifest پردازش افزایشی
+            path = os.path.join(root, name)
+            with open(path, encoding='utf-8') as f:
+                outputs[os.path.relpath(path, directory)] = f.read()
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک پردازش موازی متن")
+    parser.add_argument("--docs", type=int, default=400)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--chunk-size", type=int, default=text_processor.PROCESSOR_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        corpus_dir = os.path.join(work_dir, "pages")
+        write_corpus(corpus_dir, args.docs)
+        text_processor.HTML_FILES_BASE_DIR = corpus_dir
+        text_processor.PAGE_STORE_DIR = os.path.join(corpus_dir, "segments")
+        text_processor.LOG_LEVEL = "WARNING"
+
+        # گرم کردن ابزارهای Hazm (بارگذاری تنبل مدل‌ها) پیش از اندازه‌گیری و پیش از fork شدن کارگرها
+        text_processor.process_text_with_nlp(text_processor.normalize_persian_text_v2(" ".join(EXTRA_WORDS)))
+
+        print(f"cpu cores: {os.cpu_count()}  docs: {args.docs}")
+        print(f"{'workers':>8}{'seconds':>10}{'docs/sec':>12}{'speedup':>10}  identical")
+        baseline_seconds = None
+        baseline_outputs = None
+        for workers in args.workers:
+            text_processor.PROCESSED_TEXTS_DIR = os.path.join(work_dir, f"out_{workers}")
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                text_processor.main_processor_v2(workers=workers, chunk_size=args.chunk_size)
+            seconds = time.perf_counter() - start
+            outputs = read_outputs(text_processor.PROCESSED_TEXTS_DIR)
+            if baseline_seconds is None:
+                baseline_seconds, baseline_outputs = seconds, outputs
+            identical = outputs == baseline_outputs
+            print(f"{workers:>8}{seconds:>10.2f}{args.docs / seconds:>12.1f}{baseline_seconds / seconds:>10.2f}  "
+                  f"{identical}")
+
+
+if __name__ == "__main__":
+    main()
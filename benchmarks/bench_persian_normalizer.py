@@ -0,0 +1,99 @@
+# seoran/benchmarks/bench_persian_normalizer.py
+# بنچمارک نرمال‌سازی متن فارسی: مسیر مرجع (Normalizer().normalize کامل Hazm و پنج re.sub جداگانه) در برابر
+# PersianNormalizer (جدول نگاشت یک‌گذره و الگوهای کامپایل شده). خروجی دو مسیر روی متن استخراج شده از صفحات
+# نمونه (benchmarks/fixtures) و روی یک پیکره تصادفی از حالت‌های مرزی (ي/ك عربی، اعراب، کشیده، نیم‌فاصله‌های
+# اضافه، علائم، ارقام لاتین/عربی/فارسی، لیگاتورها، کاراکترهای کنترلی) مقایسه می‌شود و زمان CPU به ازای هر
+# مگابایت متن گزارش می‌شود.
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/bench_persian_normalizer.py --repeat 20
+#   python benchmarks/bench_persian_normalizer.py --pages-dir crawler/downloaded_pages --fuzz 0
+
+import argparse
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "processor"))
+sys.path.insert(0, BENCH_DIR)
+
+from hazm import Normalizer  # noqa: E402
+
+from html_cleaner import extract_text_from_html  # noqa: E402
+from persian_normalizer import PersianNormalizer, normalize_with_hazm  # noqa: E402
+from bench_html_cleaner import FIXTURES_DIR, load_pages  # noqa: E402
+
+FUZZ_CHARACTERS = (list("آابپتثجچحخدذرزژسشصضطظعغفقکگلمنوهی") * 4
+                   + list("يكىۀة“”\"'.:!،؛؟»«[](){}/\\  \n\t\r0123456789۰۱۲۳۴۵۶۷۸۹٠١٢%ـabcXYZ‌‌ًَّٰ۔﷽ﷲﻻﮎ\x01\x85\xa0"))
+FUZZ_WORDS = ["می", "نمی", "رود", "ها", "های", "تر", "ترین", "ام", "اش", "ی", "ه", "خانه", "کتاب", "شده", "است",
+              "...", "زمین", "لرزه", "ای", "سلاممم", "گر", "۱۲.۵", "3.14", '"سلام"', "(متن)"]
+
+
+def fuzz_texts(count, seed=1):
+    rng = random.Random(seed)
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 25)):
+            if rng.random() < 0.5:
+                parts.append(rng.choice(FUZZ_WORDS))
+            else:
+                parts.append("".join(rng.choices(FUZZ_CHARACTERS, k=rng.randint(1, 6))))
+            parts.append(rng.choice([" ", " ", "", "\n", "‌", "  "]))
+        yield "".join(parts)
+
+
+def cpu_seconds(function, texts, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.process_time()
+        for text in texts:
+            function(text)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک نرمال‌سازی متن فارسی")
+    parser.add_argument("--pages-dir", default=FIXTURES_DIR, help="پوشه صفحات HTML (به صورت بازگشتی)")
+    parser.add_argument("--repeat", type=int, default=10, help="تعداد تکرار (بهترین زمان گزارش می‌شود)")
+    parser.add_argument("--fuzz", type=int, default=20000, help="تعداد متن‌های تصادفی برای مقایسه خروجی")
+    args = parser.parse_args()
+
+    texts = [extract_text_from_html(html) for _, html in load_pages(args.pages_dir)]
+    texts = [text for text in texts if text]
+    if not texts:
+        print(f"هیچ متنی از صفحات {args.pages_dir} استخراج نشد.")
+        return
+    hazm_normalizer = Normalizer()
+    normalizer = PersianNormalizer(hazm_normalizer)
+    if not normalizer.supported:
+        print("هشدار: قواعد Normalizer نصب شده با نسخه پشتیبانی شده فرق دارد؛ PersianNormalizer از مسیر Hazm "
+              "استفاده می‌کند.")
+
+    mismatches = 0
+    for text in texts + list(fuzz_texts(args.fuzz)):
+        for remove_numbers, remove_english in ((False, False), (True, True)):
+            if (normalize_with_hazm(hazm_normalizer, text, remove_numbers, remove_english)
+                    != normalizer.normalize_text(text, remove_numbers, remove_english)):
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"خروجی متفاوت: {text[:80]!r}")
+    if mismatches:
+        print(f"خطا: خروجی {mismatches} مورد یکسان نیست.")
+        sys.exit(1)
+
+    megabytes = sum(len(text.encode('utf-8')) for text in texts) / 1024 / 1024
+    flags = (True, True)
+    hazm_seconds = cpu_seconds(lambda text: normalize_with_hazm(hazm_normalizer, text, *flags), texts, args.repeat)
+    fast_seconds = cpu_seconds(lambda text: normalizer.normalize_text(text, *flags), texts, args.repeat)
+    print(f"texts: {len(texts)} ({megabytes * 1024:.0f} KB) + {args.fuzz} fuzz cases (identical output)")
+    print(f"hazm path          {hazm_seconds / megabytes:>8.3f} s CPU/MB")
+    print(f"PersianNormalizer  {fast_seconds / megabytes:>8.3f} s CPU/MB")
+    print(f"speedup: {hazm_seconds / fast_seconds:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# seoran/benchmarks/bench_rate_control.py
+# بنچمارک کنترل سرعت میزبان‌ها: تاخیر ثابت (تاخیر پیش‌فرض قبلی 1 ثانیه و یک تاخیر ثابت تهاجمی) در برابر
+# تاخیر تطبیقی (rate_control.py) روی دو سرور محلی: یک سرور مقاوم و یک سرور شکننده که درخواست‌های
+# نزدیک‌تر از --min-interval ثانیه به یک میزبان را با 429 و Retry-After رد می‌کند.
+# برای هر حالت صفحه بر ثانیه، تعداد پاسخ‌های 429 سرور و تعداد URL هایی که پس از همه تلاش‌های دوباره
+# از دست رفتند گزارش می‌شود.
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/bench_rate_control.py --pages 60 --hosts 4
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "crawler"))
+sys.path.insert(0, BENCH_DIR)
+
+import crawler  # noqa: E402
+from async_crawler import crawl_website_concurrent  # noqa: E402
+from local_site import LocalSiteServer  # noqa: E402
+
+
+def run(args, host_delay, adaptive, min_interval):
+    with LocalSiteServer(host_count=args.hosts, latency=args.latency, min_interval=min_interval,
+                         retry_after=args.retry_after) as site:
+        crawler.ALLOWED_DOMAINS = []
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            pages = crawl_website_concurrent(site.start_url(), max_pages=args.pages,
+                                             allowed_domains_list=site.allowed_domains(),
+                                             max_connections_per_host=1, host_delay=host_delay,
+                                             adaptive_rate=adaptive)
+        elapsed = time.perf_counter() - start
+        throttled = site.requests_throttled
+    return pages, elapsed, throttled, int(crawler.FETCH_RETRIES.value(("gave_up",)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک تاخیر ثابت در برابر کنترل تطبیقی سرعت میزبان‌ها")
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--hosts", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.02, help="تاخیر شبیه‌سازی شده سرور (ثانیه)")
+    parser.add_argument("--min-interval", type=float, default=0.5,
+                        help="کمترین فاصله درخواست‌ها به یک میزبان که سرور شکننده می‌پذیرد (ثانیه)")
+    parser.add_argument("--retry-after", type=int, default=2, help="هدر Retry-After پاسخ‌های 429 (ثانیه)")
+    parser.add_argument("--fixed-delays", type=float, nargs="+", default=[1.0, 0.1])
+    args = parser.parse_args()
+
+    modes = [(f"fixed {delay:g}s", delay, False) for delay in args.fixed_delays]
+    modes.append((f"adaptive from {crawler.REQUEST_DELAY:g}s", crawler.REQUEST_DELAY, True))
+    with tempfile.TemporaryDirectory() as download_dir:
+        crawler.DOWNLOAD_DIR = download_dir
+        crawler.LOG_LEVEL = "WARNING"
+        crawler.CRAWL_CHECKPOINTS = False
+        print(f"{'server':<10}{'mode':<22}{'pages':>7}{'seconds':>9}{'pages/sec':>11}{'429s':>7}{'lost':>6}")
+        for server, min_interval in (("robust", 0.0), ("fragile", args.min_interval)):
+            for name, host_delay, adaptive in modes:
+                pages, elapsed, throttled, lost = run(args, host_delay, adaptive, min_interval)
+                print(f"{server:<10}{name:<22}{pages:>7}{elapsed:>9.2f}{pages / elapsed:>11.1f}{throttled:>7}{lost:>6}")
+
+
+if __name__ == "__main__":
+    main()
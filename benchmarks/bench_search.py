@@ -0,0 +1,124 @@
+# seoran/benchmarks/bench_search.py
+# بنچمارک موتور جستجو: ساخت یک ایندکس مصنوعی (توزیع زیپفی اصطلاحات)، اجرای پرس‌وجوهای تصادفی با
+# هرس Block-Max/MaxScore برداری و گزارش QPS، صدک‌های تاخیر (p50/p95/p99) و نسبت postings امتیازدهی شده به کل postings.
+# نتایج بخشی از پرس‌وجوها با امتیازدهی کامل (بدون هرس) مقایسه می‌شوند.
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/bench_search.py --docs 50000 --queries 500
+
+import argparse
+import heapq
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "indexer"))
+
+from index_builder import build_index  # noqa: E402
+from search import SearchEngine, bm25_idf  # noqa: E402
+
+
+def write_synthetic_corpus(directory, doc_count, vocabulary_size, mean_length, seed=5):
+    rng = random.Random(seed)
+    vocabulary = [f"واژه{i}" for i in range(vocabulary_size)]
+    cumulative_weights = list(itertools.accumulate(1 / rank for rank in range(1, vocabulary_size + 1)))
+    for doc_id in range(doc_count):
+        subdir = os.path.join(directory, f"site_{doc_id % 20}")
+        if doc_id < 20:
+            os.makedirs(subdir, exist_ok=True)
+        length = max(20, int(rng.expovariate(1 / mean_length)))
+        tokens = rng.choices(vocabulary, cum_weights=cumulative_weights, k=length)
+        with open(os.path.join(subdir, f"{doc_id:08d}_tokens.txt"), 'w', encoding='utf-8') as f:
+            f.write(" ".join(tokens))
+    return vocabulary
+
+
+def exhaustive_scores(engine, terms):
+    """امتیاز همه اسناد با امتیازدهی همه postings بدون هرس (برای بررسی درستی نتایج)."""
+    index = engine.index
+    scores = {}
+    length_base = engine.k1 * (1 - engine.b)
+    length_norm = engine.k1 * engine.b / index.avg_doc_length
+    for term in set(terms):
+        term_info = index.lookup(term)
+        if term_info is None:
+            continue
+        weight = terms.count(term) * bm25_idf(index.doc_count, term_info.df) * (engine.k1 + 1)
+        for doc_id, tf in index.postings(term_info):
+            scores[doc_id] = scores.get(doc_id, 0.0) + \
+                weight * tf / (tf + length_base + index.doc_length(doc_id) * length_norm)
+    return scores
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک جستجوی BM25 با هرس Block-Max")
+    parser.add_argument("--docs", type=int, default=50000)
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    parser.add_argument("--mean-length", type=int, default=150)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--verify", type=int, default=50, help="تعداد پرس‌وجو برای مقایسه با امتیازدهی کامل")
+    parser.add_argument("--index-dir", help="استفاده از ایندکس موجود به جای ساخت ایندکس مصنوعی")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        index_dir = args.index_dir
+        rng = random.Random(11)
+        if index_dir is None:
+            corpus_dir = os.path.join(work_dir, "tokens")
+            start = time.perf_counter()
+            vocabulary = write_synthetic_corpus(corpus_dir, args.docs, args.vocabulary, args.mean_length)
+            print(f"corpus written in {time.perf_counter() - start:.1f}s")
+            index_dir = os.path.join(work_dir, "index")
+            start = time.perf_counter()
+            meta = build_index(corpus_dir, index_dir)
+            print(f"index build: {time.perf_counter() - start:.1f}s "
+                  f"({meta['total_tokens'] / (time.perf_counter() - start):,.0f} tokens/s)")
+
+        with SearchEngine(index_dir) as engine:
+            if args.index_dir is not None:
+                vocabulary = [info.term for info in engine.index.iter_terms()]
+            # پرس‌وجوهای 1 تا 4 کلمه‌ای از اصطلاحات پرتکرار و میانه
+            queries = [[vocabulary[min(len(vocabulary) - 1, int(rng.paretovariate(0.6)) - 1 + 5)]
+                        for _ in range(rng.randint(1, 4))] for _ in range(args.queries)]
+
+            for terms in queries[:args.verify]:
+                scores = exhaustive_scores(engine, terms)
+                expected = heapq.nsmallest(args.k, ((-score, doc_id) for doc_id, score in scores.items()))
+                results = engine.search_terms(terms, args.k)
+                # امتیاز هر رتبه برابر است؛ اسناد هم‌امتیاز (که جمع اعشاری با ترتیب متفاوت فقط در رقم آخر جدا
+                # می‌کند) ممکن است جابجا باشند، پس شناسه‌ها با امتیاز واقعی هر سند بررسی می‌شوند
+                assert len(results) == len(expected), terms
+                assert all(abs(r.score + score) < 1e-9 for r, (score, _) in zip(results, expected)), terms
+                assert all(abs(scores[r.doc_id] - r.score) < 1e-9 for r in results), terms
+            print(f"verified {min(args.verify, len(queries))} queries against exhaustive scoring")
+
+            latencies = []
+            scored = 0
+            postings = 0
+            for terms in queries:
+                start = time.perf_counter()
+                engine.search_terms(terms, args.k)
+                latencies.append((time.perf_counter() - start) * 1000)
+                scored += engine.postings_scored
+                postings += sum(engine.index.lookup(term).df for term in set(terms)
+                                if engine.index.lookup(term) is not None)
+            latencies.sort()
+            total_seconds = sum(latencies) / 1000
+            print(f"docs: {engine.index.doc_count}  terms: {engine.index.term_count}  queries: {len(queries)}")
+            print(f"QPS: {len(queries) / total_seconds:.1f}")
+            print(f"latency ms  p50: {percentile(latencies, 0.50):.2f}  p95: {percentile(latencies, 0.95):.2f}  "
+                  f"p99: {percentile(latencies, 0.99):.2f}  max: {latencies[-1]:.2f}")
+            print(f"postings scored: {scored:,} of {postings:,} ({scored / max(postings, 1):.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# seoran/benchmarks/bench_seen_store.py
+# بنچمارک مخزن URL های دیده شده: حافظه مصرفی و نرخ بررسی عضویت
+# برای set رشته‌ها، حالت exact و حالت bloom.
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/bench_seen_store.py --urls 1000000
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "crawler"))
+
+from seen_store import ExactSeenStore, BloomSeenStore, load_seen_store  # noqa: E402
+
+
+def make_urls(count, offset=0):
+    return [f"https://host{i % 5000}.example.ir/category/{i // 5000}/post-{i + offset}?page={i % 7}"
+            for i in range(count)]
+
+
+def measure(name, factory, urls, probe_urls, batch_size, extra_bytes=0):
+    # حافظه با tracemalloc و زمان در یک اجرای جداگانه (tracemalloc تخصیص‌ها را کند می‌کند)
+    tracemalloc.start()
+    store = factory()
+    for i in range(0, len(urls), batch_size):
+        store.add_many(urls[i:i + batch_size])
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    memory += extra_bytes
+
+    store = factory()
+    start = time.perf_counter()
+    for i in range(0, len(urls), batch_size):
+        store.add_many(urls[i:i + batch_size])
+    insert_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hits = 0
+    for i in range(0, len(probe_urls), batch_size):
+        hits += sum(store.contains_many(probe_urls[i:i + batch_size]))
+    lookup_seconds = time.perf_counter() - start
+    false_positives = hits - len(probe_urls) // 2
+
+    print(f"{name:<10}{memory / len(urls):>12.1f}{len(urls) / insert_seconds:>14,.0f}"
+          f"{len(probe_urls) / lookup_seconds:>14,.0f}{false_positives:>10}")
+    return store
+
+
+class _SetStore:
+    """خط مبنا: همان set رشته‌های فعلی خزنده."""
+    def __init__(self):
+        self._urls = set()
+
+    def add_many(self, urls):
+        new_urls = [url for url in urls if url not in self._urls]
+        self._urls.update(new_urls)
+        return new_urls
+
+    def contains_many(self, urls):
+        return [url in self._urls for url in urls]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک مخزن URL های دیده شده")
+    parser.add_argument("--urls", type=int, default=500_000)
+    parser.add_argument("--batch", type=int, default=100, help="اندازه دسته (تعداد لینک‌های یک صفحه)")
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    args = parser.parse_args()
+
+    urls = make_urls(args.urls)
+    # نیمی از پرس‌وجوها موجود و نیمی جدید هستند
+    probe_urls = urls[: args.urls // 2] + make_urls(args.urls - args.urls // 2, offset=args.urls)
+
+    print(f"{'store':<10}{'bytes/url':>12}{'inserts/sec':>14}{'lookups/sec':>14}{'false+':>10}")
+    # رشته‌ها در این بنچمارک از قبل ساخته شده‌اند؛ در خزنده متعلق به خود set هستند
+    string_bytes = sum(sys.getsizeof(url) for url in urls)
+    measure("set", _SetStore, urls, probe_urls, args.batch, extra_bytes=string_bytes)
+    exact = measure("exact", ExactSeenStore, urls, probe_urls, args.batch)
+    bloom = measure("bloom", lambda: BloomSeenStore(args.urls, args.error_rate), urls, probe_urls, args.batch)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for store in (exact, bloom):
+            path = os.path.join(tmp_dir, f"{store.mode}.seen")
+            start = time.perf_counter()
+            store.save(path)
+            save_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            reloaded = load_seen_store(path)
+            load_seconds = time.perf_counter() - start
+            assert all(reloaded.contains_many(urls[:1000]))
+            print(f"{store.mode}: {os.path.getsize(path) / 1e6:.1f} MB on disk, "
+                  f"save {save_seconds:.3f}s, load {load_seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# seoran/benchmarks/bench_token_store.py
+# بنچمارک قالب خروجی پردازشگر: فایل متنی _tokens.txt برای هر سند در برابر واژه‌نامه سراسری و shard های باینری
+# شناسه توکن‌ها (token_store.py). یک پیکره مصنوعی با توزیع زیپفی اصطلاحات (لم‌های فارسی 2 تا 8 حرفی) در هر دو
+# قالب نوشته می‌شود و حجم روی دیسک، زمان نوشتن، زمان بارگذاری همه اسناد (برای تحلیل‌ها) و زمان ساخت ایندکس
+# گزارش می‌شود.
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/bench_token_store.py --docs 5000
+
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "indexer"))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "processor"))
+
+from index_builder import build_index, find_token_files  # noqa: E402
+from token_store import TokenStoreReader, TokenStoreWriter, TOKEN_STORE_DIRNAME  # noqa: E402
+
+PERSIAN_LETTERS = "ابپتثجچحخدذرزژسشصضطظعغفقکگلمنوهی"
+
+
+def synthetic_documents(doc_count, vocabulary_size, mean_length, seed=7):
+    rng = random.Random(seed)
+    vocabulary = set()
+    while len(vocabulary) < vocabulary_size:
+        vocabulary.add("".join(rng.choices(PERSIAN_LETTERS, k=rng.randint(2, 8))))
+    vocabulary = sorted(vocabulary)
+    rng.shuffle(vocabulary)
+    cumulative_weights = list(itertools.accumulate(1 / rank for rank in range(1, vocabulary_size + 1)))
+    for doc_id in range(doc_count):
+        length = max(20, int(rng.expovariate(1 / mean_length)))
+        yield os.path.join(f"site_{doc_id % 20}", f"{doc_id:08d}_tokens.txt"), \
+            rng.choices(vocabulary, cum_weights=cumulative_weights, k=length)
+
+
+def directory_size(directory):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+
+
+def write_text(directory, documents):
+    for key, tokens in documents:
+        path = os.path.join(directory, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(" ".join(tokens))
+
+
+def write_token_ids(directory, documents):
+    with TokenStoreWriter(os.path.join(directory, TOKEN_STORE_DIRNAME)) as writer:
+        for key, tokens in documents:
+            writer.add(key, tokens)
+
+
+def load_text(directory):
+    """همه اسناد: خواندن و جدا کردن توکن‌ها. تعداد کل توکن‌ها را برمی‌گرداند."""
+    total = 0
+    for path in find_token_files(directory):
+        with open(path, 'r', encoding='utf-8') as f:
+            total += len(f.read().split())
+    return total
+
+
+def load_token_ids(directory):
+    """همه اسناد: شناسه توکن‌ها بدون کپی از mmap (و یک گذر روی آنها مانند یک تحلیل ساده)."""
+    total = 0
+    with TokenStoreReader(os.path.join(directory, TOKEN_STORE_DIRNAME)) as reader:
+        for document in reader.iter_documents():
+            total += len(document.token_ids)
+            max(document.token_ids)
+        document = None
+    return total
+
+
+def load_text_frequencies(directory):
+    """بسامد اصطلاحات کل پیکره از فایل‌های متنی."""
+    frequencies = {}
+    for path in find_token_files(directory):
+        with open(path, 'r', encoding='utf-8') as f:
+            for token in f.read().split():
+                frequencies[token] = frequencies.get(token, 0) + 1
+    return frequencies
+
+
+def load_token_id_frequencies(directory):
+    """بسامد اصطلاحات کل پیکره از شناسه‌ها؛ فقط در پایان به رشته تبدیل می‌شوند."""
+    with TokenStoreReader(os.path.join(directory, TOKEN_STORE_DIRNAME)) as reader:
+        counts = [0] * len(reader.vocabulary)
+        for document in reader.iter_documents():
+            for token_id in document.token_ids:
+                counts[token_id] += 1
+        document = None
+        return {reader.vocabulary[token_id]: count for token_id, count in enumerate(counts) if count}
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="بنچمارک قالب خروجی متنی در برابر شناسه توکن‌ها")
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--mean-length", type=int, default=400)
+    args = parser.parse_args()
+
+    documents = list(synthetic_documents(args.docs, args.vocabulary, args.mean_length))
+    token_count = sum(len(tokens) for _, tokens in documents)
+    print(f"docs: {args.docs}  tokens: {token_count}  vocabulary: {args.vocabulary}")
+    print(f"{'format':<12}{'MB on disk':>12}{'write s':>10}{'load s':>10}{'freqs s':>10}{'index s':>10}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        rows = {}
+        for name, write, load, frequencies in (("text", write_text, load_text, load_text_frequencies),
+                                               ("token_ids", write_token_ids, load_token_ids,
+                                                load_token_id_frequencies)):
+            directory = os.path.join(work_dir, name)
+            os.makedirs(directory)
+            _, write_seconds = timed(write, directory, documents)
+            loaded, load_seconds = timed(load, directory)
+            assert loaded == token_count
+            counts, frequency_seconds = timed(frequencies, directory)
+            with contextlib.redirect_stdout(io.StringIO()):
+                _, index_seconds = timed(build_index, directory, os.path.join(work_dir, f"index_{name}"))
+            row = rows[name] = (directory_size(directory), load_seconds, counts)
+            print(f"{name:<12}{row[0] / 1024 / 1024:>12.1f}{write_seconds:>10.2f}{load_seconds:>10.2f}"
+                  f"{frequency_seconds:>10.2f}{index_seconds:>10.2f}")
+        assert rows["text"][2] == rows["token_ids"][2]
+        print(f"size: {rows['text'][0] / rows['token_ids'][0]:.1f}x smaller  "
+              f"load: {rows['text'][1] / rows['token_ids'][1]:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# seoran/benchmarks/local_site.py
+# سطح: سرور HTTP محلی به عنوان جایگزین وب‌سایت‌های واقعی برای بنچمارک خزنده.
+#
+# میزبان‌های مختلف با آدرس‌های 127.0.0.1 تا 127.0.0.N شبیه‌سازی می‌شوند (همه روی loopback)،
+# بنابراین خزنده هر کدام را یک میزبان جداگانه می‌بیند و ادب به ازای میزبان واقعا اعمال می‌شود.
+# سرور اتصال‌ها را باز نگه می‌دارد (HTTP/1.1 keep-alive)، در صورت درخواست بدنه‌ها را gzip می‌کند
+# و می‌تواند هزینه برقراری هر اتصال جدید (دست‌دادن TCP/TLS) را با connect_latency شبیه‌سازی کند.
+# با min_interval یک سرور شکننده شبیه‌سازی می‌شود: درخواستی که زودتر از min_interval ثانیه پس از درخواست
+# پذیرفته شده قبلی به همان میزبان برسد با 429 (و در صورت تعیین retry_after، هدر Retry-After) رد می‌شود.
+
+import random
+import threading
+import time
+import gzip
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PERSIAN_WORDS = [
+    "موتور", "جستجو", "زبان", "فارسی", "متن", "صفحه", "خزنده", "پردازش", "کتاب", "دانش",
+    "ایران", "تهران", "فرهنگ", "تاریخ", "علم", "فناوری", "برنامه", "نویسی", "داده", "شبکه",
+]
+
+
+def host_addresses(host_count):
+    """آدرس‌های loopback برای شبیه‌سازی host_count میزبان مستقل."""
+    return [f"127.0.0.{i}" for i in range(1, host_count + 1)]
+
+
+class LocalSiteServer:
+    """
+    یک سرور HTTP چند-threadی که برای هر مسیر /page/<n> یک صفحه HTML فارسی با
+    تعدادی لینک به صفحات دیگر (روی میزبان‌های مختلف) برمی‌گرداند.
+    """
+    def __init__(self, host_count=1, links_per_page=10, latency=0.02, port=0, seed=0, compress=False,
+                 connect_latency=0.0, min_interval=0.0, retry_after=None):
+        self.hosts = host_addresses(host_count)
+        self.links_per_page = links_per_page
+        self.latency = latency
+        self.seed = seed
+        self.compress = compress
+        self.connect_latency = connect_latency
+        self.min_interval = min_interval
+        self.retry_after = retry_after
+        self.requests_served = 0
+        self.requests_throttled = 0
+        self._last_accepted = {}  # میزبان (هدر Host) -> زمان آخرین درخواست پذیرفته شده
+        self.connections_opened = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # هدرها و بدنه در یک نوشتن فرستاده می‌شوند (wfile بافر دار است و پس از هر درخواست flush می‌شود) و
+            # Nagle خاموش است؛ وگرنه روی اتصال‌های keep-alive هر پاسخ منتظر ACK تاخیری (حدود 40ms) می‌ماند
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                if site.connect_latency:
+                    time.sleep(site.connect_latency)
+                with site._lock:
+                    site.connections_opened += 1
+
+            def do_GET(self):
+                if site.min_interval and site.throttle(self.headers.get('Host', '')):
+                    self.send_response(429)
+                    if site.retry_after is not None:
+                        self.send_header('Retry-After', str(site.retry_after))
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if site.latency:
+                    time.sleep(site.latency)
+                body, content_type = site.render_response(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                etag = '"%08x"' % zlib.crc32(body)
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    with site._lock:
+                        site.requests_served += 1
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('ETag', etag)
+                if site.compress and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body, compresslevel=6)
+                    self.send_header('Content-Encoding', 'gzip')
+                    self.send_header('Vary', 'Accept-Encoding')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with site._lock:
+                    site.requests_served += 1
+                    site.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        ThreadingHTTPServer.request_queue_size = 1024
+        # 0.0.0.0 لازم است تا اتصال به همه آدرس‌های 127.0.0.x پذیرفته شود
+        self._server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = None
+
+    def throttle(self, host):
+        """آیا درخواست فعلی به host باید با 429 رد شود؟"""
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_accepted.get(host)
+            if last is not None and now - last < self.min_interval:
+                self.requests_throttled += 1
+                return True
+            self._last_accepted[host] = now
+            return False
+
+    def url_for(self, host, page_number):
+        return f"http://{host}:{self.port}/page/{page_number}"
+
+    def start_url(self):
+        return self.url_for(self.hosts[0], 0)
+
+    def allowed_domains(self):
+        return [f"{host}:{self.port}" for host in self.hosts]
+
+    def render_response(self, path):
+        """(بدنه، Content-Type) پاسخ یک مسیر؛ بدنه None یعنی 404."""
+        return self.render_page(path).encode('utf-8'), 'text/html; charset=utf-8'
+
+    def render_page(self, path):
+        try:
+            page_number = int(path.rstrip('/').rsplit('/', 1)[-1])
+        except ValueError:
+            page_number = 0
+        rng = random.Random(self.seed * 1_000_003 + page_number)
+        paragraphs = " ".join(rng.choice(PERSIAN_WORDS) for _ in range(200))
+        links = []
+        for i in range(self.links_per_page):
+            target = page_number * self.links_per_page + i + 1
+            host = self.hosts[target % len(self.hosts)]
+            links.append(f'<a href="{self.url_for(host, target)}">{rng.choice(PERSIAN_WORDS)}</a>')
+        return (
+            "<!DOCTYPE html><html lang=\"fa\"><head><meta charset=\"utf-8\">"
+            f"<title>صفحه {page_number}</title></head><body><article><p>{paragraphs}</p></article>"
+            f"<nav>{' '.join(links)}</nav></body></html>"
+        )
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,311 @@
+# seoran/benchmarks/run_suite.py
+# مجموعه بنچمارک قابل تکرار خزنده و پردازشگر متن روی یک سایت مصنوعی فارسی (synthetic_site.py).
+#
+#   خزنده:     سایت از یک سرور HTTP محلی (در پروسس جدا) سرو می‌شود و برای crawl_website و خزنده ناهمگام
+#              صفحه بر ثانیه و زمان CPU هر صفحه اندازه‌گیری می‌شود.
+#   پردازشگر:  برای هر مرحله (استخراج متن، نرمال‌سازی، توکنایز، لماتایز) سند بر ثانیه، توکن بر ثانیه و
+#              بیشینه حافظه تخصیص یافته (tracemalloc) و برای main_processor_v2 سرعت کل گزارش می‌شود.
+#
+# نتایج به همراه تنظیمات، commit فعلی و مشخصات سیستم در یک فایل JSON نوشته می‌شوند؛ با --compare
+# نتایج با یک اجرای قبلی مقایسه می‌شوند.
+#
+# اجرا از ریشه مخزن:
+#   python benchmarks/run_suite.py --pages 500 --docs 300
+#   python benchmarks/run_suite.py --compare benchmarks/results/suite_20240101-120000.json
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.join(BENCH_DIR, "..")
+sys.path.insert(0, os.path.join(REPO_DIR, "crawler"))
+sys.path.insert(0, os.path.join(REPO_DIR, "processor"))
+sys.path.insert(0, BENCH_DIR)
+
+import crawler  # noqa: E402
+import text_processor  # noqa: E402
+from async_crawler import crawl_website_concurrent  # noqa: E402
+from lemma_cache import LemmaCache  # noqa: E402
+from synthetic_site import SyntheticSite, DEFAULT_ENCODINGS, write_html_corpus  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+RESULTS_FORMAT_VERSION = 1
+
+
+# --- خزنده ---
+
+def _site_options(args):
+    return dict(page_count=args.pages, links_per_page=args.links, page_words=args.page_words,
+                encodings=args.encodings, host_count=args.hosts, latency=args.latency, seed=args.seed,
+                compress=args.compress, connect_latency=args.connect_latency)
+
+
+def _measure_crawl(mode, args):
+    site = SyntheticSite(**_site_options(args)).start_in_subprocess()
+    try:
+        with tempfile.TemporaryDirectory() as download_dir:
+            crawler.DOWNLOAD_DIR = download_dir
+            crawler.ALLOWED_DOMAINS = []
+            crawler.REQUEST_DELAY = 0
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if mode == "sync":
+                    crawler.crawl_website(site.start_url(), max_pages=args.crawl_pages,
+                                          allowed_domains_list=site.allowed_domains())
+                    pages = crawler.pages_crawled_count
+                else:
+                    pages = crawl_website_concurrent(site.start_url(), max_pages=args.crawl_pages,
+                                                     allowed_domains_list=site.allowed_domains(),
+                                                     max_concurrency=args.concurrency, host_delay=0)
+            wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    finally:
+        site.stop()
+    # مرحله connect شامل برقراری اتصال و انتظار تا هدرهای پاسخ (TTFB) است
+    connect_count = crawler.STAGE_SECONDS.count(("connect",))
+    return {
+        "mode": mode,
+        "pages": pages,
+        "seconds": round(wall, 4),
+        "pages_per_sec": round(pages / wall, 2) if wall else None,
+        "cpu_ms_per_page": round(cpu / pages * 1000, 3) if pages else None,
+        "connect_ms": round(crawler.STAGE_SECONDS.sum(("connect",)) / connect_count * 1000, 3) if connect_count else None,
+        "transferred_kb_per_page": round(crawler.TRANSFERRED_BYTES.total() / 1024 / pages, 2) if pages else None,
+    }
+
+
+# --- پردازشگر متن ---
+
+def _stage_extract(html_documents):
+    stats = text_processor.ProcessingStats()
+    texts = [text_processor.extract_text_from_html_v2(html, stats) for html in html_documents]
+    return texts, None
+
+
+def _stage_normalize(texts):
+    normalized = [text_processor.normalize_persian_text_v2(text, remove_numbers=text_processor.NORMALIZE_REMOVE_NUMBERS,
+                                                           remove_english=text_processor.NORMALIZE_REMOVE_ENGLISH)
+                  for text in texts]
+    return normalized, None
+
+
+def _stage_tokenize(texts):
+    documents = [[word for sentence in text_processor.sent_tokenize(text)
+                  for word in text_processor.word_tokenize(sentence)] for text in texts]
+    return documents, sum(len(words) for words in documents)
+
+
+def _stage_lemmatize(documents):
+    # همان حلقه process_text_with_nlp، با کش لم خالی تا هر اجرا از یک نقطه شروع شود
+    cache = LemmaCache(text_processor.LEMMA_CACHE_SIZE)
+    lemmatized = []
+    for words in documents:
+        tokens = []
+        for word in words:
+            lemma = cache.get(word)
+            if lemma is None:
+                lemma = text_processor._lemmatize_token(word)
+                cache.put(word, lemma)
+            if lemma:
+                tokens.append(lemma)
+        lemmatized.append(tokens)
+    return lemmatized, sum(len(words) for words in documents)
+
+
+PROCESSOR_STAGES = (
+    ("extract", _stage_extract),
+    ("normalize", _stage_normalize),
+    ("tokenize", _stage_tokenize),
+    ("lemmatize", _stage_lemmatize),
+)
+
+
+def _measure_processor_stages(html_documents):
+    """هر مرحله روی خروجی مرحله قبل اجرا می‌شود؛ یک بار برای زمان و یک بار با tracemalloc برای حافظه."""
+    results = []
+    stage_input = html_documents
+    for name, stage in PROCESSOR_STAGES:
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        stage_output, token_count = stage(stage_input)
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+        tracemalloc.start()
+        stage(stage_input)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results.append({
+            "stage": name,
+            "docs": len(stage_input),
+            "seconds": round(wall, 4),
+            "docs_per_sec": round(len(stage_input) / wall, 2) if wall else None,
+            "tokens": token_count,
+            "tokens_per_sec": round(token_count / wall, 1) if token_count and wall else None,
+            "cpu_ms_per_doc": round(cpu / len(stage_input) * 1000, 3),
+            "peak_alloc_mb": round(peak / 2**20, 2),
+        })
+        stage_input = stage_output
+    return results
+
+
+def _measure_main_processor(corpus_dir, doc_count, work_dir, workers):
+    text_processor.HTML_FILES_BASE_DIR = corpus_dir
+    text_processor.PAGE_STORE_DIR = os.path.join(corpus_dir, "segments")
+    text_processor.PROCESSED_TEXTS_DIR = os.path.join(work_dir, f"processed_{workers}")
+    text_processor.lemma_cache = LemmaCache(text_processor.LEMMA_CACHE_SIZE)
+    wall_start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        text_processor.main_processor_v2(workers=workers)
+    wall = time.perf_counter() - wall_start
+    return {"workers": workers, "docs": doc_count, "seconds": round(wall, 4),
+            "docs_per_sec": round(doc_count / wall, 2) if wall else None}
+
+
+def measure_processor(args):
+    site = SyntheticSite(**_site_options(args))
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            corpus_dir = os.path.join(work_dir, "pages")
+            doc_count = write_html_corpus(site, corpus_dir, args.docs)
+            html_documents = []
+            for root, _, files in os.walk(corpus_dir):
+                for name in sorted(files):
+                    with open(os.path.join(root, name), 'r', encoding='utf-8') as f:
+                        html_documents.append(f.read())
+
+            # گرم کردن ابزارهای Hazm (بارگذاری تنبل مدل‌ها) پیش از اندازه‌گیری
+            text_processor.process_text_with_nlp(text_processor.normalize_persian_text_v2("متن آزمایشی برای گرم کردن"))
+            return {
+                "stages": _measure_processor_stages(html_documents),
+                "end_to_end": [_measure_main_processor(corpus_dir, doc_count, work_dir, workers)
+                               for workers in args.workers],
+            }
+    finally:
+        site.stop()
+
+
+# --- گزارش ---
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_results(results):
+    if results.get("crawler"):
+        print(f"{'crawler':<10}{'pages':>8}{'seconds':>10}{'pages/sec':>12}{'cpu ms/page':>13}{'connect ms':>12}"
+              f"{'KB/page':>9}")
+        for row in results["crawler"]:
+            print(f"{row['mode']:<10}{row['pages']:>8}{row['seconds']:>10.2f}{row['pages_per_sec'] or 0:>12.1f}"
+                  f"{row['cpu_ms_per_page'] or 0:>13.2f}{row['connect_ms'] or 0:>12.2f}"
+                  f"{row['transferred_kb_per_page'] or 0:>9.1f}")
+    if results.get("processor"):
+        print(f"{'stage':<10}{'docs/sec':>10}{'tokens/sec':>12}{'cpu ms/doc':>12}{'peak MB':>9}")
+        for row in results["processor"]["stages"]:
+            tokens_per_sec = f"{row['tokens_per_sec']:.0f}" if row['tokens_per_sec'] else "-"
+            print(f"{row['stage']:<10}{row['docs_per_sec'] or 0:>10.1f}{tokens_per_sec:>12}"
+                  f"{row['cpu_ms_per_doc']:>12.3f}{row['peak_alloc_mb']:>9.2f}")
+        for row in results["processor"]["end_to_end"]:
+            print(f"main_processor_v2 workers={row['workers']}: {row['docs_per_sec']:.1f} docs/sec")
+    print(f"max RSS: {results['max_rss_mb']:.1f} MB")
+
+
+def _compare(results, previous):
+    """نسبت سرعت (فعلی به قبلی) برای معیارهای مشترک دو اجرا؛ بیشتر از 1 یعنی سریع‌تر."""
+    print(f"--- مقایسه با اجرای {previous.get('created_at')} (commit {str(previous.get('git_commit'))[:10]}) ---")
+    pairs = []
+    old_rows = {row["mode"]: row for row in previous.get("crawler") or []}
+    for row in results.get("crawler") or []:
+        old_row = old_rows.get(row["mode"])
+        if old_row is None:
+            continue
+        pairs.append((f"crawler {row['mode']}", row["pages_per_sec"], old_row["pages_per_sec"]))
+        if row.get("connect_ms") and old_row.get("connect_ms"):
+            # زمان است نه سرعت: نسبت قبلی به فعلی، تا مثل بقیه بیشتر از 1 یعنی سریع‌تر باشد
+            print(f"{'crawler ' + row['mode'] + ' connect ms':<32}{old_row['connect_ms']:>10.2f} -> "
+                  f"{row['connect_ms']:>10.2f}  ({old_row['connect_ms'] / row['connect_ms']:.2f}x)")
+    old_processor = previous.get("processor") or {}
+    old_stages = {row["stage"]: row for row in old_processor.get("stages", [])}
+    old_end_to_end = {row["workers"]: row for row in old_processor.get("end_to_end", [])}
+    for row in (results.get("processor") or {}).get("stages", []):
+        if row["stage"] in old_stages:
+            pairs.append((f"stage {row['stage']}", row["docs_per_sec"], old_stages[row["stage"]]["docs_per_sec"]))
+    for row in (results.get("processor") or {}).get("end_to_end", []):
+        if row["workers"] in old_end_to_end:
+            pairs.append((f"main_processor_v2 workers={row['workers']}", row["docs_per_sec"],
+                          old_end_to_end[row["workers"]]["docs_per_sec"]))
+    for name, current, old in pairs:
+        if current and old:
+            print(f"{name:<32}{old:>10.1f} -> {current:>10.1f}  ({current / old:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="مجموعه بنچمارک خزنده و پردازشگر متن")
+    parser.add_argument("--pages", type=int, default=1000, help="تعداد صفحات سایت مصنوعی")
+    parser.add_argument("--links", type=int, default=20, help="تعداد لینک هر صفحه")
+    parser.add_argument("--page-words", type=int, default=600, help="تعداد تقریبی کلمات متن اصلی هر صفحه")
+    parser.add_argument("--encodings", nargs="+", default=list(DEFAULT_ENCODINGS))
+    parser.add_argument("--hosts", type=int, default=4, help="تعداد میزبان‌های شبیه‌سازی شده")
+    parser.add_argument("--latency", type=float, default=0.0, help="تاخیر شبیه‌سازی شده سرور (ثانیه)")
+    parser.add_argument("--compress", action="store_true", help="سرور پاسخ‌ها را gzip کند")
+    parser.add_argument("--connect-latency", type=float, default=0.0,
+                        help="هزینه شبیه‌سازی شده برقراری هر اتصال جدید (ثانیه)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--crawl-pages", type=int, default=300, help="بودجه صفحات هر خزش")
+    parser.add_argument("--concurrency", type=int, default=50, help="درخواست هم‌زمان خزنده ناهمگام")
+    parser.add_argument("--docs", type=int, default=300, help="تعداد اسناد پیکره پردازشگر")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1], help="تعداد پروسس‌های main_processor_v2")
+    parser.add_argument("--skip-crawler", action="store_true")
+    parser.add_argument("--skip-processor", action="store_true")
+    parser.add_argument("--output", help="مسیر فایل JSON نتایج (پیش‌فرض: benchmarks/results/suite_<زمان>.json)")
+    parser.add_argument("--compare", help="فایل JSON یک اجرای قبلی برای مقایسه")
+    args = parser.parse_args()
+
+    # لاگ هر URL/دسته در اندازه‌گیری‌ها خاموش است
+    crawler.LOG_LEVEL = text_processor.LOG_LEVEL = "WARNING"
+    created_at = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    results = {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "created_at": created_at,
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": vars(args),
+        "crawler": None,
+        "processor": None,
+    }
+    if not args.skip_crawler:
+        results["crawler"] = [_measure_crawl("sync", args), _measure_crawl("async", args)]
+    if not args.skip_processor:
+        results["processor"] = measure_processor(args)
+    # ru_maxrss در لینوکس بر حسب کیلوبایت است
+    results["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    _print_results(results)
+    output = args.output or os.path.join(RESULTS_DIR, f"suite_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"نتایج در {output} ذخیره شد.")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            _compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# seoran/benchmarks/synthetic_site.py
+# سطح: وب‌سایت مصنوعی فارسی قابل تنظیم برای بنچمارک‌ها (تعداد صفحات، تعداد لینک هر صفحه، اندازه صفحه
+# و انکودینگ‌ها، از جمله windows-1256) و پیکره HTML ساخته شده از همان صفحات برای پردازشگر متن.
+#
+# محتوای هر صفحه فقط به seed و شماره صفحه بستگی دارد، پس نتایج اجراهای مختلف قابل مقایسه‌اند.
+# صفحات windows-1256 مثل بسیاری از سایت‌های فارسی قدیمی charset را فقط در تگ meta اعلام می‌کنند.
+
+import multiprocessing
+import os
+import random
+
+from local_site import LocalSiteServer, PERSIAN_WORDS
+
+# واژه‌ها و پسوندهای بیشتر تا متن صفحات به متن واقعی نزدیک‌تر باشد (و صفحات تقریبا تکراری ساخته نشوند)
+SYNTHETIC_WORDS = PERSIAN_WORDS + [
+    "دانشگاه", "دانشجو", "پژوهش", "مقاله", "نویسنده", "خواننده", "کتابخانه", "روزنامه", "خبرگزاری",
+    "اقتصاد", "سیاست", "ورزش", "فوتبال", "بازیکن", "مربی", "هنرمند", "سینما", "فیلم", "موسیقی",
+    "رفتند", "می‌روند", "نوشتند", "می‌نویسد", "خواندیم", "گفتند", "دیدم", "ساختند", "آموزش", "مدرسه",
+    "شهر", "کشور", "جهان", "مردم", "دولت", "بازار", "قیمت", "سلامت", "پزشک", "بیمارستان",
+]
+SYNTHETIC_SUFFIXES = ["", "", "", "ها", "های", "ی", "ان", "تر"]
+
+DEFAULT_ENCODINGS = ('utf-8', 'windows-1256')
+
+
+class SyntheticSite(LocalSiteServer):
+    """
+    سایت مصنوعی با page_count صفحه روی host_count میزبان. هر صفحه links_per_page لینک به صفحات تصادفی
+    دیگر، حدود page_words کلمه متن اصلی و قالب رایج وبلاگ‌ها (منو، نوار کناری، تبلیغ، پابرگ) دارد.
+    انکودینگ صفحه n برابر encodings[n % len(encodings)] است. مسیرهای خارج از سایت 404 برمی‌گردانند.
+    """
+    def __init__(self, page_count=1000, links_per_page=20, page_words=600, encodings=DEFAULT_ENCODINGS,
+                 host_count=1, latency=0.0, port=0, seed=0, compress=False, connect_latency=0.0):
+        super().__init__(host_count=host_count, links_per_page=links_per_page, latency=latency, port=port, seed=seed,
+                         compress=compress, connect_latency=connect_latency)
+        self.page_count = page_count
+        self.page_words = page_words
+        self.encodings = tuple(encodings)
+        self._process = None
+
+    def _page_number(self, path):
+        try:
+            page_number = int(path.rstrip('/').rsplit('/', 1)[-1])
+        except ValueError:
+            return None
+        return page_number if 0 <= page_number < self.page_count else None
+
+    def page_encoding(self, page_number):
+        return self.encodings[page_number % len(self.encodings)]
+
+    def render_response(self, path):
+        page_number = self._page_number(path)
+        if page_number is None:
+            return None, None
+        encoding = self.page_encoding(page_number)
+        html = self.render_page(path)
+        if encoding.lower() == 'utf-8':
+            return html.encode(encoding), 'text/html; charset=utf-8'
+        # «ی» فارسی در windows-1256 نیست؛ سایت‌های قدیمی «ي» عربی می‌نویسند (نرمال‌ساز Hazm یکسانشان می‌کند)
+        return html.replace('ی', 'ي').encode(encoding, errors='replace'), 'text/html'
+
+    def render_page(self, path):
+        page_number = self._page_number(path) or 0
+        rng = random.Random(self.seed * 1_000_003 + page_number)
+
+        def sentence(length):
+            return " ".join(rng.choice(SYNTHETIC_WORDS) + rng.choice(SYNTHETIC_SUFFIXES) for _ in range(length))
+
+        paragraph_words = 60
+        paragraphs = "".join(f"<p>{sentence(paragraph_words)}.</p>"
+                             for _ in range(max(1, self.page_words // paragraph_words)))
+        links = []
+        for _ in range(self.links_per_page):
+            target = rng.randrange(self.page_count)
+            host = self.hosts[target % len(self.hosts)]
+            links.append(f'<li><a href="{self.url_for(host, target)}">{sentence(3)}</a></li>')
+        half = len(links) // 2
+        return (
+            f'<!DOCTYPE html><html lang="fa" dir="rtl"><head><meta charset="{self.page_encoding(page_number)}">'
+            f'<title>{sentence(5)}</title><script>var page = {page_number};</script>'
+            f'<style>body{{direction: rtl}}</style></head><body>'
+            f'<header class="site-header"><nav class="main-navigation"><ul>{"".join(links[:half])}</ul></nav></header>'
+            f'<div id="sidebar"><div class="widget">{sentence(25)}</div></div>'
+            f'<div class="ads banner">{sentence(8)}</div>'
+            f'<article class="post"><h1>{sentence(6)}</h1><div class="post-meta-data">{sentence(4)}</div>'
+            f'<div class="entry-content">{paragraphs}</div></article>'
+            f'<div class="related-posts"><ul>{"".join(links[half:])}</ul></div>'
+            f'<footer class="site-footer">{sentence(15)}</footer></body></html>'
+        )
+
+    def start_in_subprocess(self):
+        """
+        سرور را در یک پروسس جدا اجرا می‌کند تا زمان CPU سرور در اندازه‌گیری خزنده (time.process_time)
+        حساب نشود. سوکت پیش از fork باز شده است، پس پورت از قبل معلوم است.
+        """
+        self._process = multiprocessing.get_context('fork').Process(target=self._server.serve_forever, daemon=True)
+        self._process.start()
+        return self
+
+    def stop(self):
+        if self._process is None:
+            super().stop()
+            return
+        self._process.terminate()
+        self._process.join()
+        self._process = None
+        self._server.server_close()
+
+
+def write_html_corpus(site, directory, doc_count=None):
+    """
+    صفحات سایت را مثل خروجی خزنده (حالت files، پوشه به ازای میزبان) در directory می‌نویسد
+    تا پردازشگر متن روی همان پیکره سنجیده شود. فایل‌ها با UTF-8 ذخیره می‌شوند (مثل save_page).
+    """
+    doc_count = site.page_count if doc_count is None else min(doc_count, site.page_count)
+    for page_number in range(doc_count):
+        subdir = os.path.join(directory, f"site_{page_number % len(site.hosts)}")
+        os.makedirs(subdir, exist_ok=True)
+        with open(os.path.join(subdir, f"page_{page_number}.html"), 'w', encoding='utf-8') as f:
+            f.write(site.render_page(f"/page/{page_number}"))
+    return doc_count
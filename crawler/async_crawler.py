@@ -0,0 +1,224 @@
+# seoran/crawler/async_crawler.py
+# سطح: موتور خزش ناهمگام (asyncio) با تعداد زیادی دانلود هم‌زمان روی میزبان‌های مختلف،
+# همراه با تاخیر تطبیقی (rate_control.py) و سقف اتصال هم‌زمان به ازای هر میزبان.
+#
+# بررسی‌های نوع محتوا، محدودیت حجم و دسته‌بندی خطاها همچنان در fetch_page انجام می‌شود؛
+# این ماژول فقط زمان‌بندی درخواست‌ها را به عهده می‌گیرد و fetch_page را در یک thread pool اجرا می‌کند.
+# ترتیب URL ها و ادب هر میزبان توسط Frontier (frontier.py) مدیریت می‌شود.
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import validators
+
+import crawler
+from crawler import (
+    fetch_page, store_page, close_page_store, close_http_session, find_near_duplicate, report_near_duplicates, analyze_fetched_page,
+    start_instrumentation, finish_instrumentation, start_checkpoint, finish_checkpoint, near_duplicate_counters,
+    create_rate_control, record_fetch_result, start_focus, observe_page, link_priorities, report_focus, url_depth,
+    logger, PAGES,
+)
+from frontier import Frontier
+from link_extractor import domain_matcher
+from near_duplicates import NearDuplicateIndex
+from seen_store import create_seen_store
+from url_utils import canonicalize_url
+
+# --- پیکربندی ---
+# حداکثر تعداد درخواست‌های در جریان (روی همه میزبان‌ها)
+MAX_CONCURRENT_FETCHES = 200
+
+# حداکثر تعداد اتصال هم‌زمان به یک میزبان
+MAX_CONNECTIONS_PER_HOST = 2
+
+# فاصله اولیه (ثانیه) بین شروع دو درخواست به یک میزبان (با ADAPTIVE_RATE_CONTROL خزنده تطبیقی است)
+PER_HOST_DELAY = crawler.REQUEST_DELAY
+
+
+async def _crawl_one(url, executor, response_info):
+    """
+    یک URL را دانلود، ذخیره و لینک‌هایش را استخراج می‌کند (نتیجه درخواست در response_info قرار می‌گیرد).
+    در صورت موفقیت (لینک‌ها، متن لینک‌ها، نشانه‌های صفحه برای خزش متمرکز) و در غیر این صورت None برمی‌گرداند.
+    """
+    loop = asyncio.get_running_loop()
+    html_content = await loop.run_in_executor(executor, fetch_page, url, None, response_info)
+    if not html_content:
+        return None
+
+    # تحلیل یک‌باره صفحه: لینک‌ها و متن اصلی از یک DOM
+    analysis = await loop.run_in_executor(executor, analyze_fetched_page, html_content, url)
+    # بررسی تکراری بودن و امتیازدهی خزش متمرکز در thread حلقه رویداد انجام می‌شوند، پس نیاز به قفل ندارند
+    original_url = find_near_duplicate(url, html_content, analysis.main_text)
+    page_signals = observe_page(url, analysis.main_text, duplicate=original_url is not None)
+    if original_url is not None:
+        logger.info("صفحه %s تقریبا تکراری %s است. ذخیره و لینک‌یابی نمی‌شود.", url, original_url)
+        PAGES.inc(labels=("near_duplicate",))
+        return set(), None, None
+    await loop.run_in_executor(executor, store_page, url, html_content, response_info.get('headers'),
+                               analysis.main_text)
+    PAGES.inc(labels=("stored",))
+    return analysis.links, analysis.anchor_texts, page_signals
+
+
+async def crawl_website_async(start_url, max_pages=crawler.MAX_PAGES_TO_CRAWL, allowed_domains_list=None,
+                              max_concurrency=MAX_CONCURRENT_FETCHES,
+                              max_connections_per_host=MAX_CONNECTIONS_PER_HOST,
+                              host_delay=PER_HOST_DELAY, max_depth=crawler.MAX_CRAWL_DEPTH, resume=False,
+                              adaptive_rate=None, focused=None):
+    """
+    نسخه ناهمگام crawl_website. تا max_concurrency درخواست را هم‌زمان در جریان نگه می‌دارد
+    و تعداد صفحات دانلود شده را برمی‌گرداند.
+    ادب هر میزبان (تاخیر و سقف اتصال) توسط Frontier اعمال می‌شود؛ تاخیر هر میزبان از host_delay شروع و
+    (اگر adaptive_rate یا به طور پیش‌فرض crawler.ADAPTIVE_RATE_CONTROL درست باشد) با پاسخ‌هایش تنظیم می‌شود.
+    resume مثل crawl_website است؛ URL هایی که هنگام توقف در جریان بودند دوباره دانلود می‌شوند.
+    focused (به طور پیش‌فرض crawler.FOCUSED_CRAWL) ترتیب URL ها را بر اساس امتیاز محتوایی تعیین می‌کند.
+    """
+    if allowed_domains_list is not None:
+        crawler.ALLOWED_DOMAINS = allowed_domains_list
+
+    if not validators.url(start_url):
+        print(f"URL شروع نامعتبر است: {start_url}")
+        return 0
+
+    start_url = canonicalize_url(start_url)
+    initial_domain = urlparse(start_url).netloc
+    if not initial_domain:
+        print("خطا: دامنه URL شروع قابل تشخیص نیست. لطفاً URL معتبر وارد کنید.")
+        return 0
+    if not crawler.ALLOWED_DOMAINS:
+        print(f"محدود کردن خزش به دامنه اولیه: {initial_domain}")
+        crawler.ALLOWED_DOMAINS = [initial_domain]
+
+    print(f"شروع خزش ناهمگام از: {start_url}")
+    print(f"حداکثر صفحات برای خزش: {max_pages}")
+    print(f"حداکثر درخواست هم‌زمان: {max_concurrency} (هر میزبان: {max_connections_per_host})")
+    if adaptive_rate is None:
+        adaptive_rate = crawler.ADAPTIVE_RATE_CONTROL
+    rate_control = create_rate_control(host_delay, adaptive_rate)
+    print(f"تاخیر اولیه برای هر میزبان: {host_delay} ثانیه"
+          + (f" (تطبیقی، بین {rate_control.min_delay} و {rate_control.max_delay} ثانیه)" if adaptive_rate else ""))
+    if focused is None:
+        focused = crawler.FOCUSED_CRAWL
+    if focused:
+        print("خزش متمرکز فعال است (ترتیب URL ها بر اساس امتیاز محتوایی).")
+    print("---")
+    metrics_server = start_instrumentation()
+
+    allowed = domain_matcher(crawler.ALLOWED_DOMAINS)
+    crawler.near_duplicate_index = NearDuplicateIndex()
+    start_focus(focused)
+    frontier = Frontier(host_delay=host_delay, max_in_flight_per_host=max_connections_per_host)
+    seen_urls = create_seen_store()
+    checkpoint, restored = start_checkpoint(start_url, resume, frontier, seen_urls)
+    if checkpoint is None or not checkpoint.resumed:
+        frontier.push(start_url, priority=0)
+        seen_urls.add(start_url)
+        if checkpoint is not None:
+            checkpoint.pushed(start_url, 0)
+    in_flight = {}  # task -> (url, priority, response_info)
+    pages_downloaded = restored.get('pages_crawled_count', 0)
+
+    def checkpoint_counters():
+        return dict(near_duplicate_counters(), pages_crawled_count=pages_downloaded)
+
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    try:
+        while frontier or in_flight:
+            # URL های در جریان done نشده‌اند، پس پس از خرابی دوباره به صف برمی‌گردند
+            if checkpoint is not None and checkpoint.due():
+                checkpoint.save(checkpoint_counters())
+            # پر کردن ظرفیت بدون عبور از بودجه صفحات (درخواست‌های در جریان هم حساب می‌شوند)
+            while len(in_flight) < max_concurrency and pages_downloaded + len(in_flight) < max_pages:
+                entry = frontier.pop()
+                if entry is None:
+                    break
+                url, priority = entry
+                if urlparse(url).netloc not in allowed:
+                    frontier.done(url)
+                    if checkpoint is not None:
+                        checkpoint.done(url)
+                    continue
+                response_info = {}
+                in_flight[asyncio.ensure_future(_crawl_one(url, executor, response_info))] = (url, priority,
+                                                                                             response_info)
+
+            budget_left = pages_downloaded + len(in_flight) < max_pages
+            ready_at = frontier.next_ready_time() if budget_left else None
+            if not in_flight:
+                if ready_at is None:
+                    break
+                await asyncio.sleep(max(0.0, ready_at - time.monotonic()))
+                continue
+
+            # تا پایان یک درخواست یا آماده شدن میزبان بعدی صبر می‌کنیم
+            timeout = None if ready_at is None else max(0.0, ready_at - time.monotonic())
+            done, _ = await asyncio.wait(in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                url, priority, response_info = in_flight.pop(task)
+                frontier.done(url)
+                if checkpoint is not None:
+                    checkpoint.done(url)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    logger.warning("یک خطای پیش‌بینی نشده در خزش ناهمگام: %s", e)
+                    continue
+                # تاخیر میزبان تنظیم و URL های شکست خورده با خطای گذرا دوباره به صف برگردانده می‌شوند
+                if record_fetch_result(frontier, rate_control, url, priority, response_info) or result is None:
+                    continue
+                pages_downloaded += 1
+                depth = url_depth(priority)
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                new_links, anchor_texts, page_signals = result
+                unseen_links = seen_urls.add_many(new_links)
+                for link_priority, group in link_priorities(unseen_links, depth + 1, anchor_texts,
+                                                            page_signals).items():
+                    for link in group:
+                        frontier.push(link, priority=link_priority)
+                    if checkpoint is not None:
+                        checkpoint.pushed_many(group, link_priority)
+    finally:
+        executor.shutdown(wait=True)
+        close_page_store()
+        close_http_session()
+        remaining = len(frontier)
+        frontier.close()
+
+    # fetch_page این شمارنده را از چند thread افزایش می‌دهد؛ مقدار دقیق را اینجا ثبت می‌کنیم
+    crawler.pages_crawled_count = pages_downloaded
+    finish_checkpoint(checkpoint_counters())
+
+    print("\n--- گزارش نهایی خزش ناهمگام ---")
+    print(f"تعداد کل صفحات دانلود شده: {pages_downloaded}")
+    print(f"تعداد کل URL های منحصربفرد دیده شده: {len(seen_urls)}")
+    print(f"تعداد URL های باقیمانده در صف: {remaining}")
+    report_near_duplicates()
+    report_focus()
+    finish_instrumentation(metrics_server)
+    print("--- خزش به پایان رسید ---")
+    return pages_downloaded
+
+
+def crawl_website_concurrent(start_url, max_pages=crawler.MAX_PAGES_TO_CRAWL, allowed_domains_list=None, **options):
+    """
+    پوشش همگام برای crawl_website_async (برای استفاده از کدهای غیر ناهمگام).
+    """
+    return asyncio.run(crawl_website_async(start_url, max_pages, allowed_domains_list, **options))
+
+
+# --- اجرای برنامه ---
+if __name__ == "__main__":
+    test_start_url = "https://virgool.io/"
+    test_max_pages = 50
+    test_allowed_domains = ["virgool.io"]
+
+    if not os.path.exists(crawler.DOWNLOAD_DIR):
+        os.makedirs(crawler.DOWNLOAD_DIR, exist_ok=True)
+
+    crawl_website_concurrent(start_url=test_start_url,
+                             max_pages=test_max_pages,
+                             allowed_domains_list=test_allowed_domains)
@@ -0,0 +1,161 @@
+# seoran/crawler/crawl_checkpoint.py
+# سطح: ذخیره دوره‌ای وضعیت خزش (Frontier، URL های دیده شده و شمارنده‌ها) برای ادامه خزش پس از توقف یا خرابی.
+#
+# وضعیت به صورت یک لاگ فقط-افزودنی از رویدادها در یک پایگاه داده SQLite (حالت WAL) نگه داشته می‌شود:
+#   push: URL به صف اضافه شد (همراه با اولویت/عمق)؛ مجموعه این URL ها همان URL های دیده شده است
+#   done: کار URL تمام شد (دانلود، ذخیره و اضافه شدن لینک‌هایش به صف، یا رد شدن آن)
+#   kept: اثر انگشت SimHash صفحه‌ای که ذخیره شد (برای بازسازی ایندکس صفحات تقریبا تکراری)
+# رویدادها در حافظه جمع می‌شوند و هر CHECKPOINT_INTERVAL ثانیه همراه با شمارنده‌ها در یک تراکنش نوشته
+# می‌شوند. هر checkpoint فقط چند سطر اضافه می‌کند: URL های هم‌نوع (و در push هم‌اولویت) با '\n' به هم
+# چسبانده می‌شوند (URL های استاندارد شده '\n' ندارند) و اثر انگشت‌ها یک آرایه باینری هستند؛ پس هزینه هر
+# checkpoint فقط به تعداد رویدادهای جدید بستگی دارد و نه به اندازه کل خزش.
+#
+# هنگام ادامه خزش، URL هایی که push شده‌اند ولی done نشده‌اند (از جمله URL هایی که هنگام توقف در جریان
+# بودند یا پس از خطای گذرا دوباره به صف برگشته بودند) با همان اولویت دوباره به صف برمی‌گردند. صفحاتی که
+# پس از آخرین checkpoint تمام شده بودند (حداکثر CHECKPOINT_INTERVAL ثانیه کار) دوباره دانلود می‌شوند؛
+# بقیه صفحات دوباره دانلود نمی‌شوند.
+
+import json
+import os
+import sqlite3
+import time
+from array import array
+from collections import Counter
+
+# --- پیکربندی ---
+CHECKPOINT_FILENAME = "crawl_checkpoint.sqlite"  # داخل DOWNLOAD_DIR خزنده
+CHECKPOINT_INTERVAL = 5.0          # فاصله (ثانیه) بین دو checkpoint
+CHECKPOINT_MAX_PENDING = 100_000   # با رسیدن تعداد رویدادهای نوشته نشده به این عدد زودتر checkpoint می‌شود
+
+_PUSH, _DONE, _KEPT = 0, 1, 2
+
+
+class CrawlCheckpoint:
+    """
+    لاگ checkpoint یک خزش. اگر resume درست باشد و checkpoint قبلی با همان start_url وجود داشته باشد،
+    resumed برابر True است و restore وضعیت را بازسازی می‌کند؛ وگرنه checkpoint قبلی پاک می‌شود.
+    متدهای ثبت رویداد thread-safe نیستند و باید از thread حلقه خزش صدا زده شوند.
+    """
+    def __init__(self, path, start_url, resume=False, interval=None, max_pending=None):
+        self.path = path
+        self.interval = CHECKPOINT_INTERVAL if interval is None else interval
+        self.max_pending = CHECKPOINT_MAX_PENDING if max_pending is None else max_pending
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # در حالت WAL با synchronous=NORMAL تراکنش‌های commit شده با خرابی پروسس از دست نمی‌روند
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS log (kind INTEGER, value, urls TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.commit()
+
+        previous_start = self._get_meta('start_url')
+        self.resumed = resume and previous_start == start_url
+        if not self.resumed:
+            self._db.execute("DELETE FROM log")
+            self._db.execute("DELETE FROM meta")
+            self._db.execute("INSERT INTO meta VALUES ('start_url', ?)", (start_url,))
+            self._db.commit()
+
+        self._reset_events()
+        self._last_checkpoint = time.monotonic()
+        self.checkpoint_count = 0
+        self.checkpoint_seconds = 0.0
+
+    def _reset_events(self):
+        self._pushed = {}  # اولویت -> URL ها
+        self._done = []
+        self._kept_urls = []
+        self._kept_fingerprints = array('Q')
+        self._event_count = 0
+
+    def _get_meta(self, key):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    # --- ثبت رویدادها (فقط در حافظه؛ با save نوشته می‌شوند) ---
+
+    def pushed(self, url, priority):
+        self._pushed.setdefault(priority, []).append(url)
+        self._event_count += 1
+
+    def pushed_many(self, urls, priority):
+        if urls:
+            self._pushed.setdefault(priority, []).extend(urls)
+            self._event_count += len(urls)
+
+    def done(self, url):
+        self._done.append(url)
+        self._event_count += 1
+
+    def kept(self, url, fingerprint):
+        if fingerprint is not None:
+            self._kept_urls.append(url)
+            self._kept_fingerprints.append(fingerprint)
+            self._event_count += 1
+
+    # --- نوشتن ---
+
+    def due(self, now=None):
+        """آیا زمان checkpoint بعدی رسیده است (یا رویدادهای نوشته نشده زیاد شده‌اند)؟"""
+        if self._event_count >= self.max_pending:
+            return True
+        return (now if now is not None else time.monotonic()) - self._last_checkpoint >= self.interval
+
+    def save(self, counters):
+        """رویدادهای جمع شده و شمارنده‌ها (یک dict) را در یک تراکنش می‌نویسد."""
+        start = time.perf_counter()
+        rows = [(_PUSH, priority, "\n".join(urls)) for priority, urls in self._pushed.items()]
+        if self._done:
+            rows.append((_DONE, None, "\n".join(self._done)))
+        if self._kept_urls:
+            rows.append((_KEPT, self._kept_fingerprints.tobytes(), "\n".join(self._kept_urls)))
+        with self._db:
+            self._db.executemany("INSERT INTO log VALUES (?, ?, ?)", rows)
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('counters', ?)", (json.dumps(counters),))
+        self._reset_events()
+        self._last_checkpoint = time.monotonic()
+        self.checkpoint_count += 1
+        self.checkpoint_seconds += time.perf_counter() - start
+
+    def close(self, counters=None):
+        """در پایان خزش: checkpoint نهایی (اگر counters داده شود) و بستن پایگاه داده."""
+        if counters is not None:
+            self.save(counters)
+        self._db.close()
+
+    # --- بازسازی ---
+
+    def restore(self, frontier, seen_store, near_duplicate_index=None):
+        """
+        URL های تمام نشده را به frontier و همه URL های دیده شده را به seen_store اضافه می‌کند،
+        اثر انگشت صفحات ذخیره شده را در near_duplicate_index ثبت می‌کند و شمارنده‌های آخرین
+        checkpoint را برمی‌گرداند.
+        """
+        # URL ی که پس از خطای گذرا دوباره به صف برگشته بیش از یک بار push شده است؛ هر done فقط یکی از
+        # push های آن را تمام شده حساب می‌کند
+        finished = Counter()
+        for kind, value, urls in self._db.execute("SELECT kind, value, urls FROM log WHERE kind != ?", (_PUSH,)):
+            if kind == _DONE:
+                finished.update(urls.split("\n"))
+            elif near_duplicate_index is not None:
+                for url, fingerprint in zip(urls.split("\n"), array('Q', value)):
+                    near_duplicate_index.insert(url, fingerprint)
+
+        for priority, urls in self._db.execute("SELECT value, urls FROM log WHERE kind = ? ORDER BY rowid",
+                                               (_PUSH,)):
+            urls = urls.split("\n")
+            seen_store.add_many(urls)
+            for url in urls:
+                if finished[url]:
+                    finished[url] -= 1
+                else:
+                    frontier.push(url, priority=priority)
+
+        counters = self._get_meta('counters')
+        return json.loads(counters) if counters else {}
+
+
+def open_checkpoint(download_dir, start_url, resume=False):
+    """CrawlCheckpoint خزش در download_dir (پوشه در صورت نیاز ساخته می‌شود)."""
+    os.makedirs(download_dir, exist_ok=True)
+    return CrawlCheckpoint(os.path.join(download_dir, CHECKPOINT_FILENAME), start_url, resume=resume)
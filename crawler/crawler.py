@@ -5,35 +5,121 @@
 import requests
 import os
 import re
-from urllib.parse import urlparse, urljoin, unquote
-from bs4 import BeautifulSoup
+from urllib.parse import urlparse, unquote
 import time
+import threading
 import validators
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+from frontier import Frontier
+from seen_store import create_seen_store
+from recrawl_state import RecrawlState, RECRAWL_STATE_FILENAME, content_hash
+from page_store import PageStoreWriter, SEGMENTS_DIRNAME
+from link_extractor import extract_links_from_html, domain_matcher
+from url_utils import canonicalize_url
+from page_analysis import analyze_page
+from encoding_detect import decode_html
+from near_duplicates import NearDuplicateIndex, text_fingerprint
+from crawl_checkpoint import open_checkpoint
+from metrics import REGISTRY, configure_logging, get_logger, start_metrics_server
+from rate_control import HostRateControl, OK
+from focus import FocusScorer, depth_of
 
 # --- پیکربندی اولیه ---
 # پوشه‌ای که صفحات دانلود شده در آن ذخیره می‌شوند
 DOWNLOAD_DIR = "downloaded_pages"
 
+# نحوه ذخیره صفحات: "files" (یک فایل .html برای هر صفحه در زیرپوشه دامنه)
+# یا "segments" (رکوردهای فشرده در فایل‌های segment داخل DOWNLOAD_DIR/segments)
+STORAGE_MODE = "files"
+
 # User-Agent برای ارسال با درخواست‌ها
+# Accept-Encoding همه فشرده‌سازی‌هایی است که urllib3 باز می‌کند (gzip و deflate، و br/zstd اگر
+# بسته‌های brotli یا zstandard نصب باشند)
 HEADERS = {
-    'User-Agent': 'SeoranBot/1.0 (+http://sajjadakbari.ir/seoran-bot-info)'
+    'User-Agent': 'SeoranBot/1.0 (+http://sajjadakbari.ir/seoran-bot-info)',
+    'Accept-Encoding': ACCEPT_ENCODING,
 }
 
+# اتصال‌های هر میزبان در یک Session مشترک (برای همه thread ها) باز نگه داشته و دوباره استفاده می‌شوند
+# (keep-alive)، پس برای هر صفحه اتصال TCP/TLS جدیدی ساخته نمی‌شود
+HTTP_POOLING = True
+HTTP_POOL_HOSTS = 100                 # تعداد میزبان‌هایی که اتصال‌هایشان نگه داشته می‌شود
+HTTP_POOL_CONNECTIONS_PER_HOST = 10   # حداکثر اتصال بیکار نگه داشته شده برای هر میزبان
+
+# حداکثر حجم صفحه (پس از باز کردن فشرده‌سازی). بدنه تکه‌تکه خوانده و با عبور از این حد رها می‌شود،
+# حتی اگر سرور Content-Length نفرستاده باشد
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+# بدنه خوانده نشده پاسخ‌های کوچک (304، صفحات خطا) تا این حجم خوانده می‌شود تا اتصال قابل استفاده مجدد بماند
+DRAIN_MAX_BYTES = 64 * 1024
+
 # لیستی از دامنه‌های مجاز برای خزش. اگر خالی باشد، به دامنه URL شروع محدود می‌شود.
 # مثال: ALLOWED_DOMAINS = ["sajjadakbari.ir", "virgool.io"]
 ALLOWED_DOMAINS = [] # در این نسخه، با استفاده از base_domain در تابع crawl_website کنترل می‌کنیم
 
 
-# --- مجموعه‌ها و متغیرهای سراسری برای ردیابی URL ها و وضعیت خزش ---
-urls_to_visit = set()  # URL هایی که باید بازدید شوند (Frontier)
-visited_urls = set()   # URL هایی که قبلا بازدید شده‌اند
-
 # حداکثر تعداد صفحاتی که می‌خواهیم دانلود کنیم (برای تست)
 MAX_PAGES_TO_CRAWL = 10  # می‌توانید این عدد را برای تست‌های بزرگتر افزایش دهید
-pages_crawled_count = 0
 
-# تاخیر بین درخواست‌ها (به ثانیه) برای اینکه به سرور فشار نیاوریم
+# تاخیر اولیه بین درخواست‌ها (به ثانیه) برای اینکه به سرور فشار نیاوریم.
+# این تاخیر به ازای هر میزبان و توسط Frontier اعمال می‌شود و با ADAPTIVE_RATE_CONTROL بر اساس زمان پاسخ،
+# خطاها، 429/503 و Retry-After هر میزبان کم یا زیاد می‌شود (rate_control.py)
 REQUEST_DELAY = 1
+ADAPTIVE_RATE_CONTROL = True
+
+# حداکثر عمق خزش نسبت به URL شروع (None یعنی بدون محدودیت)
+MAX_CRAWL_DEPTH = None
+
+# خزش متمرکز (focus.py): با True، URL ها به جای ترتیب عمق (BFS) بر اساس احتمال رسیدن به سندی که پردازشگر
+# می‌پذیرد (از روی الگوی URL، متن لینک و متن صفحه والد، با یادگیری بازده الگوها در طول خزش) برداشته می‌شوند
+FOCUSED_CRAWL = False
+
+# با True، صفحاتی که متن اصلی‌شان تقریبا تکراری صفحه‌ای است که قبلا دانلود شده (صفحات برچسب، صفحه‌بندی،
+# پارامترهای مختلف URL) ذخیره نمی‌شوند و لینک‌هایشان دنبال نمی‌شود
+SKIP_NEAR_DUPLICATES = False
+
+# سطح لاگ: "DEBUG" همه URL ها، "INFO" صفحات رد شده و خطاهای هر URL، "WARNING" فقط خطاهای پیش‌بینی نشده.
+# آمار همه این موارد در هر حال در metrics ثبت و در گزارش نهایی چاپ می‌شود.
+LOG_LEVEL = "INFO"
+# هر رکورد لاگ یک خط JSON باشد (برای جمع‌آوری لاگ‌ها)
+LOG_JSON = False
+# اگر تعیین شود، metrics در طول خزش روی http://127.0.0.1:<پورت>/metrics (و /metrics.json) در دسترس است
+METRICS_PORT = None
+
+# وضعیت خزش (صف، URL های دیده شده و شمارنده‌ها) هر چند ثانیه در DOWNLOAD_DIR ذخیره می‌شود تا خزش
+# متوقف شده با resume=True از همان جا ادامه پیدا کند (crawl_checkpoint.py)
+CRAWL_CHECKPOINTS = True
+
+
+# --- مجموعه‌ها و متغیرهای سراسری برای ردیابی URL ها و وضعیت خزش ---
+urls_to_visit = Frontier(host_delay=REQUEST_DELAY)  # URL هایی که باید بازدید شوند (Frontier)
+visited_urls = create_seen_store()   # URL هایی که قبلا دیده شده‌اند (بازدید شده یا در صف)
+pages_crawled_count = 0
+page_store_writer = None  # نویسنده مخزن segment ها (در حالت STORAGE_MODE = "segments")
+near_duplicate_index = NearDuplicateIndex()  # اثر انگشت SimHash صفحات دانلود شده
+crawl_checkpoint = None  # لاگ checkpoint خزش جاری (در صورت فعال بودن CRAWL_CHECKPOINTS)
+focus_scorer = None  # امتیازدهی لینک‌ها در خزش متمرکز (در صورت فعال بودن FOCUSED_CRAWL)
+_page_store_lock = threading.Lock()
+_http_session = None
+_http_session_lock = threading.Lock()
+
+# --- سنجش (metrics) و لاگ ---
+logger = get_logger("crawler")
+FETCHES = REGISTRY.counter("crawler_fetches_total", "نتیجه درخواست‌های دانلود صفحه", ("outcome",))
+STAGE_SECONDS = REGISTRY.histogram("crawler_stage_seconds",
+                                   "زمان هر مرحله خزش یک صفحه (connect شامل DNS، اتصال و انتظار تا هدرهای پاسخ است)",
+                                   ("stage",))
+DOWNLOADED_BYTES = REGISTRY.counter("crawler_downloaded_bytes_total", "حجم بدنه صفحات دانلود شده (بایت)")
+TRANSFERRED_BYTES = REGISTRY.counter("crawler_transferred_bytes_total",
+                                     "حجم بدنه صفحات دانلود شده روی شبکه، پیش از باز کردن فشرده‌سازی (بایت)")
+PAGES = REGISTRY.counter("crawler_pages_total", "صفحات بررسی شده در حلقه خزش بر اساس نتیجه", ("result",))
+LINKS_ENQUEUED = REGISTRY.counter("crawler_links_enqueued_total", "لینک‌های جدید اضافه شده به صف")
+FETCH_RETRIES = REGISTRY.counter("crawler_fetch_retries_total",
+                                 "URL هایی که پس از خطای گذرا دوباره به صف برگشتند", ("outcome",))
+RATE_BACKOFFS = REGISTRY.counter("crawler_rate_backoffs_total",
+                                 "عقب‌نشینی‌های کنترل سرعت میزبان‌ها پس از 429، 503 یا Timeout")
 
 
 # --- توابع کمکی ---
@@ -89,78 +175,181 @@ def sanitize_filename(url):
     return filename
 
 
-def fetch_page(url):
+def http_session():
+    """Session مشترک با pool اتصال‌های هر میزبان (یا None اگر HTTP_POOLING غیرفعال باشد)."""
+    global _http_session
+    if not HTTP_POOLING:
+        return None
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_CONNECTIONS_PER_HOST)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _http_session = session
+    return _http_session
+
+
+def close_http_session():
+    """اتصال‌های باز نگه داشته شده را می‌بندد."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+
+
+def _forget_http_session():
+    # پروسس فرزند (مثلا shard های خزنده توزیع شده) نباید از سوکت‌های پروسس والد استفاده کند
+    global _http_session
+    _http_session = None
+
+
+os.register_at_fork(after_in_child=_forget_http_session)
+
+
+def _read_body(response, max_bytes):
+    """
+    بدنه پاسخ را تکه‌تکه (پس از باز کردن فشرده‌سازی) می‌خواند. اگر حجم از max_bytes بگذرد خواندن متوقف
+    می‌شود و None برمی‌گردد (از این رو بمب‌های فشرده‌سازی هم حافظه را پر نمی‌کنند).
+    """
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(DOWNLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > max_bytes:
+            return None
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _release_response(response, body_consumed):
+    """
+    اتصال را به pool برمی‌گرداند. بدنه خوانده نشده پاسخ‌های کوچک خوانده می‌شود تا اتصال قابل استفاده مجدد
+    بماند؛ اتصال پاسخ‌های بزرگ‌تر (یا بدنه‌هایی که نیمه‌کاره رها شده‌اند) بسته می‌شود.
+    """
+    if not body_consumed:
+        content_length = response.headers.get('Content-Length', '')
+        if response.status_code == 304 or (content_length.isdigit() and int(content_length) <= DRAIN_MAX_BYTES):
+            try:
+                response.content
+            except (requests.exceptions.RequestException, RuntimeError):
+                pass
+    response.close()
+
+
+def fetch_page(url, extra_headers=None, response_info=None):
     """
     محتوای HTML یک URL را دانلود می‌کند.
+    extra_headers (مثلا هدرهای درخواست شرطی) به هدرهای پیش‌فرض اضافه می‌شوند.
+    اگر response_info (یک dict) داده شود، کد وضعیت، ETag، Last-Modified و Retry-After پاسخ، زمان انتظار تا
+    هدرهای پاسخ (latency) و در صورت نرسیدن پاسخ نوع خطا ('timeout' یا 'connection_error') در آن قرار می‌گیرد.
     """
     global pages_crawled_count
-    print(f"درحال تلاش برای دانلود: {url}")
+    logger.debug("درحال تلاش برای دانلود: %s", url)
+    request_headers = dict(HEADERS, **extra_headers) if extra_headers else HEADERS
+    session = http_session()
+    response = None
+    body_consumed = False
     try:
         # استفاده از stream=True و بررسی اولیه هدرها برای فایل‌های بزرگ یا غیر HTML
-        response = requests.get(url, headers=HEADERS, timeout=20, stream=True, allow_redirects=True)
+        # (requests زمان DNS و اتصال را جدا گزارش نمی‌کند؛ مرحله connect تا دریافت هدرها (TTFB) را می‌سنجد
+        # و با استفاده مجدد از اتصال‌ها فقط زمان انتظار برای پاسخ را شامل می‌شود)
+        started = time.monotonic()
+        with STAGE_SECONDS.time(("connect",)):
+            response = (session or requests).get(url, headers=request_headers, timeout=20, stream=True,
+                                                 allow_redirects=True)
+        if response_info is not None:
+            response_info['latency'] = time.monotonic() - started
+            response_info['status_code'] = response.status_code
+            response_info['etag'] = response.headers.get('ETag')
+            response_info['last_modified'] = response.headers.get('Last-Modified')
+            response_info['retry_after'] = response.headers.get('Retry-After')
+            response_info['headers'] = dict(response.headers)
+        if response.status_code == 304:
+            FETCHES.inc(labels=("not_modified",))
+            logger.debug("صفحه %s از آخرین دریافت تغییری نکرده است (304).", url)
+            return None
         response.raise_for_status()
 
         content_type = response.headers.get('Content-Type', '').lower()
         if 'text/html' not in content_type:
-            print(f"محتوای غیر HTML در {url} (نوع: {content_type}). رد می‌شود.")
-            response.close() # بستن اتصال در صورت عدم نیاز به محتوا
+            FETCHES.inc(labels=("not_html",))
+            logger.info("محتوای غیر HTML در %s (نوع: %s). رد می‌شود.", url, content_type)
             return None
 
         # خواندن محتوا (مهم: بعد از stream=True، محتوا باید خوانده شود)
-        # برای جلوگیری از دانلود فایل‌های بسیار بزرگ، می‌توان یک محدودیت حجم در نظر گرفت
-        content_length = response.headers.get('Content-Length')
-        if content_length and int(content_length) > 5 * 1024 * 1024: # 5MB limit
-            print(f"صفحه {url} بیش از حد بزرگ است ({content_length} بایت). رد می‌شود.")
-            response.close()
+        # اگر Content-Length اعلام شده باشد، صفحات بزرگ پیش از دانلود رد می‌شوند
+        content_length = response.headers.get('Content-Length', '')
+        if content_length.isdigit() and int(content_length) > MAX_PAGE_BYTES:
+            FETCHES.inc(labels=("too_large",))
+            logger.info("صفحه %s بیش از حد بزرگ است (%s بایت). رد می‌شود.", url, content_length)
             return None
 
-        html_text = response.text # این خط محتوای کامل را می‌خواند
-
-        # تشخیص انکودینگ
-        if response.encoding is None or 'iso-8859-1' in response.encoding.lower() or 'windows-1256' in response.encoding.lower():
-            # اگر تشخیص اولیه خوب نبود یا انکودینگ عربی/غربی بود، utf-8 را امتحان می‌کنیم
-            # BeautifulSoup می‌تواند در تشخیص انکودینگ بهتر عمل کند
-            soup_for_encoding = BeautifulSoup(response.content, 'lxml') # استفاده از response.content (بایت‌ها)
-            if soup_for_encoding.original_encoding:
-                 response.encoding = soup_for_encoding.original_encoding
-            else: # اگر باز هم تشخیص نداد، به UTF-8 بازمیگردیم
-                 response.encoding = 'utf-8'
-            try:
-                html_text = response.content.decode(response.encoding, errors='replace')
-            except Exception as e:
-                print(f"خطا در دیکود کردن محتوا با انکودینگ {response.encoding} برای {url}: {e}")
-                html_text = response.content.decode('utf-8', errors='replace') # بازگشت به utf-8 با جایگزینی خطاها
-
-        print(f"صفحه {url} با موفقیت دانلود شد.")
+        with STAGE_SECONDS.time(("download",)):
+            body = _read_body(response, MAX_PAGE_BYTES)
+        if body is None:
+            FETCHES.inc(labels=("too_large",))
+            logger.info("صفحه %s بیش از حد بزرگ است (بیش از %d بایت). رد می‌شود.", url, MAX_PAGE_BYTES)
+            return None
+        body_consumed = True
+        DOWNLOADED_BYTES.inc(len(body))
+        TRANSFERRED_BYTES.inc(response.raw.tell())
+
+        # تشخیص انکودینگ و دیکود (فقط یک بار و بدون ساختن DOM)
+        # اگر انکودینگ هدر وجود نداشت یا غربی/عربی بود، انکودینگ از روی خود محتوا تشخیص داده می‌شود
+        with STAGE_SECONDS.time(("decode",)):
+            html_text, encoding = decode_html(body, response.encoding)
+        if response_info is not None:
+            response_info['encoding'] = encoding
+
+        FETCHES.inc(labels=("ok",))
+        logger.debug("صفحه %s با موفقیت دانلود شد.", url)
         pages_crawled_count += 1
         return html_text
         
     except requests.exceptions.HTTPError as e:
-        print(f"خطای HTTP {e.response.status_code} هنگام دانلود {url}: {e.response.reason}")
-        if e.response.status_code == 404:
-            print(f"صفحه {url} یافت نشد (404).")
-        elif e.response.status_code == 403:
-            print(f"دسترسی به {url} ممنوع است (403).")
-        # می‌توانیم خطاهای دیگر مانند 401, 400, 5xx را نیز جداگانه بررسی کنیم
+        status_code = e.response.status_code
+        FETCHES.inc(labels=(f"http_{status_code}",))
+        if status_code == 404:
+            logger.info("صفحه %s یافت نشد (404).", url)
+        elif status_code == 403:
+            logger.info("دسترسی به %s ممنوع است (403).", url)
+        elif status_code in (429, 503):
+            logger.info("سرور درخواست %s را نپذیرفت (%s، Retry-After: %s).", url, status_code,
+                        e.response.headers.get('Retry-After'))
+        else:
+            # می‌توانیم خطاهای دیگر مانند 401, 400, 5xx را نیز جداگانه بررسی کنیم
+            logger.info("خطای HTTP %s هنگام دانلود %s: %s", status_code, url, e.response.reason)
         return None
     except requests.exceptions.Timeout:
-        print(f"زمان انتظار برای {url} تمام شد (Timeout).")
+        FETCHES.inc(labels=("timeout",))
+        if response_info is not None:
+            response_info['error'] = 'timeout'
+        logger.info("زمان انتظار برای %s تمام شد (Timeout).", url)
         return None
     except requests.exceptions.ConnectionError:
-        print(f"خطا در برقراری اتصال با {url} (ConnectionError).")
+        FETCHES.inc(labels=("connection_error",))
+        if response_info is not None:
+            response_info['error'] = 'connection_error'
+        logger.info("خطا در برقراری اتصال با %s (ConnectionError).", url)
         return None
     except requests.exceptions.TooManyRedirects:
-        print(f"تعداد تغییر مسیرها برای {url} بیش از حد مجاز بود (TooManyRedirects).")
+        FETCHES.inc(labels=("too_many_redirects",))
+        logger.info("تعداد تغییر مسیرها برای %s بیش از حد مجاز بود (TooManyRedirects).", url)
         return None
     except requests.exceptions.RequestException as e:
-        print(f"خطای کلی درخواست در دانلود {url}: {e}")
+        FETCHES.inc(labels=("request_error",))
+        logger.info("خطای کلی درخواست در دانلود %s: %s", url, e)
         return None
     except Exception as e:
-        print(f"یک خطای پیش‌بینی نشده در هنگام دانلود {url}: {e}")
+        FETCHES.inc(labels=("error",))
+        logger.warning("یک خطای پیش‌بینی نشده در هنگام دانلود %s: %s", url, e)
         return None
     finally:
-        if 'response' in locals() and response: # اطمینان از بسته شدن اتصال
-            response.close()
+        if response is not None: # برگرداندن اتصال به pool یا بستن آن
+            _release_response(response, body_consumed)
 
 
 def save_page(url, content, directory):
@@ -173,9 +362,9 @@ def save_page(url, content, directory):
     if not os.path.exists(directory):
         try:
             os.makedirs(directory, exist_ok=True) # exist_ok=True از خطا در صورت وجود پوشه جلوگیری می‌کند
-            print(f"پوشه {directory} ایجاد شد یا از قبل وجود داشت.")
+            logger.debug("پوشه %s ایجاد شد یا از قبل وجود داشت.", directory)
         except OSError as e:
-            print(f"خطا در ایجاد پوشه {directory}: {e}")
+            logger.warning("خطا در ایجاد پوشه %s: %s", directory, e)
             return
 
     filename = sanitize_filename(url)
@@ -184,11 +373,47 @@ def save_page(url, content, directory):
     try:
         with open(filepath, 'w', encoding='utf-8', errors='replace') as f:
             f.write(content)
-        print(f"صفحه {url} در {filepath} ذخیره شد.")
+        logger.debug("صفحه %s در %s ذخیره شد.", url, filepath)
     except IOError as e:
-        print(f"خطا در ذخیره فایل {filepath}: {e}")
+        logger.warning("خطا در ذخیره فایل %s: %s", filepath, e)
     except Exception as e:
-        print(f"یک خطای پیش‌بینی نشده در هنگام ذخیره {filepath}: {e}")
+        logger.warning("یک خطای پیش‌بینی نشده در هنگام ذخیره %s: %s", filepath, e)
+
+
+def store_page(url, content, headers=None, extracted_text=None):
+    """
+    صفحه را بر اساس STORAGE_MODE ذخیره می‌کند: فایل جداگانه در زیرپوشه دامنه،
+    یا یک رکورد (همراه با هدرهای پاسخ و متن اصلی استخراج شده، در صورت وجود) در مخزن segment ها.
+    """
+    if not content:
+        return
+    with STAGE_SECONDS.time(("save",)):
+        _store_page(url, content, headers, extracted_text)
+
+
+def _store_page(url, content, headers, extracted_text):
+    global page_store_writer
+    if STORAGE_MODE == "segments":
+        with _page_store_lock:
+            if page_store_writer is None:
+                page_store_writer = PageStoreWriter(os.path.join(DOWNLOAD_DIR, SEGMENTS_DIRNAME))
+        try:
+            page_store_writer.append(url, content, headers, extracted_text=extracted_text)
+        except (IOError, OSError) as e:
+            logger.warning("خطا در ذخیره صفحه %s در مخزن segment ها: %s", url, e)
+        return
+
+    page_sub_dir = urlparse(url).netloc.replace('.', '_') # ایجاد زیرپوشه برای هر دامنه
+    save_page(url, content, os.path.join(DOWNLOAD_DIR, page_sub_dir))
+
+
+def close_page_store():
+    """فایل‌های segment باز را می‌بندد (در پایان خزش)."""
+    global page_store_writer
+    with _page_store_lock:
+        if page_store_writer is not None:
+            page_store_writer.close()
+            page_store_writer = None
 
 
 def extract_links(html_content, base_url):
@@ -196,67 +421,215 @@ def extract_links(html_content, base_url):
     تمام لینک‌های معتبر را از محتوای HTML استخراج می‌کند.
     لینک‌ها را به URL های کامل تبدیل می‌کند و بر اساس دامنه فیلتر می‌کند.
     """
-    links = set()
-    if not html_content:
-        return links
-        
-    soup = BeautifulSoup(html_content, 'lxml') # استفاده از lxml برای سرعت بیشتر
-    
-    base_domain = urlparse(base_url).netloc
+    return extract_links_from_html(html_content, base_url, ALLOWED_DOMAINS)
 
-    for anchor_tag in soup.find_all('a', href=True):
-        href = anchor_tag['href'].strip()
-        
-        href = href.split('#')[0] # حذف fragment identifiers
 
-        # نادیده گرفتن لینک‌های خاص
-        if not href or href.startswith(('mailto:', 'tel:', 'javascript:', 'ftp:')) or href.endswith(('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.zip', '.rar', '.exe', '.mp3', '.mp4', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx')):
-            continue
+def link_priorities(links, depth, anchor_texts=None, parent=None):
+    """
+    اولویت صف لینک‌های با عمق depth: بدون خزش متمرکز همان عمق، وگرنه امتیاز focus_scorer (با متن لینک‌ها
+    و نشانه‌های صفحه والد). دیکشنری اولویت -> لینک‌ها برمی‌گرداند.
+    """
+    if focus_scorer is None:
+        return {depth: list(links)} if links else {}
+    groups = {}
+    for link in links:
+        anchor_text = anchor_texts.get(link) if anchor_texts else None
+        groups.setdefault(focus_scorer.priority(link, depth, anchor_text, parent), []).append(link)
+    return groups
 
-        try:
-            absolute_url = urljoin(base_url, href)
-        except ValueError: # در صورت بروز مشکل در urljoin (مثلا href خیلی نامعتبر باشد)
-            # print(f"خطا در ساخت URL مطلق از: '{href}' با base_url: '{base_url}'")
-            continue
-        
-        # اعتبارسنجی اولیه URL
-        if not validators.url(absolute_url):
-            # print(f"لینک نامعتبر (ساختاری) یافت شد و رد شد: {absolute_url} (از href: '{href}')")
-            continue
 
-        parsed_absolute_url = urlparse(absolute_url)
-        
-        # فقط پروتکل‌های http و https
-        if parsed_absolute_url.scheme not in ['http', 'https']:
-            # print(f"پروتکل نامعتبر در لینک: {absolute_url}")
-            continue
-            
-        # کنترل دامنه
-        if ALLOWED_DOMAINS: # اگر لیست دامنه‌های مجاز پر است
-            if parsed_absolute_url.netloc not in ALLOWED_DOMAINS:
-                # print(f"لینک به دامنه خارجی {parsed_absolute_url.netloc} (خارج از لیست مجاز) رد شد: {absolute_url}")
-                continue
-        else: # اگر لیست دامنه‌های مجاز خالی است، فقط به دامنه سایت مبدا محدود شو
-            if parsed_absolute_url.netloc != base_domain:
-                # print(f"لینک به دامنه خارجی {parsed_absolute_url.netloc} (دامنه مبدا: {base_domain}) رد شد: {absolute_url}")
-                continue
-        
-        links.add(absolute_url)
-            
-    return links
+def enqueue_links(links, depth, initial_domain, anchor_texts=None, parent=None):
+    """
+    لینک‌های مجاز و دیده نشده را با عمق depth (و در خزش متمرکز امتیازشان) به صف اضافه می‌کند و تعداد آنها را
+    برمی‌گرداند.
+    """
+    # بررسی مجدد دامنه برای لینک‌های جدید قبل از افزودن به صف (با مجموعه/پسوند، نه جستجو در لیست)
+    allowed = domain_matcher(ALLOWED_DOMAINS if ALLOWED_DOMAINS else [initial_domain])
+    candidate_links = [link for link in links if urlparse(link).netloc in allowed]
+
+    # بررسی دسته‌ای همه لینک‌های صفحه در مخزن URL های دیده شده
+    unseen_links = visited_urls.add_many(candidate_links)
+    for priority, group in link_priorities(unseen_links, depth, anchor_texts, parent).items():
+        for link in group:
+            urls_to_visit.push(link, priority=priority)
+        if crawl_checkpoint is not None:
+            crawl_checkpoint.pushed_many(group, priority)
+    LINKS_ENQUEUED.inc(len(unseen_links))
+    return len(unseen_links)
+
+
+def create_rate_control(host_delay, adaptive=True):
+    """کنترل سرعت میزبان‌ها؛ بدون adaptive تاخیر هر میزبان ثابت می‌ماند ولی تلاش دوباره و Retry-After برقرارند."""
+    if adaptive:
+        return HostRateControl(initial_delay=host_delay)
+    return HostRateControl(initial_delay=host_delay, min_delay=host_delay, max_delay=host_delay)
+
+
+def record_fetch_result(frontier, rate_control, url, priority, response_info):
+    """
+    نتیجه درخواست url را به کنترل سرعت میزبانش می‌دهد و تاخیر (و در صورت عقب‌نشینی، مکث) میزبان را در
+    frontier اعمال می‌کند. اگر درخواست با خطای گذرا شکست خورده و هنوز تلاش مجاز دارد، URL را با همان اولویت
+    دوباره به صف برمی‌گرداند و True برمی‌گرداند.
+    """
+    host = urlparse(url).netloc
+    outcome, delay, pause_until = rate_control.observe(host, response_info)
+    frontier.set_host_delay(host, delay)
+    if pause_until is not None:
+        RATE_BACKOFFS.inc()
+        frontier.defer_host(host, pause_until)
+        logger.info("میزبان %s تا %.1f ثانیه درخواستی نمی‌گیرد (تاخیر جدید: %.2f ثانیه).", host,
+                    pause_until - time.monotonic(), delay)
+    if outcome == OK:
+        rate_control.forget(url)
+        return False
+    if not rate_control.retry(url):
+        FETCH_RETRIES.inc(labels=("gave_up",))
+        logger.info("دانلود %s پس از %d تلاش دوباره انجام نشد. رد می‌شود.", url, rate_control.max_retries)
+        return False
+    FETCH_RETRIES.inc(labels=("requeued",))
+    frontier.push(url, priority=priority)
+    if crawl_checkpoint is not None:
+        crawl_checkpoint.pushed(url, priority)
+    return True
+
+
+def analyze_fetched_page(html_content, url):
+    """تحلیل یک‌باره صفحه دانلود شده (لینک‌ها و متن اصلی) با ثبت زمان مرحله parse."""
+    with STAGE_SECONDS.time(("parse",)):
+        return analyze_page(html_content, url, ALLOWED_DOMAINS, with_anchor_texts=focus_scorer is not None)
+
+
+def find_near_duplicate(url, html_content, main_text):
+    """
+    اگر متن اصلی صفحه تقریبا تکراری صفحه‌ای باشد که قبلا دانلود شده، URL آن صفحه را برمی‌گرداند
+    (و صفحه در آمار تکراری‌ها ثبت می‌شود)، وگرنه صفحه را در ایندکس تکراری‌ها ثبت می‌کند و None برمی‌گرداند.
+    """
+    if not SKIP_NEAR_DUPLICATES:
+        return None
+    fingerprint = text_fingerprint(main_text)
+    original_url = near_duplicate_index.add(url, fingerprint, len(html_content.encode('utf-8')))
+    if original_url is None and crawl_checkpoint is not None:
+        crawl_checkpoint.kept(url, fingerprint)
+    return original_url
+
+
+def start_instrumentation():
+    """
+    در شروع هر خزش: تنظیم لاگ، صفر کردن metrics خزنده و (اگر METRICS_PORT تعیین شده باشد)
+    راه‌اندازی سرور metrics. سرور (یا None) را برمی‌گرداند.
+    """
+    configure_logging(LOG_LEVEL, LOG_JSON)
+    REGISTRY.reset("crawler_")
+    if METRICS_PORT is None:
+        return None
+    server = start_metrics_server(METRICS_PORT)
+    print(f"metrics خزنده در http://127.0.0.1:{server.server_address[1]}/metrics در دسترس است.")
+    return server
+
+
+def finish_instrumentation(metrics_server):
+    """گزارش خلاصه metrics (نتیجه درخواست‌ها و زمان مراحل) و توقف سرور metrics."""
+    print("آمار مراحل خزش:")
+    for line in REGISTRY.summary_lines("crawler_"):
+        print(f"  {line}")
+    if metrics_server is not None:
+        metrics_server.shutdown()
+        metrics_server.server_close()
+
+
+def start_checkpoint(start_url, resume, frontier, seen_store):
+    """
+    در شروع هر خزش: باز کردن لاگ checkpoint (اگر CRAWL_CHECKPOINTS فعال باشد) و در صورت ادامه خزش
+    قبلی، بازسازی صف، URL های دیده شده و ایندکس تکراری‌ها. (checkpoint یا None، شمارنده‌های ذخیره شده)
+    را برمی‌گرداند.
+    """
+    global crawl_checkpoint
+    crawl_checkpoint = open_checkpoint(DOWNLOAD_DIR, start_url, resume) if CRAWL_CHECKPOINTS else None
+    if crawl_checkpoint is None or not crawl_checkpoint.resumed:
+        if resume:
+            print("checkpoint قابل استفاده‌ای پیدا نشد؛ خزش از ابتدا شروع می‌شود.")
+        return crawl_checkpoint, {}
+    counters = crawl_checkpoint.restore(frontier, seen_store, near_duplicate_index)
+    near_duplicate_index.duplicate_count = counters.get('near_duplicates', 0)
+    near_duplicate_index.bytes_saved = counters.get('near_duplicate_bytes_saved', 0)
+    print(f"ادامه خزش از checkpoint: {counters.get('pages_crawled_count', 0)} صفحه دانلود شده، "
+          f"{len(frontier)} URL در صف، {len(seen_store)} URL دیده شده.")
+    return crawl_checkpoint, counters
+
+
+def finish_checkpoint(counters):
+    """checkpoint نهایی و بستن لاگ checkpoint خزش جاری."""
+    global crawl_checkpoint
+    if crawl_checkpoint is None:
+        return
+    checkpoint = crawl_checkpoint
+    crawl_checkpoint = None
+    checkpoint.close(counters)
+    print(f"checkpoint ها: {checkpoint.checkpoint_count} بار در {checkpoint.path} "
+          f"(مجموع {checkpoint.checkpoint_seconds * 1000:.1f} میلی‌ثانیه)")
+
+
+def near_duplicate_counters():
+    return {'near_duplicates': near_duplicate_index.duplicate_count,
+            'near_duplicate_bytes_saved': near_duplicate_index.bytes_saved}
+
+
+def start_focus(focused):
+    """در شروع هر خزش: امتیازدهی لینک‌ها برای خزش متمرکز (یا None)."""
+    global focus_scorer
+    focus_scorer = FocusScorer() if focused else None
+    return focus_scorer
+
+
+def url_depth(priority):
+    """عمق URL از اولویت آن در Frontier: بدون خزش متمرکز اولویت خود عمق است."""
+    return int(priority) if focus_scorer is None else depth_of(priority)
+
+
+def observe_page(url, main_text, duplicate=False):
+    """ثبت نتیجه یک صفحه دانلود شده در خزش متمرکز؛ نشانه‌های صفحه برای لینک‌هایش (یا None)."""
+    if focus_scorer is None:
+        return None
+    return focus_scorer.observe(url, main_text, duplicate)
+
+
+def report_focus():
+    if focus_scorer is not None and focus_scorer.fetched:
+        print(f"خزش متمرکز: {focus_scorer.accepted} صفحه از {focus_scorer.fetched} صفحه دانلود شده مفید بود "
+              f"({focus_scorer.accepted * 1000 / focus_scorer.fetched:.0f} در هر 1000 دانلود)")
+
+
+def report_near_duplicates():
+    if near_duplicate_index.duplicate_count:
+        print(f"تعداد صفحات تقریبا تکراری (ذخیره و لینک‌یابی نشده): {near_duplicate_index.duplicate_count} "
+              f"در {near_duplicate_index.cluster_count} خوشه ({near_duplicate_index.bytes_saved} بایت صرفه‌جویی)")
 
 
 # --- تابع اصلی خزنده ---
-def crawl_website(start_url, max_pages=MAX_PAGES_TO_CRAWL, allowed_domains_list=None):
+def crawl_website(start_url, max_pages=MAX_PAGES_TO_CRAWL, allowed_domains_list=None, max_depth=MAX_CRAWL_DEPTH,
+                  incremental=False, resume=False):
     """
     تابع اصلی برای شروع خزش از یک URL.
+    URL ها به ترتیب عمق (BFS)، یا با FOCUSED_CRAWL به ترتیب امتیاز محتوایی، و با رعایت تاخیر هر میزبان از
+    Frontier برداشته می‌شوند.
+
+    در حالت incremental، صفحاتی که زمان خزش مجددشان نرسیده دانلود نمی‌شوند، بقیه با درخواست شرطی
+    دریافت می‌شوند و صفحات بدون تغییر (304 یا هش یکسان) دوباره ذخیره و لینک‌یابی نمی‌شوند؛
+    در این موارد لینک‌های ذخیره شده از خزش قبلی دنبال می‌شوند.
+
+    با resume=True، اگر checkpoint خزشی با همین start_url در DOWNLOAD_DIR باشد، خزش با صف، URL های
+    دیده شده و شمارنده‌های آن ادامه پیدا می‌کند (max_pages شامل صفحات دانلود شده قبلی هم هست).
     """
-    global pages_crawled_count, urls_to_visit, visited_urls, ALLOWED_DOMAINS
+    global pages_crawled_count, urls_to_visit, visited_urls, near_duplicate_index, ALLOWED_DOMAINS
 
     # بازنشانی متغیرهای سراسری برای هر اجرای crawl_website (اگر به صورت ماژول استفاده شود)
     pages_crawled_count = 0
-    urls_to_visit = set()
-    visited_urls = set()
+    urls_to_visit.close()
+    urls_to_visit = Frontier(host_delay=REQUEST_DELAY)
+    rate_control = create_rate_control(REQUEST_DELAY, ADAPTIVE_RATE_CONTROL)
+    visited_urls = create_seen_store()
+    near_duplicate_index = NearDuplicateIndex()
+    start_focus(FOCUSED_CRAWL)
 
     if allowed_domains_list is not None:
         ALLOWED_DOMAINS = allowed_domains_list
@@ -266,6 +639,7 @@ def crawl_website(start_url, max_pages=MAX_PAGES_TO_CRAWL, allowed_domains_list=
         print(f"URL شروع نامعتبر است: {start_url}")
         return
 
+    start_url = canonicalize_url(start_url)
     initial_domain = urlparse(start_url).netloc
     if not ALLOWED_DOMAINS and initial_domain:
         print(f"محدود کردن خزش به دامنه اولیه: {initial_domain}")
@@ -274,72 +648,140 @@ def crawl_website(start_url, max_pages=MAX_PAGES_TO_CRAWL, allowed_domains_list=
         print("خطا: دامنه URL شروع قابل تشخیص نیست. لطفاً URL معتبر وارد کنید.")
         return
 
+    recrawl_state = None
+    if incremental:
+        os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+        recrawl_state = RecrawlState(os.path.join(DOWNLOAD_DIR, RECRAWL_STATE_FILENAME))
+    pages_not_modified = 0
+    pages_not_due = 0
+
+    checkpoint, restored = start_checkpoint(start_url, resume, urls_to_visit, visited_urls)
+    if checkpoint is not None and checkpoint.resumed:
+        pages_crawled_count = restored.get('pages_crawled_count', 0)
+        pages_not_modified = restored.get('pages_not_modified', 0)
+        pages_not_due = restored.get('pages_not_due', 0)
+    else:
+        urls_to_visit.push(start_url, priority=0)
+        visited_urls.add(start_url)
+        if checkpoint is not None:
+            checkpoint.pushed(start_url, 0)
 
-    urls_to_visit.add(start_url)
+    def checkpoint_counters():
+        return dict(near_duplicate_counters(), pages_crawled_count=pages_crawled_count,
+                    pages_not_modified=pages_not_modified, pages_not_due=pages_not_due)
 
     print(f"شروع خزش از: {start_url}")
     print(f"حداکثر صفحات برای خزش: {max_pages}")
     print(f"دامنه‌های مجاز: {ALLOWED_DOMAINS if ALLOWED_DOMAINS else 'فقط دامنه شروع'}")
-    print(f"تاخیر بین درخواست‌ها: {REQUEST_DELAY} ثانیه")
+    if ADAPTIVE_RATE_CONTROL:
+        print(f"تاخیر بین درخواست‌ها (برای هر میزبان، تطبیقی): {REQUEST_DELAY} ثانیه در شروع، "
+              f"بین {rate_control.min_delay} و {rate_control.max_delay} ثانیه")
+    else:
+        print(f"تاخیر بین درخواست‌ها (برای هر میزبان): {REQUEST_DELAY} ثانیه")
+    if incremental:
+        print("حالت خزش افزایشی فعال است.")
+    if FOCUSED_CRAWL:
+        print("خزش متمرکز فعال است (ترتیب URL ها بر اساس امتیاز محتوایی).")
     print("---")
+    metrics_server = start_instrumentation()
 
     while urls_to_visit and pages_crawled_count < max_pages:
-        # انتخاب URL از صف. برای کنترل بیشتر می‌توان از صف اولویت‌دار یا deque استفاده کرد.
-        # set.pop() یک عنصر را به صورت غیر قطعی برمی‌دارد.
-        current_url = urls_to_visit.pop()
-
-        if current_url in visited_urls:
+        if checkpoint is not None and checkpoint.due():
+            checkpoint.save(checkpoint_counters())
+        # انتخاب کم‌عمق‌ترین URL از میزبانی که زمان مجاز درخواست بعدی‌اش رسیده است
+        entry = urls_to_visit.pop()
+        if entry is None:
+            # هیچ میزبانی هنوز آماده نیست؛ تا آماده شدن نزدیک‌ترین میزبان صبر می‌کنیم
+            time.sleep(max(0.0, urls_to_visit.next_ready_time() - time.monotonic()))
             continue
+        current_url, priority = entry
+        depth = url_depth(priority)
+        if checkpoint is not None:
+            # checkpoint فقط بین دو URL نوشته می‌شود، پس این رویداد پیش از پایان کار این URL ذخیره نمی‌شود
+            checkpoint.done(current_url)
 
-        print(f"\n({pages_crawled_count + 1}/{max_pages}) درحال پردازش: {current_url}")
-        visited_urls.add(current_url)
+        logger.debug("(%d/%d) درحال پردازش (عمق %d): %s", pages_crawled_count + 1, max_pages, depth, current_url)
 
         # بررسی مجدد دامنه قبل از دانلود (احتیاط بیشتر)
         parsed_current_url = urlparse(current_url)
         current_domain = parsed_current_url.netloc
         
-        if ALLOWED_DOMAINS and current_domain not in ALLOWED_DOMAINS:
-            print(f"دامنه {current_domain} خارج از لیست مجاز است. رد می‌شود: {current_url}")
+        if ALLOWED_DOMAINS and current_domain not in domain_matcher(ALLOWED_DOMAINS):
+            logger.debug("دامنه %s خارج از لیست مجاز است. رد می‌شود: %s", current_domain, current_url)
             continue
         # این شرط اضافه شد تا اگر ALLOWED_DOMAINS در طول اجرا تغییر کرد (نباید بکند ولی برای اطمینان)
         # یا اگر در ابتدا خالی بود و بعد بر اساس initial_domain پر شد، درست عمل کند.
         elif not ALLOWED_DOMAINS and initial_domain and current_domain != initial_domain:
-             print(f"دامنه {current_domain} خارج از دامنه اولیه ({initial_domain}) است. رد می‌شود: {current_url}")
+             logger.debug("دامنه %s خارج از دامنه اولیه (%s) است. رد می‌شود: %s", current_domain, initial_domain,
+                          current_url)
              continue
 
+        # فقط اگر هنوز جا برای خزش داریم و از حداکثر عمق عبور نکرده‌ایم لینک‌ها را دنبال کن
+        can_expand = max_depth is None or depth < max_depth
+
+        record = recrawl_state.get(current_url) if recrawl_state else None
+        if record is not None and not RecrawlState.is_due(record):
+            logger.debug("زمان خزش مجدد %s هنوز نرسیده است. از لینک‌های ذخیره شده استفاده می‌شود.", current_url)
+            PAGES.inc(labels=("not_due",))
+            pages_not_due += 1
+            if can_expand:
+                enqueue_links(record['links'], depth + 1, initial_domain)
+            continue
+
+        response_info = {}
+        html_content = fetch_page(current_url, RecrawlState.conditional_headers(record), response_info)
+        if record_fetch_result(urls_to_visit, rate_control, current_url, priority, response_info):
+            continue
 
-        html_content = fetch_page(current_url)
+        if record is not None and (response_info.get('status_code') == 304 or
+                                   (html_content and content_hash(html_content) == record['body_hash'])):
+            # صفحه تغییری نکرده: نه ذخیره مجدد، نه استخراج دوباره لینک‌ها
+            recrawl_state.record_unchanged(current_url, record, response_info.get('etag'),
+                                           response_info.get('last_modified'))
+            recrawl_state.commit()
+            PAGES.inc(labels=("not_modified",))
+            pages_not_modified += 1
+            if can_expand:
+                enqueue_links(record['links'], depth + 1, initial_domain)
+            continue
 
         if html_content:
-            # ذخیره سازی صفحه
-            page_sub_dir = current_domain.replace('.', '_') # ایجاد زیرپوشه برای هر دامنه
-            full_download_path = os.path.join(DOWNLOAD_DIR, page_sub_dir)
-            save_page(current_url, html_content, full_download_path)
-            
-            # استخراج لینک‌های جدید
-            if pages_crawled_count < max_pages: # فقط اگر هنوز جا برای خزش داریم لینک استخراج کن
-                new_links = extract_links(html_content, current_url)
-                # print(f"{len(new_links)} لینک در {current_url} یافت شد.")
-                
-                added_to_queue_count = 0
-                for link in new_links:
-                    if link not in visited_urls and link not in urls_to_visit:
-                        # بررسی مجدد دامنه برای لینک‌های جدید قبل از افزودن به صف
-                        parsed_link_domain = urlparse(link).netloc
-                        if ALLOWED_DOMAINS and parsed_link_domain in ALLOWED_DOMAINS:
-                            urls_to_visit.add(link)
-                            added_to_queue_count +=1
-                        elif not ALLOWED_DOMAINS and initial_domain and parsed_link_domain == initial_domain:
-                            urls_to_visit.add(link)
-                            added_to_queue_count +=1
-                        # else:
-                            # print(f"لینک {link} به دلیل عدم تطابق دامنه به صف اضافه نشد.")
-                if added_to_queue_count > 0:
-                    print(f"{added_to_queue_count} لینک جدید به صف اضافه شد.")
-        
-        # معرفی تاخیر
-        # print(f"تاخیر {REQUEST_DELAY} ثانیه‌ای...") # این خط را می‌توانید حذف کنید تا خروجی تمیزتر باشد
-        time.sleep(REQUEST_DELAY)
+            # تحلیل یک‌باره صفحه: لینک‌ها و متن اصلی از یک DOM
+            analysis = analyze_fetched_page(html_content, current_url)
+            new_links = analysis.links
+            # print(f"{len(new_links)} لینک در {current_url} یافت شد.")
+
+            original_url = find_near_duplicate(current_url, html_content, analysis.main_text)
+            page_signals = observe_page(current_url, analysis.main_text, duplicate=original_url is not None)
+            if original_url is not None:
+                logger.info("صفحه %s تقریبا تکراری %s است. ذخیره و لینک‌یابی نمی‌شود.", current_url, original_url)
+                PAGES.inc(labels=("near_duplicate",))
+                if recrawl_state:
+                    recrawl_state.record_changed(current_url, record, response_info.get('etag'),
+                                                 response_info.get('last_modified'), content_hash(html_content), [])
+                    recrawl_state.commit()
+                continue
+
+            # ذخیره سازی صفحه (در مخزن segment ها متن اصلی هم ذخیره می‌شود تا پردازشگر دوباره پارس نکند)
+            store_page(current_url, html_content, response_info.get('headers'), analysis.main_text)
+            PAGES.inc(labels=("stored",))
+
+            if pages_crawled_count < max_pages and can_expand:
+                added_to_queue_count = enqueue_links(new_links, depth + 1, initial_domain, analysis.anchor_texts,
+                                                     page_signals)
+                logger.debug("%d لینک جدید به صف اضافه شد.", added_to_queue_count)
+
+            if recrawl_state:
+                recrawl_state.record_changed(current_url, record, response_info.get('etag'),
+                                             response_info.get('last_modified'), content_hash(html_content),
+                                             sorted(new_links))
+                recrawl_state.commit()
+
+    if recrawl_state:
+        recrawl_state.close()
+    close_page_store()
+    close_http_session()
+    finish_checkpoint(checkpoint_counters())
 
     print("\n--- گزارش نهایی خزش ---")
     if pages_crawled_count >= max_pages:
@@ -348,8 +790,14 @@ def crawl_website(start_url, max_pages=MAX_PAGES_TO_CRAWL, allowed_domains_list=
         print("دیگر لینکی برای بازدید در صف (در دامنه‌های مجاز) وجود ندارد.")
     
     print(f"تعداد کل صفحات دانلود شده: {pages_crawled_count}")
-    print(f"تعداد کل URL های منحصربفرد بازدید شده: {len(visited_urls)}")
+    print(f"تعداد کل URL های منحصربفرد دیده شده: {len(visited_urls)}")
     print(f"تعداد URL های باقیمانده در صف: {len(urls_to_visit)}")
+    if incremental:
+        print(f"تعداد صفحات بدون تغییر (304 یا هش یکسان): {pages_not_modified}")
+        print(f"تعداد صفحاتی که زمان خزش مجددشان نرسیده بود: {pages_not_due}")
+    report_near_duplicates()
+    report_focus()
+    finish_instrumentation(metrics_server)
     print("--- خزش به پایان رسید ---")
 
 # --- اجرای برنامه ---
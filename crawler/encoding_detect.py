@@ -0,0 +1,140 @@
+# seoran/crawler/encoding_detect.py
+# سطح: تشخیص سریع انکودینگ صفحات HTML فقط از روی بایت‌ها (بدون پارس DOM)، مشترک بین خزنده و پردازشگر.
+#
+# ترتیب تشخیص:
+#   1. BOM (قطعی)
+#   2. charset هدر HTTP، اگر قابل اعتماد باشد (ISO-8859-1 پیش‌فرض requests و windows-1256 نیستند)
+#   3. اگر بایت غیر ASCII دارد و UTF-8 معتبر است: UTF-8. متن عربی/فارسی windows-1256 عملا هیچ‌وقت
+#      UTF-8 معتبر نیست (حروف پشت سر هم بایت‌های 0xC1 به بالا هستند که بایت ادامه UTF-8 نیستند)،
+#      پس این بررسی از charset اعلام شده در meta که در سایت‌های فارسی زیاد غلط است مطمئن‌تر است.
+#   4. اگر بخش معتبر پیش از اولین بایت خراب دست کم UTF8_MIN_VALID_PREFIX_BYTES بایت غیر ASCII دارد: UTF-8 با
+#      جایگزینی بایت‌های خراب (صفحه UTF-8 با یک بایت سرگردان، مثلا در پابرگ یا یک تبلیغ)
+#   5. charset تگ meta (<meta charset> یا http-equiv) در SNIFF_BYTES بایت اول، اگر قابل اعتماد باشد
+#   6. بررسی آماری: UTF-8 با چند بایت خراب، windows-1256 (سهم حروف عربی از بایت‌های غیر ASCII) یا windows-1252
+
+import codecs
+import re
+
+# --- پیکربندی ---
+SNIFF_BYTES = 4096                  # تگ meta فقط در این تعداد بایت اول جستجو می‌شود
+SNIFF_SAMPLE_BYTES = 4096           # بررسی آماری فقط روی این تعداد بایت (دو طرف اولین بایت غیر UTF-8) انجام می‌شود
+# حداقل بایت‌های غیر ASCII (حروف چندبایتی) در بخش UTF-8 معتبر پیش از اولین بایت خراب برای دیکود به UTF-8.
+# در متن windows-1256 حروف پشت سر هم تقریبا بلافاصله UTF-8 نامعتبر می‌سازند.
+UTF8_MIN_VALID_PREFIX_BYTES = 64
+UTF8_MIN_CONTINUATION_RATIO = 0.95  # حداقل نسبت بایت‌های ادامه به بایت‌های آغازگر UTF-8 برای UTF-8 با چند بایت خراب
+CP1256_MIN_ARABIC_SHARE = 0.6       # حداقل سهم حروف عربی/فارسی windows-1256 از بایت‌های غیر ASCII
+
+# انکودینگ‌هایی که اعلام شدنشان (در هدر یا meta) قابل اعتماد نیست و باید از روی محتوا بررسی شوند
+# (نام‌های استاندارد codecs)
+UNRELIABLE_DECLARED_ENCODINGS = ('iso8859-1', 'cp1252', 'cp1256', 'ascii')
+
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig', 'utf-8'),
+    (codecs.BOM_UTF32_LE, 'utf-32', 'utf-32-le'),  # پیش از UTF-16 LE که BOM آن پیشوند این BOM است
+    (codecs.BOM_UTF32_BE, 'utf-32', 'utf-32-be'),
+    (codecs.BOM_UTF16_LE, 'utf-16', 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16', 'utf-16-be'),
+)
+
+# charset در <meta charset="..."> و <meta http-equiv="Content-Type" content="text/html; charset=...">
+_META_CHARSET_RE = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:+-]+)', re.IGNORECASE)
+
+# برای بررسی آماری هر بایت با یک bytes.translate به کلاسش نگاشت و بعد کلاس‌ها با bytes.count شمرده می‌شوند
+# (بدون حلقه پایتون): a ASCII، c/C بایت ادامه UTF-8 (0x80 تا 0xBF)، l/L بایت‌های 0xC0 به بالا؛
+# حروف بزرگ بایت‌هایی هستند که در windows-1256 حروف و علائم عربی/فارسی‌اند (از جمله پ، چ، ژ، گ و ک)
+def _byte_class(byte):
+    if byte < 0x80:
+        return 'a'
+    arabic = '\u0600' <= bytes([byte]).decode('cp1256', errors='replace') <= '\u06ff'
+    name = 'c' if byte < 0xC0 else 'l'
+    return name.upper() if arabic else name
+
+
+_BYTE_CLASSES = ''.join(_byte_class(byte) for byte in range(256)).encode('ascii')
+
+
+def normalize_encoding_name(name):
+    """نام استاندارد codecs برای یک برچسب charset (مثلا 'windows-1256' -> 'cp1256') یا None اگر ناشناخته باشد."""
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.strip().strip('"\'')).name
+    except LookupError:
+        return None
+
+
+def bom_encoding(content):
+    """(codec دیکود، نام انکودینگ) بر اساس BOM ابتدای content یا None."""
+    for bom, codec, name in _BOMS:
+        if content.startswith(bom):
+            return codec, name
+    return None
+
+
+def meta_charset(content):
+    """charset اعلام شده در تگ meta در SNIFF_BYTES بایت اول (برچسب خام) یا None."""
+    match = _META_CHARSET_RE.search(content, 0, SNIFF_BYTES)
+    return match.group(1).decode('ascii').lower() if match else None
+
+
+def sniff_encoding(content, start=0):
+    """
+    تشخیص آماری برای محتوایی که UTF-8 معتبر نیست: 'utf-8' (چند بایت خراب)، 'windows-1256' یا 'windows-1252'.
+    نمونه از دو طرف start (معمولا محل اولین بایت نامعتبر UTF-8) برداشته می‌شود تا هم بخش ASCII ابتدای صفحه
+    (هدر، اسکریپت‌ها و استایل‌ها) نمونه را هدر ندهد و هم متن معتبر پیش از یک بایت خراب دیده شود.
+    """
+    sample_start = max(0, start - SNIFF_SAMPLE_BYTES // 2)
+    classes = content[sample_start:sample_start + SNIFF_SAMPLE_BYTES].translate(_BYTE_CLASSES)
+    high = len(classes) - classes.count(b'a')
+    if not high:
+        return 'utf-8'
+    # در UTF-8 پس از هر بایت آغازگر (0xC0 به بالا) دست کم یک بایت ادامه (0x80 تا 0xBF) می‌آید؛ در windows-1256
+    # بیشتر حروف فارسی بالای 0xC0 هستند و فقط چند حرف (پ، چ، ژ، گ، ک) و علامت در بازه بایت‌های ادامه‌اند
+    arabic_continuation = classes.count(b'C')
+    continuation = classes.count(b'c') + arabic_continuation
+    if continuation >= UTF8_MIN_CONTINUATION_RATIO * (high - continuation):
+        return 'utf-8'
+    if arabic_continuation + classes.count(b'L') >= CP1256_MIN_ARABIC_SHARE * high:
+        return 'windows-1256'
+    return 'windows-1252'
+
+
+def decode_html(content, declared_encoding=None):
+    """
+    بایت‌های صفحه را فقط یک بار به متن تبدیل می‌کند و (متن، انکودینگ) برمی‌گرداند.
+    declared_encoding انکودینگ اعلام شده در هدر HTTP است (در صورت وجود).
+    """
+    bom = bom_encoding(content)
+    if bom is not None:
+        return content.decode(bom[0], errors='replace'), bom[1]
+
+    declared = normalize_encoding_name(declared_encoding)
+    if declared is not None and declared not in UNRELIABLE_DECLARED_ENCODINGS:
+        try:
+            return content.decode(declared, errors='replace'), declared_encoding
+        except LookupError:  # codec هایی مانند rot13 که انکودینگ متن نیستند
+            pass
+
+    if content.isascii():
+        return content.decode('ascii'), 'utf-8'
+    try:
+        return content.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError as e:
+        invalid_start = e.start
+    # بایت‌های غیر ASCII بخش پیش از invalid_start همگی حروف چندبایتی UTF-8 معتبرند
+    valid_multibyte = invalid_start - content[:invalid_start].translate(_BYTE_CLASSES).count(b'a')
+    if valid_multibyte >= UTF8_MIN_VALID_PREFIX_BYTES:
+        return content.decode('utf-8', errors='replace'), 'utf-8'
+
+    label = meta_charset(content)
+    declared = normalize_encoding_name(label)
+    # meta با UTF-8 هم اینجا قابل اعتماد نیست، چون محتوا UTF-8 معتبر نبود
+    if declared is not None and declared not in UNRELIABLE_DECLARED_ENCODINGS and declared != 'utf-8':
+        try:
+            return content.decode(declared, errors='replace'), label
+        except LookupError:
+            pass
+
+    encoding = sniff_encoding(content, invalid_start)
+    return content.decode(encoding, errors='replace'), encoding
+
@@ -0,0 +1,195 @@
+# seoran/crawler/focus.py
+# سطح: خزش متمرکز (focused crawling). URL های کشف شده بر اساس احتمال اینکه به یک سند مفید برسند (سندی
+# که پردازشگر به خاطر کوتاهی متن یا کمی توکن رد نمی‌کند) اولویت‌بندی می‌شوند تا بودجه max_pages خزنده
+# صرف صفحات برچسب، ورود، جستجو و صفحات غیر فارسی نشود.
+#
+# نشانه‌های ارزان هر لینک:
+#   الگوی URL:    میزبان، اولین بخش مسیر و شکل بقیه بخش‌ها ("blog.ir/tag/*"، "blog.ir/post/0/*")؛ بازده هر
+#                 الگو (سهم صفحات مفید) در طول خزش یاد گرفته می‌شود و تا وقتی مشاهده کافی نباشد به برآورد
+#                 اولیه قواعد FOCUS_URL_RULES (یا بازده کل خزش) نزدیک است
+#   متن لینک:     سهم حروف فارسی و تعداد کلمات (لینک‌های «ورود»، «برچسب» و ... امتیاز نمی‌گیرند)
+#   صفحه والد:    سهم حروف فارسی متن اصلی و مفید بودن آن
+# امتیاز نهایی و عمق لینک در یک عدد صحیح (اولویت Frontier) جمع می‌شوند: امتیازها در FOCUS_SCORE_BUCKETS دسته
+# گرد می‌شوند و در هر دسته URL های کم‌عمق‌تر زودتر برداشته می‌شوند؛ عمق با depth_of دوباره به دست می‌آید
+# (فقط برای اولویت‌هایی که encode_priority ساخته است).
+# بدون خزش متمرکز اولویت همان عمق است (دسته صفر)، پس checkpoint ها و صف روی دیسک تغییری نمی‌کنند.
+
+import re
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+# --- پیکربندی ---
+# آستانه‌های سند مفید؛ همان MIN_TEXT_LENGTH و MIN_TOKEN_COUNT پردازشگر (text_processor.py). خزنده توکن‌های
+# پس از NLP را ندارد و به جای آن کلمات فارسی متن اصلی را می‌شمارد.
+FOCUS_MIN_TEXT_LENGTH = 100
+FOCUS_MIN_TOKEN_COUNT = 20
+
+# دقت امتیاز در اولویت (تعداد دسته‌ها) و بیشترین عمق قابل نمایش در اولویت. FOCUS_SCORE_BUCKETS *
+# FOCUS_DEPTH_SLOTS باید زیر 2**53 بماند تا اولویت در ستون REAL صف روی دیسک (frontier.py) دقیق بماند.
+FOCUS_SCORE_BUCKETS = 20
+FOCUS_DEPTH_SLOTS = 2 ** 32
+
+# وزن نشانه‌ها در امتیاز نهایی
+FOCUS_PATTERN_WEIGHT = 0.6
+FOCUS_ANCHOR_WEIGHT = 0.2
+FOCUS_PARENT_WEIGHT = 0.2
+
+# وزن برآورد اولیه هر الگو در برابر مشاهدات آن (به تعداد صفحه)
+FOCUS_PRIOR_WEIGHT = 4.0
+# متن لینک با این تعداد کلمه فارسی یا بیشتر امتیاز کامل می‌گیرد
+FOCUS_ANCHOR_WORDS = 3
+# نشانه‌های متن صفحه فقط از این تعداد کاراکتر اول متن اصلی محاسبه می‌شوند
+FOCUS_SAMPLE_CHARS = 4000
+# حداکثر تعداد الگوهایی که آمارشان نگه داشته می‌شود (الگوهای جدید پس از آن فقط برآورد اولیه دارند)
+FOCUS_MAX_PATTERNS = 100_000
+
+# برآورد اولیه بازده URL ها بر اساس مسیر (اولین قاعده منطبق)
+FOCUS_URL_RULES = [
+    (r'/(?:login|signin|sign-in|signup|register|logout|account|wp-admin|wp-login|cart|checkout)\b', 0.02),
+    (r'[/?&](?:tag|tags|category|categories|author|search|s|q|page|feed|rss|archive|label)(?:[/=]|$)', 0.15),
+    (r'[?&](?:replytocom|share|print|sort|order|filter)=', 0.1),
+    (r'^/(?:en|ar|fr|de|ru)(?:/|$)', 0.1),
+    (r'/(?:post|posts|article|articles|news|blog|story|\d{4}/\d{1,2})/', 0.7),
+]
+
+# متن لینک‌هایی که به سند نمی‌رسند
+FOCUS_BAD_ANCHOR_RE = re.compile(
+    r'^\s*(?:ورود|خروج|ثبت[\s‌]?نام|عضویت|برچسب|دسته[\s‌]?بندی|جستجو|صفحه بعد|صفحه قبل|بیشتر'
+    r'|log\s?in|sign\s?(?:in|up)|register|tags?|category|search|next|prev(?:ious)?|more)\b', re.IGNORECASE)
+
+_URL_RULES = [(re.compile(pattern, re.IGNORECASE), prior) for pattern, prior in FOCUS_URL_RULES]
+_PERSIAN_LETTERS_RE = re.compile(r'[ء-يپچژکگیآ]')
+_LETTERS_RE = re.compile(r'[^\W\d_]')
+_PERSIAN_WORD_RE = re.compile(r'[ء-يپچژکگیآ‌]{2,}')
+_DIGITS_RE = re.compile(r'\d+')
+
+# نشانه‌های یک صفحه دانلود شده برای لینک‌های آن
+PageSignals = namedtuple('PageSignals', ['persian_ratio', 'useful'])
+
+
+def url_pattern(url):
+    """
+    الگوی URL: میزبان، اولین بخش مسیر (با ارقام یکسان شده) و شکل بقیه بخش‌ها ('0' عددی، '*' غیر عددی)
+    و نام پارامترهای query.
+    """
+    parts = urlsplit(url)
+    segments = [segment for segment in parts.path.split('/') if segment]
+    shape = [_DIGITS_RE.sub('0', segments[0].lower())[:40]] if segments else []
+    shape.extend('0' if segment.isdigit() else '*' for segment in segments[1:4])
+    if len(segments) > 4:
+        shape.append('…')
+    pattern = parts.netloc + '/' + '/'.join(shape)
+    if parts.query:
+        pattern += '?' + '&'.join(sorted({item.partition('=')[0] for item in parts.query.split('&')}))
+    return pattern
+
+
+def text_signals(text):
+    """(سهم حروف فارسی از همه حروف، تعداد کلمات فارسی) یک متن (فقط FOCUS_SAMPLE_CHARS کاراکتر اول)."""
+    if not text:
+        return 0.0, 0
+    text = text[:FOCUS_SAMPLE_CHARS]
+    letters = len(_LETTERS_RE.findall(text))
+    if not letters:
+        return 0.0, 0
+    return len(_PERSIAN_LETTERS_RE.findall(text)) / letters, len(_PERSIAN_WORD_RE.findall(text))
+
+
+def is_useful_document(text, persian_words=None):
+    """
+    آیا متن اصلی صفحه از آستانه‌های پردازشگر می‌گذرد؟ (برآورد؛ بدون نرمال‌سازی و NLP)
+    persian_words تعداد کلمات فارسی متن است اگر قبلا با text_signals شمرده شده باشد.
+    """
+    if not text or len(text.strip()) < FOCUS_MIN_TEXT_LENGTH:
+        return False
+    if persian_words is None:
+        persian_words = text_signals(text)[1]
+    return persian_words >= FOCUS_MIN_TOKEN_COUNT
+
+
+def url_rule_prior(url):
+    """برآورد اولیه بازده URL از FOCUS_URL_RULES، یا None اگر هیچ قاعده‌ای منطبق نباشد."""
+    parts = urlsplit(url)
+    target = parts.path + ('?' + parts.query if parts.query else '')
+    for pattern, prior in _URL_RULES:
+        if pattern.search(target):
+            return prior
+    return None
+
+
+def anchor_score(anchor_text):
+    """امتیاز متن لینک (0 تا 1): متن فارسی چند کلمه‌ای بیشترین امتیاز را می‌گیرد."""
+    if not anchor_text:
+        return 0.3  # لینک تصویری یا بدون متن
+    if FOCUS_BAD_ANCHOR_RE.match(anchor_text):
+        return 0.0
+    persian_ratio, words = text_signals(anchor_text)
+    return persian_ratio * min(1.0, words / FOCUS_ANCHOR_WORDS)
+
+
+def encode_priority(score, depth):
+    """اولویت Frontier برای امتیاز score (0 تا 1) و عمق depth؛ اولویت کمتر زودتر برداشته می‌شود."""
+    bucket = min(FOCUS_SCORE_BUCKETS - 1, int((1.0 - score) * FOCUS_SCORE_BUCKETS))
+    return max(0, bucket) * FOCUS_DEPTH_SLOTS + min(depth, FOCUS_DEPTH_SLOTS - 1)
+
+
+def depth_of(priority):
+    """عمق URL از اولویتی که encode_priority ساخته است."""
+    return int(priority) % FOCUS_DEPTH_SLOTS
+
+
+class FocusScorer:
+    """
+    امتیازدهی لینک‌ها و یادگیری برخط بازده الگوهای URL. observe پس از دانلود هر صفحه صدا زده می‌شود و
+    priority اولویت لینک‌های جدید را می‌دهد. متدها thread-safe نیستند و باید از حلقه خزش صدا زده شوند.
+    """
+    def __init__(self):
+        self._patterns = {}  # الگو -> [تعداد صفحات دانلود شده، تعداد صفحات مفید]
+        self.fetched = 0
+        self.accepted = 0
+
+    def overall_yield(self):
+        return (self.accepted + 1) / (self.fetched + 2)
+
+    def pattern_yield(self, url, pattern=None):
+        """بازده برآورد شده الگوی URL: مشاهدات الگو همراه با برآورد اولیه (قواعد یا بازده کل)."""
+        prior = url_rule_prior(url)
+        if prior is None:
+            prior = self.overall_yield()
+        counts = self._patterns.get(pattern or url_pattern(url))
+        if counts is None:
+            return prior
+        return (counts[1] + FOCUS_PRIOR_WEIGHT * prior) / (counts[0] + FOCUS_PRIOR_WEIGHT)
+
+    def score(self, url, anchor_text=None, parent=None):
+        """امتیاز لینک (0 تا 1)؛ parent نشانه‌های صفحه‌ای است که لینک در آن پیدا شده (PageSignals)."""
+        parent_score = 0.5 if parent is None else parent.persian_ratio * (1.0 if parent.useful else 0.5)
+        return (FOCUS_PATTERN_WEIGHT * self.pattern_yield(url)
+                + FOCUS_ANCHOR_WEIGHT * anchor_score(anchor_text)
+                + FOCUS_PARENT_WEIGHT * parent_score)
+
+    def priority(self, url, depth, anchor_text=None, parent=None):
+        return encode_priority(self.score(url, anchor_text, parent), depth)
+
+    def observe(self, url, main_text, duplicate=False):
+        """
+        نتیجه دانلود یک صفحه را در آمار الگویش ثبت می‌کند (صفحه تقریبا تکراری مفید حساب نمی‌شود)
+        و PageSignals صفحه را برای امتیازدهی لینک‌هایش برمی‌گرداند.
+        """
+        persian_ratio, persian_words = text_signals(main_text)
+        useful = not duplicate and is_useful_document(main_text, persian_words)
+        self.fetched += 1
+        self.accepted += useful
+        pattern = url_pattern(url)
+        counts = self._patterns.get(pattern)
+        if counts is None and len(self._patterns) < FOCUS_MAX_PATTERNS:
+            counts = self._patterns[pattern] = [0, 0]
+        if counts is not None:
+            counts[0] += 1
+            counts[1] += useful
+        return PageSignals(persian_ratio, useful)
+
+    def top_patterns(self, limit=10):
+        """پرتکرارترین الگوها: (الگو، صفحات دانلود شده، صفحات مفید)."""
+        rows = sorted(self._patterns.items(), key=lambda item: -item[1][0])[:limit]
+        return [(pattern, fetched, accepted) for pattern, (fetched, accepted) in rows]
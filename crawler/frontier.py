@@ -0,0 +1,264 @@
+# seoran/crawler/frontier.py
+# سطح: صف خزش (Frontier) با یک صف اولویت‌دار برای هر میزبان، انتخاب بر اساس اولویت
+# (عمق یا امتیاز) و زمان مجاز بعدی میزبان، و انتقال ورودی‌های اضافی به دیسک (SQLite)
+# وقتی تعداد ورودی‌های حافظه از بودجه تعیین شده بیشتر شود.
+#
+# همه عملیات‌ها O(log n) هستند: heap داخل هر میزبان، دو heap برای میزبان‌ها
+# (آماده / در انتظار) و ایندکس B-tree در SQLite برای ورودی‌های روی دیسک.
+
+import heapq
+import os
+import sqlite3
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+# --- پیکربندی ---
+# حداکثر تعداد ورودی که در حافظه نگه داشته می‌شود؛ مازاد آن به دیسک منتقل می‌شود
+FRONTIER_MEMORY_BUDGET = 1_000_000
+
+# تعداد ورودی‌هایی که در هر بار از دیسک به حافظه برگردانده می‌شوند
+FRONTIER_REFILL_BATCH = 1000
+
+# تعداد ورودی‌های بافر شده پیش از نوشتن دسته‌ای روی دیسک
+FRONTIER_SPILL_BATCH = 5000
+
+# حالت‌های یک میزبان
+_IDLE, _READY, _WAITING, _BUSY = range(4)
+
+
+class _HostQueue:
+    __slots__ = ('heap', 'spilled', 'spilled_min', 'ready_at', 'delay', 'state', 'version', 'in_flight')
+
+    def __init__(self):
+        self.heap = []             # (priority, seq, url)
+        self.spilled = 0           # تعداد ورودی‌های این میزبان روی دیسک
+        self.spilled_min = None    # کمترین اولویت بین ورودی‌های روی دیسک
+        self.ready_at = 0.0        # زودترین زمان مجاز برای درخواست بعدی
+        self.delay = None          # تاخیر اختصاصی میزبان (None یعنی host_delay صف)
+        self.state = _IDLE
+        self.version = 0           # برای باطل کردن تنبل (lazy) ورودی‌های قدیمی heap ها
+        self.in_flight = 0
+
+    def best_priority(self):
+        best = self.heap[0][0] if self.heap else None
+        if self.spilled and (best is None or self.spilled_min < best):
+            best = self.spilled_min
+        return best
+
+    def __len__(self):
+        return len(self.heap) + self.spilled
+
+
+class Frontier:
+    """
+    صف URL ها با تفکیک میزبان. اولویت کمتر زودتر برداشته می‌شود (مثلا عمق برای BFS).
+
+    pop فقط از میزبان‌هایی URL برمی‌گرداند که زمان مجازشان رسیده و به سقف درخواست
+    هم‌زمان نرسیده‌اند؛ اگر هیچ میزبانی آماده نباشد None برمی‌گرداند و next_ready_time
+    زمان آماده شدن نزدیک‌ترین میزبان را می‌دهد.
+    """
+    def __init__(self, host_delay=0.0, memory_budget=FRONTIER_MEMORY_BUDGET, spill_dir=None,
+                 max_in_flight_per_host=None):
+        self.host_delay = host_delay
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.max_in_flight_per_host = max_in_flight_per_host
+
+        self._hosts = {}
+        self._ready = []      # (best_priority, seq, host, version)
+        self._waiting = []    # (ready_at, seq, host, version)
+        self._seq = 0
+        self._size = 0
+        self._in_memory = 0
+
+        self._db = None
+        self._db_path = None
+        self._spill_buffer = []
+
+    # --- صف میزبان‌ها ---
+
+    def _schedule(self, host, hq, now):
+        hq.version += 1
+        self._seq += 1
+        if hq.ready_at <= now:
+            hq.state = _READY
+            heapq.heappush(self._ready, (hq.best_priority(), self._seq, host, hq.version))
+        else:
+            hq.state = _WAITING
+            heapq.heappush(self._waiting, (hq.ready_at, self._seq, host, hq.version))
+
+    def _host_queue(self, host):
+        hq = self._hosts.get(host)
+        if hq is None:
+            hq = self._hosts[host] = _HostQueue()
+        return hq
+
+    def _promote_waiting(self, now):
+        waiting = self._waiting
+        while waiting and waiting[0][0] <= now:
+            _, _, host, version = heapq.heappop(waiting)
+            hq = self._hosts.get(host)
+            if hq is not None and hq.version == version and hq.state == _WAITING:
+                self._schedule(host, hq, now)
+
+    # --- ذخیره‌سازی روی دیسک ---
+
+    def _open_db(self):
+        fd, self._db_path = tempfile.mkstemp(prefix="seoran_frontier_", suffix=".sqlite", dir=self.spill_dir)
+        os.close(fd)
+        self._db = sqlite3.connect(self._db_path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=OFF")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute("CREATE TABLE frontier (host TEXT, priority REAL, seq INTEGER, url TEXT)")
+        self._db.execute("CREATE INDEX frontier_host_order ON frontier (host, priority, seq)")
+
+    def _flush_spill_buffer(self):
+        if not self._spill_buffer:
+            return
+        if self._db is None:
+            self._open_db()
+        self._db.execute("BEGIN")
+        self._db.executemany("INSERT INTO frontier VALUES (?, ?, ?, ?)", self._spill_buffer)
+        self._db.execute("COMMIT")
+        self._spill_buffer = []
+
+    def _refill(self, host, hq):
+        self._flush_spill_buffer()
+        rows = self._db.execute(
+            "SELECT rowid, priority, seq, url FROM frontier WHERE host = ? ORDER BY priority, seq LIMIT ?",
+            (host, FRONTIER_REFILL_BATCH)).fetchall()
+        self._db.execute("BEGIN")
+        self._db.executemany("DELETE FROM frontier WHERE rowid = ?", [(row[0],) for row in rows])
+        self._db.execute("COMMIT")
+        for _, priority, seq, url in rows:
+            heapq.heappush(hq.heap, (priority, seq, url))
+        hq.spilled -= len(rows)
+        self._in_memory += len(rows)
+        if hq.spilled:
+            hq.spilled_min = self._db.execute(
+                "SELECT MIN(priority) FROM frontier WHERE host = ?", (host,)).fetchone()[0]
+        else:
+            hq.spilled_min = None
+
+    # --- رابط عمومی ---
+
+    def push(self, url, priority=0, now=None):
+        host = urlsplit(url).netloc
+        hq = self._host_queue(host)
+        previous_best = hq.best_priority()
+
+        self._seq += 1
+        if self._in_memory >= self.memory_budget:
+            self._spill_buffer.append((host, priority, self._seq, url))
+            if len(self._spill_buffer) >= FRONTIER_SPILL_BATCH:
+                self._flush_spill_buffer()
+            hq.spilled += 1
+            if hq.spilled_min is None or priority < hq.spilled_min:
+                hq.spilled_min = priority
+        else:
+            heapq.heappush(hq.heap, (priority, self._seq, url))
+            self._in_memory += 1
+        self._size += 1
+
+        if hq.state == _IDLE:
+            self._schedule(host, hq, time.monotonic() if now is None else now)
+        elif hq.state == _READY and priority < previous_best:
+            # اولویت بهتر شد؛ ورودی جدید در heap آماده‌ها، ورودی قبلی باطل می‌شود
+            self._schedule(host, hq, time.monotonic() if now is None else now)
+
+    def pop(self, now=None):
+        """
+        بهترین URL از بین میزبان‌های آماده را برمی‌دارد: (url, priority) یا None.
+        """
+        if now is None:
+            now = time.monotonic()
+        self._promote_waiting(now)
+
+        while self._ready:
+            _, _, host, version = heapq.heappop(self._ready)
+            hq = self._hosts[host]
+            if hq.version != version or hq.state != _READY:
+                continue
+
+            if hq.spilled and (not hq.heap or hq.spilled_min < hq.heap[0][0]):
+                self._refill(host, hq)
+            priority, _, url = heapq.heappop(hq.heap)
+            self._in_memory -= 1
+            self._size -= 1
+
+            hq.ready_at = now + (self.host_delay if hq.delay is None else hq.delay)
+            hq.in_flight += 1
+            if self.max_in_flight_per_host is not None and hq.in_flight >= self.max_in_flight_per_host:
+                hq.state = _BUSY
+            elif len(hq):
+                self._schedule(host, hq, now)
+            else:
+                hq.state = _IDLE
+            return url, priority
+        return None
+
+    def done(self, url, now=None):
+        """
+        پایان درخواست URL را اعلام می‌کند تا ظرفیت هم‌زمانی میزبان آزاد شود.
+        """
+        host = urlsplit(url).netloc
+        hq = self._hosts.get(host)
+        if hq is None:
+            return
+        hq.in_flight = max(0, hq.in_flight - 1)
+        if hq.state == _BUSY:
+            if len(hq):
+                self._schedule(host, hq, time.monotonic() if now is None else now)
+            else:
+                hq.state = _IDLE
+
+    def set_host_delay(self, host, delay):
+        """
+        تاخیر بین درخواست‌های یک میزبان را (از درخواست بعدی) تغییر می‌دهد؛ None یعنی host_delay صف.
+        """
+        self._host_queue(host).delay = delay
+
+    def defer_host(self, host, until, now=None):
+        """
+        میزبان تا زمان until (time.monotonic) هیچ URL ی نمی‌دهد (مثلا پس از 429 یا Retry-After).
+        """
+        hq = self._host_queue(host)
+        if until <= hq.ready_at:
+            return
+        hq.ready_at = until
+        if hq.state in (_READY, _WAITING):
+            self._schedule(host, hq, time.monotonic() if now is None else now)
+
+    def next_ready_time(self, now=None):
+        """
+        زمان (time.monotonic) آماده شدن نزدیک‌ترین میزبان، یا None اگر هیچ میزبان منتظری نباشد.
+        """
+        if now is None:
+            now = time.monotonic()
+        self._promote_waiting(now)
+        if self._ready:
+            return now
+        while self._waiting:
+            ready_at, _, host, version = self._waiting[0]
+            hq = self._hosts.get(host)
+            if hq is not None and hq.version == version and hq.state == _WAITING:
+                return ready_at
+            heapq.heappop(self._waiting)
+        return None
+
+    def host_count(self):
+        return len(self._hosts)
+
+    def close(self):
+        self._spill_buffer = []
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            try:
+                os.remove(self._db_path)
+            except OSError:
+                pass
+
+    def __len__(self):
+        return self._size
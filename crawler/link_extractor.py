@@ -0,0 +1,221 @@
+# seoran/crawler/link_extractor.py
+# سطح: استخراج سریع لینک‌های معتبر از یک صفحه (فیلتر پسوند و پروتکل، تبدیل به URL مطلق، یکسان‌سازی، کنترل دامنه).
+#
+# برای سرعت در صفحات پر لینک (مثل صفحات دسته‌بندی):
+#   - فیلترهای پروتکل و پسوند یک بار کامپایل می‌شوند.
+#   - URL پایه صفحه فقط یک بار پارس می‌شود و لینک‌های نسبی رایج بدون urljoin ساخته می‌شوند.
+#   - به جای validators.url (که regex سنگینی دارد) فقط scheme، میزبان و پورت بررسی می‌شوند.
+#   - لینک‌ها یکسان‌سازی (canonicalize) می‌شوند تا تکراری‌ها پیش از رسیدن به frontier حذف شوند.
+#   - کنترل دامنه با مجموعه و تطبیق پسوند ("*.example.ir") انجام می‌شود، نه جستجو در لیست.
+
+import re
+from functools import lru_cache
+from urllib.parse import urlsplit, urljoin
+
+from lxml import etree
+import lxml.html
+
+from url_utils import canonicalize_url, DEFAULT_PORTS
+
+_SKIPPED_SCHEMES_RE = re.compile(r'(?:mailto|tel|javascript|ftp|data|sms|whatsapp):', re.IGNORECASE)
+_SKIPPED_EXTENSIONS_RE = re.compile(
+    r'\.(?:pdf|jpe?g|png|gif|webp|svg|zip|rar|7z|exe|mp3|mp4|avi|mkv|docx?|xlsx?|pptx?)$', re.IGNORECASE)
+_HOST_RE = re.compile(
+    r'(?:[^\W_](?:[\w-]{0,61}[^\W_])?\.)+(?:[^\W\d_]{2,63}|xn--[a-z0-9-]{1,59})'  # نام دامنه با TLD
+    r'|\d{1,3}(?:\.\d{1,3}){3}'                                                     # آدرس IPv4
+)
+_ALLOWED_SCHEMES = ('http', 'https')
+
+
+class DomainMatcher:
+    """
+    تطبیق دامنه با مجموعه‌ای از دامنه‌های مجاز. ورودی‌هایی مانند "*.example.ir" یا ".example.ir"
+    خود دامنه و همه زیردامنه‌های آن را می‌پذیرند. مقایسه روی netloc یکسان شده (حروف کوچک، بدون پورت پیش‌فرض) است.
+    """
+    def __init__(self, domains):
+        self.exact = set()
+        self.suffixes = set()
+        for domain in domains:
+            domain = domain.strip().lower()
+            if domain.startswith('*.'):
+                self.suffixes.add(domain[2:])
+            elif domain.startswith('.'):
+                self.suffixes.add(domain[1:])
+            elif domain:
+                self.exact.add(domain)
+
+    def __bool__(self):
+        return bool(self.exact or self.suffixes)
+
+    def matches(self, netloc):
+        if netloc in self.exact:
+            return True
+        if self.suffixes:
+            host = netloc
+            while host:
+                if host in self.suffixes:
+                    return True
+                host = host.partition('.')[2]
+        return False
+
+    __contains__ = matches
+
+
+@lru_cache(maxsize=64)
+def _matcher_for(domains):
+    return DomainMatcher(domains)
+
+
+def domain_matcher(allowed_domains):
+    """یک DomainMatcher برای لیست دامنه‌ها (با کش، تا برای هر صفحه دوباره ساخته نشود)."""
+    if isinstance(allowed_domains, DomainMatcher):
+        return allowed_domains
+    return _matcher_for(tuple(allowed_domains or ()))
+
+
+def _is_valid_netloc(netloc):
+    if '@' in netloc:
+        return False
+    host, _, port = netloc.partition(':')
+    if port and not (port.isdigit() and int(port) < 65536):
+        return False
+    return _HOST_RE.fullmatch(host) is not None
+
+
+class LinkExtractor:
+    """
+    استخراج کننده لینک برای یک صفحه. URL پایه یک بار پارس می‌شود و برای همه لینک‌ها استفاده می‌شود.
+    اگر allowed_domains خالی باشد، فقط لینک‌های دامنه base_url نگه داشته می‌شوند.
+    """
+    def __init__(self, base_url, allowed_domains=None):
+        self.base_url = base_url
+        base = urlsplit(base_url)
+        self._scheme = base.scheme.lower()
+        self._origin = f"{self._scheme}://{base.netloc}"
+        self._base_path = base.path or '/'
+        self._base_dir = self._origin + self._base_path[:self._base_path.rfind('/') + 1]
+        matcher = domain_matcher(allowed_domains)
+        if not matcher:
+            netloc = base.netloc.lower()
+            host, _, port = netloc.rpartition(':')
+            if port and DEFAULT_PORTS.get(self._scheme) == port:
+                netloc = host
+            matcher = DomainMatcher([netloc])
+        self.matcher = matcher
+
+    def resolve(self, href):
+        """href را به URL مطلق تبدیل می‌کند (بدون fragment)، یا None اگر باید نادیده گرفته شود."""
+        href = href.strip()
+        hash_index = href.find('#')
+        if hash_index != -1:
+            href = href[:hash_index]  # حذف fragment identifiers
+        if not href or _SKIPPED_SCHEMES_RE.match(href):
+            return None
+
+        if href.startswith(('http://', 'https://', 'HTTP://', 'HTTPS://')):
+            return href
+        if href.startswith('//'):
+            return f"{self._scheme}:{href}"
+        if href.startswith('/'):
+            return self._origin + href
+        if href.startswith('?'):
+            return self._origin + self._base_path + href
+        if ':' in href.split('/', 1)[0] or href.startswith('.'):
+            # scheme های دیگر یا مسیرهای ./ و ../ با urljoin حل می‌شوند
+            try:
+                return urljoin(self.base_url, href)
+            except ValueError:
+                return None
+        return self._base_dir + href
+
+    def accept(self, absolute_url):
+        """شکل یکسان شده URL اگر معتبر و در دامنه‌های مجاز باشد، در غیر این صورت None."""
+        try:
+            parts = urlsplit(absolute_url)
+        except ValueError:
+            return None
+        if parts.scheme.lower() not in _ALLOWED_SCHEMES or ' ' in parts.netloc:
+            return None
+        if _SKIPPED_EXTENSIONS_RE.search(parts.path):
+            return None
+        canonical_url = canonicalize_url(absolute_url)
+        netloc = urlsplit(canonical_url).netloc
+        if not _is_valid_netloc(netloc) or not self.matcher.matches(netloc):
+            return None
+        return canonical_url
+
+    def extract(self, hrefs):
+        """مجموعه URL های یکسان شده و مجاز از یک دنباله href."""
+        links = set()
+        seen_hrefs = set()
+        resolve = self.resolve
+        accept = self.accept
+        for href in hrefs:
+            # لینک‌های تکراری یک صفحه (مثلا منوی سربرگ و پابرگ) فقط یک بار بررسی می‌شوند
+            if href in seen_hrefs:
+                continue
+            seen_hrefs.add(href)
+            absolute_url = resolve(href)
+            if absolute_url is None:
+                continue
+            canonical_url = accept(absolute_url)
+            if canonical_url is not None:
+                links.add(canonical_url)
+        return links
+
+    def extract_anchors(self, anchors):
+        """
+        دیکشنری URL یکسان شده و مجاز -> متن لینک از یک دنباله (href، متن). اگر چند لینک به یک URL برسند
+        طولانی‌ترین متن نگه داشته می‌شود.
+        """
+        anchor_texts = {}
+        resolved = {}
+        for href, text in anchors:
+            if href in resolved:
+                canonical_url = resolved[href]
+            else:
+                absolute_url = self.resolve(href)
+                canonical_url = resolved[href] = None if absolute_url is None else self.accept(absolute_url)
+            if canonical_url is None:
+                continue
+            previous = anchor_texts.get(canonical_url)
+            if previous is None or len(text) > len(previous):
+                anchor_texts[canonical_url] = text
+        return anchor_texts
+
+
+def extract_links_from_soup(soup, base_url, allowed_domains=None):
+    """
+    لینک‌های معتبر را از یک soup ساخته شده استخراج می‌کند.
+    اگر allowed_domains خالی باشد، فقط لینک‌های دامنه base_url نگه داشته می‌شوند.
+    """
+    hrefs = (anchor_tag['href'] for anchor_tag in soup.find_all('a', href=True))
+    return LinkExtractor(base_url, allowed_domains).extract(hrefs)
+
+
+def extract_anchor_texts_from_soup(soup, base_url, allowed_domains=None):
+    """
+    مثل extract_links_from_soup، ولی دیکشنری URL -> متن لینک (با فاصله‌های یکسان شده) برمی‌گرداند.
+    """
+    def anchor_text(anchor_tag):
+        # بیشتر لینک‌ها فقط یک گره متنی دارند؛ get_text فقط برای لینک‌های با تگ‌های تو در تو لازم است
+        text = anchor_tag.string
+        return " ".join((text if text is not None else anchor_tag.get_text(" ")).split())
+
+    anchors = ((anchor_tag['href'], anchor_text(anchor_tag)) for anchor_tag in soup.find_all('a', href=True))
+    return LinkExtractor(base_url, allowed_domains).extract_anchors(anchors)
+
+
+def extract_links_from_html(html_content, base_url, allowed_domains=None):
+    """
+    مسیر سریع بدون BeautifulSoup: HTML مستقیما با lxml پارس می‌شود و فقط href تگ‌های a خوانده می‌شود.
+    برای وقتی که متن اصلی صفحه لازم نیست.
+    """
+    if not html_content:
+        return set()
+    try:
+        document = lxml.html.document_fromstring(html_content)
+    except (ValueError, etree.ParserError):
+        return set()
+    hrefs = (href for href in (element.get('href') for element in document.iter('a')) if href is not None)
+    return LinkExtractor(base_url, allowed_domains).extract(hrefs)
@@ -0,0 +1,372 @@
+# seoran/crawler/metrics.py
+# سطح: لایه سبک سنجش (metrics) و لاگ برای خزنده و پردازشگر متن.
+#
+# شمارنده‌ها (Counter)، مقدارها (Gauge) و هیستوگرام‌های تاخیر (Histogram) در یک MetricsRegistry ثبت می‌شوند.
+# از هر registry می‌توان یک snapshot (dict قابل تبدیل به JSON، قابل ادغام بین پروسس‌ها) و متن قالب
+# Prometheus (برای scrape از طریق start_metrics_server یا نوشتن در فایل) گرفت.
+#
+# لاگ‌ها از logging استاندارد پایتون و لاگر "seoran" استفاده می‌کنند. پیام‌ها با آرگومان‌های جداگانه
+# (logger.debug("... %s", url)) ساخته می‌شوند تا وقتی سطح لاگ غیرفعال است هیچ رشته‌ای قالب‌بندی نشود.
+# با configure_logging(json_format=True) هر لاگ یک خط JSON (همراه با فیلدهای extra) است.
+#
+# این ماژول به Hazm وابسته نیست تا خزنده و پردازشگر متن هر دو از آن استفاده کنند.
+
+import bisect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# مرزهای پیش‌فرض هیستوگرام‌های تاخیر (ثانیه)
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LOGGER_NAME = "seoran"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}  # مقادیر برچسب‌ها (tuple) -> مقدار
+        self._lock = threading.Lock()
+
+    # قفل قابل pickle نیست؛ آمار پروسس‌های کارگر بدون قفل منتقل و در پروسس اصلی دوباره ساخته می‌شود
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def _labels_dict(self, labels):
+        return dict(zip(self.label_names, labels))
+
+
+class Counter(_Metric):
+    """شمارنده افزایشی، اختیاری با برچسب (labels یک tuple هم‌ترتیب با label_names است)."""
+    kind = "counter"
+
+    def inc(self, amount=1, labels=()):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def total(self):
+        return sum(self._values.values())
+
+    def _samples(self):
+        return [{"labels": self._labels_dict(labels), "value": value} for labels, value in self._values.items()]
+
+    def _merge_samples(self, samples):
+        for sample in samples:
+            self.inc(sample["value"], tuple(sample["labels"][name] for name in self.label_names))
+
+
+class Gauge(Counter):
+    """مقداری که تنظیم می‌شود (مثلا تعداد خوشه‌ها یا اندازه صف)؛ در ادغام مقدار جدید جایگزین می‌شود."""
+    kind = "gauge"
+
+    def set(self, value, labels=()):
+        with self._lock:
+            self._values[labels] = value
+
+    def _merge_samples(self, samples):
+        for sample in samples:
+            self.set(sample["value"], tuple(sample["labels"][name] for name in self.label_names))
+
+
+class Histogram(_Metric):
+    """هیستوگرام با مرزهای ثابت؛ برای هر مقدار برچسب‌ها تعداد هر بازه، جمع و تعداد نگه داشته می‌شود."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, labels=()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, labels=()):
+        """زمان اجرای بلوک with را (ثانیه) ثبت می‌کند."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, labels)
+
+    def count(self, labels=()):
+        state = self._values.get(labels)
+        return state[2] if state else 0
+
+    def sum(self, labels=()):
+        state = self._values.get(labels)
+        return state[1] if state else 0.0
+
+    def quantile(self, fraction, labels=()):
+        """تخمین صدک از روی بازه‌ها (مرز بالای بازه‌ای که صدک در آن است)، یا None بدون نمونه."""
+        state = self._values.get(labels)
+        if not state or not state[2]:
+            return None
+        rank = fraction * state[2]
+        cumulative = 0
+        for index, bucket_count in enumerate(state[0]):
+            cumulative += bucket_count
+            if cumulative >= rank and bucket_count:
+                return self.buckets[index] if index < len(self.buckets) else float('inf')
+        return float('inf')
+
+    def _samples(self):
+        return [{"labels": self._labels_dict(labels), "counts": list(counts), "sum": total, "count": count}
+                for labels, (counts, total, count) in self._values.items()]
+
+    def _merge_samples(self, samples):
+        for sample in samples:
+            labels = tuple(sample["labels"][name] for name in self.label_names)
+            with self._lock:
+                state = self._values.get(labels)
+                if state is None:
+                    state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                for index, bucket_count in enumerate(sample["counts"]):
+                    state[0][index] += bucket_count
+                state[1] += sample["sum"]
+                state[2] += sample["count"]
+
+
+class MetricsRegistry:
+    """مجموعه metric ها با نام یکتا. counter، gauge و histogram یک metric موجود را برمی‌گردانند یا می‌سازند."""
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'_metrics': self._metrics}
+
+    def __setstate__(self, state):
+        self._metrics = state['_metrics']
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, metric_class, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, *args, **kwargs)
+            elif type(metric) is not metric_class:
+                raise ValueError(f"metric {name} قبلا با نوع دیگری ({metric.kind}) ثبت شده است")
+            return metric
+
+    def counter(self, name, documentation, label_names=()):
+        return self._get_or_create(Counter, name, documentation, label_names)
+
+    def gauge(self, name, documentation, label_names=()):
+        return self._get_or_create(Gauge, name, documentation, label_names)
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, label_names, buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def reset(self, prefix=""):
+        """مقادیر metric هایی که نامشان با prefix شروع می‌شود صفر می‌شوند (خود metric ها باقی می‌مانند)."""
+        for name, metric in list(self._metrics.items()):
+            if name.startswith(prefix):
+                metric.reset()
+
+    def snapshot(self):
+        """وضعیت فعلی همه metric ها به صورت dict قابل تبدیل به JSON."""
+        result = {}
+        for name, metric in list(self._metrics.items()):
+            with metric._lock:
+                entry = {"type": metric.kind, "help": metric.documentation, "labels": list(metric.label_names),
+                         "samples": metric._samples()}
+            if metric.kind == "histogram":
+                entry["buckets"] = list(metric.buckets)
+            result[name] = entry
+        return result
+
+    def merge(self, snapshot):
+        """snapshot یک registry دیگر (مثلا پروسس کارگر) را به این registry اضافه می‌کند."""
+        for name, entry in snapshot.items():
+            if entry["type"] == "histogram":
+                metric = self.histogram(name, entry["help"], entry["labels"], entry["buckets"])
+            elif entry["type"] == "gauge":
+                metric = self.gauge(name, entry["help"], entry["labels"])
+            else:
+                metric = self.counter(name, entry["help"], entry["labels"])
+            metric._merge_samples(entry["samples"])
+
+    def exposition(self):
+        """متن همه metric ها در قالب exposition پرومتئوس (text/plain; version=0.0.4)."""
+        lines = []
+        for name, entry in sorted(self.snapshot().items()):
+            lines.append(f"# HELP {name} {_escape_help(entry['help'])}")
+            lines.append(f"# TYPE {name} {entry['type']}")
+            for sample in entry["samples"]:
+                labels = sample["labels"]
+                if entry["type"] != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(sample['value'])}")
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(entry["buckets"] + ["+Inf"], sample["counts"]):
+                    cumulative += bucket_count
+                    bucket_labels = dict(labels, le=bound if bound == "+Inf" else _format_value(bound))
+                    lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(sample['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {sample['count']}")
+        return "\n".join(lines) + "\n"
+
+    def summary_lines(self, prefix=""):
+        """خلاصه خوانا: مقدار شمارنده‌ها و تعداد، میانگین، p50 و p95 هیستوگرام‌ها (ثانیه‌ها به میلی‌ثانیه)."""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            if not name.startswith(prefix) or not metric._values:
+                continue
+            for labels in sorted(metric._values):
+                label_text = _format_labels(metric._labels_dict(labels))
+                if metric.kind != "histogram":
+                    lines.append(f"{name}{label_text} = {_format_value(metric._values[labels])}")
+                    continue
+                count = metric.count(labels)
+                lines.append(f"{name}{label_text}: n={count} mean={metric.sum(labels) / count * 1000:.2f}ms "
+                             f"p50<={metric.quantile(0.5, labels) * 1000:.1f}ms "
+                             f"p95<={metric.quantile(0.95, labels) * 1000:.1f}ms")
+        return lines
+
+
+def _escape_help(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        parts.append(f'{name}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if value == float('inf'):
+            return "+Inf"
+        return repr(value)
+    return str(value)
+
+
+# registry سراسری پروسس (خزنده)؛ پردازشگر متن برای هر ProcessingStats یک registry جدا دارد
+REGISTRY = MetricsRegistry()
+
+
+def write_exposition(path, registry=REGISTRY):
+    """متن exposition را (مثلا برای textfile collector) به صورت اتمیک در path می‌نویسد."""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(registry.exposition())
+    os.replace(temp_path, path)
+
+
+def start_metrics_server(port, registry=REGISTRY, host="127.0.0.1"):
+    """
+    یک سرور HTTP در thread جداگانه راه می‌اندازد: /metrics متن exposition و /metrics.json یک snapshot.
+    سرور را برمی‌گرداند (برای توقف: server.shutdown() و server.server_close()).
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                body = json.dumps(registry.snapshot(), ensure_ascii=False).encode('utf-8')
+                content_type = "application/json; charset=utf-8"
+            elif self.path.startswith("/metrics"):
+                body = registry.exposition().encode('utf-8')
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# --- لاگ ---
+
+# ویژگی‌های استاندارد LogRecord؛ بقیه ویژگی‌ها (از extra) در لاگ JSON به عنوان فیلد نوشته می‌شوند
+_STANDARD_RECORD_ATTRIBUTES = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+
+class JsonLogFormatter(logging.Formatter):
+    """هر رکورد لاگ را به یک خط JSON تبدیل می‌کند: زمان، سطح، لاگر، پیام و فیلدهای extra."""
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+_configured_handler = None
+
+
+def configure_logging(level="WARNING", json_format=False, stream=None):
+    """
+    سطح و قالب لاگ‌های seoran را تنظیم می‌کند (فراخوانی دوباره تنظیم قبلی را جایگزین می‌کند).
+    level یکی از DEBUG، INFO، WARNING، ERROR (یا عدد سطح logging) است.
+    """
+    global _configured_handler
+    logger = logging.getLogger(LOGGER_NAME)
+    if _configured_handler is not None:
+        logger.removeHandler(_configured_handler)
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonLogFormatter() if json_format else logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level if isinstance(level, int) else level.upper())
+    logger.propagate = False
+    _configured_handler = handler
+    return logger
+
+
+def get_logger(name):
+    """لاگر یک ماژول زیر لاگر اصلی seoran (مثلا get_logger("crawler") -> seoran.crawler)."""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
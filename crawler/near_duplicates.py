@@ -0,0 +1,139 @@
+# seoran/crawler/near_duplicates.py
+# سطح: تشخیص صفحات تقریبا تکراری (near-duplicate) با SimHash.
+#
+# سایت‌ها یک محتوا را زیر URL های زیادی منتشر می‌کنند (صفحات برچسب، صفحه‌بندی، پارامترهای مختلف).
+# برای هر سند یک اثر انگشت 64 بیتی SimHash از shingle های کلمات ساخته می‌شود؛ اسناد مشابه اثر انگشت‌هایی
+# با فاصله همینگ کم دارند. برای پیدا کردن سریع اسناد مشابه، اثر انگشت به NEAR_DUPLICATE_MAX_DISTANCE + 1
+# باند تقسیم می‌شود (LSH): دو اثر انگشت با فاصله حداکثر NEAR_DUPLICATE_MAX_DISTANCE حتما در دست کم یک باند
+# کاملا یکسان هستند، پس فقط اسناد هم‌باند مقایسه می‌شوند.
+#
+# این ماژول به Hazm وابسته نیست تا خزنده (روی متن اصلی صفحه) و پردازشگر متن (روی لیست توکن‌ها)
+# هر دو از آن استفاده کنند.
+
+import hashlib
+import re
+from collections import Counter
+
+SIMHASH_BITS = 64
+# تعداد کلمات هر shingle
+SHINGLE_SIZE = 3
+# حداکثر فاصله همینگ دو اثر انگشت تا تقریبا تکراری محسوب شوند
+NEAR_DUPLICATE_MAX_DISTANCE = 3
+# اسناد کوتاه‌تر از این (تعداد کلمه) اثر انگشت قابل اعتمادی ندارند و بررسی نمی‌شوند
+NEAR_DUPLICATE_MIN_TOKENS = 20
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def simhash(tokens, shingle_size=SHINGLE_SIZE):
+    """اثر انگشت SimHash یک لیست توکن (shingle های shingle_size کلمه‌ای با وزن تعداد تکرار)."""
+    if len(tokens) <= shingle_size:
+        shingles = Counter([" ".join(tokens)])
+    else:
+        shingles = Counter(" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1))
+    bit_weights = [0] * SIMHASH_BITS
+    total_weight = 0
+    for shingle, weight in shingles.items():
+        # هش پایدار (برخلاف hash() پایتون) تا اثر انگشت‌ها بین پروسس‌ها و اجراها قابل مقایسه باشند
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+        total_weight += weight
+        while value:
+            lowest_bit = value & -value
+            bit_weights[lowest_bit.bit_length() - 1] += weight
+            value ^= lowest_bit
+    fingerprint = 0
+    for bit, weight in enumerate(bit_weights):
+        # بیت در اثر انگشت یک است اگر وزن shingle هایی که این بیت را دارند از نصف بیشتر باشد
+        if 2 * weight > total_weight:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def tokens_fingerprint(tokens):
+    """اثر انگشت یک لیست توکن، یا None برای اسناد خیلی کوتاه."""
+    if len(tokens) < NEAR_DUPLICATE_MIN_TOKENS:
+        return None
+    return simhash(tokens)
+
+
+def text_fingerprint(text):
+    """اثر انگشت یک متن (مثلا متن اصلی استخراج شده صفحه)، یا None برای متن‌های خیلی کوتاه."""
+    return tokens_fingerprint(_WORD_RE.findall(text.lower())) if text else None
+
+
+def hamming_distance(first, second):
+    return bin(first ^ second).count('1')
+
+
+class NearDuplicateIndex:
+    """
+    ایندکس LSH اثر انگشت‌ها. فقط اولین سند هر خوشه (سند اصلی) ایندکس می‌شود و اسناد بعدی که به آن
+    نزدیک باشند تکراری آن سند محسوب می‌شوند. آمار خوشه‌ها و حجم صرفه‌جویی شده هم نگه داشته می‌شود.
+    """
+    def __init__(self, max_distance=NEAR_DUPLICATE_MAX_DISTANCE):
+        self.max_distance = max_distance
+        band_count = max_distance + 1
+        band_width = SIMHASH_BITS // band_count
+        self._bands = []  # (shift، mask) هر باند؛ آخرین باند بیت‌های باقیمانده را هم می‌گیرد
+        for band in range(band_count):
+            width = band_width if band < band_count - 1 else SIMHASH_BITS - band * band_width
+            self._bands.append((band * band_width, (1 << width) - 1))
+        self._tables = [{} for _ in self._bands]
+        self._fingerprints = {}  # کلید سند اصلی -> اثر انگشت
+        self.cluster_sizes = {}  # کلید سند اصلی -> تعداد تکراری‌ها
+        self.duplicate_count = 0
+        self.bytes_saved = 0
+
+    def _band_keys(self, fingerprint):
+        for table, (shift, mask) in zip(self._tables, self._bands):
+            yield table, (fingerprint >> shift) & mask
+
+    def find(self, fingerprint):
+        """کلید سند اصلی نزدیک به fingerprint، یا None."""
+        for table, band_key in self._band_keys(fingerprint):
+            for key in table.get(band_key, ()):
+                if hamming_distance(fingerprint, self._fingerprints[key]) <= self.max_distance:
+                    return key
+        return None
+
+    def insert(self, key, fingerprint):
+        """سند را بدون بررسی تکراری بودن به عنوان سند اصلی ایندکس می‌کند (مثلا اسناد اجرای قبلی)."""
+        self.discard(key)
+        self._fingerprints[key] = fingerprint
+        for table, band_key in self._band_keys(fingerprint):
+            table.setdefault(band_key, []).append(key)
+
+    def discard(self, key):
+        """سند اصلی را از ایندکس حذف می‌کند (مثلا وقتی محتوایش تغییر کرده است)."""
+        fingerprint = self._fingerprints.pop(key, None)
+        if fingerprint is None:
+            return
+        for table, band_key in self._band_keys(fingerprint):
+            keys = table[band_key]
+            keys.remove(key)
+            if not keys:
+                del table[band_key]
+
+    def add(self, key, fingerprint, size=0):
+        """
+        اگر سند تقریبا تکراری یک سند قبلی باشد کلید آن سند را برمی‌گرداند (size به حجم صرفه‌جویی شده
+        اضافه می‌شود)، وگرنه سند را ایندکس می‌کند و None برمی‌گرداند. اسناد بدون اثر انگشت بررسی نمی‌شوند.
+        """
+        if fingerprint is None:
+            return None
+        original = self.find(fingerprint)
+        if original is None or original == key:
+            self.insert(key, fingerprint)
+            return None
+        self.cluster_sizes[original] = self.cluster_sizes.get(original, 0) + 1
+        self.duplicate_count += 1
+        self.bytes_saved += size
+        return original
+
+    @property
+    def cluster_count(self):
+        """تعداد خوشه‌هایی که دست کم یک سند تکراری دارند."""
+        return len(self.cluster_sizes)
+
+    def __len__(self):
+        return len(self._fingerprints)
@@ -0,0 +1,39 @@
+# seoran/crawler/page_analysis.py
+# سطح: تحلیل یک‌باره صفحه. HTML فقط یک بار با BeautifulSoup/lxml پارس می‌شود و از همان DOM
+# هم لینک‌های خروجی و هم متن اصلی پاکسازی شده (همان خروجی extract_text_from_html_v2) به دست می‌آید.
+# تشخیص انکودینگ جدا و بدون ساختن DOM در encoding_detect.py انجام می‌شود.
+
+import os
+import sys
+from collections import namedtuple
+
+from bs4 import BeautifulSoup
+
+from link_extractor import extract_links_from_soup, extract_anchor_texts_from_soup
+
+# قواعد پاکسازی HTML در پوشه processor تعریف شده‌اند (بدون وابستگی به Hazm)
+PROCESSOR_MODULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "processor")
+if PROCESSOR_MODULES_DIR not in sys.path:
+    sys.path.append(PROCESSOR_MODULES_DIR)
+from html_cleaner import extract_text_from_soup  # noqa: E402
+
+PageAnalysis = namedtuple('PageAnalysis', ['links', 'main_text', 'anchor_texts'], defaults=(None,))
+
+
+def analyze_page(html_content, base_url, allowed_domains=None, with_main_text=True, with_anchor_texts=False):
+    """
+    صفحه را یک بار پارس می‌کند و PageAnalysis(links, main_text, anchor_texts) برمی‌گرداند.
+    لینک‌ها پیش از پاکسازی DOM استخراج می‌شوند (پاکسازی بخش‌هایی مانند nav را حذف می‌کند).
+    anchor_texts (URL -> متن لینک، برای خزش متمرکز) فقط با with_anchor_texts ساخته می‌شود.
+    """
+    if not html_content:
+        return PageAnalysis(set(), "", {} if with_anchor_texts else None)
+    soup = BeautifulSoup(html_content, 'lxml')
+    if with_anchor_texts:
+        anchor_texts = extract_anchor_texts_from_soup(soup, base_url, allowed_domains)
+        links = set(anchor_texts)
+    else:
+        anchor_texts = None
+        links = extract_links_from_soup(soup, base_url, allowed_domains)
+    main_text = extract_text_from_soup(soup) if with_main_text else None
+    return PageAnalysis(links, main_text, anchor_texts)
@@ -0,0 +1,250 @@
+# seoran/crawler/page_store.py
+# سطح: مخزن صفحات به صورت فایل‌های segment فقط-افزودنی (شبیه WARC) به جای یک فایل برای هر صفحه.
+#
+# قالب هر رکورد در فایل segment-NNNNN.seg:
+#   هدر ثابت: magic (4 بایت 'SRP1')، نوع فشرده‌سازی (1 بایت)، طول payload فشرده (4 بایت)
+#   payload فشرده: طول متادیتا (4 بایت) + متادیتای JSON (url، زمان دریافت، هدرها و در صورت وجود
+#   متن اصلی استخراج شده توسط تحلیل صفحه) + بدنه صفحه
+# هر رکورد جداگانه فشرده می‌شود تا دسترسی تصادفی ممکن باشد.
+#
+# فایل جانبی segment-NNNNN.idx برای هر رکورد یک ورودی ثابت 20 بایتی دارد:
+#   اثر انگشت URL (8 بایت)، offset (8 بایت)، طول کل رکورد (4 بایت)
+# رکوردها با mmap به صورت تصادفی یا به صورت جریانی (ترتیبی) خوانده می‌شوند.
+
+import glob
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+try:
+    import zstandard
+except ImportError:  # zstd اختیاری است؛ در نبود آن از zlib (gzip) استفاده می‌شود
+    zstandard = None
+
+from url_utils import url_fingerprint
+
+# --- پیکربندی ---
+SEGMENTS_DIRNAME = "segments"                # زیرپوشه مخزن داخل DOWNLOAD_DIR
+SEGMENT_MAX_BYTES = 256 * 1024 * 1024        # بعد از این اندازه segment جدید شروع می‌شود
+PAGE_STORE_COMPRESSION = "zstd" if zstandard else "gzip"
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+_RECORD_MAGIC = b"SRP1"
+_RECORD_HEADER = struct.Struct('<4sBI')
+_META_LENGTH = struct.Struct('<I')
+_INDEX_ENTRY = struct.Struct('<QQI')
+_COMPRESSION_CODES = {"none": 0, "gzip": 1, "zstd": 2}
+_SEGMENT_NAME_RE = re.compile(r'segment-(\d+)\.seg$')
+
+PageRecord = namedtuple('PageRecord', ['url', 'fetch_time', 'headers', 'body', 'extracted_text'],
+                        defaults=(None,))
+
+
+def _compress(data, codec):
+    if codec == 1:
+        return zlib.compress(data, GZIP_LEVEL)
+    if codec == 2:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return data
+
+
+def _decompress(data, codec):
+    if codec == 1:
+        return zlib.decompress(data)
+    if codec == 2:
+        if zstandard is None:
+            raise RuntimeError("برای خواندن رکوردهای zstd بسته zstandard لازم است.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return bytes(data)
+
+
+def _decode_record(buffer, offset):
+    """یک رکورد را از offset داده شده می‌خواند: (PageRecord، طول کل رکورد)."""
+    magic, codec, payload_length = _RECORD_HEADER.unpack_from(buffer, offset)
+    if magic != _RECORD_MAGIC:
+        raise ValueError(f"رکورد نامعتبر در offset {offset}")
+    start = offset + _RECORD_HEADER.size
+    payload = _decompress(buffer[start:start + payload_length], codec)
+    meta_length, = _META_LENGTH.unpack_from(payload, 0)
+    meta = json.loads(payload[_META_LENGTH.size:_META_LENGTH.size + meta_length].decode('utf-8'))
+    body = payload[_META_LENGTH.size + meta_length:]
+    record = PageRecord(meta['url'], meta['fetch_time'], meta.get('headers') or {}, body, meta.get('extracted_text'))
+    return record, _RECORD_HEADER.size + payload_length
+
+
+def _segment_paths(directory):
+    paths = []
+    for path in glob.glob(os.path.join(directory, "segment-*.seg")):
+        match = _SEGMENT_NAME_RE.search(path)
+        if match:
+            paths.append((int(match.group(1)), path))
+    return sorted(paths)
+
+
+class PageStoreWriter:
+    """
+    نویسنده فقط-افزودنی segment ها. هر نمونه یک segment جدید شروع می‌کند و
+    وقتی اندازه آن از segment_max_bytes گذشت به segment بعدی می‌رود. thread-safe است.
+    """
+    def __init__(self, directory, segment_max_bytes=SEGMENT_MAX_BYTES, compression=PAGE_STORE_COMPRESSION):
+        if compression not in _COMPRESSION_CODES:
+            raise ValueError(f"نوع فشرده‌سازی نامعتبر: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise RuntimeError("فشرده‌سازی zstd به بسته zstandard نیاز دارد.")
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self._codec = _COMPRESSION_CODES[compression]
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        existing = _segment_paths(directory)
+        self._segment_id = existing[-1][0] + 1 if existing else 0
+        self._segment_file = None
+        self._index_file = None
+        self._offset = 0
+
+    def _open_segment(self):
+        # چند پروسس (مثلا shard های خزنده توزیع شده) می‌توانند در یک پوشه بنویسند؛
+        # هر segment با ساخت انحصاری فایلش رزرو می‌شود
+        while True:
+            base = os.path.join(self.directory, f"segment-{self._segment_id:05d}")
+            try:
+                self._segment_file = open(base + ".seg", 'xb')
+                break
+            except FileExistsError:
+                self._segment_id += 1
+        self._index_file = open(base + ".idx", 'ab')
+        self._offset = self._segment_file.tell()
+
+    def _close_segment(self):
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._index_file.close()
+            self._segment_file = None
+            self._index_file = None
+
+    def append(self, url, body, headers=None, fetch_time=None, extracted_text=None):
+        """
+        یک صفحه را اضافه می‌کند و (شماره segment، offset، طول) را برمی‌گرداند.
+        body می‌تواند bytes یا str (که به UTF-8 تبدیل می‌شود) باشد.
+        """
+        if isinstance(body, str):
+            body = body.encode('utf-8', errors='replace')
+        meta = {
+            'url': url,
+            'fetch_time': fetch_time if fetch_time is not None else time.time(),
+            'headers': dict(headers) if headers else {},
+        }
+        if extracted_text is not None:
+            meta['extracted_text'] = extracted_text
+        meta = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+        payload = _compress(_META_LENGTH.pack(len(meta)) + meta + body, self._codec)
+        record = _RECORD_HEADER.pack(_RECORD_MAGIC, self._codec, len(payload)) + payload
+        fingerprint = url_fingerprint(url)
+
+        with self._lock:
+            if self._segment_file is None:
+                self._open_segment()
+            elif self._offset >= self.segment_max_bytes:
+                self._close_segment()
+                self._segment_id += 1
+                self._open_segment()
+            offset = self._offset
+            self._segment_file.write(record)
+            # ابتدا رکورد و سپس ورودی ایندکس نوشته می‌شود تا ایندکس هرگز به داده ناقص اشاره نکند
+            self._segment_file.flush()
+            self._index_file.write(_INDEX_ENTRY.pack(fingerprint, offset, len(record)))
+            self._index_file.flush()
+            self._offset += len(record)
+            return self._segment_id, offset, len(record)
+
+    def close(self):
+        with self._lock:
+            self._close_segment()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PageStoreReader:
+    """
+    خواننده مخزن segment ها: دسترسی تصادفی با URL از طریق ایندکس و mmap،
+    یا خواندن جریانی همه رکوردها به ترتیب نوشته شدن.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self._segments = dict(_segment_paths(directory))
+        self._maps = {}
+        self._index = {}
+        for segment_id in sorted(self._segments):
+            index_path = self._segments[segment_id][:-4] + ".idx"
+            if not os.path.exists(index_path):
+                continue
+            with open(index_path, 'rb') as f:
+                data = f.read()
+            usable = len(data) - len(data) % _INDEX_ENTRY.size
+            for fingerprint, offset, length in _INDEX_ENTRY.iter_unpack(data[:usable]):
+                # نسخه‌های جدیدتر یک URL (در segment های بعدی) جایگزین نسخه‌های قبلی می‌شوند
+                self._index[fingerprint] = (segment_id, offset, length)
+
+    def _map(self, segment_id):
+        segment_map = self._maps.get(segment_id)
+        if segment_map is None:
+            with open(self._segments[segment_id], 'rb') as f:
+                segment_map = self._maps[segment_id] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return segment_map
+
+    def get(self, url):
+        """آخرین نسخه ذخیره شده یک URL، یا None."""
+        location = self._index.get(url_fingerprint(url))
+        if location is None:
+            return None
+        segment_id, offset, _ = location
+        record, _ = _decode_record(self._map(segment_id), offset)
+        return record
+
+    def iter_records(self, latest_only=True):
+        """
+        همه رکوردها را به ترتیب segment و offset برمی‌گرداند. با latest_only نسخه‌های
+        قدیمی‌تر URL هایی که بعدا دوباره ذخیره شده‌اند حذف می‌شوند.
+        """
+        for segment_id in sorted(self._segments):
+            if os.path.getsize(self._segments[segment_id]) == 0:
+                continue
+            segment_map = self._map(segment_id)
+            offset = 0
+            end = len(segment_map)
+            while offset + _RECORD_HEADER.size <= end:
+                try:
+                    record, length = _decode_record(segment_map, offset)
+                except Exception:
+                    # انتهای ناقص segment (مثلا قطع برنامه هنگام نوشتن)
+                    break
+                if not latest_only or self._index.get(url_fingerprint(record.url), (None, None))[:2] == \
+                        (segment_id, offset):
+                    yield record
+                offset += length
+
+    def __iter__(self):
+        return self.iter_records()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, url):
+        return url_fingerprint(url) in self._index
+
+    def close(self):
+        for segment_map in self._maps.values():
+            segment_map.close()
+        self._maps = {}
@@ -0,0 +1,161 @@
+# seoran/crawler/rate_control.py
+# سطح: کنترل تطبیقی سرعت درخواست به ازای هر میزبان (به جای تاخیر ثابت و سراسری).
+#
+# برای هر میزبان یک تاخیر بین درخواست‌ها، میانگین متحرک (EWMA) زمان پاسخ و نرخ خطا نگه داشته می‌شود:
+#   پاسخ سالم و سریع:         تاخیر به تدریج کم می‌شود (ضرب در RATE_SPEEDUP_FACTOR) تا به کف تاخیر برسد
+#   پاسخ کند یا نرخ خطای بالا:  تاخیر کمی زیاد می‌شود (ضرب در RATE_SLOWDOWN_FACTOR)
+#   429، 503 یا Timeout:       عقب‌نشینی نمایی (ضرب در RATE_BACKOFF_FACTOR) و مکث میزبان به اندازه تاخیر
+#                              جدید یا Retry-After سرور (هر کدام بیشتر باشد)
+# کف تاخیر هر میزبان بیشترِ min_delay و RATE_LATENCY_MULTIPLE برابر میانگین زمان پاسخ آن است، پس سرورهای
+# کند هیچ وقت با سرعت سرورهای سریع خزش نمی‌شوند.
+#
+# URL هایی که با خطای گذرا (429، 5xx، Timeout یا خطای اتصال) دانلود نشده‌اند حداکثر MAX_FETCH_RETRIES بار
+# دوباره به صف برمی‌گردند. زمان‌بندی خود درخواست‌ها همچنان با Frontier است (set_host_delay / defer_host).
+
+import time
+from email.utils import parsedate_to_datetime
+
+# --- پیکربندی ---
+RATE_MIN_DELAY = 0.25         # کمترین تاخیر بین دو درخواست به یک میزبان (سقف سرعت، ثانیه)
+RATE_MAX_DELAY = 60.0         # بیشترین تاخیر پس از عقب‌نشینی‌های پشت سر هم (ثانیه)
+RATE_SPEEDUP_FACTOR = 0.9     # ضریب کاهش تاخیر پس از هر پاسخ سالم
+RATE_SLOWDOWN_FACTOR = 1.25   # ضریب افزایش تاخیر وقتی پاسخ‌ها کند یا خطادار هستند
+RATE_BACKOFF_FACTOR = 2.0     # ضریب عقب‌نشینی نمایی برای 429، 503 و Timeout
+RATE_BACKOFF_MIN_DELAY = 1.0  # تاخیر پس از اولین عقب‌نشینی، حتی اگر تاخیر قبلی کمتر (یا صفر) بوده باشد
+RATE_LATENCY_TARGET = 2.0     # میانگین زمان پاسخ بیشتر از این (ثانیه) یعنی سرور تحت فشار است
+RATE_LATENCY_MULTIPLE = 2.0   # تاخیر هر میزبان کمتر از این ضریب میانگین زمان پاسخ آن نمی‌شود
+RATE_ERROR_THRESHOLD = 0.25   # نرخ خطای بیشتر از این یعنی سرور تحت فشار است
+RATE_EWMA_WEIGHT = 0.2        # وزن آخرین پاسخ در میانگین‌های متحرک
+RATE_MAX_RETRY_AFTER = 600.0  # Retry-After طولانی‌تر از این (ثانیه) کوتاه می‌شود تا خزش متوقف نماند
+
+# حداکثر تعداد تلاش دوباره برای URL هایی که با خطای گذرا دانلود نشده‌اند
+MAX_FETCH_RETRIES = 3
+
+# نتیجه یک درخواست از دید کنترل سرعت
+OK, ERROR, THROTTLED = "ok", "error", "throttled"
+
+THROTTLE_STATUS_CODES = frozenset((429, 503))
+TRANSIENT_STATUS_CODES = frozenset((500, 502, 504))
+
+
+def classify_response(response_info):
+    """
+    نتیجه یک درخواست بر اساس response_info پر شده توسط fetch_page: THROTTLED برای 429، 503 و Timeout،
+    ERROR برای 5xx گذرا و خطای اتصال، و OK برای هر پاسخ دیگر (از جمله 404 و 403 که مشکل سرور نیستند).
+    """
+    error = response_info.get('error')
+    if error == 'timeout':
+        return THROTTLED
+    if error is not None:
+        return ERROR
+    status_code = response_info.get('status_code')
+    if status_code in THROTTLE_STATUS_CODES:
+        return THROTTLED
+    if status_code in TRANSIENT_STATUS_CODES:
+        return ERROR
+    return OK
+
+
+def parse_retry_after(value):
+    """
+    مقدار هدر Retry-After (تعداد ثانیه یا تاریخ HTTP) به ثانیه، یا None اگر قابل تشخیص نباشد.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return None
+        if retry_at is None or retry_at.tzinfo is None:
+            return None
+        seconds = retry_at.timestamp() - time.time()
+    return min(max(0.0, seconds), RATE_MAX_RETRY_AFTER)
+
+
+class _HostRate:
+    __slots__ = ('delay', 'latency', 'error_rate')
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.latency = None       # میانگین متحرک زمان پاسخ (ثانیه)
+        self.error_rate = 0.0     # میانگین متحرک سهم پاسخ‌های خطا/محدود شده
+
+
+class HostRateControl:
+    """
+    تاخیر تطبیقی هر میزبان و شمارش تلاش‌های دوباره هر URL.
+    initial_delay تاخیر شروع هر میزبان است؛ کف تاخیر کمترِ min_delay و initial_delay است (initial_delay=0
+    یعنی بدون تاخیر تا وقتی که سرور اعلام فشار کند). متدها thread-safe نیستند و باید از حلقه خزش صدا زده شوند.
+    """
+    def __init__(self, initial_delay, min_delay=RATE_MIN_DELAY, max_delay=RATE_MAX_DELAY,
+                 max_retries=MAX_FETCH_RETRIES):
+        self.initial_delay = initial_delay
+        self.min_delay = min(min_delay, initial_delay)
+        self.max_delay = max(max_delay, initial_delay)
+        self.max_retries = max_retries
+        self._hosts = {}
+        self._retries = {}  # URL -> تعداد تلاش‌های دوباره تا کنون
+        self.backoff_count = 0
+        self.retry_count = 0
+
+    def delay(self, host):
+        rate = self._hosts.get(host)
+        return self.initial_delay if rate is None else rate.delay
+
+    def observe(self, host, response_info, now=None):
+        """
+        نتیجه یک درخواست به host را ثبت می‌کند. (نتیجه، تاخیر جدید، زمان مکث) را برمی‌گرداند؛ زمان مکث
+        (time.monotonic) فقط پس از عقب‌نشینی تعیین می‌شود و میزبان تا آن زمان نباید درخواستی بگیرد.
+        """
+        rate = self._hosts.get(host)
+        if rate is None:
+            rate = self._hosts[host] = _HostRate(self.initial_delay)
+        outcome = classify_response(response_info)
+        weight = RATE_EWMA_WEIGHT
+        rate.error_rate += weight * ((outcome != OK) - rate.error_rate)
+        latency = response_info.get('latency')
+        if latency is not None and outcome != THROTTLED:
+            rate.latency = latency if rate.latency is None else rate.latency + weight * (latency - rate.latency)
+
+        pause_until = None
+        if outcome == THROTTLED:
+            self.backoff_count += 1
+            rate.delay = min(self.max_delay, max(rate.delay * RATE_BACKOFF_FACTOR, RATE_BACKOFF_MIN_DELAY))
+            pause = rate.delay
+            retry_after = parse_retry_after(response_info.get('retry_after'))
+            if retry_after is not None:
+                pause = max(pause, retry_after)
+            pause_until = (time.monotonic() if now is None else now) + pause
+        elif (outcome == ERROR or rate.error_rate > RATE_ERROR_THRESHOLD
+              or (rate.latency is not None and rate.latency > RATE_LATENCY_TARGET)):
+            rate.delay = min(self.max_delay, max(rate.delay * RATE_SLOWDOWN_FACTOR, self.min_delay))
+        else:
+            rate.delay *= RATE_SPEEDUP_FACTOR
+
+        floor = self.min_delay
+        if rate.latency is not None:
+            floor = max(floor, min(self.max_delay, rate.latency * RATE_LATENCY_MULTIPLE))
+        rate.delay = max(rate.delay, floor)
+        return outcome, rate.delay, pause_until
+
+    def retry(self, url):
+        """آیا URL دانلود نشده باید دوباره به صف برگردد؟ (هر URL حداکثر max_retries بار)"""
+        attempts = self._retries.get(url, 0)
+        if attempts >= self.max_retries:
+            self._retries.pop(url, None)
+            return False
+        self._retries[url] = attempts + 1
+        self.retry_count += 1
+        return True
+
+    def forget(self, url):
+        """پایان کار URL (دانلود موفق یا خطای غیر گذرا)؛ شمارنده تلاش‌هایش پاک می‌شود."""
+        if self._retries:
+            self._retries.pop(url, None)
+
+    def host_delays(self):
+        return {host: rate.delay for host, rate in self._hosts.items()}
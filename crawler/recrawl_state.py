@@ -0,0 +1,102 @@
+# seoran/crawler/recrawl_state.py
+# سطح: وضعیت خزش افزایشی. برای هر URL مقدار ETag، Last-Modified، هش بدنه، لینک‌های خروجی
+# و فاصله تطبیقی خزش مجدد در یک پایگاه داده SQLite نگه داشته می‌شود.
+#
+# فاصله خزش مجدد هر URL با تغییر صفحه نصف و با عدم تغییر 1.5 برابر می‌شود
+# (بین MIN_RECRAWL_INTERVAL و MAX_RECRAWL_INTERVAL).
+
+import hashlib
+import sqlite3
+import time
+
+# --- پیکربندی ---
+RECRAWL_STATE_FILENAME = "recrawl_state.sqlite"  # داخل DOWNLOAD_DIR خزنده
+DEFAULT_RECRAWL_INTERVAL = 24 * 3600       # یک روز
+MIN_RECRAWL_INTERVAL = 3600                # یک ساعت
+MAX_RECRAWL_INTERVAL = 30 * 24 * 3600      # سی روز
+RECRAWL_BACKOFF_FACTOR = 1.5               # ضریب افزایش فاصله برای صفحات بدون تغییر
+
+
+def content_hash(html_content):
+    """هش بدنه صفحه برای تشخیص تغییر محتوا (وقتی سرور ETag/Last-Modified نمی‌دهد)."""
+    return hashlib.blake2b(html_content.encode('utf-8', errors='replace'), digest_size=16).hexdigest()
+
+
+class RecrawlState:
+    """
+    نگهداری وضعیت آخرین دریافت هر URL برای درخواست‌های شرطی و زمان‌بندی خزش مجدد.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT,
+                links TEXT,
+                fetched_at REAL,
+                next_due REAL,
+                interval REAL,
+                fetch_count INTEGER,
+                change_count INTEGER
+            )""")
+        self._db.commit()
+
+    def get(self, url):
+        row = self._db.execute(
+            "SELECT etag, last_modified, body_hash, links, fetched_at, next_due, interval, fetch_count, change_count "
+            "FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        keys = ('etag', 'last_modified', 'body_hash', 'links', 'fetched_at', 'next_due', 'interval',
+                'fetch_count', 'change_count')
+        record = dict(zip(keys, row))
+        record['links'] = record['links'].split('\n') if record['links'] else []
+        return record
+
+    @staticmethod
+    def is_due(record, now=None):
+        return record is None or (now if now is not None else time.time()) >= record['next_due']
+
+    @staticmethod
+    def conditional_headers(record):
+        """هدرهای If-None-Match و If-Modified-Since برای درخواست شرطی."""
+        headers = {}
+        if record:
+            if record['etag']:
+                headers['If-None-Match'] = record['etag']
+            if record['last_modified']:
+                headers['If-Modified-Since'] = record['last_modified']
+        return headers
+
+    def record_unchanged(self, url, record, etag=None, last_modified=None, now=None):
+        """صفحه تغییری نکرده است (304 یا هش یکسان): فاصله خزش مجدد بیشتر می‌شود."""
+        now = now if now is not None else time.time()
+        interval = min(MAX_RECRAWL_INTERVAL, record['interval'] * RECRAWL_BACKOFF_FACTOR)
+        self._db.execute(
+            "UPDATE pages SET etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified), "
+            "fetched_at = ?, next_due = ?, interval = ?, fetch_count = fetch_count + 1 WHERE url = ?",
+            (etag, last_modified, now, now + interval, interval, url))
+
+    def record_changed(self, url, record, etag, last_modified, body_hash, links, now=None):
+        """صفحه جدید است یا تغییر کرده است: فاصله خزش مجدد کمتر می‌شود."""
+        now = now if now is not None else time.time()
+        if record is None:
+            interval, fetch_count, change_count = DEFAULT_RECRAWL_INTERVAL, 1, 0
+        else:
+            interval = max(MIN_RECRAWL_INTERVAL, record['interval'] / 2)
+            fetch_count, change_count = record['fetch_count'] + 1, record['change_count'] + 1
+        self._db.execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, etag, last_modified, body_hash, '\n'.join(links), now, now + interval, interval,
+             fetch_count, change_count))
+
+    def commit(self):
+        self._db.commit()
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
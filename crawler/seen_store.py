@@ -0,0 +1,219 @@
+# seoran/crawler/seen_store.py
+# سطح: مخزن فشرده URL های دیده شده به جای set رشته‌ها.
+#
+# دو حالت:
+#   exact: اثر انگشت‌های 64 بیتی در یک جدول درهم‌سازی با آدرس‌دهی باز روی array('Q')
+#          (حدود 16 تا 27 بایت برای هر URL به جای صدها بایت برای شیء رشته).
+#   bloom: فیلتر Bloom با نرخ مثبت کاذب قابل تنظیم (چند بیت برای هر URL)؛
+#          ممکن است تعداد کمی URL جدید به اشتباه دیده شده فرض شوند.
+# هر دو حالت بررسی دسته‌ای لینک‌های یک صفحه و ذخیره/بازیابی از دیسک را پشتیبانی می‌کنند.
+
+import math
+import struct
+from array import array
+
+from url_utils import url_fingerprint
+
+# --- پیکربندی ---
+SEEN_STORE_MODE = "exact"          # "exact" یا "bloom"
+SEEN_STORE_CAPACITY = 10_000_000   # تعداد مورد انتظار URL ها (برای اندازه فیلتر Bloom)
+SEEN_STORE_ERROR_RATE = 0.001      # نرخ مثبت کاذب فیلتر Bloom
+
+_EXACT_MAGIC = b"SEENEX01"
+_BLOOM_MAGIC = b"SEENBL01"
+_MAX_LOAD_FACTOR = 0.6
+
+
+class ExactSeenStore:
+    """
+    مجموعه دقیق اثر انگشت‌های 64 بیتی URL ها با probing خطی.
+    مقدار 0 نشانه خانه خالی است؛ اثر انگشت 0 به 1 نگاشت می‌شود.
+    """
+    mode = "exact"
+
+    def __init__(self, initial_capacity=1 << 16):
+        capacity = 1
+        while capacity < initial_capacity:
+            capacity <<= 1
+        self._table = array('Q', bytes(8 * capacity))
+        self._mask = capacity - 1
+        self._count = 0
+
+    def _insert_fingerprint(self, fp):
+        table = self._table
+        mask = self._mask
+        i = fp & mask
+        while True:
+            slot = table[i]
+            if slot == 0:
+                table[i] = fp
+                self._count += 1
+                return True
+            if slot == fp:
+                return False
+            i = (i + 1) & mask
+
+    def _contains_fingerprint(self, fp):
+        table = self._table
+        mask = self._mask
+        i = fp & mask
+        while True:
+            slot = table[i]
+            if slot == fp:
+                return True
+            if slot == 0:
+                return False
+            i = (i + 1) & mask
+
+    def _grow(self):
+        old_table = self._table
+        self._table = array('Q', bytes(16 * len(old_table)))
+        self._mask = len(self._table) - 1
+        self._count = 0
+        for fp in old_table:
+            if fp:
+                self._insert_fingerprint(fp)
+
+    def add(self, url):
+        """URL را اضافه می‌کند؛ اگر قبلا دیده نشده بود True برمی‌گرداند."""
+        if self._count + 1 > _MAX_LOAD_FACTOR * len(self._table):
+            self._grow()
+        return self._insert_fingerprint(url_fingerprint(url) or 1)
+
+    def add_many(self, urls):
+        """همه URL ها را اضافه می‌کند و فهرست URL هایی که جدید بودند (به همان ترتیب) را برمی‌گرداند."""
+        return [url for url in urls if self.add(url)]
+
+    def contains_many(self, urls):
+        return [self._contains_fingerprint(url_fingerprint(url) or 1) for url in urls]
+
+    def __contains__(self, url):
+        return self._contains_fingerprint(url_fingerprint(url) or 1)
+
+    def __len__(self):
+        return self._count
+
+    def memory_bytes(self):
+        return self._table.itemsize * len(self._table)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(_EXACT_MAGIC)
+            f.write(struct.pack('<QQ', len(self._table), self._count))
+            self._table.tofile(f)
+
+    @classmethod
+    def _read(cls, f):
+        capacity, count = struct.unpack('<QQ', f.read(16))
+        store = cls.__new__(cls)
+        store._table = array('Q')
+        store._table.fromfile(f, capacity)
+        store._mask = capacity - 1
+        store._count = count
+        return store
+
+
+class BloomSeenStore:
+    """
+    فیلتر Bloom برای URL های دیده شده. k اندیس بیت با درهم‌سازی دوگانه از اثر انگشت 64 بیتی
+    ساخته می‌شود، پس برای هر URL فقط یک بار درهم‌سازی انجام می‌شود.
+    """
+    mode = "bloom"
+
+    def __init__(self, capacity=SEEN_STORE_CAPACITY, error_rate=SEEN_STORE_ERROR_RATE):
+        if not 0 < error_rate < 1:
+            raise ValueError(f"error_rate باید بین 0 و 1 باشد: {error_rate}")
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bit_count = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self._hash_count = max(1, round(self._bit_count / capacity * math.log(2)))
+        self._bits = bytearray((self._bit_count + 7) // 8)
+        self._count = 0
+
+    def _positions(self, fp):
+        h1 = fp & 0xFFFFFFFF
+        h2 = (fp >> 32) | 1
+        m = self._bit_count
+        return [(h1 + i * h2) % m for i in range(self._hash_count)]
+
+    def add(self, url):
+        """URL را اضافه می‌کند؛ اگر (تا جایی که فیلتر می‌داند) جدید بود True برمی‌گرداند."""
+        bits = self._bits
+        is_new = False
+        for pos in self._positions(url_fingerprint(url)):
+            byte_index = pos >> 3
+            mask = 1 << (pos & 7)
+            if not bits[byte_index] & mask:
+                bits[byte_index] |= mask
+                is_new = True
+        if is_new:
+            self._count += 1
+        return is_new
+
+    def add_many(self, urls):
+        return [url for url in urls if self.add(url)]
+
+    def _contains_fingerprint(self, fp):
+        bits = self._bits
+        for pos in self._positions(fp):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def contains_many(self, urls):
+        return [self._contains_fingerprint(url_fingerprint(url)) for url in urls]
+
+    def __contains__(self, url):
+        return self._contains_fingerprint(url_fingerprint(url))
+
+    def __len__(self):
+        # تعداد تقریبی: افزودن‌هایی که فیلتر جدید تشخیص داده است
+        return self._count
+
+    def memory_bytes(self):
+        return len(self._bits)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(_BLOOM_MAGIC)
+            f.write(struct.pack('<QQQQd', self.capacity, self._bit_count, self._hash_count, self._count,
+                                self.error_rate))
+            f.write(self._bits)
+
+    @classmethod
+    def _read(cls, f):
+        capacity, bit_count, hash_count, count, error_rate = struct.unpack('<QQQQd', f.read(40))
+        store = cls.__new__(cls)
+        store.capacity = capacity
+        store.error_rate = error_rate
+        store._bit_count = bit_count
+        store._hash_count = hash_count
+        store._count = count
+        store._bits = bytearray(f.read((bit_count + 7) // 8))
+        return store
+
+
+def create_seen_store(mode=None, capacity=None, error_rate=None):
+    """
+    مخزن URL های دیده شده را بر اساس حالت پیکربندی شده می‌سازد.
+    """
+    mode = mode or SEEN_STORE_MODE
+    if mode == "exact":
+        return ExactSeenStore()
+    if mode == "bloom":
+        return BloomSeenStore(capacity or SEEN_STORE_CAPACITY, error_rate or SEEN_STORE_ERROR_RATE)
+    raise ValueError(f"حالت نامعتبر برای مخزن URL های دیده شده: {mode}")
+
+
+def load_seen_store(path):
+    """
+    مخزنی را که با save ذخیره شده است (از هر دو حالت) بازیابی می‌کند.
+    """
+    with open(path, 'rb') as f:
+        magic = f.read(8)
+        if magic == _EXACT_MAGIC:
+            return ExactSeenStore._read(f)
+        if magic == _BLOOM_MAGIC:
+            return BloomSeenStore._read(f)
+    raise ValueError(f"فایل {path} یک مخزن URL دیده شده معتبر نیست.")
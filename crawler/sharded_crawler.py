@@ -0,0 +1,440 @@
+# seoran/crawler/sharded_crawler.py
+# سطح: خزش توزیع شده با چند پروسس (روی یک یا چند ماشین) که هر کدام مالک بخشی از میزبان‌ها هستند.
+#
+# میزبان هر URL با یک هش پایدار به یکی از shard ها نسبت داده می‌شود. هر shard صف (Frontier)، مجموعه
+# URL های دیده شده و ایندکس تکراری‌های خودش را فقط برای میزبان‌های خودش نگه می‌دارد، پس هیچ پروسسی صف
+# یا مجموعه دیده شده کامل را ندارد و ادب هر میزبان (تاخیر تطبیقی، 429 و Retry-After) بدون هماهنگی رعایت می‌شود.
+# لینک‌هایی که به میزبان‌های shard های دیگر می‌رسند در صف ارسال جمع و دسته‌ای برای shard مالک فرستاده
+# می‌شوند (صف مالک تکراری‌ها را حذف می‌کند).
+#
+# هماهنگ‌کننده (CrawlCoordinator) با multiprocessing.managers در یک پروسس جدا اجرا می‌شود و از طریق
+# شبکه در دسترس است: صف دریافت هر shard، بودجه سراسری صفحات (max_pages؛ shard ها آن را به صورت دسته‌های
+# کوچک اجاره می‌کنند)، تشخیص پایان خزش و جمع‌آوری آمار و metrics همه shard ها.
+# صف‌های داخل هماهنگ‌کننده جایگزین یک صف پیام واقعی (مثل Redis یا Kafka) هستند.
+#
+# اجرا روی یک ماشین: crawl_website_sharded(...) هماهنگ‌کننده و shard ها را به صورت پروسس‌های محلی اجرا می‌کند.
+# اجرا روی چند ماشین (همه با یک SEORAN_AUTHKEY):
+#   python sharded_crawler.py coordinator --start-url URL --shards 4 --max-pages 1000 --port 5700
+#   python sharded_crawler.py worker --shard 0 --coordinator HOST:5700     (برای هر shard روی ماشین دلخواه)
+
+import argparse
+import collections
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from multiprocessing.managers import BaseManager
+from urllib.parse import urlsplit
+
+import validators
+
+import crawler
+from crawler import (
+    fetch_page, store_page, close_page_store, close_http_session, find_near_duplicate, analyze_fetched_page,
+    create_rate_control, record_fetch_result, start_focus, logger, PAGES,
+)
+from frontier import Frontier
+from link_extractor import domain_matcher
+from metrics import REGISTRY, MetricsRegistry, configure_logging
+from near_duplicates import NearDuplicateIndex
+from seen_store import create_seen_store
+from url_utils import canonicalize_url
+
+# --- پیکربندی ---
+SHARD_COUNT = 4
+COORDINATOR_PORT = 5700
+# کلید احراز هویت اتصال shard ها به هماهنگ‌کننده (برای اجرای چند ماشینی حتما تغییر داده شود)
+COORDINATOR_AUTHKEY = os.environ.get("SEORAN_AUTHKEY", "seoran-crawl").encode('utf-8')
+# حداکثر تعداد لینک هر دسته ارسالی به shard دیگر
+EXCHANGE_BATCH_SIZE = 500
+# فاصله (ثانیه) ارسال دسته‌های ناقص و بررسی صف دریافت وقتی shard مشغول است
+EXCHANGE_INTERVAL = 0.1
+# تعداد صفحاتی که هر shard در هر درخواست از بودجه سراسری اجاره می‌کند
+BUDGET_LEASE = 4
+# حداکثر زمان انتظار shard بیکار برای پیام جدید (ثانیه)
+IDLE_WAIT = 0.5
+
+
+def shard_for_host(host, shard_count):
+    """shard مالک یک میزبان (هش پایدار، مستقل از پروسس و ماشین)."""
+    digest = hashlib.blake2b(host.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') % shard_count
+
+
+def shard_for_url(url, shard_count):
+    return shard_for_host(urlsplit(url).netloc, shard_count)
+
+
+class CrawlCoordinator:
+    """
+    وضعیت مشترک همه shard ها. همه متدها thread-safe هستند (سرور manager هر اتصال را در یک thread سرویس می‌دهد).
+    هر shard در حال کار «فعال» است و وقتی چیزی برای انجام ندارد با wait اعلام بیکاری می‌کند. خزش وقتی تمام
+    است که همه shard ها بیکار و همه صف‌ها خالی باشند (یا بودجه صفحات تمام شده باشد)؛ چون دریافت پیام و فعال
+    شدن shard در یک عمل اتمی انجام می‌شود، هیچ پیامی در راه جا نمی‌ماند.
+    """
+    def __init__(self, shard_count, max_pages, config):
+        self.shard_count = shard_count
+        self.max_pages = max_pages
+        self._config = dict(config, shard_count=shard_count, max_pages=max_pages)
+        self._condition = threading.Condition()
+        self._inboxes = [collections.deque() for _ in range(shard_count)]
+        self._active = [False] * shard_count
+        self._pending = [0] * shard_count   # اندازه صف هر shard در آخرین اعلام بیکاری
+        self._stopped = set()               # shard هایی که کارشان تمام شده (یا با خطا متوقف شده‌اند)
+        self._granted = 0                   # صفحات اجاره داده شده (منهای اجاره‌های برگشتی)
+        self._exchanged = 0
+        self._shard_stats = {}
+        self._metrics = MetricsRegistry()
+
+    def config(self):
+        return self._config
+
+    def _finished(self):
+        if any(self._active) or any(self._inboxes):
+            return False
+        return self._granted >= self.max_pages or not any(self._pending)
+
+    def finished(self):
+        with self._condition:
+            return self._finished()
+
+    def send(self, shard, batch):
+        """یک دسته (url، عمق) به صف دریافت shard اضافه می‌کند."""
+        with self._condition:
+            if shard in self._stopped:
+                return
+            self._inboxes[shard].append(batch)
+            self._exchanged += len(batch)
+            self._condition.notify_all()
+
+    def _drain(self, shard):
+        inbox = self._inboxes[shard]
+        batches = list(inbox)
+        inbox.clear()
+        return batches
+
+    def receive(self, shard):
+        """دسته‌های رسیده به shard (بدون انتظار). shard فراخواننده فعال محسوب می‌شود."""
+        with self._condition:
+            self._active[shard] = True
+            return self._drain(shard)
+
+    def wait(self, shard, pending, timeout=IDLE_WAIT):
+        """
+        shard بیکار است (pending: تعداد URL های صفش که به دلیل تمام شدن بودجه منتظر مانده‌اند). تا رسیدن
+        پیام، آزاد شدن بودجه یا پایان خزش (حداکثر timeout ثانیه) صبر می‌کند و (دسته‌ها، پایان خزش) را برمی‌گرداند.
+        """
+        with self._condition:
+            self._active[shard] = False
+            self._pending[shard] = pending
+            self._condition.notify_all()
+            self._condition.wait_for(
+                lambda: self._inboxes[shard] or self._finished() or (pending and self._granted < self.max_pages),
+                timeout)
+            if self._finished():
+                return [], True
+            batches = self._drain(shard)
+            self._active[shard] = True
+            return batches, False
+
+    def acquire(self, shard, count=BUDGET_LEASE):
+        """حداکثر count صفحه از بودجه سراسری اجاره می‌دهد و تعداد اجاره داده شده را برمی‌گرداند."""
+        with self._condition:
+            granted = max(0, min(count, self.max_pages - self._granted))
+            self._granted += granted
+            return granted
+
+    def release(self, shard, count):
+        """اجاره استفاده نشده را برمی‌گرداند."""
+        with self._condition:
+            self._granted -= count
+            self._condition.notify_all()
+
+    def finish(self, shard, stats, metrics_snapshot):
+        """
+        آمار و metrics نهایی یک shard. پس از آن shard بیکار محسوب و پیام‌هایش دور ریخته می‌شوند تا توقف
+        یک shard با خطا بقیه را منتظر نگه ندارد.
+        """
+        with self._condition:
+            self._shard_stats[shard] = stats
+            self._metrics.merge(metrics_snapshot)
+            self._stopped.add(shard)
+            self._active[shard] = False
+            self._pending[shard] = 0
+            self._inboxes[shard].clear()
+            self._condition.notify_all()
+
+    def summary(self):
+        with self._condition:
+            return {'pages': self._granted, 'exchanged_links': self._exchanged,
+                    'shards': dict(self._shard_stats), 'metrics': self._metrics.snapshot()}
+
+
+_coordinator = None
+
+
+def _init_coordinator(shard_count, max_pages, config):
+    global _coordinator
+    _coordinator = CrawlCoordinator(shard_count, max_pages, config)
+
+
+def _get_coordinator():
+    return _coordinator
+
+
+class CoordinatorManager(BaseManager):
+    pass
+
+
+CoordinatorManager.register('coordinator', callable=_get_coordinator)
+
+
+def start_coordinator(shard_count, max_pages, config, address=("127.0.0.1", 0), authkey=None):
+    """
+    هماهنگ‌کننده را در یک پروسس جدا راه‌اندازی می‌کند. manager را برمی‌گرداند (manager.address نشانی واقعی
+    است و manager.coordinator() پراکسی هماهنگ‌کننده؛ در پایان manager.shutdown()).
+    """
+    manager = CoordinatorManager(address=address, authkey=authkey or COORDINATOR_AUTHKEY,
+                                 ctx=multiprocessing.get_context('fork'))
+    manager.start(initializer=_init_coordinator, initargs=(shard_count, max_pages, config))
+    return manager
+
+
+def connect_coordinator(address, authkey=None):
+    """پراکسی هماهنگ‌کننده‌ای که روی address (میزبان، پورت) اجرا می‌شود."""
+    manager = CoordinatorManager(address=address, authkey=authkey or COORDINATOR_AUTHKEY)
+    manager.connect()
+    return manager.coordinator()
+
+
+def run_shard(shard, address, authkey=None):
+    """
+    حلقه خزش یک shard: URL های میزبان‌های خودش را دانلود می‌کند و لینک‌های میزبان‌های دیگر را
+    به shard مالکشان می‌فرستد. آمار shard را برمی‌گرداند.
+    """
+    coordinator = connect_coordinator(address, authkey)
+    config = coordinator.config()
+    shard_count = config['shard_count']
+    max_depth = config['max_depth']
+    crawler.ALLOWED_DOMAINS = config['allowed_domains']
+    allowed = domain_matcher(crawler.ALLOWED_DOMAINS)
+
+    configure_logging(crawler.LOG_LEVEL, crawler.LOG_JSON)
+    REGISTRY.reset("crawler_")
+    crawler.near_duplicate_index = NearDuplicateIndex()
+    # خزش متمرکز در shard ها استفاده نمی‌شود: لینک‌ها بین shard ها با عمقشان (BFS) ارسال می‌شوند
+    start_focus(False)
+    frontier = Frontier(host_delay=config['host_delay'])
+    rate_control = create_rate_control(config['host_delay'], config['adaptive_rate'])
+    seen_urls = create_seen_store()
+    outboxes = [[] for _ in range(shard_count)]
+    host_shards = {}
+    stats = {'pages': 0, 'links_sent': 0, 'links_received': 0}
+    lease = 0
+
+    def accept(batches):
+        for batch in batches:
+            stats['links_received'] += len(batch)
+            for url, depth in batch:
+                if seen_urls.add(url):
+                    frontier.push(url, priority=depth)
+
+    def flush(owner):
+        if outboxes[owner]:
+            coordinator.send(owner, outboxes[owner])
+            stats['links_sent'] += len(outboxes[owner])
+            outboxes[owner] = []
+
+    def flush_all():
+        for owner in range(shard_count):
+            flush(owner)
+
+    def route(links, depth):
+        local_links = []
+        for link in links:
+            host = urlsplit(link).netloc
+            if host not in allowed:
+                continue
+            owner = host_shards.get(host)
+            if owner is None:
+                owner = host_shards[host] = shard_for_host(host, shard_count)
+            if owner == shard:
+                local_links.append(link)
+            else:
+                outboxes[owner].append((link, depth))
+                if len(outboxes[owner]) >= EXCHANGE_BATCH_SIZE:
+                    flush(owner)
+        for link in seen_urls.add_many(local_links):
+            frontier.push(link, priority=depth)
+
+    next_exchange = 0.0
+    try:
+        while True:
+            now = time.monotonic()
+            if now >= next_exchange:
+                flush_all()
+                accept(coordinator.receive(shard))
+                next_exchange = now + EXCHANGE_INTERVAL
+
+            if frontier and lease == 0:
+                lease = coordinator.acquire(shard, BUDGET_LEASE)
+            entry = frontier.pop() if lease else None
+            if entry is None:
+                if frontier and lease:
+                    # هیچ میزبانی هنوز آماده نیست
+                    ready_at = frontier.next_ready_time() or now
+                    time.sleep(max(0.0, min(ready_at, next_exchange) - time.monotonic()))
+                    continue
+                # بیکار: صف خالی است یا بودجه صفحات (فعلا) تمام شده است
+                flush_all()
+                if lease:
+                    coordinator.release(shard, lease)
+                    lease = 0
+                batches, finished = coordinator.wait(shard, len(frontier))
+                if finished:
+                    break
+                accept(batches)
+                continue
+
+            url, depth = entry
+            logger.debug("shard %d (عمق %d): %s", shard, depth, url)
+            response_info = {}
+            html_content = fetch_page(url, None, response_info)
+            if record_fetch_result(frontier, rate_control, url, depth, response_info) or not html_content:
+                continue
+            lease -= 1
+            stats['pages'] += 1
+
+            analysis = analyze_fetched_page(html_content, url)
+            original_url = find_near_duplicate(url, html_content, analysis.main_text)
+            if original_url is not None:
+                logger.info("صفحه %s تقریبا تکراری %s است. ذخیره و لینک‌یابی نمی‌شود.", url, original_url)
+                PAGES.inc(labels=("near_duplicate",))
+                continue
+            store_page(url, html_content, response_info.get('headers'), analysis.main_text)
+            PAGES.inc(labels=("stored",))
+            if max_depth is None or depth < max_depth:
+                route(analysis.links, depth + 1)
+    finally:
+        if lease:
+            coordinator.release(shard, lease)
+        close_page_store()
+        close_http_session()
+        stats['remaining'] = len(frontier)
+        stats['seen'] = len(seen_urls)
+        stats['near_duplicates'] = crawler.near_duplicate_index.duplicate_count
+        frontier.close()
+        coordinator.finish(shard, stats, REGISTRY.snapshot())
+    return stats
+
+
+def _shard_process(shard, address, authkey):
+    try:
+        run_shard(shard, address, authkey)
+    except Exception as e:
+        logger.warning("خطا در shard %d: %s", shard, e)
+        raise
+
+
+def print_report(summary):
+    print("\n--- گزارش نهایی خزش توزیع شده ---")
+    print(f"تعداد کل صفحات دانلود شده: {summary['pages']}")
+    print(f"تعداد لینک‌های ارسال شده بین shard ها: {summary['exchanged_links']}")
+    for shard, stats in sorted(summary['shards'].items()):
+        print(f"  shard {shard}: {stats['pages']} صفحه، {stats['seen']} URL دیده شده، "
+              f"{stats['remaining']} URL باقیمانده در صف، {stats['near_duplicates']} صفحه تقریبا تکراری")
+    metrics = MetricsRegistry()
+    metrics.merge(summary['metrics'])
+    print("آمار مراحل خزش (همه shard ها):")
+    for line in metrics.summary_lines("crawler_"):
+        print(f"  {line}")
+    print("--- خزش به پایان رسید ---")
+
+
+def _prepare(start_url, allowed_domains_list, shard_count, max_depth, host_delay):
+    """اعتبارسنجی URL شروع و ساختن پیکربندی مشترک shard ها (یا None)."""
+    if not validators.url(start_url):
+        print(f"URL شروع نامعتبر است: {start_url}")
+        return None, None
+    start_url = canonicalize_url(start_url)
+    initial_domain = urlsplit(start_url).netloc
+    allowed_domains = list(allowed_domains_list or crawler.ALLOWED_DOMAINS or [initial_domain])
+    print(f"شروع خزش توزیع شده از: {start_url}")
+    print(f"تعداد shard ها: {shard_count}")
+    print(f"دامنه‌های مجاز: {allowed_domains}")
+    print("---")
+    return start_url, {'allowed_domains': allowed_domains, 'max_depth': max_depth, 'host_delay': host_delay,
+                       'adaptive_rate': crawler.ADAPTIVE_RATE_CONTROL}
+
+
+def crawl_website_sharded(start_url, max_pages=crawler.MAX_PAGES_TO_CRAWL, allowed_domains_list=None,
+                          shard_count=SHARD_COUNT, max_depth=crawler.MAX_CRAWL_DEPTH, host_delay=None):
+    """
+    خزش با shard_count پروسس محلی و یک هماهنگ‌کننده محلی. تعداد صفحات دانلود شده را برمی‌گرداند.
+    همه shard ها در DOWNLOAD_DIR ذخیره می‌کنند (زیرپوشه‌های دامنه‌ها یا segment های جداگانه).
+    """
+    host_delay = crawler.REQUEST_DELAY if host_delay is None else host_delay
+    start_url, config = _prepare(start_url, allowed_domains_list, shard_count, max_depth, host_delay)
+    if start_url is None:
+        return 0
+
+    manager = start_coordinator(shard_count, max_pages, config)
+    try:
+        coordinator = manager.coordinator()
+        coordinator.send(shard_for_url(start_url, shard_count), [(start_url, 0)])
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=_shard_process, args=(shard, manager.address, COORDINATOR_AUTHKEY))
+                     for shard in range(shard_count)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        summary = coordinator.summary()
+    finally:
+        manager.shutdown()
+
+    crawler.pages_crawled_count = summary['pages']
+    print_report(summary)
+    return summary['pages']
+
+
+def _parse_address(text):
+    host, _, port = text.rpartition(':')
+    return host or "127.0.0.1", int(port)
+
+
+# --- اجرای برنامه ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="خزش توزیع شده بر اساس هش میزبان")
+    subparsers = parser.add_subparsers(dest="role", required=True)
+    coordinator_parser = subparsers.add_parser("coordinator", help="اجرای هماهنگ‌کننده")
+    coordinator_parser.add_argument("--start-url", required=True)
+    coordinator_parser.add_argument("--shards", type=int, default=SHARD_COUNT)
+    coordinator_parser.add_argument("--max-pages", type=int, default=crawler.MAX_PAGES_TO_CRAWL)
+    coordinator_parser.add_argument("--max-depth", type=int, default=crawler.MAX_CRAWL_DEPTH)
+    coordinator_parser.add_argument("--allowed-domains", nargs="*", default=None)
+    coordinator_parser.add_argument("--host-delay", type=float, default=crawler.REQUEST_DELAY)
+    coordinator_parser.add_argument("--bind", default="0.0.0.0")
+    coordinator_parser.add_argument("--port", type=int, default=COORDINATOR_PORT)
+    worker_parser = subparsers.add_parser("worker", help="اجرای یک shard")
+    worker_parser.add_argument("--shard", type=int, required=True)
+    worker_parser.add_argument("--coordinator", default=f"127.0.0.1:{COORDINATOR_PORT}")
+    args = parser.parse_args()
+
+    if args.role == "worker":
+        os.makedirs(crawler.DOWNLOAD_DIR, exist_ok=True)
+        run_shard(args.shard, _parse_address(args.coordinator))
+    else:
+        start_url, config = _prepare(args.start_url, args.allowed_domains, args.shards, args.max_depth,
+                                     args.host_delay)
+        if start_url is not None:
+            manager = start_coordinator(args.shards, args.max_pages, config, address=(args.bind, args.port))
+            coordinator = manager.coordinator()
+            coordinator.send(shard_for_url(start_url, args.shards), [(start_url, 0)])
+            print(f"هماهنگ‌کننده روی {args.bind}:{args.port} منتظر {args.shards} shard است.")
+            # پایان خزش و رسیدن آمار همه shard ها
+            while not (coordinator.finished() and len(coordinator.summary()['shards']) == args.shards):
+                time.sleep(1)
+            print_report(coordinator.summary())
+            manager.shutdown()
@@ -0,0 +1,90 @@
+# seoran/crawler/url_utils.py
+# سطح: توابع کمکی مشترک برای یکسان‌سازی (canonicalization) و اثر انگشت URL ها.
+
+import hashlib
+import re
+from urllib.parse import urlsplit, urlunsplit, quote
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+# پارامترهای ردیابی که روی محتوای صفحه اثری ندارند و از URL حذف می‌شوند
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = frozenset([
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_hsenc', '_hsmi', '_ga', '_gl',
+])
+
+# حذف '/' انتهایی مسیرهای غیر ریشه (/blog/ و /blog یک URL در نظر گرفته می‌شوند)
+STRIP_TRAILING_SLASH = True
+
+# کاراکترهایی از مسیر که کدگذاری نمی‌شوند ('%' برای حفظ کدگذاری‌های موجود)
+_PATH_SAFE_CHARS = "/:@!$&'()*+,;=-._~%"
+_PERCENT_ESCAPE_RE = re.compile(r'%[0-9a-f]{2}')
+
+
+def _remove_dot_segments(path):
+    segments = []
+    for segment in path.split('/'):
+        if segment == '..':
+            if len(segments) > 1:
+                segments.pop()
+        elif segment != '.':
+            segments.append(segment)
+    if path.endswith(('/.', '/..')):
+        segments.append('')
+    return '/'.join(segments) or '/'
+
+
+def _canonical_query(query):
+    params = []
+    for param in query.split('&'):
+        if not param:
+            continue
+        name = param.split('=', 1)[0]
+        if name in TRACKING_PARAMS or name.startswith(TRACKING_PARAM_PREFIXES):
+            continue
+        params.append(param)
+    params.sort()
+    return '&'.join(params)
+
+
+def canonicalize_url(url):
+    """
+    شکل یکسان یک URL را برمی‌گرداند تا نسخه‌های هم‌ارز آن یک اثر انگشت داشته باشند:
+    حروف کوچک برای scheme و میزبان، حذف پورت پیش‌فرض، حذف fragment، حذف بخش‌های '.' و '..'،
+    کدگذاری درصدی یکسان برای مسیر (مثلا مسیرهای فارسی)، حذف '/' انتهایی، حذف پارامترهای ردیابی
+    و مرتب کردن پارامترهای کوئری.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if ':' in netloc:
+        host, _, port = netloc.rpartition(':')
+        if DEFAULT_PORTS.get(scheme) == port or not port:
+            netloc = host
+    if netloc.endswith('.'):
+        netloc = netloc[:-1]
+
+    path = parts.path or '/'
+    if '/.' in path:
+        path = _remove_dot_segments(path)
+    if not path.isascii() or ' ' in path:
+        path = quote(path, safe=_PATH_SAFE_CHARS)
+    if '%' in path:
+        path = _PERCENT_ESCAPE_RE.sub(lambda m: m.group(0).upper(), path)
+    if STRIP_TRAILING_SLASH and len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/') or '/'
+
+    query = _canonical_query(parts.query) if parts.query else ''
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def url_fingerprint(url):
+    """
+    اثر انگشت 64 بیتی (عدد صحیح بدون علامت) برای شکل یکسان شده URL.
+    """
+    digest = hashlib.blake2b(canonicalize_url(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
@@ -0,0 +1,271 @@
+# seoran/indexer/corpus_stats.py
+# سطح: آمار دسته‌ای پیکره با NumPy: ماتریس تنک سند-اصطلاح (CSR)، بسامد اصطلاحات (cf)، بسامد اسناد (df)، IDF و
+# بردار TF-IDF نرمال شده هر سند، از خروجی پردازشگر متن (فایل‌های *_tokens.txt و/یا خروجی باینری token_ids).
+#
+# ساخت در دو گذر جریانی و دسته‌ای انجام می‌شود تا پیکره‌های بزرگتر از حافظه هم ممکن باشند (فقط واژه‌نامه و
+# آرایه‌های به اندازه تعداد اصطلاحات در حافظه می‌مانند):
+#   گذر 1: خروجی پردازشگر یک بار خوانده می‌شود؛ برای هر دسته (حدود STATS_CHUNK_TOKENS توکن) جفت‌های یکتای
+#          (سند، اصطلاح) با np.unique شمرده، df، cf و طول اسناد جمع و ماتریس CSR دسته در یک فایل موقت نوشته می‌شود.
+#   گذر 2: IDF از df محاسبه می‌شود؛ وزن‌های ماتریس هر دسته و نرمال‌سازی L2 سطرها برداری انجام و مستقیما در
+#          آرایه‌های .npy روی دیسک (open_memmap) نوشته می‌شوند.
+# ترتیب اسناد همان ترتیب index_builder است، پس شناسه سند اینجا و در ایندکس جستجو یکی است.
+#
+# فایل‌های خروجی (داخل STATS_DIR):
+#   meta.json                          تعداد اسناد و اصطلاحات، nnz، تعداد کل توکن‌ها و تنظیمات وزن‌دهی
+#   vocabulary.txt, docs.txt           اصطلاح هر شناسه اصطلاح و نام هر شناسه سند (هر کدام در یک سطر)
+#   df.npy, cf.npy, idf.npy            آرایه‌های به اندازه تعداد اصطلاحات
+#   doc_lengths.npy                    تعداد توکن‌های هر سند
+#   indptr.npy, indices.npy            ساختار CSR مشترک (سطر = سند، ستون = شناسه اصطلاح، ستون‌ها صعودی)
+#   tf.npy, tfidf.npy                  مقدار هر درایه: تعداد تکرار و وزن TF-IDF نرمال شده
+#
+# با اجرای مستقیم، آمار ساخته و اصطلاحات پربسامد (با df بالا) به عنوان نامزد کلمات توقف چاپ می‌شوند؛
+# این لیست را می‌توان پس از بازبینی به DEFAULT_STOP_WORDS پردازشگر اضافه کرد.
+
+import json
+import os
+import time
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from index_builder import PROCESSED_TEXTS_DIR, find_token_files, open_token_store, iter_token_documents
+
+# --- پیکربندی ---
+STATS_DIR = "corpus_stats"
+# تعداد تقریبی توکن‌هایی که با هم در یک دسته (ماتریس موقت در حافظه) پردازش می‌شوند
+STATS_CHUNK_TOKENS = 5_000_000
+# وزن tf: با SUBLINEAR_TF مقدار 1 + log(tf) به جای tf
+SUBLINEAR_TF = True
+# نامزدهای کلمه توقف: اصطلاحاتی که حداقل در این کسر از اسناد آمده‌اند
+STOP_WORD_MIN_DF_RATIO = 0.3
+STOP_WORD_CANDIDATES = 50
+
+META_FILENAME = "meta.json"
+VOCABULARY_FILENAME = "vocabulary.txt"
+DOCS_FILENAME = "docs.txt"
+CHUNK_FILENAME = "chunk-{:05d}.npz"  # ماتریس موقت هر دسته بین دو گذر
+
+
+def _corpus_documents(tokens_dir, term_ids):
+    """
+    (نام سند، آرایه uint32 شناسه اصطلاحات) همه اسناد به ترتیب index_builder. شناسه‌های خروجی باینری همان
+    شناسه‌های واژه‌نامه آن هستند (term_ids با آن واژه‌نامه شروع می‌شود) و اصطلاحات فایل‌های متنی در صورت
+    نیاز به انتهای term_ids اضافه می‌شوند.
+    """
+    token_store = open_token_store(tokens_dir)
+    try:
+        if token_store is not None and not term_ids:
+            term_ids.update((term, term_id) for term_id, term in enumerate(token_store.vocabulary))
+        for name, tokens, vocabulary in iter_token_documents(find_token_files(tokens_dir), token_store, tokens_dir):
+            if vocabulary is not None:
+                # کپی از mmap، چون آرایه تا پایان دسته نگه داشته می‌شود
+                yield name, np.array(tokens, dtype=np.uint32)
+            else:
+                yield name, np.fromiter([term_ids.setdefault(token, len(term_ids)) for token in tokens],
+                                        dtype=np.uint32, count=len(tokens))
+    finally:
+        if token_store is not None:
+            token_store.close()
+
+
+def _chunks(documents, chunk_tokens):
+    """اسناد را در دسته‌هایی با حدود chunk_tokens توکن برمی‌گرداند: (نام‌ها، آرایه‌های شناسه)."""
+    names, arrays, tokens = [], [], 0
+    for name, ids in documents:
+        names.append(name)
+        arrays.append(ids)
+        tokens += len(ids)
+        if tokens >= chunk_tokens:
+            yield names, arrays
+            names, arrays, tokens = [], [], 0
+    if names:
+        yield names, arrays
+
+
+def chunk_matrix(arrays, vocabulary_size):
+    """
+    ماتریس CSR تعداد تکرار اصطلاحات یک دسته اسناد: (indptr، indices، counts، طول اسناد).
+    جفت‌های (سند، اصطلاح) به یک کلید int64 تبدیل و با np.unique مرتب و شمرده می‌شوند.
+    """
+    lengths = np.fromiter((len(ids) for ids in arrays), dtype=np.int64, count=len(arrays))
+    ids = np.concatenate(arrays).astype(np.int64) if arrays else np.zeros(0, dtype=np.int64)
+    rows = np.repeat(np.arange(len(arrays), dtype=np.int64), lengths)
+    keys, counts = np.unique(rows * vocabulary_size + ids, return_counts=True)
+    key_rows = keys // vocabulary_size
+    indptr = np.zeros(len(arrays) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(key_rows, minlength=len(arrays)), out=indptr[1:])
+    return indptr, (keys - key_rows * vocabulary_size).astype(np.uint32), counts, lengths
+
+
+def _grow(values, size):
+    return values if len(values) >= size else np.concatenate([values, np.zeros(size - len(values), values.dtype)])
+
+
+def compute_idf(df, doc_count):
+    """IDF هموار: log((1 + N) / (1 + df)) + 1 (برای اصطلاحی که در همه اسناد آمده هم مثبت است)."""
+    return (np.log((1.0 + doc_count) / (1.0 + df)) + 1.0).astype(np.float32)
+
+
+def tfidf_weights(indptr, indices, counts, idf, sublinear_tf=SUBLINEAR_TF):
+    """وزن TF-IDF درایه‌های یک ماتریس CSR با نرمال‌سازی L2 هر سطر (سطرهای خالی صفر می‌مانند)."""
+    weights = counts.astype(np.float32)
+    if sublinear_tf:
+        weights = 1.0 + np.log(weights)
+    weights *= idf[indices]
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=len(indptr) - 1)).astype(np.float32)
+    norms[norms == 0] = 1.0
+    weights /= norms[rows]
+    return weights
+
+
+def build_corpus_stats(tokens_dir=PROCESSED_TEXTS_DIR, stats_dir=STATS_DIR, chunk_tokens=STATS_CHUNK_TOKENS,
+                       sublinear_tf=SUBLINEAR_TF):
+    """
+    آمار پیکره را از خروجی پردازشگر در tokens_dir می‌سازد و در stats_dir می‌نویسد؛ متادیتا را برمی‌گرداند.
+    """
+    start_time = time.time()
+    os.makedirs(stats_dir, exist_ok=True)
+    term_ids = {}
+
+    # گذر 1: df، cf، طول اسناد و ماتریس موقت هر دسته
+    df = np.zeros(0, dtype=np.int64)
+    cf = np.zeros(0, dtype=np.int64)
+    doc_lengths = []
+    chunk_paths = []
+    nnz = 0
+    with open(os.path.join(stats_dir, DOCS_FILENAME), 'w', encoding='utf-8') as docs_file:
+        for names, arrays in _chunks(_corpus_documents(tokens_dir, term_ids), chunk_tokens):
+            vocabulary_size = max(len(term_ids), 1)
+            indptr, indices, counts, lengths = chunk_matrix(arrays, vocabulary_size)
+            df = _grow(df, vocabulary_size)
+            cf = _grow(cf, vocabulary_size)
+            df += np.bincount(indices, minlength=vocabulary_size)
+            cf += np.bincount(indices, weights=counts, minlength=vocabulary_size).astype(np.int64)
+            nnz += len(indices)
+            docs_file.write(("\n" if doc_lengths else "") + "\n".join(names))
+            doc_lengths.append(lengths)
+            chunk_paths.append(os.path.join(stats_dir, CHUNK_FILENAME.format(len(chunk_paths))))
+            np.savez(chunk_paths[-1], indptr=indptr, indices=indices, counts=counts.astype(np.uint32))
+    doc_lengths = np.concatenate(doc_lengths) if doc_lengths else np.zeros(0, dtype=np.int64)
+    vocabulary = list(term_ids)
+    df = _grow(df, len(vocabulary))[:len(vocabulary)]
+    cf = _grow(cf, len(vocabulary))[:len(vocabulary)]
+    doc_count = len(doc_lengths)
+    idf = compute_idf(df, doc_count)
+
+    # گذر 2: وزن‌ها و ماتریس‌های نهایی مستقیما روی دیسک
+    indptr_out = open_memmap(os.path.join(stats_dir, "indptr.npy"), mode='w+', dtype=np.int64, shape=(doc_count + 1,))
+    indices_out = open_memmap(os.path.join(stats_dir, "indices.npy"), mode='w+', dtype=np.uint32, shape=(nnz,))
+    tf_out = open_memmap(os.path.join(stats_dir, "tf.npy"), mode='w+', dtype=np.uint32, shape=(nnz,))
+    tfidf_out = open_memmap(os.path.join(stats_dir, "tfidf.npy"), mode='w+', dtype=np.float32, shape=(nnz,))
+    indptr_out[0] = 0
+    doc_offset = 0
+    value_offset = 0
+    for path in chunk_paths:
+        with np.load(path) as chunk:
+            indptr, indices, counts = chunk['indptr'], chunk['indices'], chunk['counts']
+        end = value_offset + len(indices)
+        indptr_out[doc_offset + 1:doc_offset + len(indptr)] = indptr[1:] + value_offset
+        indices_out[value_offset:end] = indices
+        tf_out[value_offset:end] = counts
+        tfidf_out[value_offset:end] = tfidf_weights(indptr, indices, counts, idf, sublinear_tf)
+        doc_offset += len(indptr) - 1
+        value_offset = end
+        os.remove(path)
+    for array in (indptr_out, indices_out, tf_out, tfidf_out):
+        array.flush()
+    del indptr_out, indices_out, tf_out, tfidf_out
+
+    np.save(os.path.join(stats_dir, "df.npy"), df.astype(np.uint32))
+    np.save(os.path.join(stats_dir, "cf.npy"), cf)
+    np.save(os.path.join(stats_dir, "idf.npy"), idf)
+    np.save(os.path.join(stats_dir, "doc_lengths.npy"), doc_lengths.astype(np.uint32))
+    with open(os.path.join(stats_dir, VOCABULARY_FILENAME), 'w', encoding='utf-8') as f:
+        f.write("\n".join(vocabulary))
+    meta = {
+        'doc_count': doc_count,
+        'term_count': len(vocabulary),
+        'nnz': nnz,
+        'total_tokens': int(doc_lengths.sum()),
+        'sublinear_tf': sublinear_tf,
+        'idf': "log((1 + N) / (1 + df)) + 1",
+        'normalization': "l2",
+    }
+    with open(os.path.join(stats_dir, META_FILENAME), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    print(f"آمار پیکره در {stats_dir} ساخته شد: {doc_count} سند، {len(vocabulary)} اصطلاح، "
+          f"{nnz} درایه غیر صفر ({time.time() - start_time:.2f} ثانیه).")
+    return meta
+
+
+class CorpusStats:
+    """خواننده آمار ساخته شده؛ آرایه‌های بزرگ با mmap باز می‌شوند."""
+    def __init__(self, stats_dir=STATS_DIR):
+        self.stats_dir = stats_dir
+        with open(os.path.join(stats_dir, META_FILENAME), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.doc_count = self.meta['doc_count']
+        with open(os.path.join(stats_dir, VOCABULARY_FILENAME), 'r', encoding='utf-8') as f:
+            self.vocabulary = f.read().split("\n") if self.meta['term_count'] else []
+        with open(os.path.join(stats_dir, DOCS_FILENAME), 'r', encoding='utf-8') as f:
+            self.doc_names = f.read().split("\n") if self.doc_count else []
+        self._term_ids = None
+
+        def load(name):
+            return np.load(os.path.join(stats_dir, name), mmap_mode='r')
+        self.df = load("df.npy")
+        self.cf = load("cf.npy")
+        self.idf = load("idf.npy")
+        self.doc_lengths = load("doc_lengths.npy")
+        self.indptr = load("indptr.npy")
+        self.indices = load("indices.npy")
+        self.tf = load("tf.npy")
+        self.tfidf = load("tfidf.npy")
+
+    def term_id(self, term):
+        if self._term_ids is None:
+            self._term_ids = {term: term_id for term_id, term in enumerate(self.vocabulary)}
+        return self._term_ids.get(term)
+
+    def document_vector(self, doc_id):
+        """(شناسه اصطلاحات، وزن‌های TF-IDF) سند doc_id."""
+        start, end = self.indptr[doc_id], self.indptr[doc_id + 1]
+        return self.indices[start:end], self.tfidf[start:end]
+
+    def top_terms(self, doc_id, k=10):
+        """k اصطلاح با بیشترین وزن TF-IDF در سند: لیست (اصطلاح، وزن)."""
+        indices, weights = self.document_vector(doc_id)
+        order = np.argsort(-weights, kind='stable')[:k]
+        return [(self.vocabulary[indices[i]], float(weights[i])) for i in order]
+
+    def similar_documents(self, doc_id, k=10):
+        """k سند با بیشترین شباهت کسینوسی به doc_id (به جز خودش): لیست (شناسه سند، شباهت)."""
+        query = np.zeros(len(self.vocabulary), dtype=np.float32)
+        indices, weights = self.document_vector(doc_id)
+        query[indices] = weights
+        rows = np.repeat(np.arange(self.doc_count), np.diff(self.indptr))
+        scores = np.bincount(rows, weights=self.tfidf * query[self.indices], minlength=self.doc_count)
+        scores[doc_id] = -1.0
+        order = np.argsort(-scores, kind='stable')[:k]
+        return [(int(i), float(scores[i])) for i in order if scores[i] > 0]
+
+    def stop_word_candidates(self, min_df_ratio=STOP_WORD_MIN_DF_RATIO, limit=STOP_WORD_CANDIDATES):
+        """اصطلاحاتی که حداقل در min_df_ratio اسناد آمده‌اند، به ترتیب df نزولی: لیست (اصطلاح، کسر اسناد)."""
+        if not self.doc_count:
+            return []
+        ratios = self.df / self.doc_count
+        candidates = np.flatnonzero(ratios >= min_df_ratio)
+        candidates = candidates[np.argsort(-ratios[candidates], kind='stable')][:limit]
+        return [(self.vocabulary[i], float(ratios[i])) for i in candidates]
+
+
+if __name__ == "__main__":
+    build_corpus_stats()
+    stats = CorpusStats()
+    candidates = stats.stop_word_candidates()
+    print(f"\nنامزدهای کلمه توقف (df حداقل {STOP_WORD_MIN_DF_RATIO:.0%} اسناد)؛ پس از بازبینی به "
+          "DEFAULT_STOP_WORDS در processor/text_processor.py اضافه کنید:")
+    for term, ratio in candidates:
+        print(f'    "{term}",  # {ratio:.1%}')
@@ -0,0 +1,256 @@
+# seoran/indexer/index_builder.py
+# سطح: ساخت ایندکس معکوس موقعیتی از خروجی پردازشگر متن (فایل‌های *_tokens.txt و/یا خروجی باینری token_ids).
+#
+# ساخت به روش SPIMI با حافظه محدود انجام می‌شود: اسناد به ترتیب خوانده می‌شوند و postings در یک
+# دیکشنری در حافظه جمع می‌شوند؛ وقتی تعداد موقعیت‌ها به SPIMI_MAX_POSTINGS رسید، اصطلاحات مرتب شده
+# و در یک فایل run موقت نوشته می‌شوند. در پایان همه run ها با ادغام k-راهه (heapq.merge) خوانده
+# می‌شوند و ایندکس نهایی (قالب inverted_index.py) به صورت جریانی نوشته می‌شود. بنابراین پیکره‌هایی
+# بزرگتر از حافظه هم قابل ایندکس شدن هستند.
+
+import glob
+import heapq
+import itertools
+import json
+import marshal
+import os
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+
+from inverted_index import (
+    INDEX_FORMAT_VERSION, POSTINGS_BLOCK_SIZE, META_FILENAME, DOCS_FILENAME, DOCLENS_FILENAME, LEXICON_FILENAME,
+    DICTIONARY_FILENAME, BLOCKS_FILENAME, POSTINGS_DOCS_FILENAME, POSTINGS_POSITIONS_FILENAME,
+    TERM_ENTRY, BLOCK_ENTRY, encode_varints,
+)
+
+# خواننده خروجی باینری پردازشگر در پوشه processor است
+PROCESSOR_MODULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "processor")
+if PROCESSOR_MODULES_DIR not in sys.path:
+    sys.path.append(PROCESSOR_MODULES_DIR)
+from token_store import TokenStoreReader, TOKEN_STORE_DIRNAME  # noqa: E402
+
+# --- پیکربندی ---
+PROCESSED_TEXTS_DIR = os.path.join("..", "processor", "processed_texts_tokens")  # خروجی پردازشگر متن
+INDEX_DIR = "search_index"
+TOKENS_FILE_PATTERN = "*_tokens.txt"
+
+# حداکثر تعداد موقعیت (توکن) که پیش از نوشتن یک run موقت در حافظه نگه داشته می‌شود
+SPIMI_MAX_POSTINGS = 2_000_000
+
+
+def find_token_files(tokens_dir):
+    """فایل‌های توکن پردازشگر به ترتیب ثابت (شناسه‌های سند در هر ساخت یکسان هستند)."""
+    return sorted(glob.glob(os.path.join(tokens_dir, "**", TOKENS_FILE_PATTERN), recursive=True))
+
+
+def open_token_store(tokens_dir):
+    """خواننده خروجی باینری پردازشگر (قالب token_ids) در tokens_dir، یا None اگر وجود نداشته باشد."""
+    store_dir = os.path.join(tokens_dir, TOKEN_STORE_DIRNAME)
+    return TokenStoreReader(store_dir) if os.path.isdir(store_dir) else None
+
+
+def iter_token_documents(token_files, token_store, tokens_dir):
+    """
+    (نام سند، توکن‌ها، واژه‌نامه) همه اسناد به ترتیب ثابت: ابتدا فایل‌های متنی و سپس اسناد خروجی باینری.
+    توکن‌های فایل‌های متنی رشته هستند (واژه‌نامه None)؛ توکن‌های خروجی باینری شناسه‌هایی هستند که
+    بدون کپی از mmap خوانده می‌شوند و فقط اصطلاحات یکتای هر سند با واژه‌نامه به رشته تبدیل می‌شوند.
+    """
+    for path in token_files:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                tokens = f.read().split()
+        except (IOError, UnicodeDecodeError) as e:
+            print(f"خطا در خواندن {path}: {e}. سند خالی در نظر گرفته می‌شود.")
+            tokens = []
+        yield os.path.relpath(path, tokens_dir), tokens, None
+    if token_store is not None:
+        for document in token_store.iter_documents():
+            yield document.key, document.token_ids, token_store.vocabulary
+
+
+class _PostingsWriter:
+    """نوشتن جریانی اصطلاحات مرتب شده در فایل‌های نهایی ایندکس."""
+    def __init__(self, index_dir, doc_lengths):
+        self.doc_lengths = doc_lengths
+        self._lexicon = open(os.path.join(index_dir, LEXICON_FILENAME), 'wb')
+        self._dictionary = open(os.path.join(index_dir, DICTIONARY_FILENAME), 'wb')
+        self._blocks = open(os.path.join(index_dir, BLOCKS_FILENAME), 'wb')
+        self._docs = open(os.path.join(index_dir, POSTINGS_DOCS_FILENAME), 'wb')
+        self._positions = open(os.path.join(index_dir, POSTINGS_POSITIONS_FILENAME), 'wb')
+        self._lexicon_offset = 0
+        self._block_count = 0
+        self.term_count = 0
+
+    def write_term(self, term, postings):
+        """postings: دنباله (doc_id، موقعیت‌ها) با doc_id صعودی."""
+        first_block = self._block_count
+        df = 0
+        collection_frequency = 0
+        previous_doc = 0
+        buffered = []
+        for posting in postings:
+            buffered.append(posting)
+            if len(buffered) == POSTINGS_BLOCK_SIZE:
+                previous_doc = self._write_block(buffered, previous_doc)
+                df += len(buffered)
+                collection_frequency += sum(len(positions) for _, positions in buffered)
+                buffered = []
+        if buffered:
+            self._write_block(buffered, previous_doc)
+            df += len(buffered)
+            collection_frequency += sum(len(positions) for _, positions in buffered)
+
+        term_bytes = term.encode('utf-8')
+        self._lexicon.write(term_bytes)
+        self._dictionary.write(TERM_ENTRY.pack(self._lexicon_offset, len(term_bytes), df, first_block,
+                                               self._block_count - first_block, collection_frequency))
+        self._lexicon_offset += len(term_bytes)
+        self.term_count += 1
+
+    def _write_block(self, postings, previous_doc):
+        docs_buffer = bytearray()
+        positions_buffer = bytearray()
+        gaps = []
+        tfs = []
+        for doc_id, positions in postings:
+            gaps.append(doc_id - previous_doc)
+            previous_doc = doc_id
+            tfs.append(len(positions))
+            previous_position = 0
+            position_gaps = []
+            for position in positions:
+                position_gaps.append(position - previous_position)
+                previous_position = position
+            encode_varints(position_gaps, positions_buffer)
+        encode_varints(gaps, docs_buffer)
+        encode_varints(tfs, docs_buffer)
+
+        min_doclen = min(self.doc_lengths[doc_id] for doc_id, _ in postings)
+        self._blocks.write(BLOCK_ENTRY.pack(previous_doc, len(postings), self._docs.tell(), self._positions.tell(),
+                                            max(tfs), min_doclen))
+        self._docs.write(docs_buffer)
+        self._positions.write(positions_buffer)
+        self._block_count += 1
+        return previous_doc
+
+    def close(self):
+        for f in (self._lexicon, self._dictionary, self._blocks, self._docs, self._positions):
+            f.close()
+
+
+def _write_run(block_index, path):
+    """اصطلاحات یک بلاک SPIMI را به ترتیب مرتب در یک فایل run موقت می‌نویسد."""
+    with open(path, 'wb') as f:
+        for term in sorted(block_index):
+            doc_ids, positions_lists = block_index[term]
+            marshal.dump((term, doc_ids, positions_lists), f)
+
+
+def _iter_run(path, run_number):
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                term, doc_ids, positions_lists = marshal.load(f)
+            except EOFError:
+                return
+            yield term, run_number, doc_ids, positions_lists
+
+
+def _merged_postings(records):
+    # run ها به ترتیب شماره خوانده می‌شوند و شناسه‌های سند در run های بعدی بزرگترند، پس ترتیب حفظ می‌شود
+    for _, _, doc_ids, positions_lists in records:
+        yield from zip(doc_ids, positions_lists)
+
+
+def build_index(tokens_dir=PROCESSED_TEXTS_DIR, index_dir=INDEX_DIR, max_postings_in_memory=SPIMI_MAX_POSTINGS):
+    """
+    ایندکس معکوس را از فایل‌های توکن tokens_dir در index_dir می‌سازد و متادیتای ایندکس را برمی‌گرداند.
+    ایندکس ابتدا در یک پوشه موقت ساخته و سپس جایگزین ایندکس قبلی می‌شود.
+    """
+    start_time = time.time()
+    token_files = find_token_files(tokens_dir)
+    token_store = open_token_store(tokens_dir)
+    print(f"تعداد {len(token_files) + (len(token_store) if token_store else 0)} سند برای ایندکس یافت شد.")
+
+    building_dir = index_dir + ".building"
+    if os.path.exists(building_dir):
+        shutil.rmtree(building_dir)
+    os.makedirs(building_dir)
+
+    doc_lengths = array('I')
+    run_paths = []
+    with tempfile.TemporaryDirectory(dir=building_dir) as runs_dir:
+        block_index = {}
+        postings_in_memory = 0
+        with open(os.path.join(building_dir, DOCS_FILENAME), 'w', encoding='utf-8') as docs_file:
+            documents = iter_token_documents(token_files, token_store, tokens_dir)
+            for doc_id, (name, tokens, vocabulary) in enumerate(documents):
+                docs_file.write(("\n" if doc_id else "") + name)
+                doc_lengths.append(len(tokens))
+
+                term_positions = {}
+                for position, token in enumerate(tokens):
+                    positions = term_positions.get(token)
+                    if positions is None:
+                        term_positions[token] = [position]
+                    else:
+                        positions.append(position)
+                for term, positions in term_positions.items():
+                    if vocabulary is not None:
+                        term = vocabulary[term]
+                    entry = block_index.get(term)
+                    if entry is None:
+                        block_index[term] = ([doc_id], [positions])
+                    else:
+                        entry[0].append(doc_id)
+                        entry[1].append(positions)
+                postings_in_memory += len(tokens)
+
+                if postings_in_memory >= max_postings_in_memory:
+                    run_paths.append(os.path.join(runs_dir, f"run-{len(run_paths):05d}.bin"))
+                    _write_run(block_index, run_paths[-1])
+                    block_index = {}
+                    postings_in_memory = 0
+            tokens = None  # رها کردن memoryview آخرین سند پیش از بستن mmap ها
+        if token_store is not None:
+            token_store.close()
+        if block_index or not run_paths:
+            run_paths.append(os.path.join(runs_dir, f"run-{len(run_paths):05d}.bin"))
+            _write_run(block_index, run_paths[-1])
+            block_index = {}
+        print(f"{len(run_paths)} بلاک SPIMI نوشته شد؛ ادغام بلاک‌ها...")
+
+        with open(os.path.join(building_dir, DOCLENS_FILENAME), 'wb') as f:
+            doc_lengths.tofile(f)
+        writer = _PostingsWriter(building_dir, doc_lengths)
+        runs = [_iter_run(path, number) for number, path in enumerate(run_paths)]
+        for term, records in itertools.groupby(heapq.merge(*runs), key=lambda record: record[0]):
+            writer.write_term(term, _merged_postings(records))
+        writer.close()
+
+    total_tokens = sum(doc_lengths)
+    meta = {
+        'version': INDEX_FORMAT_VERSION,
+        'doc_count': len(doc_lengths),
+        'term_count': writer.term_count,
+        'total_tokens': total_tokens,
+        'avg_doc_length': total_tokens / len(doc_lengths) if doc_lengths else 0.0,
+        'block_size': POSTINGS_BLOCK_SIZE,
+        'spimi_runs': len(run_paths),
+    }
+    with open(os.path.join(building_dir, META_FILENAME), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    if os.path.exists(index_dir):
+        shutil.rmtree(index_dir)
+    os.replace(building_dir, index_dir)
+
+    print(f"ایندکس در {index_dir} ساخته شد: {meta['doc_count']} سند، {meta['term_count']} اصطلاح، "
+          f"{total_tokens} توکن ({time.time() - start_time:.2f} ثانیه).")
+    return meta
+
+
+if __name__ == "__main__":
+    build_index()
@@ -0,0 +1,321 @@
+# seoran/indexer/inverted_index.py
+# سطح: قالب فایل‌های ایندکس معکوس موقعیتی (positional) و خواننده آن با mmap.
+#
+# فایل‌های یک ایندکس (داخل یک پوشه):
+#   meta.json        تعداد اسناد و اصطلاحات، میانگین طول سند، اندازه بلاک‌ها و نسخه قالب
+#   docs.txt         نام سند (مسیر نسبی فایل توکن‌ها) برای هر شناسه سند، هر سطر یک سند
+#   doclens.bin      طول هر سند (تعداد توکن) به صورت uint32
+#   lexicon.bin      متن UTF-8 همه اصطلاحات پشت سر هم، به ترتیب بایتی مرتب شده
+#   dictionary.bin   برای هر اصطلاح یک ورودی ثابت: offset و طول در lexicon، df، شماره اولین بلاک،
+#                    تعداد بلاک‌ها و تعداد کل تکرار اصطلاح
+#   blocks.bin       برای هر بلاک (حداکثر POSTINGS_BLOCK_SIZE سند) یک ورودی ثابت: آخرین شناسه سند،
+#                    تعداد اسناد، offset در postings.docs و postings.pos، بیشترین tf و کمترین طول سند
+#                    (برای حد بالای امتیاز در جستجو و پرش از بلاک‌ها)
+#   postings.docs    برای هر بلاک: فاصله شناسه‌های سند (delta) و سپس tf ها، همه با varint
+#   postings.pos     برای هر سند بلاک: فاصله موقعیت‌های اصطلاح در سند (delta) با varint
+#
+# همه فایل‌ها با mmap خوانده می‌شوند و جستجوی اصطلاح با جستجوی دودویی روی dictionary.bin انجام می‌شود.
+# برای جستجو، چند بلاک یک اصطلاح با read_blocks یکجا و برداری (NumPy) از حالت فشرده خارج می‌شوند.
+
+import json
+import mmap
+import os
+import struct
+from array import array
+from collections import namedtuple
+
+import numpy as np
+
+INDEX_FORMAT_VERSION = 1
+POSTINGS_BLOCK_SIZE = 128
+
+META_FILENAME = "meta.json"
+DOCS_FILENAME = "docs.txt"
+DOCLENS_FILENAME = "doclens.bin"
+LEXICON_FILENAME = "lexicon.bin"
+DICTIONARY_FILENAME = "dictionary.bin"
+BLOCKS_FILENAME = "blocks.bin"
+POSTINGS_DOCS_FILENAME = "postings.docs"
+POSTINGS_POSITIONS_FILENAME = "postings.pos"
+
+TERM_ENTRY = struct.Struct('<QIIQIQ')   # lexicon_offset, term_length, df, first_block, block_count, collection_tf
+BLOCK_ENTRY = struct.Struct('<IIQQII')  # last_doc, doc_count, docs_offset, positions_offset, max_tf, min_doclen
+
+# همان BLOCK_ENTRY به صورت dtype ساختاریافته NumPy
+BLOCK_DTYPE = np.dtype([('last_doc', '<u4'), ('doc_count', '<u4'), ('docs_offset', '<u8'),
+                        ('positions_offset', '<u8'), ('max_tf', '<u4'), ('min_doclen', '<u4')])
+assert BLOCK_DTYPE.itemsize == BLOCK_ENTRY.size
+
+TermInfo = namedtuple('TermInfo', ['term', 'df', 'collection_frequency', 'first_block', 'block_count'])
+BlockEntry = namedtuple('BlockEntry', ['last_doc', 'doc_count', 'docs_offset', 'positions_offset', 'max_tf',
+                                       'min_doclen'])
+
+
+def encode_varints(values, out):
+    """اعداد صحیح نامنفی را با varint (7 بیت در هر بایت) به انتهای bytearray اضافه می‌کند."""
+    append = out.append
+    for value in values:
+        while value >= 0x80:
+            append((value & 0x7F) | 0x80)
+            value >>= 7
+        append(value)
+
+
+def decode_varints(buffer, offset, count):
+    """count عدد varint را از offset می‌خواند و (لیست اعداد، offset بعدی) برمی‌گرداند."""
+    # مسیر سریع: وقتی همه اعداد تک بایتی هستند (حالت رایج برای tf ها و فاصله‌های کوچک)
+    chunk = buffer[offset:offset + count]
+    if len(chunk) == count and (not count or max(chunk) < 0x80):
+        return list(chunk), offset + count
+    values = []
+    append = values.append
+    for _ in range(count):
+        byte = buffer[offset]
+        offset += 1
+        if byte < 0x80:
+            append(byte)
+            continue
+        value = byte & 0x7F
+        shift = 7
+        while True:
+            byte = buffer[offset]
+            offset += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        append(value)
+    return values, offset
+
+
+def decode_varint_array(data):
+    """همه اعداد varint یک آرایه uint8 را برداری از حالت فشرده خارج می‌کند (آرایه int64)."""
+    if not data.size or data.max() < 0x80:
+        return data.astype(np.int64)
+    # از آخرین (پرارزش‌ترین) بایت هر عدد به عقب: در هر دور، بایت قبلی اعدادی که هنوز تمام نشده‌اند اضافه می‌شود
+    value_ends = np.flatnonzero(data < 0x80)
+    values = data[value_ends].astype(np.int64)
+    previous_ends = np.empty_like(value_ends)
+    previous_ends[0] = -1
+    previous_ends[1:] = value_ends[:-1]
+    positions = value_ends - 1
+    longer = np.flatnonzero(positions > previous_ends)
+    while longer.size:
+        values[longer] = (values[longer] << 7) | (data[positions[longer]] & 0x7F)
+        positions[longer] -= 1
+        longer = longer[positions[longer] > previous_ends[longer]]
+    return values
+
+
+def _concatenated_ranges(starts, lengths):
+    """اندیس‌های بازه‌های [start، start + length) پشت سر هم (آرایه int64)."""
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(offsets[-1] + lengths[-1] if len(lengths) else 0)
+
+
+def _map_file(path):
+    if os.path.getsize(path) == 0:
+        return b""
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class InvertedIndex:
+    """
+    خواننده ایندکس معکوس. فایل‌ها با mmap باز می‌شوند و فقط بخش‌هایی که خوانده می‌شوند در حافظه می‌آیند.
+    """
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, META_FILENAME), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != INDEX_FORMAT_VERSION:
+            raise ValueError(f"نسخه قالب ایندکس پشتیبانی نمی‌شود: {self.meta.get('version')}")
+        self.doc_count = self.meta['doc_count']
+        self.term_count = self.meta['term_count']
+        self.avg_doc_length = self.meta['avg_doc_length']
+
+        self._lexicon = _map_file(os.path.join(index_dir, LEXICON_FILENAME))
+        self._dictionary = _map_file(os.path.join(index_dir, DICTIONARY_FILENAME))
+        self._blocks = _map_file(os.path.join(index_dir, BLOCKS_FILENAME))
+        self._docs = _map_file(os.path.join(index_dir, POSTINGS_DOCS_FILENAME))
+        self._positions = _map_file(os.path.join(index_dir, POSTINGS_POSITIONS_FILENAME))
+        self._doclens_map = _map_file(os.path.join(index_dir, DOCLENS_FILENAME))
+        self.doc_lengths = memoryview(self._doclens_map).cast('I') if self.doc_count else array('I')
+        self.doc_length_array = np.frombuffer(self._doclens_map, dtype='<u4')
+        self._docs_array = np.frombuffer(self._docs, dtype=np.uint8)
+        self._total_blocks = len(self._blocks) // BLOCK_ENTRY.size
+        self._doc_names = None
+
+    # --- دیکشنری اصطلاحات ---
+    def _term_bytes(self, index):
+        lexicon_offset, term_length = TERM_ENTRY.unpack_from(self._dictionary, index * TERM_ENTRY.size)[:2]
+        return self._lexicon[lexicon_offset:lexicon_offset + term_length]
+
+    def _term_info(self, index):
+        lexicon_offset, term_length, df, first_block, block_count, collection_frequency = \
+            TERM_ENTRY.unpack_from(self._dictionary, index * TERM_ENTRY.size)
+        term = self._lexicon[lexicon_offset:lexicon_offset + term_length].decode('utf-8')
+        return TermInfo(term, df, collection_frequency, first_block, block_count)
+
+    def lookup(self, term):
+        """اطلاعات یک اصطلاح (TermInfo) با جستجوی دودویی در دیکشنری مرتب، یا None."""
+        key = term.encode('utf-8')
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._term_bytes(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.term_count and self._term_bytes(low) == key:
+            return self._term_info(low)
+        return None
+
+    def iter_terms(self):
+        """همه اصطلاحات به ترتیب دیکشنری."""
+        for index in range(self.term_count):
+            yield self._term_info(index)
+
+    # --- بلاک‌ها و postings ---
+    def block(self, term_info, block_number):
+        """ورودی بلاک block_number ام (از صفر) یک اصطلاح."""
+        return BlockEntry(*BLOCK_ENTRY.unpack_from(self._blocks, (term_info.first_block + block_number) *
+                                                   BLOCK_ENTRY.size))
+
+    def blocks(self, term_info):
+        """ورودی‌های همه بلاک‌های یک اصطلاح."""
+        start = term_info.first_block * BLOCK_ENTRY.size
+        end = start + term_info.block_count * BLOCK_ENTRY.size
+        return [BlockEntry(*fields) for fields in BLOCK_ENTRY.iter_unpack(self._blocks[start:end])]
+
+    def block_table(self, term_info):
+        """ورودی‌های همه بلاک‌های یک اصطلاح به صورت آرایه ساختاریافته NumPy (BLOCK_DTYPE)."""
+        start = term_info.first_block * BLOCK_ENTRY.size
+        return np.frombuffer(self._blocks[start:start + term_info.block_count * BLOCK_ENTRY.size], dtype=BLOCK_DTYPE)
+
+    def read_blocks(self, term_info, block_numbers, table=None):
+        """
+        شناسه‌های سند و tf های چند بلاک یک اصطلاح (block_numbers صعودی) با یک بار خارج کردن برداری از حالت
+        فشرده: (doc_ids، tfs) به صورت آرایه‌های int64 پشت سر هم. table خروجی block_table است اگر قبلا خوانده شده باشد.
+        """
+        if table is None:
+            table = self.block_table(term_info)
+        block_numbers = np.asarray(block_numbers, dtype=np.int64)
+        counts = table['doc_count'][block_numbers].astype(np.int64)
+        docs_offsets = table['docs_offset'].astype(np.int64)
+        # پایان بایت‌های هر بلاک شروع بلاک بعدی در blocks.bin است (یا پایان postings.docs)
+        next_block = term_info.first_block + term_info.block_count
+        if next_block < self._total_blocks:
+            end = BLOCK_ENTRY.unpack_from(self._blocks, next_block * BLOCK_ENTRY.size)[2]
+        else:
+            end = len(self._docs_array)
+        ends = np.append(docs_offsets[1:], end)
+        # بایت‌های بلاک‌های متوالی پشت سر هم هستند و یکجا برداشته می‌شوند
+        starts = docs_offsets[block_numbers]
+        stops = ends[block_numbers]
+        breaks = np.flatnonzero(block_numbers[1:] != block_numbers[:-1] + 1) + 1
+        if breaks.size:
+            run_starts = starts[np.concatenate(([0], breaks))]
+            run_stops = stops[np.concatenate((breaks - 1, [-1]))]
+            data = self._docs_array[_concatenated_ranges(run_starts, run_stops - run_starts)]
+        else:
+            data = self._docs_array[starts[0]:stops[-1]]
+        values = decode_varint_array(data)
+
+        # هر بلاک: count فاصله شناسه سند و سپس count تا tf. همه بلاک‌های یک اصطلاح جز آخرین بلاک پر هستند، پس
+        # بلاک‌ها (جز شاید آخری) به شکل آرایه (بلاک، 2، count) خوانده می‌شوند
+        bases = np.where(block_numbers > 0, table['last_doc'][block_numbers - 1], 0).astype(np.int64)
+        full_count = int(counts[0])
+        full_blocks = len(block_numbers) if counts[-1] == full_count else len(block_numbers) - 1
+        split = 2 * full_count * full_blocks
+        doc_parts = []
+        tf_parts = []
+        for part_values, part_bases, count in ((values[:split], bases[:full_blocks], full_count),
+                                               (values[split:], bases[full_blocks:], int(counts[-1]))):
+            if not part_bases.size:
+                continue
+            part = part_values.reshape(len(part_bases), 2, count)
+            # اولین فاصله هر بلاک نسبت به آخرین شناسه سند بلاک قبلی است
+            part[:, 0, 0] += part_bases
+            doc_parts.append(np.cumsum(part[:, 0, :], axis=1).ravel())
+            tf_parts.append(part[:, 1, :].ravel())
+        if len(doc_parts) == 1:
+            return doc_parts[0], tf_parts[0]
+        return np.concatenate(doc_parts), np.concatenate(tf_parts)
+
+    def read_block(self, term_info, block_number):
+        """شناسه‌های سند و tf های یک بلاک: (doc_ids، tfs)."""
+        entry = self.block(term_info, block_number)
+        base = self.block(term_info, block_number - 1).last_doc if block_number else 0
+        gaps, offset = decode_varints(self._docs, entry.docs_offset, entry.doc_count)
+        tfs, _ = decode_varints(self._docs, offset, entry.doc_count)
+        doc_ids = []
+        for gap in gaps:
+            base += gap
+            doc_ids.append(base)
+        return doc_ids, tfs
+
+    def read_block_positions(self, term_info, block_number, tfs=None):
+        """لیست موقعیت‌های اصطلاح در هر سند یک بلاک (به ترتیب اسناد بلاک)."""
+        entry = self.block(term_info, block_number)
+        if tfs is None:
+            _, tfs = self.read_block(term_info, block_number)
+        offset = entry.positions_offset
+        all_positions = []
+        for tf in tfs:
+            gaps, offset = decode_varints(self._positions, offset, tf)
+            position = 0
+            positions = []
+            for gap in gaps:
+                position += gap
+                positions.append(position)
+            all_positions.append(positions)
+        return all_positions
+
+    def postings(self, term):
+        """(doc_id، tf) برای همه اسنادی که اصطلاح در آنها آمده است."""
+        term_info = term if isinstance(term, TermInfo) else self.lookup(term)
+        if term_info is None:
+            return
+        for block_number in range(term_info.block_count):
+            doc_ids, tfs = self.read_block(term_info, block_number)
+            yield from zip(doc_ids, tfs)
+
+    def positions(self, term, doc_id):
+        """موقعیت‌های اصطلاح در یک سند (لیست خالی اگر نیامده باشد)."""
+        term_info = term if isinstance(term, TermInfo) else self.lookup(term)
+        if term_info is None:
+            return []
+        for block_number in range(term_info.block_count):
+            if self.block(term_info, block_number).last_doc < doc_id:
+                continue
+            doc_ids, tfs = self.read_block(term_info, block_number)
+            if doc_id not in doc_ids:
+                return []
+            return self.read_block_positions(term_info, block_number, tfs)[doc_ids.index(doc_id)]
+        return []
+
+    # --- اسناد ---
+    def doc_length(self, doc_id):
+        return self.doc_lengths[doc_id]
+
+    def doc_name(self, doc_id):
+        if self._doc_names is None:
+            with open(os.path.join(self.index_dir, DOCS_FILENAME), 'r', encoding='utf-8') as f:
+                self._doc_names = f.read().split('\n')
+        return self._doc_names[doc_id]
+
+    def close(self):
+        if isinstance(self.doc_lengths, memoryview):
+            self.doc_lengths.release()
+        self.doc_length_array = self._docs_array = None
+        for mapped in (self._lexicon, self._dictionary, self._blocks, self._docs, self._positions,
+                       self._doclens_map):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
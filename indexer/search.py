@@ -0,0 +1,253 @@
+# seoran/indexer/search.py
+# سطح: موتور پرس‌وجو. عبارت جستجو از همان مسیر نرمال‌سازی و NLP پردازشگر متن عبور می‌کند تا
+# اصطلاحات پرس‌وجو با لم‌های ایندکس شده یکسان باشند، و اسناد با BM25 امتیازدهی می‌شوند.
+#
+# برای اینکه همه postings امتیازدهی نشوند از حد بالای امتیاز بلاک‌ها (Block-Max) استفاده می‌شود: برای هر بلاک
+# هر اصطلاح حد بالای امتیاز از بیشترین tf و کمترین طول سند بلاک در ایندکس محاسبه می‌شود. مرزهای بلاک‌های همه
+# اصطلاحات، فضای شناسه‌های سند را به بازه‌هایی تقسیم می‌کنند که در هر اصطلاح فقط در یک بلاک قرار دارند و حد
+# بالای هر بازه مجموع حد بالای همان بلاک‌هاست. امتیاز اسناد امیدوارترین بازه‌ها یک آستانه اولیه برای k نتیجه برتر
+# می‌دهد؛ بعد فقط بلاک‌های بازه‌هایی که حد بالایشان به آستانه می‌رسد خوانده می‌شوند. اصطلاحاتی که مجموع بیشترین
+# امتیازشان به آستانه نمی‌رسد (MaxScore) سند نامزد تولید نمی‌کنند و بلاک‌هایشان فقط برای نامزدهای امیدوار
+# خوانده می‌شوند. خارج کردن بلاک‌ها از حالت فشرده، BM25 و جمع امتیاز اصطلاحات همه برداری (NumPy) هستند.
+# نتیجه دقیقا همان امتیازدهی کامل است (در تساوی امتیاز، شناسه سند کوچکتر جلوتر است).
+
+import math
+import os
+import sys
+from collections import Counter, namedtuple
+
+import numpy as np
+
+from inverted_index import InvertedIndex
+
+# نرمال‌سازی و NLP پرس‌وجو با همان توابع پردازشگر متن انجام می‌شود
+PROCESSOR_MODULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "processor")
+if PROCESSOR_MODULES_DIR not in sys.path:
+    sys.path.append(PROCESSOR_MODULES_DIR)
+from text_processor import normalize_persian_text_v2, process_text_with_nlp  # noqa: E402
+
+# --- پیکربندی ---
+INDEX_DIR = "search_index"
+DEFAULT_TOP_K = 10
+BM25_K1 = 1.2
+BM25_B = 0.75
+# تعداد بازه‌های با بیشترین حد بالا که برای آستانه اولیه امتیازدهی می‌شوند
+SEARCH_SEED_INTERVALS = 16
+# خطای نسبی مجاز محاسبه حد بالا (جمع اعشاری با ترتیب متفاوت)؛ بازه‌های به این اندازه نزدیک به آستانه هم بررسی می‌شوند
+_BOUND_TOLERANCE = 1e-9
+
+SearchResult = namedtuple('SearchResult', ['doc_id', 'score', 'name'])
+
+
+def analyze_query(query):
+    """عبارت جستجو را مانند متن اسناد نرمال و لماتایز می‌کند و لیست اصطلاحات را برمی‌گرداند."""
+    normalized_query = normalize_persian_text_v2(query, remove_numbers=True, remove_english=True)
+    return process_text_with_nlp(normalized_query)
+
+
+def bm25_idf(doc_count, df):
+    return math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+
+
+class _TermScorer:
+    """وزن BM25 یک اصطلاح پرس‌وجو، ورودی‌های بلاک‌های آن و حد بالای امتیاز هر بلاک (آرایه‌های NumPy)."""
+    __slots__ = ('term_info', 'weight', 'table', 'last_docs', 'block_max', 'max_score')
+
+    def __init__(self, index, term_info, query_frequency, k1, b):
+        self.term_info = term_info
+        self.weight = query_frequency * bm25_idf(index.doc_count, term_info.df) * (k1 + 1)
+        self.table = index.block_table(term_info)
+        self.last_docs = self.table['last_doc'].astype(np.int64)
+        max_tfs = self.table['max_tf'].astype(np.float64)
+        min_doc_lengths = self.table['min_doclen']
+        self.block_max = self.weight * max_tfs / (max_tfs + length_denominators(index, k1, b, min_doc_lengths))
+        self.max_score = float(self.block_max.max())
+
+    def needed_blocks(self, block_numbers):
+        """
+        شماره‌های یکتا و معتبر (صعودی) از شماره بلاک‌ها (len(last_docs) یعنی بدون بلاک). اگر بیش از نیمی از
+        بلاک‌های بین اولین و آخرین بلاک لازم باشند همه آن‌ها برگردانده می‌شوند: خواندن بایت‌های پشت سر هم ارزان‌تر از
+        جمع کردن تکه‌های جدا است و امتیاز اسناد اضافه فقط نامزدهای بیشتری می‌سازد.
+        """
+        needed = np.zeros(len(self.last_docs) + 1, dtype=bool)
+        needed[block_numbers] = True
+        needed = np.flatnonzero(needed[:-1])
+        if needed.size and 2 * len(needed) > needed[-1] - needed[0] + 1:
+            return np.arange(needed[0], needed[-1] + 1)
+        return needed
+
+    def read(self, index, block_numbers):
+        """(doc_ids، tfs) بلاک‌های block_numbers (خروجی needed_blocks)."""
+        if not block_numbers.size:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return index.read_blocks(self.term_info, block_numbers, self.table)
+
+    def scores(self, doc_ids, tfs, denominators):
+        """امتیاز BM25 اسناد؛ denominators خروجی length_denominators برای همه اسناد است."""
+        tfs = tfs.astype(np.float64)
+        return self.weight * tfs / (tfs + denominators[doc_ids])
+
+
+def length_denominators(index, k1, b, doc_lengths):
+    """بخش طول سند در مخرج BM25 (tf + k1 * (1 - b + b * dl / avgdl)) برای آرایه طول اسناد."""
+    length_norm = k1 * b / index.avg_doc_length if index.avg_doc_length else 0.0
+    return k1 * (1 - b) + doc_lengths * length_norm
+
+
+def _kth_score(scores, k, floor=0.0):
+    """k امین امتیاز بزرگ اگر از floor بیشتر باشد، وگرنه floor."""
+    scores = scores[scores > floor]
+    if len(scores) < k:
+        return floor
+    return float(np.partition(scores, len(scores) - k)[len(scores) - k])
+
+
+def _top_k(doc_ids, scores, k):
+    """k سند برتر (امتیاز نزولی، در تساوی شناسه صعودی) از آرایه‌های شناسه و امتیاز."""
+    if len(scores) > k:
+        kth_score = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = scores >= kth_score
+        doc_ids, scores = doc_ids[candidates], scores[candidates]
+    order = np.lexsort((doc_ids, -scores))[:k]
+    return doc_ids[order], scores[order]
+
+
+class SearchEngine:
+    """
+    جستجوی top-k با BM25 روی ایندکس ساخته شده توسط index_builder.
+    postings_scored تعداد postings است که در آخرین جستجو از حالت فشرده خارج و امتیازدهی شدند.
+    """
+    def __init__(self, index_dir=INDEX_DIR, k1=BM25_K1, b=BM25_B):
+        self.index = InvertedIndex(index_dir)
+        self.k1 = k1
+        self.b = b
+        self.postings_scored = 0
+        # برای همه اسناد یک بار محاسبه می‌شود (8 بایت برای هر سند) تا امتیازدهی هر posting یک جمع و تقسیم باشد
+        self._length_denominators = length_denominators(self.index, k1, b, self.index.doc_length_array)
+
+    def search(self, query, k=DEFAULT_TOP_K):
+        """k سند برتر برای یک عبارت جستجو (به ترتیب نزولی امتیاز)."""
+        return self.search_terms(analyze_query(query), k)
+
+    def search_terms(self, terms, k=DEFAULT_TOP_K):
+        """k سند برتر برای لیستی از اصطلاحات (لم‌های) از پیش پردازش شده."""
+        self.postings_scored = 0
+        scorers = []
+        for term, query_frequency in Counter(terms).items():
+            term_info = self.index.lookup(term)
+            if term_info is not None and term_info.df:
+                scorers.append(_TermScorer(self.index, term_info, query_frequency, self.k1, self.b))
+        if not scorers or k <= 0:
+            return []
+        doc_ids, scores = self._block_max_top_k(scorers, k)
+        return [SearchResult(doc_id, score, self.index.doc_name(doc_id))
+                for doc_id, score in zip(doc_ids.tolist(), scores.tolist())]
+
+    def _block_max_top_k(self, scorers, k):
+        # اصطلاحات به ترتیب صعودی بیشترین امتیاز: اصطلاحاتی که مجموع بیشترین امتیازشان به آستانه نمی‌رسد
+        # (غیر ضروری، MaxScore) سند نامزد تولید نمی‌کنند و فقط برای نامزدهای امیدوار خوانده می‌شوند
+        scorers = sorted(scorers, key=lambda scorer: scorer.max_score)
+        max_score_sums = np.cumsum([scorer.max_score for scorer in scorers])
+        denominators = self._length_denominators
+
+        # شروع بازه‌ها: صفر و سند بعد از پایان هر بلاک هر اصطلاح (تا آخرین سند دارای یکی از اصطلاحات)
+        last_doc = max(int(scorer.last_docs[-1]) for scorer in scorers)
+        starts = np.unique(np.concatenate([np.zeros(1, dtype=np.int64)] + [scorer.last_docs + 1 for scorer in scorers]))
+        starts = starts[starts <= last_doc]
+        upper_bounds = np.zeros(len(starts))
+        interval_blocks = []  # برای هر اصطلاح: شماره بلاک هر بازه (len(last_docs) اگر اصطلاح در بازه سندی ندارد)
+        for scorer in scorers:
+            block_numbers = np.searchsorted(scorer.last_docs, starts)
+            covered = block_numbers < len(scorer.last_docs)
+            upper_bounds[covered] += scorer.block_max[block_numbers[covered]]
+            interval_blocks.append(block_numbers)
+
+        # مجموع امتیاز اسناد؛ np.zeros صفحه‌های دست نخورده حافظه را واقعا تخصیص نمی‌دهد
+        accumulator = np.zeros(last_doc + 1)
+
+        def accumulate(scorer, block_numbers):
+            doc_ids, tfs = scorer.read(self.index, scorer.needed_blocks(block_numbers))
+            accumulator[doc_ids] += scorer.scores(doc_ids, tfs, denominators)
+            self.postings_scored += len(doc_ids)
+            return doc_ids
+
+        # آستانه اولیه: امتیاز اسناد بلاک‌های امیدوارترین بازه‌ها. امتیاز اسنادی از این بلاک‌ها که بیرون این
+        # بازه‌ها هستند ناقص است، ولی امتیاز ناقص هم حد پایین امتیاز سند است و آستانه را بیش از حد بالا نمی‌برد.
+        seed = np.argsort(-upper_bounds, kind='stable')[:SEARCH_SEED_INTERVALS]
+        seed_docs = np.unique(np.concatenate([accumulate(scorer, block_numbers[seed])
+                                              for scorer, block_numbers in zip(scorers, interval_blocks)]))
+        if len(seed) == len(starts):
+            # بازه‌های اولیه همه اسناد اصطلاحات را پوشانده‌اند و امتیازها کامل هستند
+            return _top_k(seed_docs, accumulator[seed_docs], k)
+        threshold = _kth_score(accumulator[seed_docs], k)
+        accumulator[seed_docs] = 0.0
+
+        # اسناد اصطلاحات ضروری در بازه‌هایی که حد بالایشان به آستانه می‌رسد
+        cutoff = threshold * (1 - _BOUND_TOLERANCE)
+        essential = int(np.searchsorted(max_score_sums, cutoff))
+        promising = upper_bounds >= cutoff
+        for scorer, block_numbers in zip(scorers[essential:], interval_blocks[essential:]):
+            accumulate(scorer, block_numbers[promising])
+        # نامزدها: اسنادی که امتیاز اصطلاحات ضروری به همراه بیشترین امتیاز بقیه اصطلاحات به آستانه می‌رسد
+        minimum = cutoff - (max_score_sums[essential - 1] if essential else 0.0)
+        candidates = np.flatnonzero(accumulator >= minimum if minimum > 0 else accumulator)
+        if essential and len(candidates) >= sum(len(scorer.last_docs) for scorer in scorers[:essential]):
+            # نامزدها تقریبا همه بلاک‌های اصطلاحات غیر ضروری را می‌پوشانند: این اصطلاحات هم مانند اصطلاحات ضروری
+            # خوانده می‌شوند تا کار اضافه پیدا کردن بلاک هر نامزد انجام نشود
+            for scorer, block_numbers in zip(scorers[:essential], interval_blocks[:essential]):
+                accumulate(scorer, block_numbers[promising])
+            essential = 0
+            candidates = np.flatnonzero(accumulator >= cutoff)
+        scores = accumulator[candidates]
+        # بازه هر نامزد، که بلاک نامزد را در هر اصطلاح مشخص می‌کند
+        candidate_intervals = np.searchsorted(starts, candidates, side='right') - 1
+
+        # اصطلاحات غیر ضروری به ترتیب نزولی بیشترین امتیاز. امتیازهای ناقص حد پایین‌اند و آستانه را بالا می‌برند؛
+        # نامزدهایی که حتی با حد بالای اصطلاحات باقی‌مانده به آستانه نمی‌رسند کنار گذاشته می‌شوند.
+        for position in range(essential - 1, -1, -1):
+            scorer = scorers[position]
+            threshold = _kth_score(scores, k, threshold)
+            cutoff = threshold * (1 - _BOUND_TOLERANCE)
+            block_numbers = interval_blocks[position][candidate_intervals]
+            covered = block_numbers < len(scorer.last_docs)
+            bounds = scores + (max_score_sums[position - 1] if position else 0.0)
+            bounds[covered] += scorer.block_max[block_numbers[covered]]
+            remaining = bounds >= cutoff
+            candidates, scores = candidates[remaining], scores[remaining]
+            candidate_intervals = candidate_intervals[remaining]
+            # بعد از صفر کردن نامزدها، accumulator برای نامزدها فقط امتیاز همین اصطلاح را نگه می‌دارد
+            accumulator[candidates] = 0.0
+            accumulate(scorer, block_numbers[remaining])
+            scores = scores + accumulator[candidates]
+        # همه اسنادی که امتیازشان به آستانه می‌رسد (دست کم k سند اگر وجود داشته باشند) هنوز نامزدند
+        final = scores >= cutoff
+        return _top_k(candidates[final], scores[final], k)
+
+    def close(self):
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == "__main__":
+    if not os.path.exists(INDEX_DIR):
+        print(f"ایندکسی در {INDEX_DIR} یافت نشد. ابتدا index_builder.py را اجرا کنید.")
+        sys.exit(1)
+    with SearchEngine(INDEX_DIR) as engine:
+        print(f"ایندکس بارگذاری شد: {engine.index.doc_count} سند، {engine.index.term_count} اصطلاح.")
+        while True:
+            try:
+                query = input("\nعبارت جستجو (خالی برای خروج): ").strip()
+            except EOFError:
+                break
+            if not query:
+                break
+            results = engine.search(query)
+            if not results:
+                print("نتیجه‌ای یافت نشد.")
+            for rank, result in enumerate(results, start=1):
+                print(f"{rank}. {result.name} (امتیاز: {result.score:.3f})")
@@ -0,0 +1,355 @@
+# seoran/processor/html_cleaner.py
+# سطح: پاکسازی DOM و استخراج متن اصلی صفحه. این ماژول به Hazm وابسته نیست تا خزنده
+# (در تحلیل یک‌باره صفحه) و پردازشگر متن هر دو از آن استفاده کنند.
+#
+# دو پیاده‌سازی با خروجی یکسان وجود دارد:
+#   extract_text_from_soup   روی یک BeautifulSoup: یک find_all برای هر تگ ناخواسته و یک select برای هر سلکتور.
+#   extract_text_from_html   قواعد را یک بار کامپایل می‌کند و HTML را با پارسر lxml (همان پارسری که
+#                            BeautifulSoup با 'lxml' استفاده می‌کند) در یک گذر جریانی پاکسازی می‌کند:
+#                            زیردرخت‌های ناخواسته هرس می‌شوند و محتوای اصلی در همان گذر پیدا می‌شود.
+
+import functools
+import re
+
+import soupsieve
+from bs4 import BeautifulSoup, Comment
+from lxml import etree
+
+# تگ‌هایی که محتوای آنها باید کاملا حذف شود (بدون تغییر نسبت به قبل)
+UNWANTED_TAGS = [
+    'script', 'style', 'header', 'footer', 'nav', 'aside', 'form', 'button', 
+    'select', 'textarea', 'iframe', 'link', 'meta', 'noscript', 'embed', 'object'
+]
+# سلکتورهای CSS برای حذف بخش‌های خاص (بدون تغییر نسبت به قبل)
+UNWANTED_CSS_SELECTORS = [
+    '.ads', '.advertisement', '.ad', '.banner', '.popup', '.cookie-banner', '.cookie-notice',
+    '#sidebar', '#comments', '.comments-area', '.comment-list', '.reply',
+    '.related-posts', '.related_posts', '.share-buttons', '.social-sharing',
+    '.site-footer', '.site-header', '.main-navigation', '.menu', '.social-links', 
+    '.breadcrumbs', '.pagination', '.widget', '.author-bio', '.post-meta-data',
+    '[class*="promo"]', '[id*="promo"]', '[class*="advert"]', '[id*="advert"]',
+    '[aria-hidden="true"]'
+]
+
+# محل‌های احتمالی محتوای اصلی، به ترتیب اولویت
+MAIN_CONTENT_SELECTORS = ['article', 'main', '.post-content', '.entry-content', '#content', '#main-content']
+
+
+def extract_text_from_soup(soup):
+    """
+    عناصر ناخواسته را از soup حذف می‌کند (soup تغییر می‌کند) و متن محتوای اصلی را برمی‌گرداند.
+    """
+    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+        comment.extract()
+    for tag_name in UNWANTED_TAGS:
+        for tag in soup.find_all(tag_name):
+            tag.decompose()
+    for selector in UNWANTED_CSS_SELECTORS:
+        try:
+            for element in soup.select(selector):
+                element.decompose()
+        except Exception:
+            pass
+    body = soup.find('body')
+    if not body:
+        text_content = soup.get_text(separator=' ', strip=True)
+    else:
+        main_text_element = None
+        for tag_selector in MAIN_CONTENT_SELECTORS:
+            if tag_selector.startswith('.'): main_text_element = body.select_one(tag_selector)
+            elif tag_selector.startswith('#'): main_text_element = body.select_one(tag_selector)
+            else: main_text_element = body.find(tag_selector)
+            if main_text_element: break
+        if main_text_element: text_content = main_text_element.get_text(separator=' ', strip=True)
+        else: text_content = body.get_text(separator=' ', strip=True)
+    return _clean_extracted_text(text_content)
+
+
+def _clean_extracted_text(text_content):
+    """حذف URL ها و فاصله‌های اضافه از متن استخراج شده."""
+    if not text_content: return ""
+    url_pattern = r'https?://[^\s/$.?#].[^\s]*|www\.[^\s/$.?#].[^\s]*'
+    text_content = re.sub(url_pattern, '', text_content)
+    lines = (line.strip() for line in text_content.splitlines())
+    text_content = ' '.join(line for line in lines if line) 
+    text_content = re.sub(r'\s{2,}', ' ', text_content).strip()
+    return text_content
+
+
+# --- پاکسازی کامپایل شده در یک گذر ---
+
+# BeautifulSoup رشته‌های داخل این تگ‌ها را از نوع دیگری (Script، TemplateString، RubyTextString و ...)
+# می‌سازد. get_text هر عنصر فقط رشته‌های نوع خودش را برمی‌گرداند: برای عناصر معمولی رشته‌هایی که داخل
+# هیچ کدام از این تگ‌ها نیستند و برای خود این تگ‌ها رشته‌هایی که نزدیک‌ترین تگ از این لیست بالایشان هم‌نام است
+_STRING_CONTAINER_TAGS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+
+# سلکتورهای ساده (مرکب از تگ، کلاس، شناسه و شرط‌های ویژگی، بدون ترکیب‌کننده و شبه‌کلاس)
+_COMPOUND_SELECTOR_RE = re.compile(
+    r'([a-zA-Z][\w-]*)?((?:\.-?[_a-zA-Z][\w-]*|#[\w-]+'
+    r'|\[\s*[\w-]+\s*(?:[*^$~|]?=\s*(?:"[^"]*"|\'[^\']*\'|[\w-]+)\s*)?\])*)$'
+)
+_SELECTOR_PART_RE = re.compile(
+    r'\.(-?[_a-zA-Z][\w-]*)|#([\w-]+)'
+    r'|\[\s*([\w-]+)\s*(?:([*^$~|]?=)\s*(?:"([^"]*)"|\'([^\']*)\'|([\w-]+))\s*)?\]'
+)
+
+
+def _parse_simple_selector(selector):
+    """
+    سلکتور ساده را به (تگ، کلاس‌ها، شناسه‌ها، شرط‌های ویژگی) تبدیل می‌کند، یا None اگر ساده نباشد.
+    شرط ویژگی (نام، عملگر، مقدار) است؛ عملگر None یعنی فقط وجود ویژگی.
+    """
+    match = _COMPOUND_SELECTOR_RE.match(selector.strip())
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    classes, ids, attributes = [], [], []
+    for part in _SELECTOR_PART_RE.finditer(match.group(2)):
+        class_name, id_value, attribute, operator, double_quoted, single_quoted, bare = part.groups()
+        if class_name:
+            classes.append(class_name)
+        elif id_value:
+            ids.append(id_value)
+        else:
+            value = next((v for v in (double_quoted, single_quoted, bare) if v is not None), None)
+            attributes.append((attribute.lower(), operator, value))
+    tag = match.group(1).lower() if match.group(1) else None
+    return tag, tuple(classes), tuple(ids), tuple(attributes)
+
+
+def _attribute_matches(actual, operator, value):
+    # همان معنای soupsieve برای سلکتورهای ویژگی (حساس به بزرگی و کوچکی حروف)
+    if operator is None:
+        return True
+    if operator == '=':
+        return actual == value
+    if not value:
+        return False
+    if operator == '*=':
+        return value in actual
+    if operator == '^=':
+        return actual.startswith(value)
+    if operator == '$=':
+        return actual.endswith(value)
+    if operator == '~=':
+        return value in actual.split()
+    return actual == value or actual.startswith(value + '-')  # |=
+
+
+def _rule_matches(rule, tag, attrib):
+    rule_tag, classes, ids, attributes = rule
+    if rule_tag is not None and rule_tag != tag:
+        return False
+    if classes and not set(classes).issubset(attrib.get('class', '').split()):
+        return False
+    if ids and any(attrib.get('id') != id_value for id_value in ids):
+        return False
+    for name, operator, value in attributes:
+        actual = attrib.get(name)
+        if actual is None:
+            return False
+        if name == 'class':
+            # BeautifulSoup کلاس‌ها را لیست نگه می‌دارد و برای مقایسه با یک فاصله به هم می‌چسباند
+            actual = ' '.join(actual.split())
+        if not _attribute_matches(actual, operator, value):
+            return False
+    return True
+
+
+class CompiledHtmlCleaner:
+    """
+    قواعد پاکسازی (تگ‌ها و سلکتورهای ناخواسته و سلکتورهای محتوای اصلی) که یک بار کامپایل شده‌اند.
+    قواعد تک شرطی (فقط تگ، فقط کلاس یا فقط شناسه) با جستجو در مجموعه بررسی می‌شوند.
+    supported برای سلکتورهایی که ساده نیستند False است و آنگاه باید از extract_text_from_soup استفاده کرد.
+    """
+    def __init__(self, unwanted_tags, unwanted_selectors, main_content_selectors):
+        self.supported = True
+        self._tags = set(unwanted_tags)
+        self._classes = set()
+        self._ids = set()
+        self._rules = []
+        for selector in unwanted_selectors:
+            rule = _parse_simple_selector(selector)
+            if rule is None:
+                try:
+                    soupsieve.compile(selector)
+                except Exception:
+                    continue  # سلکتور نامعتبر در مسیر BeautifulSoup هم نادیده گرفته می‌شود
+                self.supported = False
+                continue
+            tag, classes, ids, attributes = rule
+            if tag and not (classes or ids or attributes):
+                self._tags.add(tag)
+            elif len(classes) == 1 and not (tag or ids or attributes):
+                self._classes.add(classes[0])
+            elif len(ids) == 1 and not (tag or classes or attributes):
+                self._ids.add(ids[0])
+            else:
+                self._rules.append(rule)
+
+        self._main_rules = []
+        for selector in main_content_selectors:
+            if selector.startswith('.') or selector.startswith('#'):
+                rule = _parse_simple_selector(selector)
+                if rule is None:
+                    self.supported = False
+                    continue
+            else:
+                rule = (selector, (), (), ())  # مانند body.find(نام تگ)
+            self._main_rules.append(rule)
+
+    def is_unwanted(self, tag, attrib):
+        if tag in self._tags:
+            return True
+        if not attrib:
+            return False
+        classes = attrib.get('class')
+        if classes and self._classes and not self._classes.isdisjoint(classes.split()):
+            return True
+        if self._ids and attrib.get('id') in self._ids:
+            return True
+        for rule in self._rules:
+            if _rule_matches(rule, tag, attrib):
+                return True
+        return False
+
+    def extract_text(self, html_content):
+        """متن محتوای اصلی (مانند extract_text_from_soup)، یا None اگر lxml نتواند سند را پارس کند."""
+        if html_content and html_content[0] == "\N{BYTE ORDER MARK}":
+            html_content = html_content[1:]
+        markups = [html_content]
+        if isinstance(html_content, str):
+            markups.append(html_content.encode('utf-8'))  # مانند BeautifulSoup، اگر lxml متن یونیکد را نپذیرد
+        for markup in markups:
+            target = _CleaningTarget(self)
+            parser = etree.HTMLParser(target=target, recover=True)
+            try:
+                parser.feed(markup)
+                parser.close()
+            except (UnicodeDecodeError, LookupError, etree.ParserError, etree.XMLSyntaxError):
+                continue
+            return _clean_extracted_text(target.main_text())
+        return None
+
+
+class _CleaningTarget:
+    """
+    هدف رویدادهای پارسر lxml. رشته‌ها مانند BeautifulSoup ساخته می‌شوند (داده‌های پشت سر هم تا رویداد
+    بعدی یک رشته‌اند)، رشته‌های داخل زیردرخت‌های هرس شده دور ریخته می‌شوند و برای body و اولین
+    عنصر منطبق با هر سلکتور محتوای اصلی بازه رشته‌هایش ثبت می‌شود.
+    """
+    def __init__(self, cleaner):
+        self.cleaner = cleaner
+        self.pieces = []
+        self.piece_containers = []  # نزدیک‌ترین تگ از _STRING_CONTAINER_TAGS بالای هر رشته (یا None)
+        self.body_range = None
+        self.main_ranges = [None] * len(cleaner._main_rules)  # [شروع، پایان، نام تگ]
+        self._data = []
+        self._stack = []       # برای هر عنصر باز: (هرس شده، تگ نگهدارنده رشته است، بازه‌هایی که با بسته شدنش تمام می‌شوند)
+        self._pruned = 0       # تعداد عناصر هرس شده باز (بیشتر از صفر یعنی داخل زیردرخت حذف شده)
+        self._containers = []  # تگ‌های باز از _STRING_CONTAINER_TAGS
+        self._in_body = False
+
+    def _flush(self):
+        if self._data:
+            text = "".join(self._data)
+            self._data = []
+            if not self._pruned:
+                text = text.strip()
+                if text:
+                    self.pieces.append(text)
+                    self.piece_containers.append(self._containers[-1] if self._containers else None)
+
+    def start(self, tag, attrib):
+        self._flush()
+        if self._pruned:
+            self._stack.append((False, False, None))
+            return
+        if self.cleaner.is_unwanted(tag, attrib):
+            self._pruned += 1
+            self._stack.append((True, False, None))
+            return
+        ranges = None
+        if self._in_body:
+            for i, rule in enumerate(self.cleaner._main_rules):
+                if self.main_ranges[i] is None and _rule_matches(rule, tag, attrib):
+                    self.main_ranges[i] = [len(self.pieces), None, tag]
+                    ranges = (ranges or []) + [self.main_ranges[i]]
+        elif tag == 'body' and self.body_range is None:
+            self.body_range = [len(self.pieces), None, tag]
+            self._in_body = True
+            ranges = [self.body_range]
+        container = tag in _STRING_CONTAINER_TAGS
+        if container:
+            self._containers.append(tag)
+        self._stack.append((False, container, ranges))
+
+    def end(self, tag):
+        self._flush()
+        pruned, container, ranges = self._stack.pop()
+        if pruned:
+            self._pruned -= 1
+        if container:
+            self._containers.pop()
+        if ranges:
+            for text_range in ranges:
+                text_range[1] = len(self.pieces)
+                if text_range is self.body_range:
+                    self._in_body = False
+
+    def data(self, data):
+        self._data.append(data)
+
+    def comment(self, text):
+        self._flush()
+
+    def pi(self, target, data=None):
+        self._flush()
+
+    def doctype(self, *args):
+        self._flush()
+
+    def close(self):
+        self._flush()
+        for text_range in [self.body_range] + self.main_ranges:
+            if text_range is not None and text_range[1] is None:
+                text_range[1] = len(self.pieces)
+
+    def _text(self, start, end, tag=None):
+        # مانند get_text(separator=' ', strip=True) روی عنصری با نام tag
+        wanted = tag if tag in _STRING_CONTAINER_TAGS else None
+        return ' '.join(piece for piece, container in zip(self.pieces[start:end], self.piece_containers[start:end])
+                        if container == wanted)
+
+    def main_text(self):
+        if self.body_range is None:
+            return self._text(0, len(self.pieces))
+        for text_range in self.main_ranges:
+            if text_range is not None:
+                return self._text(*text_range)
+        return self._text(*self.body_range)
+
+
+@functools.lru_cache(maxsize=8)
+def _compiled_cleaner(unwanted_tags, unwanted_selectors, main_content_selectors):
+    return CompiledHtmlCleaner(unwanted_tags, unwanted_selectors, main_content_selectors)
+
+
+def compiled_cleaner():
+    """پاکساز کامپایل شده برای قواعد فعلی (اگر لیست‌های قواعد تغییر کنند دوباره کامپایل می‌شود)."""
+    return _compiled_cleaner(tuple(UNWANTED_TAGS), tuple(UNWANTED_CSS_SELECTORS), tuple(MAIN_CONTENT_SELECTORS))
+
+
+def extract_text_from_html(html_content):
+    """
+    متن محتوای اصلی یک صفحه HTML، با همان خروجی extract_text_from_soup(BeautifulSoup(html_content, 'lxml'))
+    ولی بدون ساختن درخت BeautifulSoup و در یک گذر. اگر قواعد پاکسازی سلکتور پیچیده‌ای داشته باشند یا
+    lxml نتواند سند را پارس کند، از مسیر BeautifulSoup استفاده می‌شود.
+    """
+    if not html_content:
+        return ""
+    cleaner = compiled_cleaner()
+    if cleaner.supported:
+        text = cleaner.extract_text(html_content)
+        if text is not None:
+            return text
+    return extract_text_from_soup(BeautifulSoup(html_content, 'lxml'))
@@ -0,0 +1,106 @@
+# seoran/processor/lemma_cache.py
+# سطح: کش محدود (LRU) از شکل ظاهری یک توکن به نتیجه نهایی پردازش آن (لم یا حذف شدن توکن).
+#
+# متن فارسی توزیع زیپفی دارد: چند هزار شکل پرتکرار بیشتر توکن‌ها را می‌سازند، پس نتیجه تصمیم‌های
+# کلمه توقف، عددی، علامت نگارشی و لماتایزر برای هر شکل فقط یک بار محاسبه می‌شود.
+# کش می‌تواند در یک فایل JSON ذخیره شود تا اجرای بعدی گرم شروع شود. هر فایل یک امضا دارد
+# (مثلا هش کلمات توقف و نسخه Hazm) و اگر امضا تغییر کند فایل نادیده گرفته می‌شود.
+
+import json
+import os
+from collections import OrderedDict
+
+LEMMA_CACHE_FORMAT_VERSION = 1
+
+
+class LemmaCache:
+    """
+    کش LRU با شمارنده‌های hit و miss. مقدار هر ورودی لم نهایی توکن است، یا رشته خالی
+    اگر توکن باید حذف شود. get برای ورودی‌های موجود نبودن None برمی‌گرداند.
+    با track_new_entries (فقط در پروسس‌های کارگر) ورودی‌های جدید تا drain_new_entries بعدی نگه داشته می‌شوند؛
+    تعداد آنها هم حداکثر max_size است.
+    """
+    def __init__(self, max_size, track_new_entries=False):
+        self.max_size = max_size
+        self.track_new_entries = track_new_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._new_entries = {}
+
+    def get(self, word):
+        try:
+            value = self._entries[word]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(word)
+        self.hits += 1
+        return value
+
+    def put(self, word, value):
+        self._store(word, value)
+        if self.track_new_entries:
+            new_entries = self._new_entries
+            new_entries[word] = value
+            if len(new_entries) > self.max_size:
+                del new_entries[next(iter(new_entries))]
+
+    def _store(self, word, value):
+        entries = self._entries
+        entries[word] = value
+        entries.move_to_end(word)
+        while len(entries) > self.max_size:
+            entries.popitem(last=False)
+
+    def update(self, items):
+        """ورودی‌های محاسبه شده در جای دیگر (مثلا در یک پروسس کارگر) را بدون تغییر شمارنده‌ها اضافه می‌کند."""
+        for word, value in items:
+            self._store(word, value)
+
+    def drain_new_entries(self):
+        """ورودی‌هایی که از آخرین فراخوانی محاسبه شده‌اند را برمی‌گرداند و لیست را خالی می‌کند."""
+        new_entries = list(self._new_entries.items())
+        self._new_entries = {}
+        return new_entries
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, word):
+        return word in self._entries
+
+    def save(self, path, signature):
+        """کش را (به ترتیب LRU) در یک فایل JSON ذخیره می‌کند. نوشتن اتمیک است."""
+        data = {
+            'version': LEMMA_CACHE_FORMAT_VERSION,
+            'signature': signature,
+            'entries': list(self._entries.items()),
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def load(self, path, signature):
+        """
+        ورودی‌های یک فایل ذخیره شده را بارگذاری می‌کند و تعداد آنها را برمی‌گرداند.
+        اگر فایل وجود نداشته باشد، خراب باشد یا امضای آن متفاوت باشد 0 برمی‌گرداند.
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if data.get('version') != LEMMA_CACHE_FORMAT_VERSION or data.get('signature') != signature:
+            return 0
+        entries = data.get('entries') or []
+        self.update(entries)
+        return len(entries)
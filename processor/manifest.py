@@ -0,0 +1,164 @@
+# seoran/processor/manifest.py
+# سطح: فهرست (manifest) ورودی‌های پردازش شده برای اجرای افزایشی پردازشگر متن.
+#
+# برای هر ورودی (مسیر فایل HTML یا URL یک رکورد مخزن segment ها) اندازه، زمان تغییر، هش محتوا و
+# فایل خروجی آخرین پردازش نگه داشته می‌شود. در اجرای بعدی فقط ورودی‌های جدید یا تغییر کرده پردازش
+# می‌شوند و خروجی ورودی‌های حذف شده پاک می‌شود. نسخه پردازش (هش کلمات توقف، تنظیمات نرمال‌سازی و ...)
+# هم ذخیره می‌شود و اگر تغییر کند همه ورودی‌ها دوباره پردازش می‌شوند.
+# اثر انگشت SimHash هر ورودی و سند اصلی ورودی‌های تقریبا تکراری هم ثبت می‌شود تا تشخیص تکراری‌ها
+# در اجرای افزایشی با ورودی‌های پردازش نشده (بدون تغییر) هم ممکن باشد.
+
+import hashlib
+import os
+import sqlite3
+import time
+from collections import namedtuple
+
+MANIFEST_FILENAME = "processing_manifest.sqlite"
+# تعداد ثبت‌ها پیش از commit خودکار
+MANIFEST_COMMIT_INTERVAL = 500
+
+InputState = namedtuple('InputState', ['size', 'mtime', 'content_hash'])
+
+
+def bytes_content_hash(data):
+    """هش 16 بایتی (hex) محتوای یک ورودی."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def file_content_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ProcessingManifest:
+    """
+    manifest ذخیره شده در SQLite. needs_processing تصمیم می‌گیرد یک ورودی باید پردازش شود یا نه،
+    record نتیجه پردازش را ثبت می‌کند و remove_missing خروجی ورودی‌هایی را که دیگر وجود ندارند پاک می‌کند.
+    """
+    def __init__(self, path, processing_version, remove_output=None):
+        self.path = path
+        self.processing_version = processing_version
+        # حذف خروجی یک ورودی (مسیر ثبت شده در output_path)؛ پیش‌فرض حذف فایل است
+        self.remove_output = remove_output or remove_file
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS inputs ("
+            " source TEXT PRIMARY KEY, size INTEGER, mtime REAL, content_hash TEXT,"
+            " output_path TEXT, processed_at REAL, fingerprint TEXT, duplicate_of TEXT)"
+        )
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(inputs)")}
+        for column in ('fingerprint', 'duplicate_of'):
+            if column not in columns:  # manifest ساخته شده با نسخه‌های قبلی
+                self._connection.execute(f"ALTER TABLE inputs ADD COLUMN {column} TEXT")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = self._connection.execute("SELECT value FROM meta WHERE key = 'processing_version'").fetchone()
+        self.stored_version = row[0] if row else None
+        # در اولین اجرا (manifest خالی) همه ورودی‌ها جدید هستند و «تغییر نسخه» محسوب نمی‌شود
+        self.version_changed = self.stored_version is not None and self.stored_version != processing_version
+        self._seen_sources = set()
+        self._pending_writes = 0
+
+    def _get(self, source):
+        return self._connection.execute(
+            "SELECT size, mtime, content_hash, output_path FROM inputs WHERE source = ?", (source,)
+        ).fetchone()
+
+    def needs_processing(self, source, size, mtime, read_content_hash):
+        """
+        (True، InputState) اگر ورودی جدید یا تغییر کرده باشد یا نسخه پردازش عوض شده باشد، وگرنه (False، None).
+        اگر اندازه و زمان تغییر یکسان باشند هش محاسبه نمی‌شود؛ read_content_hash فقط در صورت نیاز صدا زده می‌شود.
+        """
+        self._seen_sources.add(source)
+        row = self._get(source)
+        if row is not None and not self.version_changed and row[0] == size and row[1] == mtime:
+            return False, None
+        content_hash = read_content_hash()
+        if row is not None and not self.version_changed and row[2] == content_hash:
+            # فقط زمان تغییر عوض شده است (مثلا کپی دوباره فایل)؛ محتوا همان است
+            self._connection.execute("UPDATE inputs SET size = ?, mtime = ? WHERE source = ?",
+                                     (size, mtime, source))
+            self._count_write()
+            return False, None
+        return True, InputState(size, mtime, content_hash)
+
+    def record(self, source, state, output_path, fingerprint=None, duplicate_of=None):
+        """
+        نتیجه پردازش یک ورودی را ثبت می‌کند. output_path برای ورودی‌هایی که رد شده‌اند None است.
+        اگر خروجی قبلی این ورودی فایل دیگری بوده (یا ورودی این بار رد شده) خروجی قبلی حذف می‌شود.
+        برای ورودی‌های تقریبا تکراری duplicate_of ورودی اصلی آنهاست.
+        """
+        row = self._get(source)
+        if row is not None and row[3] and row[3] != output_path:
+            self.remove_output(row[3])
+        self._connection.execute(
+            "INSERT OR REPLACE INTO inputs (source, size, mtime, content_hash, output_path, processed_at,"
+            " fingerprint, duplicate_of) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (source, state.size, state.mtime, state.content_hash, output_path, time.time(),
+             None if fingerprint is None else f"{fingerprint:016x}", duplicate_of)
+        )
+        self._count_write()
+
+    def kept_fingerprints(self):
+        """(ورودی، اثر انگشت) ورودی‌هایی که خروجی‌شان نگه داشته شده است (اسناد اصلی خوشه‌های تکراری)."""
+        if self.version_changed:
+            return
+        for source, fingerprint in self._connection.execute(
+                "SELECT source, fingerprint FROM inputs WHERE output_path IS NOT NULL AND fingerprint IS NOT NULL"):
+            yield source, int(fingerprint, 16)
+
+    def forget_orphaned_duplicates(self, source_exists):
+        """
+        ورودی‌های تکراری که ورودی اصلی‌شان دیگر وجود ندارد از manifest حذف می‌شوند تا دوباره پردازش شوند
+        (و یکی از آنها جای سند اصلی را بگیرد). تعداد این ورودی‌ها را برمی‌گرداند.
+        """
+        orphaned = [source for source, duplicate_of in
+                    self._connection.execute("SELECT source, duplicate_of FROM inputs WHERE duplicate_of IS NOT NULL")
+                    if not source_exists(duplicate_of)]
+        for source in orphaned:
+            self._connection.execute("DELETE FROM inputs WHERE source = ?", (source,))
+        self._connection.commit()
+        return len(orphaned)
+
+    def remove_missing(self):
+        """ورودی‌هایی که در این اجرا دیده نشدند (حذف شده‌اند) را پاک می‌کند و تعداد خروجی‌های حذف شده را برمی‌گرداند."""
+        removed_outputs = 0
+        missing = [(source, output_path) for source, output_path in
+                   self._connection.execute("SELECT source, output_path FROM inputs")
+                   if source not in self._seen_sources]
+        for source, output_path in missing:
+            if output_path and self.remove_output(output_path):
+                removed_outputs += 1
+            self._connection.execute("DELETE FROM inputs WHERE source = ?", (source,))
+        self._connection.commit()
+        return removed_outputs
+
+    def _count_write(self):
+        self._pending_writes += 1
+        if self._pending_writes >= MANIFEST_COMMIT_INTERVAL:
+            self._connection.commit()
+            self._pending_writes = 0
+
+    def commit(self):
+        """ثبت تغییرات به همراه نسخه پردازش فعلی."""
+        self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('processing_version', ?)",
+                                 (self.processing_version,))
+        self._connection.commit()
+        self._pending_writes = 0
+
+    def close(self):
+        self._connection.close()
+
+
+def remove_file(path):
+    """فایل path را حذف می‌کند؛ اگر وجود نداشت False برمی‌گرداند."""
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
@@ -0,0 +1,293 @@
+# seoran/processor/persian_normalizer.py
+# سطح: نرمال‌سازی متن فارسی پیش از توکنایزیشن.
+#
+# دو پیاده‌سازی با خروجی یکسان وجود دارد:
+#   normalize_with_hazm       مسیر مرجع: Normalizer().normalize کامل Hazm و سپس پنج re.sub جداگانه روی کل متن
+#                             (تکرار حروف، ارقام، حروف لاتین، کاراکترهای کنترلی و فاصله‌ها).
+#   PersianNormalizer         همان قواعد Hazm با الگوهای یک بار کامپایل شده و بدون کپی‌های اضافه:
+#     - نگاشت کاراکترها (ي/ك عربی و فرم‌های نمایشی به حروف فارسی، یکسان‌سازی ارقام و ٪) یک جدول است.
+#       str.translate روی متن غیر لاتین برای هر کاراکتر یک جستجوی دیکشنری انجام می‌دهد (حدود ده برابر کندتر
+#       از اسکن regex)، پس جدول با یک کلاس کاراکتر کامپایل شده اعمال می‌شود و فقط کاراکترهایی که واقعا
+#       نگاشت دارند (در متن فارسی استاندارد معمولا هیچ) لمس می‌شوند. حذف اعراب، کاراکترهای خاص، کشیده و
+#       کاراکترهای کنترلی هم به همین شکل یک گذر هستند.
+#     - الگوهای فاصله‌گذاری Hazm به شکل معادلی نوشته شده‌اند که با یک کاراکتر ثابت شروع می‌شود (lookbehind به
+#       جای گروه ابتدایی) تا موتور regex فقط در محل‌های ممکن تطبیق را امتحان کند، دو الگوی فاصله بین عدد و
+#       حرف در یک گذر ادغام شده‌اند و الگوهایی که کاراکتر لازمشان در متن نیست اجرا نمی‌شوند.
+#     - مراحل وابسته به واژه‌نامه Hazm (چسباندن پسوندها، کاهش تکرار حروف و جدا کردن «می») از همان نمونه
+#       Normalizer استفاده می‌کنند.
+# اگر تنظیمات یا قواعد Normalizer داده شده با نسخه‌ای که این پیاده‌سازی از آن نوشته شده (Hazm 0.10) فرق کند،
+# supported برابر False است و PersianNormalizer از مسیر مرجع استفاده می‌کند.
+
+import hashlib
+import json
+import re
+
+# --- پیکربندی ---
+# امضای قواعد Normalizer پیش‌فرض Hazm 0.10 (rules_signature)
+SUPPORTED_HAZM_RULES_SIGNATURE = "802ef903ecda56b6e683ad524024e0c31fbe716c82a6fa1a4080329fa3526052"
+
+PERSIAN_LETTERS = "آابپتثجچحخدذرزژسشصضطظعغفقکگلمنوهی"
+ZWNJ = "‌"
+
+# --- مسیر مرجع ---
+
+def normalize_with_hazm(hazm_normalizer, text, remove_numbers=False, remove_english=False):
+    if not text: return ""
+    normalized_text = hazm_normalizer.normalize(text)
+    normalized_text = re.sub(r'(.)\1{2,}', r'\1\1', normalized_text)
+    if remove_numbers: normalized_text = re.sub(r'[0-9۰-۹]+', '', normalized_text)
+    if remove_english: normalized_text = re.sub(r'[a-zA-Z]+', '', normalized_text)
+    normalized_text = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', normalized_text)
+    normalized_text = re.sub(r'\s{2,}', ' ', normalized_text).strip()
+    return normalized_text
+
+
+# --- مسیر سریع ---
+
+def rules_signature(hazm_normalizer):
+    """هش تنظیمات و قواعد یک Normalizer (و توکنایزر داخلی آن) که PersianNormalizer بازنویسی کرده است."""
+    tokenizer = getattr(hazm_normalizer, 'tokenizer', None)
+    rules = [
+        [getattr(hazm_normalizer, name, None) for name in (
+            '_correct_spacing', '_remove_diacritics', '_remove_specials_chars', '_decrease_repeated_chars',
+            '_persian_style', '_persian_number', '_unicodes_replacement', '_seperate_mi',
+            'translation_src', 'translation_dst', 'number_translation_src', 'number_translation_dst',
+            'extra_space_patterns', 'punctuation_spacing_patterns', 'affix_spacing_patterns',
+            'persian_style_patterns', 'diacritics_patterns', 'specials_chars_patterns', 'replacements',
+            'more_than_two_repeat_pattern', 'joint_mi_patterns')],
+        [getattr(tokenizer, name, None) for name in (
+            '_join_verb_parts', '_join_abbreviation', 'separate_emoji', 'replace_links', 'replace_ids',
+            'replace_emails', 'replace_numbers', 'replace_hashtags')],
+        getattr(getattr(tokenizer, 'pattern', None), 'pattern', None),
+    ]
+    return hashlib.sha256(json.dumps(rules, ensure_ascii=False, default=list).encode('utf-8')).hexdigest()
+
+
+def _char_class(chars):
+    return "[" + "".join(re.escape(char) for char in sorted(set(chars))) + "]"
+
+
+def _mapper(table):
+    """تابع اعمال جدول نگاشت {کاراکتر: رشته} که فقط دنباله‌های کاراکترهای جدول را جایگزین می‌کند."""
+    pattern = re.compile(_char_class(table) + "+")
+    translation = str.maketrans(table)
+
+    def apply(text):
+        return pattern.sub(lambda match: match.group().translate(translation), text)
+    return apply
+
+
+_PUNC_AFTER = r"\.:!،؛؟»\]\)\}"
+_PUNC_BEFORE = r"«\[\(\{"
+_PERSIAN_DIGITS = "۰۱۲۳۴۵۶۷۸۹"
+
+# persian_style
+_QUOTE_RE = re.compile('"([^\n"]+)"')
+_DECIMAL_POINT_RE = re.compile(r"([\d+])\.([\d+])")
+_ELLIPSIS_RE = re.compile(r" ?\.\.\.")
+
+# correct_spacing: extra_space_patterns
+_MULTI_SPACE_RE = re.compile("  +")
+_MULTI_NEWLINE_RE = re.compile("\n\n\n+")
+_MULTI_ZWNJ_RE = re.compile(ZWNJ + ZWNJ + "+")
+_ZWNJ_BEFORE_SPACE_RE = re.compile(ZWNJ + "+ ")
+_ZWNJ_AFTER_SPACE_RE = re.compile(" " + ZWNJ + "+")
+# \b‌*\B و \B‌*\b: تطبیق خالی ممکن نیست، پس تطبیق‌ها با اولین نیم‌فاصله شروع می‌شوند
+_ZWNJ_WORD_START_RE = re.compile(ZWNJ + r"(?<=\w" + ZWNJ + ")" + ZWNJ + r"*\B")
+_ZWNJ_WORD_END_RE = re.compile(ZWNJ + r"(?<!\w" + ZWNJ + ")" + ZWNJ + r"*\b")
+_KESHIDE_CR_RE = re.compile("[ـ\r]+")
+
+# الگوی WordTokenizer با یک lookahead روی کاراکتر اول (تا موتور regex فقط روی علائم و ارقام متوقف شود)
+_TOKEN_SPLIT_RE = re.compile(r'(?=[؟!?\d.:،؛»\])}"«\[({/\\])([؟!?]+|[\d.:]+|[:.،؛»\])}"«\[({/\\])')
+
+# correct_spacing: affix_spacing_patterns
+_HEH_YEH_RE = re.compile("(?<=[^ ]ه) ی ")
+# (^| )(ن?می) : تطبیق ابتدای متن جدا بررسی می‌شود تا الگوی اصلی با فاصله شروع شود
+_MI_AT_START_RE = re.compile("(ن?می) ")
+_MI_RE = re.compile(" (ن?می) ")
+_SUFFIX_RE = re.compile(" (?<=[^\n\\d " + _PUNC_AFTER + _PUNC_BEFORE + "]{2} )(?=(?:تر(?:ین?)?|گری?|های?)(?:[ \n"
+                        + _PUNC_AFTER + _PUNC_BEFORE + "]|$))")
+_HEH_VERB_SUFFIX_RE = re.compile("(?<=[^ ]ه) (?=ا(?:م|یم|ش|ند|ی|ید|ت)(?:[ \n" + _PUNC_AFTER + "]|$))")
+
+# correct_spacing: punctuation_spacing_patterns
+_QUOTE_SPACE_RE = re.compile('" ([^\n"]+) "')
+_SPACE_BEFORE_PUNC_RE = re.compile(" (?=[" + _PUNC_AFTER + "])")
+_SPACE_AFTER_PUNC_RE = re.compile("([" + _PUNC_BEFORE + "]) ")
+_AFTER_DOT_RE = re.compile("[\\.:](?=[^ " + _PUNC_AFTER + "\\d" + _PERSIAN_DIGITS + "])")
+_AFTER_PUNC_RE = re.compile("[!،؛؟»\\]\\)\\}](?=[^ " + _PUNC_AFTER + "])")
+_BEFORE_PUNC_RE = re.compile("[" + _PUNC_BEFORE + "](?<=[^ " + _PUNC_BEFORE + "][" + _PUNC_BEFORE + "])")
+# (\d)([حروف]) و ([حروف])(\d) در یک گذر که فقط روی ارقام متوقف می‌شود
+_DIGIT_LETTER_RE = re.compile(r"\d(?:(?<=(?P<before>[" + PERSIAN_LETTERS + r"])\d))?"
+                              r"(?=(?P<after>[" + PERSIAN_LETTERS + "]))?")
+
+# decrease_repeated_chars و seperate_mi
+_REPEATED_LETTER_RE = re.compile("([" + PERSIAN_LETTERS + r"])\1{2,}")
+# \bن?می[حروف]+ با \b به صورت lookbehind بعد از حرف اول
+_JOINT_MI_RE = re.compile(r"(?:ن(?<!\wن)م|م(?<!\wم))ی[" + PERSIAN_LETTERS + "]+")
+
+# پس‌پردازش seoran
+_REPEATED_CHAR_RE = re.compile(r'(.)\1{2,}')
+_WHITESPACE_RE = re.compile(r'\s\s+')
+
+
+class PersianNormalizer:
+    """
+    نرمال‌ساز سریع با خروجی یکسان با normalize_with_hazm برای همان نمونه Normalizer Hazm.
+    normalize معادل Normalizer.normalize است و normalize_text پس‌پردازش seoran را هم انجام می‌دهد.
+    """
+    def __init__(self, hazm_normalizer):
+        self.hazm_normalizer = hazm_normalizer
+        self.supported = rules_signature(hazm_normalizer) == SUPPORTED_HAZM_RULES_SIGNATURE
+        if not self.supported:
+            return
+        table = dict(zip(hazm_normalizer.translation_src, hazm_normalizer.translation_dst))
+        numbers = dict(zip(hazm_normalizer.number_translation_src, hazm_normalizer.number_translation_dst))
+        # نگاشت ارقام بعد از persian_style است، اما الگوهای آن برای همه انواع ارقام (\d) یکسان عمل می‌کنند
+        table = {char: numbers.get(mapped, mapped) for char, mapped in table.items()}
+        table.update((char, mapped) for char, mapped in numbers.items() if char not in table)
+        self._map_characters = _mapper({char: mapped for char, mapped in table.items() if char != mapped})
+        self._diacritics = hazm_normalizer.diacritics_patterns[0][0][1:-1]
+        self._diacritics_re = re.compile(hazm_normalizer.diacritics_patterns[0][0] + "+")
+        replacements = {}
+        for pattern, replacement in hazm_normalizer.replacements:
+            replacements.update((char, replacement) for char in re.sub(r"[()|]", "", pattern))
+        # کاراکترهای unicodes_replacement و specials_chars_patterns مشترک نیستند
+        specials = hazm_normalizer.specials_chars_patterns[0][0][1:-1]
+        replacements.update((char, "") for char in specials)
+        self._replace_specials = _mapper(replacements)
+        self._deletions = {}
+        # همه پیشوندهای کلیدهای واژه‌نامه و فعل‌ها که پس از آنها نیم‌فاصله می‌آید: اگر توکن قبلی در این مجموعه
+        # نباشد، چسباندنش به توکن بعدی هیچ‌وقت یک فعل یا کلمه شناخته شده نمی‌سازد
+        self._joinable_prefixes = set()
+        for lexicon in (hazm_normalizer.verbs, hazm_normalizer.words):
+            for key in lexicon:
+                position = key.find(ZWNJ)
+                while position >= 0:
+                    self._joinable_prefixes.add(key[:position])
+                    position = key.find(ZWNJ, position + 1)
+
+    def normalize(self, text):
+        """معادل hazm_normalizer.normalize(text)."""
+        if not self.supported:
+            return self.hazm_normalizer.normalize(text)
+        return self._normalize(text)[0]
+
+    def normalize_text(self, text, remove_numbers=False, remove_english=False):
+        """معادل normalize_with_hazm."""
+        if not text: return ""
+        if not self.supported:
+            return normalize_with_hazm(self.hazm_normalizer, text, remove_numbers, remove_english)
+        text, has_repeats = self._normalize(text)
+        if has_repeats:
+            text = _REPEATED_CHAR_RE.sub(r'\1\1', text)
+        text = self._deletion_re(remove_numbers, remove_english).sub('', text)
+        return _WHITESPACE_RE.sub(' ', text).strip()
+
+    def _normalize(self, text):
+        """
+        (متن نرمال شده، آیا ممکن است سه تکرار پشت سر هم یک کاراکتر داشته باشد). اگر پیش از decrease_repeated_chars
+        هیچ تکراری نباشد، مراحل بعدی هم تکراری نمی‌سازند (جدا کردن «می» فقط نیم‌فاصله بین دو حرف می‌گذارد).
+        """
+        text = self._map_characters(text)
+        text = self._persian_style(text)
+        if any(char in text for char in self._diacritics):
+            text = self._diacritics_re.sub("", text)
+        text = self._correct_spacing(text)
+        text = self._replace_specials(text)
+        has_repeats = _REPEATED_CHAR_RE.search(text) is not None
+        if has_repeats and _REPEATED_LETTER_RE.search(text):
+            text = self.hazm_normalizer.decrease_repeated_chars(text)
+        return self._seperate_mi(text), has_repeats
+
+    def _deletion_re(self, remove_numbers, remove_english):
+        # حذف ارقام، حروف لاتین و کاراکترهای کنترلی پشت سر هم انجام می‌شد؛ همه حذف کاراکتر هستند
+        key = (remove_numbers, remove_english)
+        if key not in self._deletions:
+            pattern = r'\x00-\x1f\x7f-\x9f' + (r'0-9۰-۹' if remove_numbers else '') + ('a-zA-Z' if remove_english else '')
+            self._deletions[key] = re.compile('[' + pattern + ']+')
+        return self._deletions[key]
+
+    def _persian_style(self, text):
+        if '"' in text:
+            text = _QUOTE_RE.sub(r"«\1»", text)
+        if '.' in text:
+            text = _DECIMAL_POINT_RE.sub(r"\1٫\2", text)
+            if '...' in text:
+                text = _ELLIPSIS_RE.sub(" …", text)
+        return text
+
+    def _correct_spacing(self, text):
+        text = _MULTI_SPACE_RE.sub(" ", text)
+        text = _MULTI_NEWLINE_RE.sub("\n\n", text)
+        if ZWNJ in text:
+            text = _MULTI_ZWNJ_RE.sub(ZWNJ, text)
+            text = _ZWNJ_BEFORE_SPACE_RE.sub(" ", text)
+            text = _ZWNJ_AFTER_SPACE_RE.sub(" ", text)
+            text = _ZWNJ_WORD_START_RE.sub("", text)
+            text = _ZWNJ_WORD_END_RE.sub("", text)
+        if "ـ" in text or "\r" in text:
+            text = _KESHIDE_CR_RE.sub("", text)
+
+        # توکنایزر Hazm روی هر سطر: الگوی آن از مرز سطرها عبور نمی‌کند، پس کل متن یک بار جدا می‌شود
+        # (" ".join روی خروجی split همان sub(" \1 ") است)
+        text = " ".join(_TOKEN_SPLIT_RE.split(text.replace("\t", " ")))
+        text = "\n".join(" ".join(self._token_spacing([word for word in line.split(" ") if word]))
+                         for line in text.split("\n"))
+
+        if " ی " in text:
+            text = _HEH_YEH_RE.sub(ZWNJ + "ی ", text)
+        if "می " in text:
+            match = _MI_AT_START_RE.match(text)
+            head = ""
+            if match:
+                head, text = match.group(1) + ZWNJ, text[match.end():]
+            text = head + _MI_RE.sub(" \\1" + ZWNJ, text)
+        text = _SUFFIX_RE.sub(ZWNJ, text)
+        if " ا" in text:
+            text = _HEH_VERB_SUFFIX_RE.sub(ZWNJ, text)
+        text = text.replace("هها", "ه" + ZWNJ + "ها")
+
+        if '"' in text:
+            text = _QUOTE_SPACE_RE.sub(r'"\1"', text)
+        text = _SPACE_BEFORE_PUNC_RE.sub("", text)
+        text = _SPACE_AFTER_PUNC_RE.sub(r"\1", text)
+        text = _AFTER_DOT_RE.sub(r"\g<0> ", text)
+        text = _AFTER_PUNC_RE.sub(r"\g<0> ", text)
+        text = _BEFORE_PUNC_RE.sub(r" \g<0>", text)
+        return _DIGIT_LETTER_RE.sub(_space_digit, text)
+
+    def _token_spacing(self, tokens):
+        """همان Normalizer.token_spacing Hazm."""
+        verbs = self.hazm_normalizer.verbs
+        words = self.hazm_normalizer.words
+        suffixes = self.hazm_normalizer.suffixes
+        joinable_prefixes = self._joinable_prefixes
+        result = []
+        last = len(tokens) - 1
+        for t, token in enumerate(tokens):
+            if result:
+                previous = result[-1]
+                token_pair = previous + ZWNJ + token if previous in joinable_prefixes else None
+                if token_pair is not None and (token_pair in verbs or token_pair in words
+                                               and words[token_pair][0] > 0):
+                    if not (t < last and token + "_" + tokens[t + 1] in verbs):
+                        result[-1] = token_pair
+                        continue
+                elif token in suffixes and previous in words:
+                    result[-1] = previous + ZWNJ + token
+                    continue
+            result.append(token)
+        return result
+
+    def _seperate_mi(self, text):
+        verbs = self.hazm_normalizer.verbs
+        for word in _JOINT_MI_RE.findall(text):
+            prefix_length = 3 if word.startswith("نمی") else 2
+            joined = word[:prefix_length] + ZWNJ + word[prefix_length:]
+            if joined in verbs:
+                text = text.replace(word, joined)
+        return text
+
+
+def _space_digit(match):
+    return (" " if match.group('before') else "") + match.group() + (" " if match.group('after') else "")
@@ -2,38 +2,97 @@
 # سطح: پردازشگر متن با قابلیت‌های کامل NLP (توکنایزیشن، حذف کلمات توقف، لماتایزیشن)
 
 import os
+import sys
 import glob
-from bs4 import BeautifulSoup, Comment
+import hashlib
+import json
+import logging
+from importlib import metadata
 from hazm import Normalizer, sent_tokenize, word_tokenize, Lemmatizer, Stemmer # <<< جدید: ابزارهای NLP از Hazm
 import re
 import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlparse
 # import json # <<< برای ذخیره به صورت JSON (فعلا استفاده نمی‌شود)
 
+# ماژول‌های مشترک با خزنده (مخزن segment ها، ابزارهای URL) در پوشه crawler قرار دارند
+CRAWLER_MODULES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "crawler")
+if CRAWLER_MODULES_DIR not in sys.path:
+    sys.path.append(CRAWLER_MODULES_DIR)
+from page_store import PageStoreReader, SEGMENTS_DIRNAME  # noqa: E402
+from url_utils import url_fingerprint  # noqa: E402
+from encoding_detect import decode_html  # noqa: E402
+from metrics import MetricsRegistry, configure_logging, get_logger, write_exposition  # noqa: E402
+from near_duplicates import (  # noqa: E402
+    NearDuplicateIndex, tokens_fingerprint, SHINGLE_SIZE, NEAR_DUPLICATE_MAX_DISTANCE, NEAR_DUPLICATE_MIN_TOKENS,
+)
+
+# قواعد پاکسازی HTML (UNWANTED_TAGS و UNWANTED_CSS_SELECTORS) در html_cleaner تعریف شده‌اند
+# تا خزنده هم بتواند بدون وابستگی به Hazm از آنها استفاده کند
+from html_cleaner import (  # noqa: E402
+    UNWANTED_TAGS, UNWANTED_CSS_SELECTORS, MAIN_CONTENT_SELECTORS, extract_text_from_html,
+)
+from lemma_cache import LemmaCache  # noqa: E402
+from persian_normalizer import PersianNormalizer  # noqa: E402
+from manifest import (  # noqa: E402
+    ProcessingManifest, MANIFEST_FILENAME, bytes_content_hash, file_content_hash, remove_file,
+)
+from token_store import TokenStoreWriter, TOKEN_STORE_DIRNAME  # noqa: E402
+
 # --- پیکربندی ---
 HTML_FILES_BASE_DIR = os.path.join("..", "crawler", "downloaded_pages")
+# مخزن segment های خزنده (وقتی خزنده با STORAGE_MODE = "segments" اجرا شده باشد)
+PAGE_STORE_DIR = os.path.join(HTML_FILES_BASE_DIR, SEGMENTS_DIRNAME)
 PROCESSED_TEXTS_DIR = "processed_texts_tokens" # <<< تغییر نام پوشه خروجی برای تمایز
 
-# تگ‌هایی که محتوای آنها باید کاملا حذف شود (بدون تغییر نسبت به قبل)
-UNWANTED_TAGS = [
-    'script', 'style', 'header', 'footer', 'nav', 'aside', 'form', 'button', 
-    'select', 'textarea', 'iframe', 'link', 'meta', 'noscript', 'embed', 'object'
-]
-# سلکتورهای CSS برای حذف بخش‌های خاص (بدون تغییر نسبت به قبل)
-UNWANTED_CSS_SELECTORS = [
-    '.ads', '.advertisement', '.ad', '.banner', '.popup', '.cookie-banner', '.cookie-notice',
-    '#sidebar', '#comments', '.comments-area', '.comment-list', '.reply',
-    '.related-posts', '.related_posts', '.share-buttons', '.social-sharing',
-    '.site-footer', '.site-header', '.main-navigation', '.menu', '.social-links', 
-    '.breadcrumbs', '.pagination', '.widget', '.author-bio', '.post-meta-data',
-    '[class*="promo"]', '[id*="promo"]', '[class*="advert"]', '[id*="advert"]',
-    '[aria-hidden="true"]'
-]
+# قالب خروجی: "text" یک فایل _tokens.txt برای هر سند (توکن‌ها جدا شده با فاصله)؛ "token_ids" یک واژه‌نامه
+# سراسری و شناسه توکن‌های همه اسناد در shard های باینری (token_store.py) در زیرپوشه TOKEN_STORE_DIRNAME
+OUTPUT_FORMAT = "text"
+# در قالب token_ids، offset کاراکتری هر توکن در متن نرمال شده هم ذخیره شود
+STORE_TOKEN_OFFSETS = False
 
 MIN_TEXT_LENGTH = 100 # حداقل طول متن استخراجی اولیه
 MIN_TOKEN_COUNT = 20  # <<< جدید: حداقل تعداد توکن پس از پردازش NLP برای ذخیره
 
+# حذف اعداد و حروف انگلیسی در نرمال‌سازی اولیه
+NORMALIZE_REMOVE_NUMBERS = True
+NORMALIZE_REMOVE_ENGLISH = True
+
+# پردازش افزایشی: با True فقط ورودی‌های جدید یا تغییر کرده پردازش می‌شوند و خروجی ورودی‌های حذف شده پاک
+# می‌شود (manifest در PROCESSED_TEXTS_DIR)
+INCREMENTAL_PROCESSING = False
+# با هر تغییر در کد پردازش که خروجی را عوض می‌کند افزایش یابد تا همه ورودی‌ها دوباره پردازش شوند
+PROCESSING_CODE_VERSION = 2
+
+# حذف صفحات تقریبا تکراری (SimHash روی لیست توکن‌ها): با True فقط اولین صفحه هر خوشه ذخیره می‌شود
+DROP_NEAR_DUPLICATES = False
+
+# تعداد پروسس‌های پردازش موازی: 1 یعنی پردازش ترتیبی در همین پروسس، None یعنی به تعداد هسته‌های CPU
+PROCESSOR_WORKERS = 1
+# تعداد فایل/صفحه‌ای که هر بار به یک پروسس داده می‌شود
+PROCESSOR_CHUNK_SIZE = 32
+
+# حداکثر تعداد شکل‌های ظاهری توکن که نتیجه پردازششان (لم یا حذف) در حافظه نگه داشته می‌شود
+LEMMA_CACHE_SIZE = 200_000
+# با True، کش بین اجراها ذخیره می‌شود (در فایل LEMMA_CACHE_FILENAME داخل PROCESSED_TEXTS_DIR) تا اجرای بعدی
+# گرم شروع شود
+PERSIST_LEMMA_CACHE = False
+LEMMA_CACHE_FILENAME = "lemma_cache.json"
+
+# سطح لاگ: "DEBUG" هر فایل، "INFO" پیشرفت هر دسته، "WARNING" فقط هشدارها (خطای هر فایل در گزارش نهایی می‌آید)
+LOG_LEVEL = "INFO"
+# هر رکورد لاگ یک خط JSON باشد
+LOG_JSON = False
+# اگر تعیین شود، metrics پردازش در پایان در قالب exposition پرومتئوس در این فایل نوشته می‌شود
+METRICS_FILE = None
+
+logger = get_logger("processor")
+
 # --- مقداردهی اولیه ابزارهای پردازش زبان ---
 hazm_normalizer = Normalizer()
+# همان قواعد hazm_normalizer با الگوهای کامپایل شده (خروجی یکسان، چند برابر سریعتر)
+persian_normalizer = PersianNormalizer(hazm_normalizer)
 hazm_lemmatizer = Lemmatizer() # <<< جدید
 # hazm_stemmer = Stemmer() # اگر بخواهیم از Stemmer استفاده کنیم
 
@@ -97,19 +156,103 @@ DEFAULT_STOP_WORDS = [
 # تبدیل لیست کلمات توقف به set برای جستجوی سریعتر
 STOP_WORDS = set(DEFAULT_STOP_WORDS)
 
+# کلمات تک حرفی که حذف نمی‌شوند (ضمایر)
+SHORT_WORDS_TO_KEEP = ['ما', 'تو', 'او', 'من']
+# توکن‌هایی که فقط از علائم نگارشی تشکیل شده‌اند
+PUNCTUATION_TOKEN_RE = re.compile(r'^[\.\،\؛\؟\!\(\)\[\]\{\}:\"\'\«\»_\-–—/\\]+$')
+
+# کش نتیجه پردازش هر شکل ظاهری توکن (کلمه توقف، عدد، علامت نگارشی، لم)
+lemma_cache = LemmaCache(LEMMA_CACHE_SIZE)
+
+
+def lemma_cache_signature():
+    """
+    امضای قواعدی که نتیجه کش به آنها بستگی دارد؛ اگر کلمات توقف، الگوها یا نسخه Hazm تغییر کند
+    کش ذخیره شده قبلی استفاده نمی‌شود.
+    """
+    try:
+        hazm_version = metadata.version('hazm')
+    except metadata.PackageNotFoundError:
+        hazm_version = 'unknown'
+    rules = json.dumps([sorted(STOP_WORDS), sorted(SHORT_WORDS_TO_KEEP), PUNCTUATION_TOKEN_RE.pattern, hazm_version],
+                       ensure_ascii=False)
+    return hashlib.blake2b(rules.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def processing_version():
+    """
+    امضای همه تنظیماتی که روی خروجی پردازش اثر دارند (کلمات توقف، آستانه‌ها، نرمال‌سازی، قواعد پاکسازی HTML).
+    اگر تغییر کند، manifest همه ورودی‌ها را دوباره پردازش می‌کند.
+    """
+    settings = json.dumps([
+        PROCESSING_CODE_VERSION, lemma_cache_signature(), MIN_TEXT_LENGTH, MIN_TOKEN_COUNT,
+        NORMALIZE_REMOVE_NUMBERS, NORMALIZE_REMOVE_ENGLISH,
+        UNWANTED_TAGS, UNWANTED_CSS_SELECTORS, MAIN_CONTENT_SELECTORS,
+        DROP_NEAR_DUPLICATES, SHINGLE_SIZE, NEAR_DUPLICATE_MAX_DISTANCE, NEAR_DUPLICATE_MIN_TOKENS,
+        OUTPUT_FORMAT, STORE_TOKEN_OFFSETS,
+    ], ensure_ascii=False)
+    return hashlib.blake2b(settings.encode('utf-8'), digest_size=16).hexdigest()
+
+
+# --- آمار پردازش ---
+
+def _metric_property(metric_attribute, labels=()):
+    """ویژگی عددی ProcessingStats که مقدارش در یک metric نگه داشته می‌شود (stats.x += 1 همان inc است)."""
+    def getter(self):
+        return getattr(self, metric_attribute).value(labels)
+
+    def setter(self, value):
+        metric = getattr(self, metric_attribute)
+        if metric.kind == "gauge":
+            metric.set(value, labels)
+        else:
+            metric.inc(value - metric.value(labels), labels)
+    return property(getter, setter)
+
 
-# --- کلاس برای نگهداری آمار پردازش (بدون تغییر) ---
 class ProcessingStats:
+    """
+    آمار پردازش روی یک MetricsRegistry (metrics.py): شمارنده نتیجه ورودی‌ها، هیستوگرام زمان هر مرحله
+    (read، extract، normalize، nlp، save) و تعداد توکن‌ها. ویژگی‌های عددی قبلی (successfully_processed و ...)
+    همان شمارنده‌ها هستند. آمار پروسس‌های کارگر با merge در آمار پروسس اصلی ادغام می‌شود.
+    """
     def __init__(self):
-        self.total_html_files = 0
-        self.successfully_processed = 0
-        self.failed_to_read = 0
-        self.empty_or_short_extracted_text = 0
-        self.empty_or_short_normalized_text = 0 # این شمارنده حالا برای متن قبل از توکنایزیشن است
-        self.empty_or_short_token_list = 0 # <<< جدید: برای لیست توکن‌های بسیار کوتاه
-        self.failed_to_save = 0
+        self.metrics = MetricsRegistry()
+        self._inputs = self.metrics.counter("processor_inputs_total", "ورودی‌های یافت شده برای پردازش")
+        self._outcomes = self.metrics.counter("processor_outcomes_total", "نتیجه پردازش ورودی‌ها", ("outcome",))
+        self._lemma_lookups = self.metrics.counter("processor_lemma_cache_lookups_total",
+                                                   "جستجوهای کش لم‌ها", ("result",))
+        self._removed = self.metrics.counter("processor_removed_outputs_total",
+                                             "خروجی‌های حذف شده برای ورودی‌هایی که دیگر وجود ندارند")
+        self._near_duplicate_clusters = self.metrics.gauge("processor_near_duplicate_clusters",
+                                                           "تعداد خوشه‌های صفحات تقریبا تکراری")
+        self._near_duplicate_bytes = self.metrics.counter("processor_near_duplicate_bytes_saved_total",
+                                                          "حجم خروجی صفحات تکراری حذف شده (بایت)")
+        self.stage_seconds = self.metrics.histogram("processor_stage_seconds", "زمان هر مرحله پردازش یک ورودی",
+                                                    ("stage",))
+        self.tokens = self.metrics.counter("processor_tokens_total", "توکن‌های نهایی ذخیره شده")
         self.failed_files_list = []
 
+    total_html_files = _metric_property('_inputs')
+    successfully_processed = _metric_property('_outcomes', ("processed",))
+    failed_to_read = _metric_property('_outcomes', ("read_error",))
+    empty_or_short_extracted_text = _metric_property('_outcomes', ("short_extracted_text",))
+    empty_or_short_normalized_text = _metric_property('_outcomes', ("short_normalized_text",))  # متن قبل از توکنایزیشن
+    empty_or_short_token_list = _metric_property('_outcomes', ("short_token_list",))
+    failed_to_save = _metric_property('_outcomes', ("save_error",))
+    skipped_unchanged = _metric_property('_outcomes', ("unchanged",))  # بدون تغییر از آخرین اجرا (پردازش افزایشی)
+    near_duplicates = _metric_property('_outcomes', ("near_duplicate",))  # تقریبا تکراری؛ خروجی‌شان نگه داشته نشد
+    lemma_cache_hits = _metric_property('_lemma_lookups', ("hit",))
+    lemma_cache_misses = _metric_property('_lemma_lookups', ("miss",))
+    removed_outputs = _metric_property('_removed')
+    near_duplicate_clusters = _metric_property('_near_duplicate_clusters')
+    near_duplicate_bytes_saved = _metric_property('_near_duplicate_bytes')
+
+    def merge(self, other):
+        """آمار یک بخش از کار (مثلا خروجی یک پروسس) را به این آمار اضافه می‌کند."""
+        self.metrics.merge(other.metrics.snapshot())
+        self.failed_files_list.extend(other.failed_files_list)
+
     def report(self):
         print("\n--- آمار نهایی پردازش متن (با NLP) ---")
         print(f"تعداد کل فایل‌های HTML بررسی شده: {self.total_html_files}")
@@ -119,6 +262,20 @@ class ProcessingStats:
         print(f"تعداد فایل‌هایی با متن نرمال‌شده (قبل از NLP) خالی یا بسیار کوتاه: {self.empty_or_short_normalized_text}")
         print(f"تعداد فایل‌هایی با لیست توکن‌های نهایی خالی یا بسیار کوتاه: {self.empty_or_short_token_list}") # <<< جدید
         print(f"تعداد فایل‌هایی که ذخیره آنها با خطا مواجه شد: {self.failed_to_save}")
+        if self.skipped_unchanged or self.removed_outputs:
+            print(f"تعداد فایل‌های بدون تغییر نسبت به اجرای قبلی (پردازش نشده): {self.skipped_unchanged}")
+            print(f"تعداد خروجی‌های حذف شده برای ورودی‌های حذف شده: {self.removed_outputs}")
+        if self.near_duplicates:
+            print(f"تعداد صفحات تقریبا تکراری حذف شده: {self.near_duplicates} "
+                  f"(در {self.near_duplicate_clusters} خوشه، {self.near_duplicate_bytes_saved} بایت صرفه‌جویی)")
+        stage_lines = self.metrics.summary_lines("processor_stage_seconds")
+        if stage_lines:
+            print("زمان مراحل پردازش:")
+            for line in stage_lines:
+                print(f"  {line}")
+        lookups = self.lemma_cache_hits + self.lemma_cache_misses
+        if lookups:
+            print(f"نرخ hit کش لم‌ها: {self.lemma_cache_hits / lookups:.1%} ({self.lemma_cache_hits} از {lookups} توکن)")
         if self.failed_files_list:
             print("\nلیست فایل‌هایی که در پردازش آنها خطا رخ داد یا رد شدند:")
             for f_path, reason in self.failed_files_list:
@@ -127,57 +284,56 @@ class ProcessingStats:
 
 # --- توابع کمکی ---
 
-# extract_text_from_html_v2 بدون تغییر باقی می‌ماند (همان نسخه قبلی)
 def extract_text_from_html_v2(html_content, stats):
-    if not html_content:
-        return ""
-    soup = BeautifulSoup(html_content, 'lxml')
-    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
-        comment.extract()
-    for tag_name in UNWANTED_TAGS:
-        for tag in soup.find_all(tag_name):
-            tag.decompose()
-    for selector in UNWANTED_CSS_SELECTORS:
-        try:
-            for element in soup.select(selector):
-                element.decompose()
-        except Exception:
-            pass
-    body = soup.find('body')
-    if not body:
-        text_content = soup.get_text(separator=' ', strip=True)
-    else:
-        main_content_tags = ['article', 'main', '.post-content', '.entry-content', '#content', '#main-content']
-        main_text_element = None
-        for tag_selector in main_content_tags:
-            if tag_selector.startswith('.'): main_text_element = body.select_one(tag_selector)
-            elif tag_selector.startswith('#'): main_text_element = body.select_one(tag_selector)
-            else: main_text_element = body.find(tag_selector)
-            if main_text_element: break
-        if main_text_element: text_content = main_text_element.get_text(separator=' ', strip=True)
-        else: text_content = body.get_text(separator=' ', strip=True)
-    if not text_content: return ""
-    url_pattern = r'https?://[^\s/$.?#].[^\s]*|www\.[^\s/$.?#].[^\s]*'
-    text_content = re.sub(url_pattern, '', text_content)
-    lines = (line.strip() for line in text_content.splitlines())
-    text_content = ' '.join(line for line in lines if line) 
-    text_content = re.sub(r'\s{2,}', ' ', text_content).strip()
-    return text_content
-
-
-# normalize_persian_text_v2 بدون تغییر باقی می‌ماند (همان نسخه قبلی)
+    # پاکسازی کامپایل شده در یک گذر؛ خروجی همان extract_text_from_soup روی BeautifulSoup است
+    return extract_text_from_html(html_content)
+
+
+# خروجی همان نسخه قبلی است (persian_normalizer.normalize_with_hazm)
 def normalize_persian_text_v2(text, remove_numbers=False, remove_english=False):
-    if not text: return ""
-    normalized_text = hazm_normalizer.normalize(text)
-    normalized_text = re.sub(r'(.)\1{2,}', r'\1\1', normalized_text) 
-    if remove_numbers: normalized_text = re.sub(r'[0-9۰-۹]+', '', normalized_text)
-    if remove_english: normalized_text = re.sub(r'[a-zA-Z]+', '', normalized_text)
-    normalized_text = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', normalized_text)
-    normalized_text = re.sub(r'\s{2,}', ' ', normalized_text).strip()
-    return normalized_text
+    return persian_normalizer.normalize_text(text, remove_numbers=remove_numbers, remove_english=remove_english)
+
+
+def _lemmatize_token(word):
+    """
+    تصمیم نهایی برای یک توکن: لم آن، یا رشته خالی اگر توکن باید حذف شود.
+    نتیجه فقط به شکل ظاهری توکن بستگی دارد و در lemma_cache نگه داشته می‌شود.
+    """
+    # 3. حذف کلمات توقف
+    if word in STOP_WORDS:
+        return ""
+
+    # (اختیاری) حذف توکن‌هایی که فقط عدد یا علامت نگارشی هستند یا خیلی کوتاه‌اند
+    # این کار می‌تواند دقت را افزایش دهد اما ممکن است برخی اطلاعات را از دست بدهد
+    # مثال: اگر کلمه فقط از اعداد تشکیل شده باشد یا طولش کمتر از 2 باشد (به جز موارد خاص)
+    if word.isnumeric(): # اگر کلمه فقط عدد است
+        return ""
+    if len(word) < 2 and word not in SHORT_WORDS_TO_KEEP: # کلمات تک حرفی (به جز ضمایر)
+        return ""
+    # حذف علائم نگارشی که به تنهایی توکن شده‌اند (Hazm word_tokenize معمولا علائم را جدا می‌کند)
+    if PUNCTUATION_TOKEN_RE.match(word):
+        return ""
+
+    # 4. لماتایز کردن (یا ریشه‌یابی)
+    # استفاده از لماتایزر:
+    lemma = hazm_lemmatizer.lemmatize(word)
+    # اگر از Stemmer استفاده می‌کنید:
+    # stem = hazm_stemmer.stem(word)
+    # lemma = stem # یا هر کدام که انتخاب می‌کنید
 
+    # گاهی لماتایزر یک # قبل از بن ماضی اضافه می‌کند، آن را حذف می‌کنیم
+    # یا برای کلمات ناشناس خود کلمه را برمی‌گرداند
+    if '#' in lemma:
+        parts = lemma.split('#')
+        # اگر قسمت دوم (بن) وجود داشت و معتبر بود، از آن استفاده کن، وگرنه از قسمت اول (اسم)
+        lemma = parts[1] if len(parts) > 1 and parts[1] else parts[0]
 
-def process_text_with_nlp(text): # <<< تابع جدید
+    lemma = lemma.strip() if lemma else ""
+    # توکن لماتایز شده نباید خالی یا خیلی کوتاه باشد
+    return lemma if len(lemma) > 1 else ""
+
+
+def process_text_with_nlp(text, with_offsets=False): # <<< تابع جدید
     """
     متن نرمال‌شده را دریافت کرده و مراحل کامل NLP را روی آن اجرا می‌کند:
     1. توکنایز کردن جملات
@@ -185,11 +341,17 @@ def process_text_with_nlp(text): # <<< تابع جدید
     3. حذف کلمات توقف
     4. لماتایز کردن (یا ریشه‌یابی)
     5. (اختیاری) حذف توکن‌های خیلی کوتاه یا نامعتبر
+    مراحل 3 تا 5 برای هر شکل ظاهری فقط یک بار انجام می‌شوند (lemma_cache).
+    با with_offsets (توکن‌ها، offset کاراکتری هر توکن در text) برگردانده می‌شود؛ offset توکنی که عینا در
+    متن پیدا نشود (مثلا چون توکنایزر آن را تغییر داده) None است.
     """
     if not text:
-        return []
+        return ([], []) if with_offsets else []
 
     processed_tokens = []
+    offsets = [] if with_offsets else None
+    cursor = 0
+    cache_get = lemma_cache.get
     
     # 1. توکنایز کردن جملات
     sentences = sent_tokenize(text)
@@ -199,42 +361,26 @@ def process_text_with_nlp(text): # <<< تابع جدید
         words = word_tokenize(sentence)
         
         for word in words:
-            # 3. حذف کلمات توقف
-            if word in STOP_WORDS:
-                continue
-            
-            # (اختیاری) حذف توکن‌هایی که فقط عدد یا علامت نگارشی هستند یا خیلی کوتاه‌اند
-            # این کار می‌تواند دقت را افزایش دهد اما ممکن است برخی اطلاعات را از دست بدهد
-            # مثال: اگر کلمه فقط از اعداد تشکیل شده باشد یا طولش کمتر از 2 باشد (به جز موارد خاص)
-            if word.isnumeric(): # اگر کلمه فقط عدد است
-                 continue
-            if len(word) < 2 and word not in ['ما', 'تو', 'او', 'من']: # کلمات تک حرفی (به جز ضمایر)
-                 continue
-            # حذف علائم نگارشی که به تنهایی توکن شده‌اند
-            # Hazm word_tokenize معمولا علائم را جدا می‌کند
-            # می‌توانیم یک لیست از علائم نگارشی تعریف کنیم و اگر توکن در آن بود، حذفش کنیم
-            punctuation_pattern = r'^[\.\،\؛\؟\!\(\)\[\]\{\}:\"\'\«\»_\-–—/\\]+$'
-            if re.match(punctuation_pattern, word):
-                continue
-
-            # 4. لماتایز کردن (یا ریشه‌یابی)
-            # استفاده از لماتایزر:
-            lemma = hazm_lemmatizer.lemmatize(word)
-            # اگر از Stemmer استفاده می‌کنید:
-            # stem = hazm_stemmer.stem(word)
-            # lemma = stem # یا هر کدام که انتخاب می‌کنید
-
-            # گاهی لماتایزر یک # قبل از بن ماضی اضافه می‌کند، آن را حذف می‌کنیم
-            # یا برای کلمات ناشناس خود کلمه را برمی‌گرداند
-            if '#' in lemma:
-                parts = lemma.split('#')
-                # اگر قسمت دوم (بن) وجود داشت و معتبر بود، از آن استفاده کن، وگرنه از قسمت اول (اسم)
-                lemma = parts[1] if len(parts) > 1 and parts[1] else parts[0]
-            
-            if lemma and len(lemma.strip()) > 1 : # توکن لماتایز شده نباید خالی یا خیلی کوتاه باشد
-                processed_tokens.append(lemma.strip())
+            lemma = cache_get(word)
+            if lemma is None:
+                lemma = _lemmatize_token(word)
+                lemma_cache.put(word, lemma)
+            if offsets is not None:
+                position = text.find(word, cursor)
+                if position >= 0:
+                    cursor = position + len(word)
+            if lemma:
+                processed_tokens.append(lemma)
+                if offsets is not None:
+                    offsets.append(position if position >= 0 else None)
                 
-    return processed_tokens
+    return (processed_tokens, offsets) if with_offsets else processed_tokens
+
+
+# در قالب token_ids، توکن‌ها (و offset ها) همراه خروجی به پروسس اصلی برگردانده و همان‌جا نوشته می‌شوند.
+# token_count تعداد توکن‌هایی است که در آمار شمرده شده‌اند (تا اگر خروجی کنار گذاشته شد از آمار کم شود).
+ProcessedOutput = namedtuple('ProcessedOutput', ['path', 'fingerprint', 'tokens', 'offsets', 'token_count'],
+                             defaults=(None, None, 0))
 
 
 def process_html_file_task_v2(html_filepath, output_base_dir, stats): # <<< تغییر نام تابع و منطق
@@ -243,8 +389,12 @@ def process_html_file_task_v2(html_filepath, output_base_dir, stats): # <<< تغ
     پردازش NLP (توکنایز، حذف کلمات توقف، لماتایز) و ذخیره لیست توکن‌ها.
     """
     try:
-        with open(html_filepath, 'r', encoding='utf-8', errors='replace') as f:
-            html_content = f.read()
+        with stats.stage_seconds.time(("read",)):
+            with open(html_filepath, 'rb') as f:
+                raw_content = f.read()
+        # فایل‌های HTML همیشه UTF-8 نیستند (مثلا صفحات windows-1256 ذخیره شده توسط ابزارهای دیگر)
+        with stats.stage_seconds.time(("decode",)):
+            html_content, _ = decode_html(raw_content)
     except IOError as e:
         stats.failed_to_read += 1
         stats.failed_files_list.append((html_filepath, f"IOError on read: {e}"))
@@ -254,41 +404,86 @@ def process_html_file_task_v2(html_filepath, output_base_dir, stats): # <<< تغ
         stats.failed_files_list.append((html_filepath, f"Unexpected error on read: {e}"))
         return
 
+    base_filename = os.path.basename(html_filepath)
+    # پسوند فایل خروجی را تغییر می‌دهیم تا مشخص باشد حاوی توکن است
+    output_filename = os.path.splitext(base_filename)[0] + "_tokens.txt" 
+    
+    relative_path_from_base_dir = os.path.relpath(os.path.dirname(html_filepath), HTML_FILES_BASE_DIR)
+    if relative_path_from_base_dir == '.': domain_subdir_name = ''
+    else: domain_subdir_name = relative_path_from_base_dir
+
+    return process_html_content_v2(html_content, html_filepath, domain_subdir_name, output_filename,
+                                   output_base_dir, stats)
+
+
+def process_page_record_task_v2(record, output_base_dir, stats):
+    """
+    یک رکورد از مخزن segment های خزنده را پردازش می‌کند.
+    نام فایل خروجی از اثر انگشت URL ساخته می‌شود، پس برخلاف نام‌های کوتاه شده فایل‌ها تداخلی پیش نمی‌آید.
+    اگر خزنده متن اصلی را هنگام تحلیل صفحه ذخیره کرده باشد، HTML دوباره پارس نمی‌شود.
+    """
+    html_content = None
+    if record.extracted_text is None:
+        with stats.stage_seconds.time(("decode",)):
+            html_content, _ = decode_html(record.body)
+    domain_subdir_name = urlparse(record.url).netloc.replace('.', '_')
+    output_filename = f"{url_fingerprint(record.url):016x}_tokens.txt"
+    return process_html_content_v2(html_content, record.url, domain_subdir_name, output_filename,
+                                   output_base_dir, stats, extracted_text=record.extracted_text)
+
+
+def process_html_content_v2(html_content, source, domain_subdir_name, output_filename, output_base_dir, stats,
+                            extracted_text=None):
+    """
+    مراحل مشترک پردازش یک صفحه (از هر منبعی): استخراج متن، نرمال‌سازی، NLP و ذخیره توکن‌ها.
+    source (مسیر فایل یا URL) فقط برای گزارش خطا استفاده می‌شود.
+    اگر extracted_text (خروجی تحلیل یک‌باره صفحه در خزنده) داده شود، مرحله استخراج متن انجام نمی‌شود.
+    در صورت موفقیت ProcessedOutput (مسیر فایل خروجی و اثر انگشت SimHash توکن‌ها) را برمی‌گرداند.
+    """
     # 1. استخراج متن
-    extracted_text = extract_text_from_html_v2(html_content, stats) # stats پاس داده نمی‌شود چون داخل خودش مدیریت می‌کند
+    if extracted_text is None:
+        with stats.stage_seconds.time(("extract",)):
+            extracted_text = extract_text_from_html_v2(html_content, stats)
     if not extracted_text or len(extracted_text.strip()) < MIN_TEXT_LENGTH:
         stats.empty_or_short_extracted_text += 1
-        stats.failed_files_list.append((html_filepath, "Extracted text too short or empty"))
+        stats.failed_files_list.append((source, "Extracted text too short or empty"))
         return
 
     # 2. نرمال‌سازی اولیه متن فارسی
-    normalized_text = normalize_persian_text_v2(extracted_text, remove_numbers=True, remove_english=True) # اعداد و انگلیسی را حذف می‌کنیم
+    with stats.stage_seconds.time(("normalize",)):
+        normalized_text = normalize_persian_text_v2(extracted_text, remove_numbers=NORMALIZE_REMOVE_NUMBERS,
+                                                    remove_english=NORMALIZE_REMOVE_ENGLISH) # اعداد و انگلیسی را حذف می‌کنیم
     if not normalized_text or len(normalized_text.strip()) < MIN_TEXT_LENGTH / 2: # آستانه کمتر برای متن نرمال شده
         stats.empty_or_short_normalized_text += 1
-        stats.failed_files_list.append((html_filepath, "Normalized text (pre-NLP) too short or empty"))
+        stats.failed_files_list.append((source, "Normalized text (pre-NLP) too short or empty"))
         return
 
     # 3. پردازش NLP برای تولید لیست توکن‌ها <<< جدید
-    final_tokens = process_text_with_nlp(normalized_text)
+    with_offsets = OUTPUT_FORMAT == "token_ids" and STORE_TOKEN_OFFSETS
+    with stats.stage_seconds.time(("nlp",)):
+        if with_offsets:
+            final_tokens, token_offsets = process_text_with_nlp(normalized_text, with_offsets=True)
+        else:
+            final_tokens, token_offsets = process_text_with_nlp(normalized_text), None
     
     if not final_tokens or len(final_tokens) < MIN_TOKEN_COUNT:
         stats.empty_or_short_token_list += 1
-        stats.failed_files_list.append((html_filepath, "Final token list too short or empty"))
+        stats.failed_files_list.append((source, "Final token list too short or empty"))
         return
 
+    fingerprint = tokens_fingerprint(final_tokens) if DROP_NEAR_DUPLICATES else None
+    if OUTPUT_FORMAT == "token_ids":
+        # شناسه‌ها فقط در پروسس اصلی که واژه‌نامه سراسری را نگه می‌دارد ساخته و نوشته می‌شوند (save_token_ids)؛
+        # مسیر خروجی نام سند در مخزن است و فایلی با این نام ساخته نمی‌شود
+        stats.successfully_processed += 1
+        stats.tokens.inc(len(final_tokens))
+        return ProcessedOutput(os.path.join(output_base_dir, TOKEN_STORE_DIRNAME, domain_subdir_name, output_filename),
+                               fingerprint, final_tokens, token_offsets, len(final_tokens))
+
     # 4. ذخیره لیست توکن‌ها
-    # فعلا توکن‌ها را با فاصله از هم در یک فایل .txt ذخیره می‌کنیم
-    # در آینده می‌توان به فرمت JSON یا فرمت‌های بهینه‌تر دیگر ذخیره کرد
+    # در قالب text توکن‌ها را با فاصله از هم در یک فایل .txt ذخیره می‌کنیم
     output_content = " ".join(final_tokens)
 
-    base_filename = os.path.basename(html_filepath)
-    # پسوند فایل خروجی را تغییر می‌دهیم تا مشخص باشد حاوی توکن است
-    output_filename = os.path.splitext(base_filename)[0] + "_tokens.txt" 
-    
-    relative_path_from_base_dir = os.path.relpath(os.path.dirname(html_filepath), HTML_FILES_BASE_DIR)
-    if relative_path_from_base_dir == '.': domain_subdir_name = ''
-    else: domain_subdir_name = relative_path_from_base_dir
-
     final_output_dir = os.path.join(output_base_dir, domain_subdir_name)
 
     if not os.path.exists(final_output_dir):
@@ -296,24 +491,226 @@ def process_html_file_task_v2(html_filepath, output_base_dir, stats): # <<< تغ
             os.makedirs(final_output_dir, exist_ok=True)
         except OSError as e:
             stats.failed_to_save += 1
-            stats.failed_files_list.append((html_filepath, f"OSError on creating output dir {final_output_dir}: {e}"))
+            stats.failed_files_list.append((source, f"OSError on creating output dir {final_output_dir}: {e}"))
             return
             
     output_filepath = os.path.join(final_output_dir, output_filename)
 
     try:
-        with open(output_filepath, 'w', encoding='utf-8') as f:
-            f.write(output_content)
+        with stats.stage_seconds.time(("save",)):
+            with open(output_filepath, 'w', encoding='utf-8') as f:
+                f.write(output_content)
         stats.successfully_processed += 1
+        stats.tokens.inc(len(final_tokens))
+        return ProcessedOutput(output_filepath, fingerprint, token_count=len(final_tokens))
     except IOError as e:
         stats.failed_to_save += 1
-        stats.failed_files_list.append((html_filepath, f"IOError on save: {e}"))
+        stats.failed_files_list.append((source, f"IOError on save: {e}"))
     except Exception as e:
         stats.failed_to_save += 1
-        stats.failed_files_list.append((html_filepath, f"Unexpected error on save: {e}"))
+        stats.failed_files_list.append((source, f"Unexpected error on save: {e}"))
+
+
+def _process_work_item(item, output_base_dir, stats):
+    """
+    یک مورد کار را پردازش می‌کند و ProcessedOutput (یا None) را برمی‌گرداند. هر مورد کار
+    (نوع، ورودی، وضعیت ورودی برای manifest) است: ('file', مسیر فایل HTML، ...) یا ('record', رکورد مخزن، ...).
+    """
+    kind, payload, _ = item
+    if kind == 'file':
+        return process_html_file_task_v2(payload, output_base_dir, stats)
+    return process_page_record_task_v2(payload, output_base_dir, stats)
+
+
+def _item_source(item):
+    """شناسه ورودی در manifest: مسیر فایل یا URL رکورد."""
+    kind, payload, _ = item
+    return payload if kind == 'file' else payload.url
+
+
+def _worker_config():
+    """تنظیماتی که باید در پروسس‌های کارگر هم (حتی با روش spawn) همان مقدار پروسس اصلی را داشته باشند."""
+    return {
+        'HTML_FILES_BASE_DIR': HTML_FILES_BASE_DIR,
+        'MIN_TEXT_LENGTH': MIN_TEXT_LENGTH,
+        'MIN_TOKEN_COUNT': MIN_TOKEN_COUNT,
+        'STOP_WORDS': STOP_WORDS,
+        'NORMALIZE_REMOVE_NUMBERS': NORMALIZE_REMOVE_NUMBERS,
+        'NORMALIZE_REMOVE_ENGLISH': NORMALIZE_REMOVE_ENGLISH,
+        'DROP_NEAR_DUPLICATES': DROP_NEAR_DUPLICATES,
+        'OUTPUT_FORMAT': OUTPUT_FORMAT,
+        'STORE_TOKEN_OFFSETS': STORE_TOKEN_OFFSETS,
+    }
+
+
+def _init_worker(config):
+    """
+    مقداردهی اولیه هر پروسس کارگر: اعمال تنظیمات پروسس اصلی.
+    Normalizer و Lemmatizer (که ساختنشان چند ثانیه طول می‌کشد) فقط یک بار برای کل عمر پروسس ساخته می‌شوند:
+    با روش fork از پروسس اصلی به ارث می‌رسند و با روش spawn هنگام import همین ماژول ساخته می‌شوند.
+    ورودی‌های جدید کش لم‌ها فقط در کارگرها نگه داشته می‌شوند تا با drain_new_entries به پروسس اصلی برسند.
+    """
+    globals().update(config)
+    lemma_cache.track_new_entries = True
+
+
+def _process_chunk(items, output_base_dir):
+    """
+    یک دسته از موارد کار را در پروسس کارگر پردازش می‌کند و آمار همان دسته، خروجی‌ها
+    (به ترتیب موارد) و ورودی‌های جدید کش لم‌ها را برمی‌گرداند (تا کش پروسس اصلی هم گرم شود و ذخیره شود).
+    """
+    chunk_stats = ProcessingStats()
+    outputs = []
+    _process_items_counting_cache(items, output_base_dir, chunk_stats,
+                                  on_result=lambda item, output, io_failed: outputs.append((output, io_failed)))
+    return chunk_stats, outputs, lemma_cache.drain_new_entries()
+
+
+def _process_items_counting_cache(items, output_base_dir, stats, on_item=None, on_result=None):
+    """
+    موارد کار را به ترتیب پردازش می‌کند. on_result(مورد، خروجی، خطای خواندن/نوشتن) پس از هر مورد صدا زده می‌شود.
+    """
+    hits_before, misses_before = lemma_cache.hits, lemma_cache.misses
+    for i, item in enumerate(items):
+        if on_item:
+            on_item(i, item)
+        io_failures_before = stats.failed_to_read + stats.failed_to_save
+        output = _process_work_item(item, output_base_dir, stats)
+        if on_result:
+            on_result(item, output, stats.failed_to_read + stats.failed_to_save > io_failures_before)
+    stats.lemma_cache_hits += lemma_cache.hits - hits_before
+    stats.lemma_cache_misses += lemma_cache.misses - misses_before
+
+
+def _iter_work_items(html_file_paths, page_store, manifest, stats):
+    """
+    موارد کار را تولید می‌کند. با manifest، ورودی‌هایی که از آخرین اجرا تغییری نکرده‌اند کنار گذاشته می‌شوند
+    و وضعیت (اندازه، زمان تغییر، هش) ورودی‌های تغییر کرده همراه مورد کار فرستاده می‌شود.
+    """
+    for filepath in html_file_paths:
+        state = None
+        if manifest:
+            try:
+                file_stat = os.stat(filepath)
+                changed, state = manifest.needs_processing(filepath, file_stat.st_size, file_stat.st_mtime,
+                                                           lambda: file_content_hash(filepath))
+            except OSError:
+                changed = True  # خطای خواندن در مرحله پردازش گزارش می‌شود
+            if not changed:
+                stats.skipped_unchanged += 1
+                continue
+        yield ('file', filepath, state)
+
+    if page_store:
+        for record in page_store.iter_records():
+            state = None
+            if manifest:
+                changed, state = manifest.needs_processing(record.url, len(record.body), record.fetch_time,
+                                                           lambda: bytes_content_hash(record.body))
+                if not changed:
+                    stats.skipped_unchanged += 1
+                    continue
+            yield ('record', record, state)
+
+
+def _iter_chunks(items, chunk_size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _process_in_parallel(items, output_base_dir, stats, workers, chunk_size, on_result=None):
+    """
+    موارد کار را به صورت دسته‌ای بین پروسس‌ها پخش می‌کند. تعداد دسته‌های در جریان محدود است تا کل
+    مخزن صفحات هم‌زمان در حافظه نباشد، و آمار دسته‌ها به ترتیب ارسال ادغام می‌شود تا گزارش نهایی
+    (از جمله ترتیب لیست خطاها) با پردازش ترتیبی یکسان باشد.
+    """
+    max_pending = workers * 2
+    pending = []
+    processed = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(_worker_config(),)) as executor:
+        for chunk in _iter_chunks(items, chunk_size):
+            # برای ثبت در manifest فقط شناسه و وضعیت ورودی‌ها در پروسس اصلی نگه داشته می‌شود
+            chunk_inputs = [(_item_source(item), item[2]) for item in chunk]
+            pending.append((executor.submit(_process_chunk, chunk, output_base_dir), chunk_inputs))
+            while len(pending) >= max_pending:
+                processed += _collect_chunk(pending.pop(0), stats, processed, on_result)
+        while pending:
+            processed += _collect_chunk(pending.pop(0), stats, processed, on_result)
+
+
+def _collect_chunk(pending_chunk, stats, processed, on_result):
+    future, chunk_inputs = pending_chunk
+    chunk_stats, outputs, new_cache_entries = future.result()
+    stats.merge(chunk_stats)
+    lemma_cache.update(new_cache_entries)
+    if on_result:
+        for (source, state), (output, io_failed) in zip(chunk_inputs, outputs):
+            on_result(source, state, output, io_failed)
+    logger.info("پردازش شد: %d/%d", processed + len(chunk_inputs), stats.total_html_files)
+    return len(chunk_inputs)
+
+
+def _token_store_dir(output_base_dir):
+    return os.path.join(output_base_dir, TOKEN_STORE_DIRNAME)
+
+
+def _open_token_store(output_base_dir):
+    """
+    نویسنده خروجی باینری، اگر قالب خروجی token_ids باشد یا خروجی باینری اجراهای قبلی وجود داشته باشد
+    (تا خروجی ورودی‌های حذف یا تغییر کرده از آن هم حذف شود)؛ وگرنه None.
+    """
+    directory = _token_store_dir(output_base_dir)
+    if OUTPUT_FORMAT != "token_ids" and not os.path.isdir(directory):
+        return None
+    return TokenStoreWriter(directory, with_offsets=STORE_TOKEN_OFFSETS)
+
+
+def _output_remover(token_store, output_base_dir):
+    """تابع حذف خروجی برای manifest: سندهای مخزن باینری با ورودی حذف و بقیه خروجی‌ها با حذف فایل."""
+    store_prefix = _token_store_dir(output_base_dir) + os.sep
+
+    def remove_output(output_path):
+        if token_store is not None and output_path.startswith(store_prefix):
+            return token_store.delete(output_path[len(store_prefix):])
+        return remove_file(output_path)
+    return remove_output
+
+
+def save_token_ids(token_store, output, stats):
+    """توکن‌های یک خروجی token_ids را در مخزن باینری می‌نویسد. در صورت خطا False برمی‌گرداند."""
+    key = os.path.relpath(output.path, token_store.directory)
+    try:
+        with stats.stage_seconds.time(("save",)):
+            token_store.add(key, output.tokens, output.offsets)
+        return True
+    except (IOError, ValueError) as e:
+        stats.successfully_processed -= 1
+        stats.tokens.inc(-len(output.tokens))
+        stats.failed_to_save += 1
+        stats.failed_files_list.append((output.path, f"Error on saving token ids: {e}"))
+        return False
+
+
+def _finish_manifest(manifest, stats):
+    """خروجی ورودی‌های حذف شده را پاک و manifest را با نسخه پردازش فعلی ذخیره می‌کند."""
+    stats.removed_outputs = manifest.remove_missing()
+    manifest.commit()
+    manifest.close()
 
 
-def main_processor_v2(): # <<< تغییر نام تابع اصلی
+def main_processor_v2(workers=PROCESSOR_WORKERS, chunk_size=PROCESSOR_CHUNK_SIZE): # <<< تغییر نام تابع اصلی
+    """
+    همه فایل‌های HTML و صفحات مخزن segment ها را پردازش می‌کند.
+    با workers بزرگتر از 1 (یا None برای تعداد هسته‌ها) پردازش با چند پروسس انجام می‌شود؛ خروجی یکسان است.
+    """
+    configure_logging(LOG_LEVEL, LOG_JSON)
     print("شروع پردازش فایل‌های HTML (با مراحل کامل NLP)...")
     start_time = time.time()
     
@@ -334,26 +731,125 @@ def main_processor_v2(): # <<< تغییر نام تابع اصلی
     htm_files_pattern = os.path.join(HTML_FILES_BASE_DIR, "**", "*.htm")
     html_file_paths.extend(glob.glob(htm_files_pattern, recursive=True))
 
-    processing_stats.total_html_files = len(html_file_paths)
+    # صفحاتی که خزنده در مخزن segment ها ذخیره کرده است مستقیما و بدون glob خوانده می‌شوند
+    page_store = PageStoreReader(PAGE_STORE_DIR) if os.path.isdir(PAGE_STORE_DIR) else None
+    stored_page_count = len(page_store) if page_store else 0
 
-    if not html_file_paths:
+    processing_stats.total_html_files = len(html_file_paths) + stored_page_count
+
+    manifest_path = os.path.join(PROCESSED_TEXTS_DIR, MANIFEST_FILENAME)
+    token_store = _open_token_store(PROCESSED_TEXTS_DIR)
+    remove_output = _output_remover(token_store, PROCESSED_TEXTS_DIR)
+    if not processing_stats.total_html_files:
         print(f"هیچ فایل HTML در مسیر {HTML_FILES_BASE_DIR} یافت نشد.")
         print("لطفاً ابتدا خزنده را اجرا کنید تا صفحاتی دانلود شوند.")
+        if INCREMENTAL_PROCESSING and os.path.exists(manifest_path):
+            # همه ورودی‌های قبلی حذف شده‌اند؛ خروجی‌هایشان هم پاک می‌شود
+            _finish_manifest(ProcessingManifest(manifest_path, processing_version(), remove_output),
+                             processing_stats)
+        if token_store is not None:
+            token_store.close()
         processing_stats.report()
         return
 
     print(f"تعداد {processing_stats.total_html_files} فایل HTML برای پردازش یافت شد.")
-    
-    for i, filepath in enumerate(html_file_paths):
-        print(f"پردازش فایل {i+1}/{processing_stats.total_html_files}: {filepath}")
-        # استفاده از تابع وظیفه جدید
-        process_html_file_task_v2(filepath, PROCESSED_TEXTS_DIR, processing_stats) 
+    if stored_page_count:
+        print(f"(از این تعداد {stored_page_count} صفحه از مخزن segment ها در {PAGE_STORE_DIR} خوانده می‌شود.)")
+
+    lemma_cache_path = os.path.join(PROCESSED_TEXTS_DIR, LEMMA_CACHE_FILENAME) if PERSIST_LEMMA_CACHE else None
+    if lemma_cache_path:
+        loaded_entries = lemma_cache.load(lemma_cache_path, lemma_cache_signature())
+        if loaded_entries:
+            print(f"{loaded_entries} ورودی کش لم‌ها از {lemma_cache_path} بارگذاری شد.")
+
+    manifest = None
+    if INCREMENTAL_PROCESSING:
+        manifest = ProcessingManifest(manifest_path, processing_version(), remove_output)
+        if manifest.version_changed:
+            print("تنظیمات پردازش (کلمات توقف، نرمال‌سازی یا ...) تغییر کرده است؛ همه فایل‌ها دوباره پردازش می‌شوند.")
+
+    near_duplicates = NearDuplicateIndex() if DROP_NEAR_DUPLICATES else None
+    if near_duplicates is not None and manifest:
+        # اسناد اصلی اجراهای قبلی که هنوز وجود دارند؛ تکراری‌هایی که سند اصلی‌شان حذف شده دوباره پردازش می‌شوند
+        existing_files = set(html_file_paths)
+
+        def source_exists(source):
+            return source in existing_files or (page_store is not None and source in page_store)
+
+        manifest.forget_orphaned_duplicates(source_exists)
+        for source, fingerprint in manifest.kept_fingerprints():
+            if source_exists(source):
+                near_duplicates.insert(source, fingerprint)
+
+    def record_result(source, state, output, io_failed):
+        output_path, fingerprint = output[:2] if output else (None, None)
+        in_token_store = output is not None and output.tokens is not None
+        original = None
+        if near_duplicates is not None:
+            near_duplicates.discard(source)  # نسخه قبلی همین ورودی (اگر تغییر کرده باشد)
+        if near_duplicates is not None and fingerprint is not None:
+            output_size = len(output.tokens) * 4 if in_token_store else os.path.getsize(output_path)
+            original = near_duplicates.add(source, fingerprint, output_size)
+            if original is not None:
+                # فقط اولین صفحه هر خوشه نگه داشته می‌شود (در قالب token_ids اصلا نوشته نمی‌شود)
+                if not in_token_store:
+                    os.remove(output_path)
+                output_path = None
+                processing_stats.successfully_processed -= 1
+                processing_stats.tokens.inc(-output.token_count)
+                processing_stats.failed_files_list.append((source, f"Near-duplicate of {original}"))
+        if in_token_store and output_path is not None and not save_token_ids(token_store, output, processing_stats):
+            if near_duplicates is not None:
+                near_duplicates.discard(source)
+            output_path = None
+            io_failed = True
+        # ورودی‌هایی که به خاطر خطای خواندن/نوشتن پردازش نشدند ثبت نمی‌شوند تا در اجرای بعدی دوباره امتحان شوند
+        if manifest and not io_failed:
+            manifest.record(source, state, output_path, fingerprint, original)
+
+    work_items = _iter_work_items(html_file_paths, page_store, manifest, processing_stats)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1:
+        print(f"پردازش موازی با {workers} پروسس (دسته‌های {chunk_size} تایی).")
+        _process_in_parallel(work_items, PROCESSED_TEXTS_DIR, processing_stats, workers, chunk_size,
+                             record_result)
+    else:
+        def log_progress(i, item):
+            logger.debug("پردازش %d/%d: %s", i + 1, processing_stats.total_html_files, _item_source(item))
+        # بدون لاگ DEBUG تابع پیشرفت اصلا صدا زده نمی‌شود
+        on_item = log_progress if logger.isEnabledFor(logging.DEBUG) else None
+        _process_items_counting_cache(work_items, PROCESSED_TEXTS_DIR, processing_stats, on_item,
+                                      lambda item, output, io_failed: record_result(
+                                          _item_source(item), item[2], output, io_failed))
+
+    if near_duplicates is not None:
+        processing_stats.near_duplicates = near_duplicates.duplicate_count
+        processing_stats.near_duplicate_clusters = near_duplicates.cluster_count
+        processing_stats.near_duplicate_bytes_saved = near_duplicates.bytes_saved
+
+    if page_store:
+        page_store.close()
+
+    if manifest:
+        _finish_manifest(manifest, processing_stats)
+    if token_store is not None:
+        token_store.close()
+
+    if lemma_cache_path:
+        try:
+            lemma_cache.save(lemma_cache_path, lemma_cache_signature())
+        except OSError as e:
+            print(f"هشدار: ذخیره کش لم‌ها در {lemma_cache_path} ممکن نشد: {e}")
 
     end_time = time.time()
     total_time = end_time - start_time
 
     processing_stats.report()
     print(f"کل زمان صرف شده برای پردازش: {total_time:.2f} ثانیه.")
+    if METRICS_FILE:
+        write_exposition(METRICS_FILE, processing_stats.metrics)
 
 
 if __name__ == "__main__":
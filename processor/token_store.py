@@ -0,0 +1,262 @@
+# seoran/processor/token_store.py
+# سطح: خروجی باینری پردازشگر متن: یک واژه‌نامه سراسری فقط-افزودنی و شناسه توکن‌های هر سند در فایل‌های shard
+# بزرگ، به جای یک فایل متنی (توکن‌های جدا شده با فاصله) برای هر سند.
+#
+# قالب فایل‌ها (داخل پوشه TOKEN_STORE_DIRNAME):
+#   vocabulary.txt      هر اصطلاح (لم) در یک خط UTF-8؛ شناسه هر اصطلاح شماره خط آن (از صفر) است.
+#                       فقط اضافه می‌شود، پس شناسه‌ها بین اجراها ثابت می‌مانند.
+#   shard-NNNNN.ids     شناسه توکن‌های اسناد پشت سر هم، هر کدام uint32 با ترتیب بایت little-endian
+#   shard-NNNNN.off     (اختیاری، برای همه اسناد یک shard یا هیچ‌کدام) offset کاراکتری هر توکن در متن نرمال شده
+#                       سند، موازی با .ids؛ offset نامعلوم DELETED_MARKER است
+#   shard-NNNNN.docs    جدول اسناد: برای هر سند هدر ثابت (شماره اولین توکن در shard: 8 بایت، تعداد توکن‌ها:
+#                       4 بایت، طول کلید: 2 بایت) و سپس کلید سند (UTF-8). تعداد DELETED_MARKER یعنی سند حذف شده.
+# ابتدا واژه‌نامه، سپس توکن‌ها و در آخر ورودی جدول اسناد نوشته می‌شود تا جدول هرگز به داده ناقص اشاره نکند.
+# نسخه‌های جدیدتر یک کلید (در ادامه همان shard یا shard های بعدی) جایگزین نسخه‌های قبلی می‌شوند.
+#
+# خواندن بدون کپی است: فایل‌های .ids با mmap باز می‌شوند و توکن‌های هر سند یک memoryview از نوع 'I' هستند.
+
+import glob
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+# --- پیکربندی ---
+TOKEN_STORE_DIRNAME = "token_shards"   # زیرپوشه خروجی باینری داخل پوشه خروجی پردازشگر
+VOCABULARY_FILENAME = "vocabulary.txt"
+SHARD_MAX_TOKENS = 64 * 1024 * 1024    # بعد از این تعداد توکن (256 مگابایت) shard جدید شروع می‌شود
+
+DELETED_MARKER = 0xFFFFFFFF
+_DOC_ENTRY = struct.Struct('<QIH')
+_SHARD_NAME_RE = re.compile(r'shard-(\d+)\.docs$')
+# memoryview.cast ترتیب بایت ماشین را استفاده می‌کند؛ روی ماشین‌های big-endian توکن‌ها کپی و جابجا می‌شوند
+_NATIVE_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+TokenDocument = namedtuple('TokenDocument', ['key', 'token_ids', 'offsets'])
+
+
+def _shard_paths(directory):
+    paths = []
+    for path in glob.glob(os.path.join(directory, "shard-*.docs")):
+        match = _SHARD_NAME_RE.search(path)
+        if match:
+            paths.append((int(match.group(1)), path[:-len(".docs")]))
+    return sorted(paths)
+
+
+def _to_le_bytes(values):
+    values = array('I', values)
+    if not _NATIVE_LITTLE_ENDIAN:
+        values.byteswap()
+    return values.tobytes()
+
+
+def _load_vocabulary(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8', newline="") as f:
+        data = f.read()
+    # خط آخر ناقص (قطع برنامه هنگام نوشتن) نادیده گرفته می‌شود؛ اسنادی که به آن نیاز داشتند هم نوشته نشده‌اند
+    return data.split("\n")[:-1]
+
+
+class TokenStoreWriter:
+    """
+    نویسنده فقط-افزودنی خروجی باینری. واژه‌نامه موجود بارگذاری می‌شود و اصطلاحات جدید به انتهای آن اضافه می‌شوند.
+    هر نمونه shard های جدید خودش را (با ساخت انحصاری فایل‌ها) شروع می‌کند. در هر لحظه فقط یک نویسنده
+    (پروسس اصلی پردازشگر) باید روی یک پوشه کار کند، چون واژه‌نامه مشترک است.
+    با with_offsets برای هر سند offset توکن‌ها هم باید داده شود.
+    """
+    def __init__(self, directory, with_offsets=False, shard_max_tokens=SHARD_MAX_TOKENS):
+        self.directory = directory
+        self.with_offsets = with_offsets
+        self.shard_max_tokens = shard_max_tokens
+        os.makedirs(directory, exist_ok=True)
+        vocabulary_path = os.path.join(directory, VOCABULARY_FILENAME)
+        self.vocabulary = _load_vocabulary(vocabulary_path)
+        self._term_ids = {term: term_id for term_id, term in enumerate(self.vocabulary)}
+        with open(vocabulary_path, 'ab') as f:
+            # حذف خط آخر ناقص تا اصطلاحات جدید شماره خط درستی بگیرند
+            f.truncate(sum(len(term.encode('utf-8')) + 1 for term in self.vocabulary))
+        self._vocabulary_file = open(vocabulary_path, 'a', encoding='utf-8', newline="\n")
+
+        existing = _shard_paths(directory)
+        self._shard_id = existing[-1][0] + 1 if existing else 0
+        self._ids_file = None
+        self._offsets_file = None
+        self._docs_file = None
+        self._shard_tokens = 0
+
+    def term_ids(self, terms):
+        """شناسه اصطلاحات (اصطلاحات جدید به واژه‌نامه اضافه می‌شوند) به صورت array('I')."""
+        term_ids = self._term_ids
+        ids = array('I')
+        new_terms = []
+        for term in terms:
+            term_id = term_ids.get(term)
+            if term_id is None:
+                term_id = term_ids[term] = len(self.vocabulary)
+                self.vocabulary.append(term)
+                new_terms.append(term)
+            ids.append(term_id)
+        if new_terms:
+            self._vocabulary_file.write("\n".join(new_terms) + "\n")
+        return ids
+
+    def _open_shard(self):
+        while True:
+            base = os.path.join(self.directory, f"shard-{self._shard_id:05d}")
+            try:
+                self._docs_file = open(base + ".docs", 'xb')
+                break
+            except FileExistsError:
+                self._shard_id += 1
+        self._ids_file = open(base + ".ids", 'wb')
+        self._offsets_file = open(base + ".off", 'wb') if self.with_offsets else None
+        self._shard_tokens = 0
+
+    def _close_shard(self):
+        if self._docs_file is not None:
+            for f in (self._ids_file, self._offsets_file, self._docs_file):
+                if f is not None:
+                    f.close()
+            self._docs_file = None
+
+    def _write_entry(self, key, token_count, ids_bytes=b"", offsets_bytes=b""):
+        if self._docs_file is None:
+            self._open_shard()
+        elif self._shard_tokens >= self.shard_max_tokens:
+            self._close_shard()
+            self._shard_id += 1
+            self._open_shard()
+        key_bytes = key.encode('utf-8')
+        start = self._shard_tokens
+        if ids_bytes:
+            self._vocabulary_file.flush()
+            self._ids_file.write(ids_bytes)
+            self._ids_file.flush()
+            if offsets_bytes:
+                self._offsets_file.write(offsets_bytes)
+                self._offsets_file.flush()
+            self._shard_tokens += token_count
+        self._docs_file.write(_DOC_ENTRY.pack(start, token_count, len(key_bytes)) + key_bytes)
+        self._docs_file.flush()
+
+    def add(self, key, terms, offsets=None):
+        """
+        سند key را با لیست اصطلاحاتش (و در صورت وجود offset هر توکن) اضافه می‌کند و تعداد بایت‌های نوشته شده
+        را برمی‌گرداند. اگر key قبلا نوشته شده باشد، این نسخه جایگزین آن می‌شود.
+        """
+        if self.with_offsets != (offsets is not None) or (offsets is not None and len(offsets) != len(terms)):
+            raise ValueError("offset ها باید دقیقا برای همه توکن‌ها داده شوند (فقط با with_offsets).")
+        ids_bytes = _to_le_bytes(self.term_ids(terms))
+        offsets_bytes = b""
+        if offsets is not None:
+            offsets_bytes = _to_le_bytes(DELETED_MARKER if offset is None else offset for offset in offsets)
+        self._write_entry(key, len(terms), ids_bytes, offsets_bytes)
+        return len(ids_bytes) + len(offsets_bytes)
+
+    def delete(self, key):
+        """سند key را حذف می‌کند (یک ورودی حذف در جدول اسناد)."""
+        self._write_entry(key, DELETED_MARKER)
+        return True
+
+    def close(self):
+        self._close_shard()
+        self._vocabulary_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TokenStoreReader:
+    """
+    خواننده خروجی باینری: واژه‌نامه، آخرین نسخه هر سند و دسترسی بدون کپی به شناسه توکن‌ها.
+    memoryview های برگردانده شده تا close معتبرند و پیش از close باید رها شوند (یا کپی شوند).
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.vocabulary = _load_vocabulary(os.path.join(directory, VOCABULARY_FILENAME))
+        self._shards = dict(_shard_paths(directory))
+        self._maps = {}
+        self._documents = {}  # کلید -> (shard، شماره اولین توکن، تعداد توکن‌ها)
+        for shard_id in sorted(self._shards):
+            with open(self._shards[shard_id] + ".docs", 'rb') as f:
+                data = f.read()
+            offset = 0
+            while offset + _DOC_ENTRY.size <= len(data):
+                start, count, key_length = _DOC_ENTRY.unpack_from(data, offset)
+                offset += _DOC_ENTRY.size
+                if offset + key_length > len(data):
+                    break  # ورودی ناقص در انتهای جدول
+                key = data[offset:offset + key_length].decode('utf-8')
+                offset += key_length
+                if count == DELETED_MARKER:
+                    self._documents.pop(key, None)
+                else:
+                    self._documents[key] = (shard_id, start, count)
+
+    def _view(self, shard_id, suffix, start, count):
+        if not count:
+            return memoryview(b"").cast('I')
+        segment_map = self._maps.get((shard_id, suffix))
+        if segment_map is None:
+            path = self._shards[shard_id] + suffix
+            if not os.path.getsize(path):
+                return None
+            with open(path, 'rb') as f:
+                segment_map = self._maps[(shard_id, suffix)] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(segment_map)[start * 4:(start + count) * 4]
+        if _NATIVE_LITTLE_ENDIAN:
+            return view.cast('I')
+        values = array('I', view)
+        values.byteswap()
+        return memoryview(values)
+
+    def get(self, key, with_offsets=False):
+        """TokenDocument سند key یا None. offsets فقط با with_offsets (و اگر ذخیره شده باشند) پر می‌شود."""
+        location = self._documents.get(key)
+        if location is None:
+            return None
+        shard_id, start, count = location
+        offsets = self._view(shard_id, ".off", start, count) if with_offsets else None
+        return TokenDocument(key, self._view(shard_id, ".ids", start, count), offsets)
+
+    def keys(self):
+        return self._documents.keys()
+
+    def iter_documents(self, with_offsets=False):
+        """آخرین نسخه همه اسناد به ترتیب کلید (ترتیب ثابت در هر بار خواندن)."""
+        for key in sorted(self._documents):
+            yield self.get(key, with_offsets)
+
+    def terms(self, token_ids):
+        """اصطلاحات متناظر با شناسه‌ها."""
+        vocabulary = self.vocabulary
+        return [vocabulary[token_id] for token_id in token_ids]
+
+    def __len__(self):
+        return len(self._documents)
+
+    def __contains__(self, key):
+        return key in self._documents
+
+    def close(self):
+        for segment_map in self._maps.values():
+            try:
+                segment_map.close()
+            except BufferError:
+                pass  # هنوز memoryview ای از آن استفاده می‌کند؛ با آزاد شدن آخرین ارجاع بسته می‌شود
+        self._maps = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()